@@ -73,4 +73,17 @@ def main():
 
 if __name__ == "__main__":
     """程序入口点"""
+    # PDF并行提取使用 spawn 方式的子进程，打包为可执行文件时需要此调用
+    import multiprocessing
+    multiprocessing.freeze_support()
+    # 命令行统计模式：python CorpusSearchTool.py count 关键词 ... / stats ... / colloc 词典形 ...（不启动界面）
+    if len(sys.argv) > 1 and sys.argv[1] == 'count':
+        from function.frequency_counter import count_main
+        sys.exit(count_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'stats':
+        from function.corpus_statistics import stats_main
+        sys.exit(stats_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == 'colloc':
+        from function.collocation import collocation_main
+        sys.exit(collocation_main(sys.argv[2:]))
     sys.exit(main())
\ No newline at end of file
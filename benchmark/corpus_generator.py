@@ -0,0 +1,185 @@
+"""
+合成语料库生成模块
+根据固定随机种子生成 SRT/ASS/VTT/MD/TXT 格式的韩语和英语台词文件，
+同一种子和规模总是生成完全相同的语料库，用于性能基准测试
+"""
+
+import argparse
+import os
+import random
+from typing import Dict, Iterator, List, Tuple
+
+# 预设规模（字节）
+SCALES = {
+    '10mb': 10 * 1024 * 1024,
+    '100mb': 100 * 1024 * 1024,
+    '1gb': 1024 * 1024 * 1024,
+}
+
+# 生成的文件格式
+FORMATS = ['srt', 'ass', 'vtt', 'md', 'txt']
+
+# 单个文件的目标大小（字节），接近一集字幕的规模
+FILE_SIZE = 512 * 1024
+
+# 韩语句子素材：基准测试关键词（사람、가다、눈이 높다）以一定比例出现
+KOREAN_SUBJECTS = ['나는', '우리는', '그 사람은', '엄마가', '친구가', '선배님은', '동생이', '그녀는']
+KOREAN_OBJECTS = ['밥을', '커피를', '영화를', '책을', '선물을', '사진을', '편지를', '음악을']
+KOREAN_VERBS = ['먹어요', '마셨어요', '봤어요', '읽고 있어요', '샀어요', '찍었어요', '썼어요', '들었어요',
+                '가요', '갔어요', '가고 싶어요', '갈 거예요']
+KOREAN_EXTRAS = ['오늘', '어제', '내일', '정말', '진짜', '아까', '빨리', '천천히', '같이', '혼자']
+KOREAN_IDIOMS = ['눈이 너무 높아요', '눈이 높은 사람이에요', '그 사람 진짜 눈이 높네']
+KOREAN_PLACES = ['학교에', '회사에', '집에', '병원에', '시장에', '공항에']
+
+# 英语句子素材
+ENGLISH_SUBJECTS = ['I', 'We', 'She', 'He', 'They', 'My friend', 'The doctor', 'Your brother']
+ENGLISH_VERBS = ['go', 'went', 'is going', 'walks', 'walked', 'takes', 'took', 'makes', 'made', 'looks']
+ENGLISH_OBJECTS = ['to school', 'home', 'a picture', 'a decision', 'the bus', 'a break', 'dinner', 'a look']
+ENGLISH_EXTRAS = ['today', 'yesterday', 'right now', 'again', 'really', 'finally', 'together', 'alone']
+
+
+class CorpusGenerator:
+    """合成语料库生成器"""
+
+    def __init__(self, seed: int = 20240101, file_size: int = FILE_SIZE):
+        """
+        初始化生成器
+
+        Args:
+            seed: 随机种子
+            file_size: 单个文件的目标大小（字节）
+        """
+        self.seed = seed
+        self.file_size = file_size
+
+    def korean_line(self, rng: random.Random) -> str:
+        """生成一句韩语台词"""
+        roll = rng.random()
+        if roll < 0.03:
+            return rng.choice(KOREAN_IDIOMS)
+        if roll < 0.25:
+            return f"{rng.choice(KOREAN_EXTRAS)} {rng.choice(KOREAN_SUBJECTS)} {rng.choice(KOREAN_PLACES)} {rng.choice(KOREAN_VERBS[8:])}"
+        return f"{rng.choice(KOREAN_EXTRAS)} {rng.choice(KOREAN_SUBJECTS)} {rng.choice(KOREAN_OBJECTS)} {rng.choice(KOREAN_VERBS[:8])}"
+
+    def english_line(self, rng: random.Random) -> str:
+        """生成一句英语台词"""
+        return (f"{rng.choice(ENGLISH_SUBJECTS)} {rng.choice(ENGLISH_VERBS)} "
+                f"{rng.choice(ENGLISH_OBJECTS)} {rng.choice(ENGLISH_EXTRAS)}.")
+
+    def generate(self, output_dir: str, total_size: int) -> Dict:
+        """
+        生成语料库
+
+        Args:
+            output_dir: 输出目录
+            total_size: 目标总大小（字节）
+
+        Returns:
+            语料库清单：{'files': [...], 'bytes': 总字节数, 'seed': 种子}
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        files = []
+        total = 0
+        index = 0
+        while total < total_size:
+            fmt = FORMATS[index % len(FORMATS)]
+            language = 'kor' if (index // len(FORMATS)) % 2 == 0 else 'eng'
+            episode = index // (2 * len(FORMATS)) + 1
+            file_name = f"{language}_ep{episode:04d}.{fmt}"
+            file_path = os.path.join(output_dir, file_name)
+
+            target = min(self.file_size, total_size - total)
+            rng = random.Random(f"{self.seed}:{index}")
+            size = self._write_file(file_path, fmt, language, episode, target, rng)
+
+            files.append({'path': file_name, 'format': fmt, 'language': language, 'bytes': size})
+            total += size
+            index += 1
+
+        return {'files': files, 'bytes': total, 'seed': self.seed}
+
+    def _iter_cues(self, language: str, rng: random.Random) -> Iterator[Tuple[int, int, str]]:
+        """无限产出 (开始毫秒, 结束毫秒, 台词)"""
+        make_line = self.korean_line if language == 'kor' else self.english_line
+        start = 1000
+        while True:
+            duration = rng.randint(800, 4000)
+            yield start, start + duration, make_line(rng)
+            start += duration + rng.randint(100, 1500)
+
+    def _write_file(self, file_path: str, fmt: str, language: str, episode: int,
+                    target: int, rng: random.Random) -> int:
+        """
+        写入单个文件，直到达到目标大小
+
+        Returns:
+            实际写入的字节数
+        """
+        chunks: List[str] = []
+        size = 0
+
+        def add(text: str):
+            nonlocal size
+            chunks.append(text)
+            size += len(text.encode('utf-8'))
+
+        title = f"Show S01E{episode:02d}"
+        if fmt == 'ass':
+            add("[Script Info]\nScriptType: v4.00+\n\n[Events]\n"
+                "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+        elif fmt == 'vtt':
+            add("WEBVTT\n\n")
+        elif fmt == 'md':
+            add(f"# {title}\n\n")
+        elif fmt == 'txt':
+            add(f"第{episode}集\n")
+
+        for n, (start, end, line) in enumerate(self._iter_cues(language, rng), 1):
+            if size >= target:
+                break
+            if fmt == 'srt':
+                add(f"{n}\n{self._srt_time(start)} --> {self._srt_time(end)}\n{line}\n\n")
+            elif fmt == 'ass':
+                add(f"Dialogue: 0,{self._ass_time(start)},{self._ass_time(end)},Default,,0,0,0,,{line}\n")
+            elif fmt == 'vtt':
+                add(f"{self._srt_time(start).replace(',', '.')} --> {self._srt_time(end).replace(',', '.')}\n{line}\n\n")
+            elif fmt == 'md':
+                add(f"[{self._clock(start)}] {line}\n")
+            else:
+                add(f"{line}\n")
+
+        with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(''.join(chunks))
+        return size
+
+    @staticmethod
+    def _clock(ms: int) -> str:
+        """毫秒转 HH:MM:SS"""
+        seconds = ms // 1000
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+    def _srt_time(self, ms: int) -> str:
+        """毫秒转 HH:MM:SS,mmm"""
+        return f"{self._clock(ms)},{ms % 1000:03d}"
+
+    @staticmethod
+    def _ass_time(ms: int) -> str:
+        """毫秒转 H:MM:SS.cc"""
+        seconds = ms // 1000
+        return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}.{ms % 1000 // 10:02d}"
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="生成合成语料库")
+    parser.add_argument('output_dir', help="输出目录")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10mb', help="语料库规模")
+    parser.add_argument('--seed', type=int, default=20240101, help="随机种子")
+    args = parser.parse_args()
+
+    manifest = CorpusGenerator(args.seed).generate(args.output_dir, SCALES[args.scale])
+    print(f"已生成 {len(manifest['files'])} 个文件，共 {manifest['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+"""
+搜索流程性能基准测试
+在合成语料库上分别计时各个阶段（解析、搜索、结果格式化、HTML导出、历史记录读写），
+结果写入JSON基准文件，并可与之前的基准比较以发现性能回退
+
+用法:
+    python benchmark/run_benchmark.py --scale 10mb
+    python benchmark/run_benchmark.py --scale 100mb --compare benchmark/results/baseline_100mb.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+# 添加项目根目录到Python路径
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCHMARK_DIR))
+
+from benchmark.corpus_generator import CorpusGenerator, SCALES, FORMATS
+
+
+class StageTimer:
+    """单个阶段的计时器，超出时间预算后停止处理剩余文件"""
+
+    def __init__(self, name: str, budget: float):
+        """
+        初始化计时器
+
+        Args:
+            name: 阶段名称
+            budget: 时间预算（秒），0 表示不限制
+        """
+        self.name = name
+        self.budget = budget
+        self.seconds = 0.0
+        self.bytes = 0
+        self.items = 0
+        self.partial = False
+
+    def exhausted(self) -> bool:
+        """是否已用完时间预算"""
+        if self.budget and self.seconds >= self.budget:
+            self.partial = True
+            return True
+        return False
+
+    def measure(self, func: Callable, size: int = 0):
+        """
+        计时执行一次操作
+
+        Args:
+            func: 要执行的操作，返回处理的条目数
+            size: 本次处理的字节数
+        """
+        start = time.perf_counter()
+        items = func()
+        self.seconds += time.perf_counter() - start
+        self.bytes += size
+        self.items += items or 0
+
+    def to_dict(self) -> Dict:
+        """转换为JSON记录"""
+        seconds = self.seconds or 1e-9
+        return {
+            'seconds': round(self.seconds, 4),
+            'bytes': self.bytes,
+            'items': self.items,
+            'mb_per_s': round(self.bytes / 1024 / 1024 / seconds, 3) if self.bytes else None,
+            'items_per_s': round(self.items / seconds, 1),
+            'partial': self.partial,
+        }
+
+
+class PipelineBenchmark:
+    """搜索流程基准测试"""
+
+    def __init__(self, corpus_dir: str, manifest: Dict, budget: float):
+        """
+        初始化基准测试
+
+        Args:
+            corpus_dir: 语料库目录
+            manifest: 语料库清单
+            budget: 每个阶段的时间预算（秒）
+        """
+        from function.search_engine_base import search_engine_base
+        from function.search_engine_kor import search_engine_kor
+
+        self.engine = search_engine_base
+        self.kor_engine = search_engine_kor
+        self.corpus_dir = corpus_dir
+        self.files = manifest['files']
+        self.budget = budget
+        self.stages: Dict[str, StageTimer] = {}
+        self.english_results: List[Dict] = []
+        self.korean_results: List[Dict] = []
+
+    def _timer(self, name: str) -> StageTimer:
+        """创建并登记阶段计时器"""
+        timer = StageTimer(name, self.budget)
+        self.stages[name] = timer
+        return timer
+
+    def _paths(self, language: str = None, fmt: str = None):
+        """按语言和格式筛选语料文件，产出 (路径, 字节数)"""
+        for item in self.files:
+            if language and item['language'] != language:
+                continue
+            if fmt and item['format'] != fmt:
+                continue
+            yield os.path.join(self.corpus_dir, item['path']), item['bytes']
+
+    def run(self, stages: List[str]):
+        """按顺序运行指定阶段"""
+        for stage in stages:
+            print(f"[benchmark] {stage} ...", flush=True)
+            getattr(self, f'bench_{stage}')()
+
+    def bench_parse(self):
+        """各格式解析器吞吐量（不使用解析缓存）"""
+        for fmt in FORMATS:
+            timer = self._timer(f'parse_{fmt}')
+            for path, size in self._paths(fmt=fmt):
+                if timer.exhausted():
+                    break
+                timer.measure(lambda: sum(1 for _ in self.engine._parse_file(path)), size)
+
+    def bench_search_in_parsed_data(self):
+        """通用关键词匹配（解析结果已在内存中，只计匹配时间）"""
+        for language, keywords in (('eng', ['went']), ('kor', ['사람'])):
+            timer = self._timer(f'search_in_parsed_data_{language}')
+            for path, size in self._paths(language=language):
+                if timer.exhausted():
+                    break
+                records = list(self.engine._parse_file(path))
+
+                def search():
+                    results = self.engine._search_in_parsed_data(
+                        records, keywords, False, False, False, self.engine._is_subtitle_file(path))
+                    if language == 'eng':
+                        self.english_results.extend(results)
+                    return len(records)
+
+                timer.measure(search, size)
+
+    def _bench_korean(self, name: str, search: Callable[[str], List[Dict]]):
+        """
+        韩语搜索阶段：每个文件先预解析到缓存（不计时），只计搜索时间
+
+        Args:
+            name: 阶段名称
+            search: 接收文件路径、返回结果列表的搜索函数
+        """
+        from function.parse_cache import parse_cache
+
+        timer = self._timer(name)
+        for path, size in self._paths(language='kor'):
+            if timer.exhausted():
+                break
+            count = self.engine.preparse(path)
+
+            def run_search():
+                results = search(path)
+                if name == 'search_korean_advanced_noun':
+                    self.korean_results.extend(results)
+                return count
+
+            timer.measure(run_search, size)
+            parse_cache.invalidate(path)
+
+    def bench_search_korean_advanced_noun(self):
+        """韩语高级搜索（名词路径）"""
+        self._bench_korean('search_korean_advanced_noun',
+                           lambda path: self.kor_engine.search_korean_advanced(path, '사람')['search_results'])
+
+    def bench_search_korean_advanced_verb(self):
+        """韩语高级搜索（动词路径，含形态分析）"""
+        self._bench_korean('search_korean_advanced_verb',
+                           lambda path: self.kor_engine.search_korean_advanced(path, '가다')['search_results'])
+
+    def bench_search_korean_idiom(self):
+        """韩语惯用语搜索"""
+        self._bench_korean('search_korean_idiom',
+                           lambda path: self.kor_engine.search_korean_idiom(path, '눈이 높다'))
+
+    def _all_results(self) -> List[Dict]:
+        """前面阶段收集的搜索结果"""
+        return self.english_results + self.korean_results
+
+    def bench_format_results(self):
+        """结果格式化（format_results_for_display）"""
+        from function.result_processor import result_processor
+
+        results = self._all_results()
+        timer = self._timer('format_results_for_display')
+        timer.measure(lambda: len(result_processor.format_results_for_display(results, 'subtitle')))
+
+    def bench_html_export(self):
+        """HTML导出（与界面自动导出使用同一实现）"""
+        from function.result_processor import result_processor
+        from gui.qt_CorpusSearchTool import CorpusSearchToolGUI
+
+        rows = [list(row) for row in result_processor.format_results_for_display(self._all_results(), 'subtitle')]
+        window = SimpleNamespace(
+            current_search_params={'keywords': '사람 went', 'input_path': self.corpus_dir, 'keyword_type': ''},
+            current_corpus_tab=1,
+            status_bar=SimpleNamespace(showMessage=lambda message: None),
+        )
+
+        timer = self._timer('html_export')
+        output = []
+        timer.measure(lambda: output.append(CorpusSearchToolGUI.auto_export_results(window, rows)) or len(rows))
+        if output and output[0] and os.path.exists(output[0]):
+            os.unlink(output[0])
+
+    def bench_history(self):
+        """搜索历史记录保存和读取（100条记录）"""
+        from function.search_history_manager import SearchHistoryManager
+
+        manager = SearchHistoryManager('kor')
+        fd, history_file = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        manager.history_file = history_file
+        manager.history = []
+        try:
+            for i in range(100):
+                manager.history.append({
+                    'timestamp': datetime(2024, 1, 1, 0, i // 60, i % 60).isoformat(),
+                    'keywords': f'키워드{i}', 'input_path': self.corpus_dir, 'output_path': '',
+                    'html_path': '', 'result_count': i, 'keyword_type': '单词', 'lemma': '가다',
+                    'target_variant_set': ['가요', '갔어요'], 'actual_variant_set': ['가요'],
+                    'settings': {'case_sensitive': False, 'fuzzy_match': False, 'regex_enabled': False},
+                })
+
+            save_timer = self._timer('history_save')
+            load_timer = self._timer('history_load')
+            for _ in range(50):
+                save_timer.measure(lambda: manager.save_history() or len(manager.history))
+                load_timer.measure(lambda: len(manager.load_history()))
+        finally:
+            os.unlink(history_file)
+
+    def report(self) -> Dict:
+        """所有阶段的结果"""
+        return {name: timer.to_dict() for name, timer in self.stages.items()}
+
+
+ALL_STAGES = ['parse', 'search_in_parsed_data', 'search_korean_advanced_noun', 'search_korean_advanced_verb',
+              'search_korean_idiom', 'format_results', 'html_export', 'history']
+
+
+def ensure_corpus(corpus_dir: str, scale: str, seed: int) -> Dict:
+    """
+    语料库不存在或参数不同时重新生成
+
+    Returns:
+        语料库清单
+    """
+    manifest_path = os.path.join(corpus_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('seed') == seed and manifest.get('scale') == scale:
+            return manifest
+
+    print(f"[benchmark] 生成 {scale} 语料库到 {corpus_dir} ...", flush=True)
+    manifest = CorpusGenerator(seed).generate(corpus_dir, SCALES[scale])
+    manifest['scale'] = scale
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> bool:
+    """
+    与基准比较并打印结果
+
+    Args:
+        current: 本次结果
+        baseline: 基准结果
+        tolerance: 允许的变慢比例，如 0.2 表示慢 20% 以内不算回退
+
+    Returns:
+        是否没有回退
+    """
+    ok = True
+    print(f"\n{'阶段':<36}{'基准(s)':>10}{'本次(s)':>10}{'比例':>8}")
+    for name, stage in current['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if not base or not base['items']:
+            print(f"{name:<36}{'-':>10}{stage['seconds']:>10.3f}{'-':>8}")
+            continue
+        # 部分运行的阶段按单位条目耗时比较
+        ratio = (stage['seconds'] / max(stage['items'], 1)) / (base['seconds'] / base['items'] or 1e-9)
+        flag = '' if ratio <= 1 + tolerance else '  <-- 回退'
+        ok = ok and not flag
+        print(f"{name:<36}{base['seconds']:>10.3f}{stage['seconds']:>10.3f}{ratio:>8.2f}{flag}")
+    return ok
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="搜索流程性能基准测试")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='10mb', help="语料库规模")
+    parser.add_argument('--seed', type=int, default=20240101, help="语料库随机种子")
+    parser.add_argument('--corpus-dir', help="语料库目录，默认 benchmark/corpus/<规模>")
+    parser.add_argument('--stages', nargs='+', choices=ALL_STAGES, default=ALL_STAGES, help="要运行的阶段")
+    parser.add_argument('--budget', type=float, default=60.0,
+                        help="每个阶段的时间预算（秒），超出后只统计已处理部分，0 表示不限制")
+    parser.add_argument('--output', help="结果JSON路径，默认 benchmark/results/baseline_<规模>.json")
+    parser.add_argument('--compare', help="与之前的基准JSON比较")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="比较时允许的变慢比例")
+    args = parser.parse_args()
+
+    # 先读取基准，允许与本次输出使用同一路径
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    corpus_dir = args.corpus_dir or os.path.join(BENCHMARK_DIR, 'corpus', args.scale)
+    manifest = ensure_corpus(corpus_dir, args.scale, args.seed)
+
+    benchmark = PipelineBenchmark(corpus_dir, manifest, args.budget)
+    benchmark.run(args.stages)
+
+    result = {
+        'scale': args.scale,
+        'seed': args.seed,
+        'corpus_bytes': manifest['bytes'],
+        'corpus_files': len(manifest['files']),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'budget': args.budget,
+        'stages': benchmark.report(),
+    }
+
+    output = args.output or os.path.join(BENCHMARK_DIR, 'results', f'baseline_{args.scale}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"[benchmark] 结果已写入 {output}")
+
+    if baseline is not None:
+        if not compare(result, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+"""
+搭配统计模块
+为每个文件建立词典形位置索引（每行台词的词典形序列，形态分析结果来自语料库统计的按行缓存），
+各文件的词典形序列按文件指纹保存到 statistics 文件夹，未变化的文件无需重新分析；
+查询某个词典形时只需读取它的倒排列表并统计窗口内左右两侧的词，
+按 PMI、log-Dice 或 t-score 排序，也可以统计词典形 n-gram
+"""
+
+import argparse
+import json
+import math
+import os
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from function.corpus_statistics import STATISTICS_DIR, KoreanLineAnalyzer, korean_line_analyzer
+
+
+# 可用的搭配强度指标
+MEASURES = ('log_dice', 'pmi', 't_score')
+# 词典形序列保存格式的版本
+SEQUENCES_VERSION = 1
+
+
+class LemmaSequenceIndex:
+    """单个文件的词典形位置索引：所有行的词典形序号连成一个数组，另记每行的起始位置"""
+
+    def __init__(self, records: Iterable[Dict], analyzer: Optional[KoreanLineAnalyzer] = None,
+                 fingerprint: Optional[Tuple[int, int]] = None):
+        """
+        建立索引
+
+        Args:
+            records: 文件的解析结果
+            analyzer: 形态分析器，None 表示使用全局实例
+            fingerprint: 文件指纹
+        """
+        analyzer = analyzer or korean_line_analyzer
+        self.fingerprint = fingerprint
+        self.keys: List[str] = []
+        key_ids: Dict[str, int] = {}
+        self.tokens = array('I')
+        self.line_starts = array('I')
+        for record in records:
+            self.line_starts.append(len(self.tokens))
+            for key in analyzer.analyze(record.get('content', '')):
+                key_id = key_ids.get(key)
+                if key_id is None:
+                    key_id = key_ids[key] = len(self.keys)
+                    self.keys.append(key)
+                self.tokens.append(key_id)
+        self.line_starts.append(len(self.tokens))
+        self._build_postings()
+
+    def _build_postings(self):
+        """由词典形序列建立倒排列表"""
+        self._key_ids = {key: i for i, key in enumerate(self.keys)}
+        postings: Dict[int, array] = {i: array('I') for i in range(len(self.keys))}
+        for position, key_id in enumerate(self.tokens):
+            postings[key_id].append(position)
+        self._postings = postings
+
+    def to_json(self) -> Dict:
+        """转换为可保存的字典"""
+        return {
+            'fingerprint': list(self.fingerprint) if self.fingerprint else None,
+            'keys': self.keys,
+            'tokens': self.tokens.tolist(),
+            'line_starts': self.line_starts.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'LemmaSequenceIndex':
+        """从保存的字典恢复（倒排列表由词典形序列重新建立，不需要形态分析）"""
+        fingerprint = data.get('fingerprint')
+        index = cls((), fingerprint=tuple(fingerprint) if fingerprint else None)
+        index.keys = list(data.get('keys', []))
+        index.tokens = array('I', data.get('tokens', []))
+        index.line_starts = array('I', data.get('line_starts', [0]))
+        index._build_postings()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def frequency(self, key: str) -> int:
+        """
+        词典形在文件中的出现次数
+
+        Args:
+            key: 统计键（词典形/词性）
+
+        Returns:
+            出现次数
+        """
+        key_id = self._key_ids.get(key)
+        return 0 if key_id is None else len(self._postings[key_id])
+
+    def matching_keys(self, lemma: str) -> List[str]:
+        """
+        取得词典形对应的统计键（未指定词性时包括所有词性）
+
+        Args:
+            lemma: 词典形或统计键
+
+        Returns:
+            文件中出现的统计键
+        """
+        if '/' in lemma:
+            return [lemma] if lemma in self._key_ids else []
+        return [key for key in self._key_ids if key.rpartition('/')[0] == lemma]
+
+    def neighbours(self, keys: List[str], left: int, right: int) -> Tuple[Counter, Counter, int]:
+        """
+        统计词典形左右窗口内出现的词（窗口不跨行）
+
+        Args:
+            keys: 节点词的统计键
+            left: 左侧窗口的词数
+            right: 右侧窗口的词数
+
+        Returns:
+            (左侧词 -> 次数, 右侧词 -> 次数, 节点词出现次数)
+        """
+        tokens = self.tokens
+        line_starts = self.line_starts
+        left_ids: Counter = Counter()
+        right_ids: Counter = Counter()
+        node_count = 0
+        for key in keys:
+            for position in self._postings[self._key_ids[key]]:
+                node_count += 1
+                line = bisect_right(line_starts, position) - 1
+                start, end = line_starts[line], line_starts[line + 1]
+                left_ids.update(tokens[max(start, position - left):position])
+                right_ids.update(tokens[position + 1:min(end, position + right + 1)])
+        return (Counter({self.keys[i]: n for i, n in left_ids.items()}),
+                Counter({self.keys[i]: n for i, n in right_ids.items()}), node_count)
+
+    def ngrams(self, n: int) -> Counter:
+        """
+        统计文件中的词典形 n-gram（不跨行）
+
+        Args:
+            n: 元数
+
+        Returns:
+            统计键元组 -> 次数
+        """
+        tokens = self.tokens
+        line_starts = self.line_starts
+        counts: Counter = Counter()
+        for line in range(len(line_starts) - 1):
+            start, end = line_starts[line], line_starts[line + 1]
+            counts.update(tuple(tokens[i:i + n]) for i in range(start, end - n + 1))
+        return Counter({tuple(self.keys[i] for i in gram): count for gram, count in counts.items()})
+
+
+def association_score(measure: str, observed: int, node_frequency: int, collocate_frequency: int,
+                      total: int) -> float:
+    """
+    计算搭配强度
+
+    Args:
+        measure: 'log_dice'、'pmi' 或 't_score'
+        observed: 共现次数
+        node_frequency: 节点词出现次数
+        collocate_frequency: 搭配词出现次数
+        total: 语料库词素总数
+
+    Returns:
+        搭配强度
+
+    Raises:
+        ValueError: 指标未知
+    """
+    expected = node_frequency * collocate_frequency / total
+    if measure == 'log_dice':
+        return 14 + math.log2(2 * observed / (node_frequency + collocate_frequency))
+    if measure == 'pmi':
+        return math.log2(observed / expected)
+    if measure == 't_score':
+        return (observed - expected) / math.sqrt(observed)
+    raise ValueError(f"未知的搭配强度指标: {measure}")
+
+
+class CollocationFinder:
+    """在词典形位置索引上统计搭配和 n-gram"""
+
+    def __init__(self, store_path: Optional[str] = None, analyzer: Optional[KoreanLineAnalyzer] = None):
+        """
+        初始化
+
+        Args:
+            store_path: 保存文件路径，None 表示 statistics/lemma_sequences_kor.json
+            analyzer: 形态分析器，None 表示使用全局实例
+        """
+        self.store_path = store_path or os.path.join(STATISTICS_DIR, 'lemma_sequences_kor.json')
+        self.analyzer = analyzer
+        self._indexes_by_path: Optional[Dict[str, LemmaSequenceIndex]] = None
+
+    def load(self) -> Dict[str, LemmaSequenceIndex]:
+        """
+        读取保存的各文件词典形序列
+
+        Returns:
+            文件路径 -> 词典形位置索引，文件不存在或版本不同时为空
+        """
+        if not os.path.exists(self.store_path):
+            return {}
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取词典形序列失败: {e}")
+            return {}
+        if data.get('version') != SEQUENCES_VERSION:
+            return {}
+        return {file_path: LemmaSequenceIndex.from_json(item) for file_path, item in data.get('files', {}).items()}
+
+    def save(self, indexes: Dict[str, LemmaSequenceIndex]):
+        """
+        保存各文件词典形序列
+
+        Args:
+            indexes: 文件路径 -> 词典形位置索引
+        """
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            temp_path = self.store_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': SEQUENCES_VERSION,
+                           'files': {file_path: index.to_json() for file_path, index in indexes.items()}},
+                          f, ensure_ascii=False)
+            os.replace(temp_path, self.store_path)
+        except OSError as e:
+            print(f"保存词典形序列失败: {e}")
+
+    def _indexes(self, engine, file_paths: List[str]) -> List[LemmaSequenceIndex]:
+        """取得文件的词典形位置索引（只分析指纹变化的文件，有变化时保存）"""
+        from function.parse_cache import parse_cache
+
+        if self._indexes_by_path is None:
+            self._indexes_by_path = self.load()
+        stored = self._indexes_by_path
+        indexes = []
+        changed = False
+        for file_path in file_paths:
+            fingerprint = parse_cache.fingerprint(file_path)
+            index = stored.get(file_path)
+            if index is None or fingerprint is None or index.fingerprint != fingerprint:
+                fingerprint, records = engine._load_records(file_path)
+                index = stored[file_path] = LemmaSequenceIndex(records, self.analyzer, fingerprint)
+                changed = True
+            indexes.append(index)
+
+        if changed:
+            # 语料库中已删除的文件也从保存的结果中去掉
+            for file_path in [path for path in stored if not os.path.exists(path)]:
+                del stored[file_path]
+            self.save(stored)
+        return indexes
+
+    def find(self, engine, file_paths: List[str], lemma: str, left: int = 3, right: int = 3,
+             measure: str = 'log_dice', min_frequency: int = 2, top: int = 20) -> Dict:
+        """
+        统计词典形的左右搭配
+
+        Args:
+            engine: 提供解析结果的搜索引擎
+            file_paths: 文件路径列表
+            lemma: 词典形（如 '먹다'）或统计键（如 '먹다/VV'）
+            left: 左侧窗口的词数
+            right: 右侧窗口的词数
+            measure: 搭配强度指标（log_dice/pmi/t_score）
+            min_frequency: 最少共现次数
+            top: 每侧返回的搭配词数
+
+        Returns:
+            {'node', 'frequency', 'total', 'left': [...], 'right': [...]}，
+            每个搭配词为 {'lemma', 'pos', 'frequency', 'collocate_frequency', 'score'}
+
+        Raises:
+            ValueError: 指标未知
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"未知的搭配强度指标: {measure}")
+        indexes = self._indexes(engine, file_paths)
+        left_counts: Counter = Counter()
+        right_counts: Counter = Counter()
+        node_frequency = 0
+        total = 0
+        node_keys = set()
+        for index in indexes:
+            total += len(index)
+            keys = index.matching_keys(lemma)
+            if not keys:
+                continue
+            node_keys.update(keys)
+            file_left, file_right, count = index.neighbours(keys, left, right)
+            left_counts.update(file_left)
+            right_counts.update(file_right)
+            node_frequency += count
+
+        collocates = {key for key, count in (left_counts + right_counts).items() if count >= min_frequency}
+        collocate_frequency = {key: sum(index.frequency(key) for index in indexes) for key in collocates}
+
+        def rank(counts: Counter) -> List[Dict]:
+            items = []
+            for key, observed in counts.items():
+                if observed < min_frequency:
+                    continue
+                collocate_lemma, _, pos = key.rpartition('/')
+                items.append({
+                    'lemma': collocate_lemma,
+                    'pos': pos,
+                    'frequency': observed,
+                    'collocate_frequency': collocate_frequency[key],
+                    'score': round(association_score(measure, observed, node_frequency,
+                                                     collocate_frequency[key], total), 4),
+                })
+            items.sort(key=lambda item: (-item['score'], -item['frequency'], item['lemma']))
+            return items[:top]
+
+        return {
+            'node': sorted(node_keys),
+            'frequency': node_frequency,
+            'total': total,
+            'left': rank(left_counts),
+            'right': rank(right_counts),
+        }
+
+    def ngrams(self, engine, file_paths: List[str], n: int = 2, min_frequency: int = 2,
+               top: int = 50) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        统计词典形 n-gram
+
+        Args:
+            engine: 提供解析结果的搜索引擎
+            file_paths: 文件路径列表
+            n: 元数
+            min_frequency: 最少出现次数
+            top: 返回的条数
+
+        Returns:
+            [(统计键元组, 次数), ...]，按次数降序
+        """
+        counts: Counter = Counter()
+        for index in self._indexes(engine, file_paths):
+            counts.update(index.ngrams(n))
+        return [(gram, count) for gram, count in counts.most_common(top) if count >= min_frequency]
+
+    def clear(self):
+        """清空内存中的索引（保存的词典形序列保留）"""
+        self._indexes_by_path = None
+
+
+def collocation_main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口：统计韩语语料库中词典形的搭配或 n-gram
+
+    Args:
+        argv: 命令行参数，None 表示使用 sys.argv
+
+    Returns:
+        退出状态码
+    """
+    parser = argparse.ArgumentParser(prog='CorpusSearchTool.py colloc', description="韩语词典形搭配统计")
+    parser.add_argument('lemma', nargs='?', help="词典形（如 먹다）或统计键（如 먹다/VV）")
+    parser.add_argument('--input', help="文件或目录，默认使用配置文件中韩语语料库的输入目录")
+    parser.add_argument('--window', type=int, default=3, help="左右窗口的词数")
+    parser.add_argument('--measure', choices=MEASURES, default='log_dice', help="搭配强度指标")
+    parser.add_argument('--min-frequency', type=int, default=2, help="最少共现次数")
+    parser.add_argument('--top', type=int, default=20, help="每侧列出的搭配词数")
+    parser.add_argument('--ngram', type=int, help="改为统计 n 元词典形序列")
+    args = parser.parse_args(argv)
+    if not args.lemma and not args.ngram:
+        parser.error("需要指定词典形或 --ngram")
+
+    from function.config_manager import config_manager
+    from function.corpus_scanner import corpus_scanner
+    from function.search_engine_kor import search_engine_kor
+    corpus_config = config_manager.get_corpus_config('korean')
+    input_path = args.input or corpus_config['input_dir']
+    file_paths = corpus_scanner.scan(input_path, extensions=corpus_config['extensions'],
+                                     ignore_patterns=corpus_config['ignore_patterns'])
+    if not file_paths:
+        print(f"没有找到可统计的文件: {input_path}")
+        return 1
+
+    if args.ngram:
+        for gram, count in collocation_finder.ngrams(search_engine_kor, file_paths, args.ngram,
+                                                     args.min_frequency, args.top):
+            print(f"{count:>8}  {' '.join(gram)}")
+        return 0
+
+    result = search_engine_kor.find_collocations(file_paths, args.lemma, args.window, args.window,
+                                                 args.measure, args.min_frequency, args.top)
+    print(f"{', '.join(result['node']) or args.lemma}: 出现 {result['frequency']} 次，词素总数 {result['total']}")
+    for side, title in (('left', '左侧'), ('right', '右侧')):
+        print(title)
+        for item in result[side]:
+            print(f"{item['score']:>10.4f} {item['frequency']:>8} {item['collocate_frequency']:>8}  "
+                  f"{item['lemma']}/{item['pos']}")
+    return 0
+
+
+# 全局搭配统计实例
+collocation_finder = CollocationFinder()
@@ -36,7 +36,13 @@ class ConfigManager:
         self.config['SEARCH'] = {
             'case_sensitive': 'False',
             'fuzzy_match': 'False',
-            'regex_enabled': 'False'
+            'regex_enabled': 'False',
+            'substring_backend': 'scan',  # 精确子串搜索后端：scan（逐行扫描）/suffix_array（后缀数组，需要 numpy）
+            'ignore_whitespace': 'False',  # 后缀数组后端忽略空白匹配
+            'context_lines': '2',  # 结果表格展开上下文时显示的前后台词条数
+            'result_limit_mode': 'all',  # 结果数量限制：all（不限制）/first（前N条）/per_episode（每集前N条）/sample（随机抽取N条）
+            'result_limit': '0',  # 限制模式保留的结果数
+            'sample_seed': ''  # 随机抽样的种子，留空表示每次不同
         }
         self.config['UI'] = {
             'current_tab': '0',  # 当前选择的标签页（0=英语，1=韩语）
@@ -57,7 +63,9 @@ class ConfigManager:
             'keyword_type': '0',  # 关键词类型索引
             'case_sensitive': 'False',
             'fuzzy_match': 'False',
-            'regex_enabled': 'False'
+            'regex_enabled': 'False',
+            'extensions': '.srt, .ass, .ssa, .vtt, .txt, .md, .markdown, .docx, .pdf',  # 需要搜索的文件类型
+            'ignore_patterns': '.*, ~$*'  # glob 忽略规则，逗号或换行分隔
         }
         # 韩语语料库配置
         self.config['KOREAN'] = {
@@ -66,7 +74,24 @@ class ConfigManager:
             'keyword_type': '0',  # 关键词类型索引
             'case_sensitive': 'False',
             'fuzzy_match': 'False',
-            'regex_enabled': 'False'
+            'regex_enabled': 'False',
+            'extensions': '.srt, .ass, .ssa, .vtt, .txt, .md, .markdown, .docx, .pdf',  # 需要搜索的文件类型
+            'ignore_patterns': '.*, ~$*'  # glob 忽略规则，逗号或换行分隔
+        }
+        # 解析器配置
+        self.config['PARSER'] = {
+            'episode_patterns': ''  # 额外的集数标题正则，每行一个
+        }
+        # 语料库目录监视配置
+        self.config['WATCHER'] = {
+            'enabled': 'False',  # 是否在后台监视输入目录并预解析变化的文件
+            'backend': 'auto',  # auto/inotify/polling
+            'poll_interval': '5'  # 轮询间隔（秒）
+        }
+        # 模糊匹配配置
+        self.config['FUZZY'] = {
+            'max_distance': 'auto',  # 最大编辑距离，auto 按关键词长度自动确定
+            'hangul_jamo': 'True'  # 韩文按字母（初声/中声/终声）计算编辑距离
         }
         
         self.save_config()
@@ -149,10 +174,17 @@ class ConfigManager:
     
     def get_search_settings(self) -> dict:
         """获取搜索设置"""
+        sample_seed = self.config.get('SEARCH', 'sample_seed', fallback='').strip()
         search_settings = {
             'case_sensitive': self.config.getboolean('SEARCH', 'case_sensitive', fallback=False),
             'fuzzy_match': self.config.getboolean('SEARCH', 'fuzzy_match', fallback=False),
-            'regex_enabled': self.config.getboolean('SEARCH', 'regex_enabled', fallback=False)
+            'regex_enabled': self.config.getboolean('SEARCH', 'regex_enabled', fallback=False),
+            'substring_backend': self.config.get('SEARCH', 'substring_backend', fallback='scan').strip(),
+            'ignore_whitespace': self.config.getboolean('SEARCH', 'ignore_whitespace', fallback=False),
+            'context_lines': self.config.getint('SEARCH', 'context_lines', fallback=2),
+            'result_limit_mode': self.config.get('SEARCH', 'result_limit_mode', fallback='all').strip(),
+            'result_limit': self.config.getint('SEARCH', 'result_limit', fallback=0),
+            'sample_seed': int(sample_seed) if sample_seed.isdigit() else None
         }
         return search_settings
     
@@ -168,6 +200,48 @@ class ConfigManager:
         if regex_enabled is not None:
             self.config.set('SEARCH', 'regex_enabled', str(regex_enabled))
     
+    def get_parser_settings(self) -> dict:
+        """
+        获取解析器设置
+
+        Returns:
+            解析器设置字典，'episode_patterns' 为额外的集数标题正则列表
+        """
+        # 正则中常有 %，按原样读取，不做插值
+        patterns_str = self.config.get('PARSER', 'episode_patterns', raw=True, fallback='')
+        episode_patterns = [p.strip() for p in patterns_str.splitlines() if p.strip()]
+        return {'episode_patterns': episode_patterns}
+    
+    def get_watcher_settings(self) -> dict:
+        """
+        获取语料库目录监视设置
+
+        Returns:
+            监视设置字典，包含 'enabled'、'backend' 和 'poll_interval'
+        """
+        return {
+            'enabled': self.config.getboolean('WATCHER', 'enabled', fallback=False),
+            'backend': self.config.get('WATCHER', 'backend', fallback='auto'),
+            'poll_interval': self.config.getfloat('WATCHER', 'poll_interval', fallback=5.0)
+        }
+    
+    def get_fuzzy_settings(self) -> dict:
+        """
+        获取模糊匹配设置
+
+        Returns:
+            模糊匹配设置字典，'max_distance' 为整数或 None（自动），'hangul_jamo' 为布尔值
+        """
+        max_distance = self.config.get('FUZZY', 'max_distance', fallback='auto').strip()
+        try:
+            max_distance = max(0, int(max_distance))
+        except ValueError:
+            max_distance = None
+        return {
+            'max_distance': max_distance,
+            'hangul_jamo': self.config.getboolean('FUZZY', 'hangul_jamo', fallback=True)
+        }
+    
     def get_column_settings(self, table_name: str) -> dict:
         """
         获取列设置
@@ -269,7 +343,7 @@ class ConfigManager:
             corpus_type: 语料库类型 ('english' 或 'korean')
             
         Returns:
-            语料库配置字典
+            语料库配置字典，'extensions' 和 'ignore_patterns' 为列表，未配置时为None
         """
         section = 'ENGLISH' if corpus_type.lower() == 'english' else 'KOREAN'
         
@@ -286,8 +360,26 @@ class ConfigManager:
             'keyword_type': self.config.get(section, 'keyword_type', fallback=''),
             'case_sensitive': self.config.getboolean(section, 'case_sensitive', fallback=False),
             'fuzzy_match': self.config.getboolean(section, 'fuzzy_match', fallback=False),
-            'regex_enabled': self.config.getboolean(section, 'regex_enabled', fallback=False)
+            'regex_enabled': self.config.getboolean(section, 'regex_enabled', fallback=False),
+            'extensions': self._get_list(section, 'extensions'),
+            'ignore_patterns': self._get_list(section, 'ignore_patterns')
         }
+
+    def _get_list(self, section: str, option: str) -> Optional[list]:
+        """
+        读取逗号或换行分隔的列表配置
+
+        Args:
+            section: 配置节
+            option: 配置项
+
+        Returns:
+            去除空白后的非空项列表，配置项不存在时返回None（由调用方使用默认值）
+        """
+        if not self.config.has_option(section, option):
+            return None
+        value = self.config.get(section, option, raw=True)
+        return [item.strip() for item in value.replace('\n', ',').split(',') if item.strip()]
     
     def set_corpus_config(self, corpus_type: str, input_dir: str = None, output_dir: str = None, keyword_type: str = None,
                          case_sensitive: bool = None, fuzzy_match: bool = None, regex_enabled: bool = None):
@@ -0,0 +1,188 @@
+"""
+上下文索引模块
+为每个文件保存一张台词偏移表：只记每条台词的行号，台词和时间轴直接引用解析结果缓存中的记录（不另存一份文本），
+取任意命中行前后 N 条台词时只需二分查找行号并按序号切片，不必重新解析文件
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from function.index_cache import FileIndexCache
+
+
+class ContextIndex:
+    """单个文件的台词偏移表"""
+
+    def __init__(self, records: Iterable[Dict]):
+        """
+        建立偏移表
+
+        Args:
+            records: 文件的完整解析结果（按行号递增，列表中的记录与解析结果缓存共用）
+        """
+        self.records = records if isinstance(records, list) else list(records)
+        self.line_numbers = array('q', (int(record.get('line_number', 0) or 0) for record in self.records))
+        # 解析器按行号递增输出记录，否则退回到字典查找
+        self._sorted = all(a < b for a, b in zip(self.line_numbers, self.line_numbers[1:]))
+        self._positions = None if self._sorted else {n: i for i, n in enumerate(self.line_numbers)}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def position(self, line_number: int) -> Optional[int]:
+        """
+        取得行号对应的台词序号
+
+        Args:
+            line_number: 行号
+
+        Returns:
+            台词序号，行号不存在时返回 None
+        """
+        if not self._sorted:
+            return self._positions.get(line_number)
+        i = bisect_left(self.line_numbers, line_number)
+        if i < len(self.line_numbers) and self.line_numbers[i] == line_number:
+            return i
+        return None
+
+    def line(self, i: int) -> Dict:
+        """
+        取得第 i 条台词
+
+        Args:
+            i: 台词序号
+
+        Returns:
+            {'line_number', 'time_axis', 'content'}
+        """
+        record = self.records[i]
+        return {
+            'line_number': self.line_numbers[i],
+            'time_axis': record.get('time_axis', ''),
+            'content': record.get('content', ''),
+        }
+
+    def context(self, line_number: int, before: int = 1, after: Optional[int] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        取得命中行前后的台词
+
+        Args:
+            line_number: 命中行的行号
+            before: 前文条数
+            after: 后文条数，None 表示与前文相同
+
+        Returns:
+            (前文列表, 后文列表)，行号不存在时均为空列表
+        """
+        i = self.position(line_number)
+        if i is None:
+            return [], []
+        after = before if after is None else after
+        return ([self.line(j) for j in range(max(0, i - before), i)],
+                [self.line(j) for j in range(i + 1, min(len(self.line_numbers), i + after + 1))])
+
+
+class ContextProvider:
+    """按文件缓存台词偏移表，为搜索结果取得上下文"""
+
+    def __init__(self, max_size: int = 2000000):
+        """
+        初始化
+
+        Args:
+            max_size: 偏移表缓存容量（按台词条数计算）
+        """
+        self._cache = FileIndexCache(ContextIndex, max_size=max_size)
+
+    def get_index(self, file_path: str, engine=None) -> ContextIndex:
+        """
+        取得文件的偏移表，文件未变化时直接使用缓存
+
+        Args:
+            file_path: 文件路径
+            engine: 提供解析结果的搜索引擎，None 表示使用基础引擎
+
+        Returns:
+            偏移表
+        """
+        if engine is None:
+            from function.search_engine_base import SearchEngineBase
+            engine = SearchEngineBase()
+        fingerprint, records = engine._load_records(file_path)
+        return self._cache.get(file_path, fingerprint, records)
+
+    def get_context(self, file_path: str, line_number: int, before: int = 1,
+                    after: Optional[int] = None, engine=None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        取得单个命中行的上下文
+
+        Args:
+            file_path: 文件路径
+            line_number: 行号
+            before: 前文条数
+            after: 后文条数，None 表示与前文相同
+            engine: 提供解析结果的搜索引擎
+
+        Returns:
+            (前文列表, 后文列表)，文件不存在时均为空列表
+        """
+        try:
+            index = self.get_index(file_path, engine)
+        except (OSError, ValueError) as e:
+            print(f"读取上下文失败 {file_path}: {e}")
+            return [], []
+        return index.context(int(line_number), before, after)
+
+    def attach(self, results: List[Dict], before: int = 1, after: Optional[int] = None,
+               engine=None) -> List[Dict]:
+        """
+        为搜索结果添加 context_before 和 context_after 字段（同一文件只取一次偏移表）
+
+        Args:
+            results: 搜索结果列表（需要 file_path 和 line_number/lineno 字段）
+            before: 前文条数
+            after: 后文条数，None 表示与前文相同
+            engine: 提供解析结果的搜索引擎
+
+        Returns:
+            添加了上下文的结果副本列表
+        """
+        indexes: Dict[str, Optional[ContextIndex]] = {}
+        enhanced_results = []
+        for result in results:
+            enhanced_result = result.copy()
+            file_path = result.get('file_path', '')
+            if file_path not in indexes:
+                try:
+                    indexes[file_path] = self.get_index(file_path, engine) if file_path else None
+                except (OSError, ValueError) as e:
+                    print(f"读取上下文失败 {file_path}: {e}")
+                    indexes[file_path] = None
+            index = indexes[file_path]
+            line_number = result.get('line_number') or result.get('lineno') or 0
+            if index is None:
+                enhanced_result['context_before'], enhanced_result['context_after'] = [], []
+            else:
+                enhanced_result['context_before'], enhanced_result['context_after'] = \
+                    index.context(int(line_number), before, after)
+            enhanced_results.append(enhanced_result)
+        return enhanced_results
+
+    def invalidate(self, file_path: str):
+        """
+        移除文件的偏移表
+
+        Args:
+            file_path: 文件路径
+        """
+        self._cache.invalidate(file_path)
+
+    def clear(self):
+        """清空偏移表缓存"""
+        self._cache.clear()
+
+
+# 全局上下文实例
+context_provider = ContextProvider()
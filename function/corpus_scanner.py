@@ -0,0 +1,219 @@
+"""
+语料库文件扫描模块
+使用 os.scandir 遍历语料库目录，按扩展名集合和忽略规则筛选文件，
+多个子目录并行读取，并按目录修改时间缓存目录列表，供多次搜索复用
+"""
+
+import fnmatch
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class CorpusScanner:
+    """语料库文件扫描器"""
+
+    # 默认搜索的文件类型（解析器支持的全部格式）
+    DEFAULT_EXTENSIONS = ['.srt', '.ass', '.ssa', '.vtt', '.txt', '.md', '.markdown', '.docx', '.pdf']
+
+    # 默认忽略规则：隐藏文件/目录和 Office 临时文件
+    DEFAULT_IGNORE_PATTERNS = ['.*', '~$*']
+
+    def __init__(self, max_workers: int = 8):
+        """
+        初始化扫描器
+
+        Args:
+            max_workers: 并行读取目录的最大线程数（网络盘或大型目录树时效果明显）
+        """
+        self.max_workers = max_workers
+        # 目录列表缓存：目录绝对路径 -> (目录修改时间, 文件名列表, 子目录名列表)
+        self._listings: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def scan(self, input_path: str, extensions: Optional[Iterable[str]] = None,
+             ignore_patterns: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        获取输入路径下所有需要搜索的文件
+
+        Args:
+            input_path: 文件或目录路径
+            extensions: 需要搜索的扩展名，None 表示使用默认集合
+            ignore_patterns: glob 忽略规则，与文件/目录名或相对路径匹配，None 表示使用默认规则
+
+        Returns:
+            文件路径列表（同一目录内按名称排序，先文件后子目录）
+        """
+        if os.path.isfile(input_path):
+            return [input_path]
+        if not os.path.isdir(input_path):
+            return []
+
+        ext_set = self.normalize_extensions(self.DEFAULT_EXTENSIONS if extensions is None else extensions)
+        patterns = list(self.DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns)
+
+        # 按层并行读取目录：每层的所有子目录同时提交给线程池
+        listings: Dict[str, Tuple[List[str], List[str]]] = {}
+        level = [(input_path, '')]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while level:
+                results = executor.map(lambda item: self._list_dir(item[0]), level)
+                next_level = []
+                for (dir_path, rel_dir), (files, subdirs) in zip(level, results):
+                    kept_subdirs = []
+                    for name in subdirs:
+                        rel_path = f'{rel_dir}{name}'
+                        if not self.is_ignored(name, rel_path, patterns):
+                            kept_subdirs.append(name)
+                            next_level.append((os.path.join(dir_path, name), rel_path + '/'))
+                    listings[dir_path] = (files, kept_subdirs)
+                level = next_level
+
+        files_to_search: List[str] = []
+        self._collect(input_path, '', listings, ext_set, patterns, files_to_search)
+        return files_to_search
+
+    def is_corpus_file(self, root: str, file_path: str, extensions: Optional[Iterable[str]] = None,
+                       ignore_patterns: Optional[Iterable[str]] = None) -> bool:
+        """
+        检查单个文件是否属于语料库（扩展名符合且路径上的各级目录和文件都未被忽略）
+
+        Args:
+            root: 语料库根目录
+            file_path: 文件路径
+            extensions: 需要搜索的扩展名，None 表示使用默认集合
+            ignore_patterns: glob 忽略规则，None 表示使用默认规则
+
+        Returns:
+            是否需要搜索该文件
+        """
+        ext_set = self.normalize_extensions(self.DEFAULT_EXTENSIONS if extensions is None else extensions)
+        patterns = list(self.DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns)
+
+        if os.path.splitext(file_path)[1].lower() not in ext_set:
+            return False
+
+        rel_path = os.path.relpath(file_path, root)
+        if rel_path.startswith(os.pardir):
+            return False
+
+        parts = rel_path.split(os.sep)
+        for i, name in enumerate(parts):
+            if self.is_ignored(name, '/'.join(parts[:i + 1]), patterns):
+                return False
+        return True
+
+    def clear_cache(self):
+        """清除目录列表缓存"""
+        with self._lock:
+            self._listings.clear()
+
+    @staticmethod
+    def normalize_extensions(extensions: Iterable[str]) -> set:
+        """
+        规范化扩展名：小写并补全前导点
+
+        Args:
+            extensions: 扩展名列表，如 ['srt', '.MD']
+
+        Returns:
+            扩展名集合，如 {'.srt', '.md'}
+        """
+        normalized = set()
+        for ext in extensions:
+            ext = ext.strip().lower()
+            if ext:
+                normalized.add(ext if ext.startswith('.') else '.' + ext)
+        return normalized
+
+    def _collect(self, dir_path: str, rel_dir: str, listings: Dict[str, Tuple[List[str], List[str]]],
+                 ext_set: set, patterns: List[str], output: List[str]):
+        """
+        按目录顺序收集符合条件的文件
+
+        Args:
+            dir_path: 目录路径
+            rel_dir: 相对输入目录的路径前缀（以 / 结尾）
+            listings: 本次扫描得到的目录列表
+            ext_set: 扩展名集合
+            patterns: 忽略规则
+            output: 结果列表
+        """
+        files, subdirs = listings[dir_path]
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in ext_set:
+                continue
+            if self.is_ignored(name, rel_dir + name, patterns):
+                continue
+            output.append(os.path.join(dir_path, name))
+        for name in subdirs:
+            self._collect(os.path.join(dir_path, name), f'{rel_dir}{name}/', listings, ext_set, patterns, output)
+
+    def _list_dir(self, dir_path: str) -> Tuple[List[str], List[str]]:
+        """
+        读取目录中的文件和子目录，目录修改时间未变化时直接使用缓存
+
+        目录的修改时间在其中增删或重命名条目时才会改变，文件内容变化不影响目录列表
+
+        Args:
+            dir_path: 目录路径
+
+        Returns:
+            (排序后的文件名列表, 排序后的子目录名列表)
+        """
+        key = os.path.abspath(dir_path)
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError as e:
+            print(f"无法访问目录 {dir_path}: {e}")
+            return [], []
+
+        with self._lock:
+            cached = self._listings.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        files, subdirs = [], []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        # DirEntry 通常可直接从目录项得到类型，无需额外的 stat 调用；
+                        # 与 os.walk 一样不进入指向目录的符号链接，避免链接成环时重复扫描
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file():
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"无法读取目录 {dir_path}: {e}")
+            return [], []
+
+        files.sort()
+        subdirs.sort()
+        with self._lock:
+            self._listings[key] = (mtime, files, subdirs)
+        return files, subdirs
+
+    def is_ignored(self, name: str, rel_path: str, patterns: Optional[Iterable[str]] = None) -> bool:
+        """
+        检查文件或目录是否匹配忽略规则
+
+        Args:
+            name: 文件或目录名
+            rel_path: 相对输入目录的路径（使用 / 分隔）
+            patterns: 忽略规则，None 表示使用默认规则
+
+        Returns:
+            是否忽略
+        """
+        for pattern in self.DEFAULT_IGNORE_PATTERNS if patterns is None else patterns:
+            if fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern):
+                return True
+        return False
+
+
+# 全局语料库扫描器实例
+corpus_scanner = CorpusScanner()
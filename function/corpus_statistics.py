@@ -0,0 +1,467 @@
+"""
+语料库统计模块
+用 kiwipiepy 对韩语语料库的每行台词做一次形态分析（相同的台词只分析一次），
+按词典形统计出现次数、文件数、集数和 Juilland's D 离散度；
+各文件的统计结果按文件指纹保存到 statistics 文件夹，未变化的文件无需重新分析，
+汇总结果以紧凑数组保存，可以立即排序、筛选和导出；也可以从命令行运行：
+python CorpusSearchTool.py stats [--sort frequency|range|episodes|dispersion|lemma] [--export 文件.csv]
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from function.frequency_counter import FrequencyCount
+
+
+# 统计结果保存位置
+STATISTICS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'statistics')
+STATISTICS_VERSION = 1
+
+# 参与统计的词性（体词、用言、修饰词、感叹词、词根和外语），不统计助词、词尾、词缀和符号
+CONTENT_TAGS = {'NNG', 'NNP', 'NNB', 'NR', 'NP', 'VV', 'VA', 'VX', 'VCN', 'MM', 'MAG', 'MAJ', 'IC', 'XR', 'SL'}
+# 词典形需要加 다 的词性
+PREDICATE_TAGS = {'VV', 'VA', 'VX', 'VCN'}
+
+# 可排序的列
+SORT_KEYS = ('frequency', 'range', 'episodes', 'dispersion', 'lemma')
+
+
+class KoreanLineAnalyzer:
+    """按行缓存的韩语形态分析：相同文字的台词只分析一次"""
+
+    def __init__(self, max_size: int = 500000):
+        """
+        初始化（kiwipiepy 模型在第一次分析时取自韩语搜索引擎，不重复加载）
+
+        Args:
+            max_size: 缓存的行数上限，超过后清空
+        """
+        self.max_size = max_size
+        self._cache: Dict[str, Tuple[str, ...]] = {}
+        self._kiwi = None
+        self._lock = threading.Lock()
+
+    def _get_kiwi(self):
+        """取得 kiwipiepy 分析器"""
+        if self._kiwi is None:
+            from function.search_engine_kor import search_engine_kor
+            self._kiwi = search_engine_kor.kiwi
+        return self._kiwi
+
+    @staticmethod
+    def lemma_key(form: str, tag: str, lemma: Optional[str] = None) -> Optional[str]:
+        """
+        取得词素的统计键（词典形/词性），不参与统计的词性返回None
+
+        Args:
+            form: 词素的形式
+            tag: 词性标签（不规则活用标记 -I/-R 会去掉）
+            lemma: kiwipiepy 给出的词典形
+
+        Returns:
+            统计键，如 '먹다/VV'、'친구/NNG'
+        """
+        tag = tag.split('-')[0]
+        if tag not in CONTENT_TAGS:
+            return None
+        if tag == 'SL':
+            form = form.lower()
+        elif tag in PREDICATE_TAGS and not (lemma or '').endswith('다'):
+            lemma = form + '다'
+        return f"{lemma or form}/{tag}"
+
+    def analyze(self, text: str) -> Tuple[str, ...]:
+        """
+        分析一行台词
+
+        Args:
+            text: 台词
+
+        Returns:
+            按出现顺序排列的统计键
+        """
+        text = text.strip()
+        if not text:
+            return ()
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        with self._lock:
+            tokens = self._get_kiwi().tokenize(text)
+        keys = tuple(key for key in (self.lemma_key(token.form, token.tag, getattr(token, 'lemma', None))
+                                     for token in tokens) if key)
+        if len(self._cache) >= self.max_size:
+            self._cache.clear()
+        self._cache[text] = keys
+        return keys
+
+    def clear(self):
+        """清空缓存"""
+        self._cache.clear()
+
+
+class FileStatistics:
+    """单个文件的统计：集名称 -> (词素数, 统计键 -> 出现次数)"""
+
+    def __init__(self, fingerprint: Optional[Tuple[int, int]] = None,
+                 episodes: Optional[Dict[str, Tuple[int, Dict[str, int]]]] = None):
+        """
+        初始化
+
+        Args:
+            fingerprint: 文件指纹
+            episodes: 各集的词素数和出现次数
+        """
+        self.fingerprint = fingerprint
+        self.episodes = episodes or {}
+
+    @classmethod
+    def build(cls, file_path: str, fingerprint: Optional[Tuple[int, int]], records: Iterable[Dict],
+              analyzer: KoreanLineAnalyzer) -> 'FileStatistics':
+        """
+        分析文件的所有台词
+
+        Args:
+            file_path: 文件路径
+            fingerprint: 文件指纹
+            records: 文件的解析结果
+            analyzer: 形态分析器
+
+        Returns:
+            文件统计
+        """
+        episodes: Dict[str, Tuple[int, Dict[str, int]]] = {}
+        for record in records:
+            keys = analyzer.analyze(record.get('content', ''))
+            if not keys:
+                continue
+            episode = FrequencyCount.episode_key(file_path, record)
+            token_count, counts = episodes.get(episode, (0, {}))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+            episodes[episode] = (token_count + len(keys), counts)
+        return cls(fingerprint, episodes)
+
+    def to_json(self) -> Dict:
+        """转换为可保存的字典"""
+        return {
+            'fingerprint': list(self.fingerprint) if self.fingerprint else None,
+            'episodes': {episode: [token_count, counts]
+                         for episode, (token_count, counts) in self.episodes.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'FileStatistics':
+        """从保存的字典恢复"""
+        fingerprint = data.get('fingerprint')
+        return cls(tuple(fingerprint) if fingerprint else None,
+                   {episode: (token_count, counts)
+                    for episode, (token_count, counts) in data.get('episodes', {}).items()})
+
+
+class CorpusStatistics:
+    """语料库的词典形统计（每列为一个紧凑数组，下标为词典形序号）"""
+
+    def __init__(self, file_statistics: Dict[str, FileStatistics]):
+        """
+        汇总各文件的统计
+
+        Args:
+            file_statistics: 文件路径 -> 文件统计
+        """
+        # 以集为离散度的分区（同名的集跨文件合并）
+        part_ids: Dict[str, int] = {}
+        part_sizes: List[int] = []
+        key_ids: Dict[str, int] = {}
+        part_counts: List[Dict[int, int]] = []
+        file_ranges: List[int] = []
+
+        for file_stats in file_statistics.values():
+            seen_in_file = set()
+            for episode, (token_count, counts) in file_stats.episodes.items():
+                part = part_ids.get(episode)
+                if part is None:
+                    part = part_ids[episode] = len(part_sizes)
+                    part_sizes.append(0)
+                part_sizes[part] += token_count
+                for key, count in counts.items():
+                    key_id = key_ids.get(key)
+                    if key_id is None:
+                        key_id = key_ids[key] = len(part_counts)
+                        part_counts.append({})
+                        file_ranges.append(0)
+                    parts = part_counts[key_id]
+                    parts[part] = parts.get(part, 0) + count
+                    if key_id not in seen_in_file:
+                        seen_in_file.add(key_id)
+                        file_ranges[key_id] += 1
+
+        self.keys: List[str] = list(key_ids)
+        self.part_count = len(part_sizes)
+        self.token_count = sum(part_sizes)
+        self.frequency = array('I', (sum(parts.values()) for parts in part_counts))
+        self.file_range = array('I', file_ranges)
+        self.episode_range = array('I', (len(parts) for parts in part_counts))
+        self.dispersion = array('d', (self.juilland_d(parts, part_sizes) for parts in part_counts))
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def juilland_d(part_counts: Dict[int, int], part_sizes: List[int]) -> float:
+        """
+        Juilland's D 离散度：D = 1 - V / sqrt(n - 1)，V 为各分区相对频率的变异系数
+
+        Args:
+            part_counts: 分区序号 -> 出现次数（未出现的分区为0）
+            part_sizes: 各分区的词素数
+
+        Returns:
+            0（集中在一个分区）~ 1（均匀分布）
+        """
+        n = len(part_sizes)
+        if n < 2:
+            return 1.0
+        rates = [count / part_sizes[part] for part, count in part_counts.items() if part_sizes[part]]
+        mean = sum(rates) / n
+        if mean <= 0:
+            return 0.0
+        variance = max(0.0, sum(rate * rate for rate in rates) / n - mean * mean)
+        d = 1 - math.sqrt(variance) / mean / math.sqrt(n - 1)
+        return min(1.0, max(0.0, d))
+
+    def row(self, i: int) -> Dict:
+        """
+        第 i 个词典形的统计
+
+        Args:
+            i: 词典形序号
+
+        Returns:
+            {'lemma', 'pos', 'frequency', 'range', 'episodes', 'dispersion'}
+        """
+        lemma, _, pos = self.keys[i].rpartition('/')
+        return {
+            'lemma': lemma,
+            'pos': pos,
+            'frequency': self.frequency[i],
+            'range': self.file_range[i],
+            'episodes': self.episode_range[i],
+            'dispersion': round(self.dispersion[i], 4),
+        }
+
+    def lookup(self, lemma: str, pos: Optional[str] = None) -> List[Dict]:
+        """
+        查找词典形的统计
+
+        Args:
+            lemma: 词典形
+            pos: 词性，None 表示所有词性
+
+        Returns:
+            统计列表
+        """
+        if pos:
+            i = self._positions.get(f"{lemma}/{pos}")
+            return [] if i is None else [self.row(i)]
+        return [self.row(i) for i, key in enumerate(self.keys) if key.rpartition('/')[0] == lemma]
+
+    def rows(self, sort: str = 'frequency', descending: bool = True, pos: Optional[Iterable[str]] = None,
+             prefix: str = '', min_frequency: int = 1, limit: Optional[int] = None) -> List[Dict]:
+        """
+        按条件筛选并排序
+
+        Args:
+            sort: 排序列（frequency/range/episodes/dispersion/lemma）
+            descending: 是否降序
+            pos: 只保留的词性，None 表示全部
+            prefix: 词典形前缀
+            min_frequency: 最少出现次数
+            limit: 最多返回的行数
+
+        Returns:
+            统计列表
+
+        Raises:
+            ValueError: 排序列未知
+        """
+        columns = {'frequency': self.frequency, 'range': self.file_range,
+                   'episodes': self.episode_range, 'dispersion': self.dispersion}
+        if sort not in SORT_KEYS:
+            raise ValueError(f"未知的排序列: {sort}")
+        pos = set(pos) if pos else None
+        indexes = [i for i, key in enumerate(self.keys)
+                   if self.frequency[i] >= min_frequency
+                   and (not prefix or key.startswith(prefix))
+                   and (pos is None or key.rpartition('/')[2] in pos)]
+        if sort == 'lemma':
+            indexes.sort(key=self.keys.__getitem__, reverse=descending)
+        else:
+            # 数值相同时按出现次数、再按词典形排序
+            column = columns[sort]
+            sign = -1 if descending else 1
+            indexes.sort(key=lambda i: (sign * column[i], -self.frequency[i], self.keys[i]))
+        return [self.row(i) for i in indexes[:limit]]
+
+    def export_csv(self, output_path: str, rows: Optional[List[Dict]] = None):
+        """
+        导出为CSV
+
+        Args:
+            output_path: 输出文件路径
+            rows: 要导出的行，None 表示按出现次数排序的全部行
+        """
+        rows = self.rows() if rows is None else rows
+        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(['词典形', '词性', '出现次数', '文件数', '集数', "Juilland's D"])
+            for row in rows:
+                writer.writerow([row['lemma'], row['pos'], row['frequency'], row['range'],
+                                 row['episodes'], row['dispersion']])
+
+
+class CorpusStatisticsBuilder:
+    """建立并保存语料库统计（只重新分析变化的文件）"""
+
+    def __init__(self, store_path: Optional[str] = None, analyzer: Optional[KoreanLineAnalyzer] = None):
+        """
+        初始化
+
+        Args:
+            store_path: 保存文件路径，None 表示 statistics/statistics_kor.json
+            analyzer: 形态分析器，None 表示使用全局实例
+        """
+        self.store_path = store_path or os.path.join(STATISTICS_DIR, 'statistics_kor.json')
+        self.analyzer = analyzer or korean_line_analyzer
+
+    def load(self) -> Dict[str, FileStatistics]:
+        """
+        读取保存的各文件统计
+
+        Returns:
+            文件路径 -> 文件统计，文件不存在或版本不同时为空
+        """
+        if not os.path.exists(self.store_path):
+            return {}
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取语料库统计失败: {e}")
+            return {}
+        if data.get('version') != STATISTICS_VERSION:
+            return {}
+        return {file_path: FileStatistics.from_json(item) for file_path, item in data.get('files', {}).items()}
+
+    def save(self, file_statistics: Dict[str, FileStatistics]):
+        """
+        保存各文件统计
+
+        Args:
+            file_statistics: 文件路径 -> 文件统计
+        """
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            temp_path = self.store_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': STATISTICS_VERSION,
+                           'files': {file_path: stats.to_json() for file_path, stats in file_statistics.items()}},
+                          f, ensure_ascii=False)
+            os.replace(temp_path, self.store_path)
+        except OSError as e:
+            print(f"保存语料库统计失败: {e}")
+
+    def build(self, file_paths: List[str], rebuild: bool = False,
+              progress_callback: Optional[Callable[[int, int, str], None]] = None) -> CorpusStatistics:
+        """
+        建立语料库统计
+
+        Args:
+            file_paths: 语料库的文件路径列表
+            rebuild: 是否忽略保存的结果全部重新分析
+            progress_callback: 进度回调 (已处理文件数, 文件总数, 文件路径)
+
+        Returns:
+            语料库统计
+        """
+        from function.search_engine_kor import search_engine_kor
+        from function.parse_cache import parse_cache
+
+        stored = {} if rebuild else self.load()
+        file_statistics: Dict[str, FileStatistics] = {}
+        changed = False
+        for i, file_path in enumerate(file_paths, 1):
+            fingerprint = parse_cache.fingerprint(file_path)
+            stats = stored.get(file_path)
+            if stats is None or fingerprint is None or stats.fingerprint != fingerprint:
+                try:
+                    records = search_engine_kor._iter_parsed_data(file_path)
+                    stats = FileStatistics.build(file_path, fingerprint, records, self.analyzer)
+                except Exception as e:
+                    print(f"统计文件 {file_path} 时出错: {e}")
+                    continue
+                changed = True
+            file_statistics[file_path] = stats
+            if progress_callback:
+                progress_callback(i, len(file_paths), file_path)
+
+        # 语料库中已删除的文件也从保存的结果中去掉
+        if changed or set(stored) != set(file_statistics):
+            self.save(file_statistics)
+        return CorpusStatistics(file_statistics)
+
+
+def stats_main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口：建立并浏览韩语语料库的词典形统计
+
+    Args:
+        argv: 命令行参数，None 表示使用 sys.argv
+
+    Returns:
+        退出状态码
+    """
+    parser = argparse.ArgumentParser(prog='CorpusSearchTool.py stats', description="韩语语料库词典形统计")
+    parser.add_argument('--input', help="文件或目录，默认使用配置文件中韩语语料库的输入目录")
+    parser.add_argument('--rebuild', action='store_true', help="忽略保存的结果全部重新分析")
+    parser.add_argument('--sort', choices=SORT_KEYS, default='frequency', help="排序列")
+    parser.add_argument('--ascending', action='store_true', help="升序排列")
+    parser.add_argument('--pos', nargs='+', help="只列出这些词性，如 VV VA NNG")
+    parser.add_argument('--prefix', default='', help="词典形前缀")
+    parser.add_argument('--min-frequency', type=int, default=1, help="最少出现次数")
+    parser.add_argument('--top', type=int, default=50, help="列出的行数，0 表示全部")
+    parser.add_argument('--export', help="导出为CSV文件（导出筛选后的全部行）")
+    args = parser.parse_args(argv)
+
+    from function.config_manager import config_manager
+    from function.corpus_scanner import corpus_scanner
+    corpus_config = config_manager.get_corpus_config('korean')
+    input_path = args.input or corpus_config['input_dir']
+    file_paths = corpus_scanner.scan(input_path, extensions=corpus_config['extensions'],
+                                     ignore_patterns=corpus_config['ignore_patterns'])
+    if not file_paths:
+        print(f"没有找到可统计的文件: {input_path}")
+        return 1
+
+    statistics = CorpusStatisticsBuilder().build(file_paths, rebuild=args.rebuild)
+    rows = statistics.rows(args.sort, not args.ascending, args.pos, args.prefix, args.min_frequency)
+    print(f"文件数: {len(file_paths)}，集数: {statistics.part_count}，"
+          f"词素数: {statistics.token_count}，词典形数: {len(statistics)}")
+    for row in rows[:args.top or None]:
+        print(f"{row['frequency']:>8} {row['range']:>6} {row['episodes']:>6} {row['dispersion']:>7.4f}  "
+              f"{row['lemma']}/{row['pos']}")
+    if args.export:
+        statistics.export_csv(args.export, rows)
+        print(f"已导出到 {args.export}")
+    return 0
+
+
+# 全局韩语形态分析实例
+korean_line_analyzer = KoreanLineAnalyzer()
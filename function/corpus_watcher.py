@@ -0,0 +1,369 @@
+"""
+语料库监视模块
+在后台监视语料库目录（Linux 上使用 inotify，其他平台轮询文件指纹），
+文件新增或修改后在空闲时预先解析并存入解析结果缓存，使下一次搜索无需重新解析
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from function.corpus_scanner import corpus_scanner
+from function.parse_cache import parse_cache
+
+
+class _PollingBackend:
+    """轮询后端：定期比较语料库文件的大小和修改时间"""
+
+    def __init__(self, roots: List[Dict], interval: float):
+        """
+        初始化轮询后端
+
+        Args:
+            roots: 语料库列表，每项包含 'path'、'extensions'、'ignore_patterns'
+            interval: 轮询间隔（秒）
+        """
+        self.roots = roots
+        self.interval = interval
+        self._next_poll = 0.0
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """获取所有语料库文件的指纹"""
+        snapshot = {}
+        for root in self.roots:
+            files = corpus_scanner.scan(root['path'], root['extensions'], root['ignore_patterns'])
+            for file_path in files:
+                fingerprint = parse_cache.fingerprint(file_path)
+                if fingerprint is not None:
+                    snapshot[file_path] = fingerprint
+        return snapshot
+
+    def wait(self, timeout: float) -> List[Tuple[str, bool]]:
+        """
+        等待文件变化
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            [(文件路径, 是否已删除), ...]
+        """
+        now = time.monotonic()
+        if now < self._next_poll:
+            time.sleep(min(timeout, self._next_poll - now))
+            return []
+        self._next_poll = now + self.interval
+
+        snapshot = self._take_snapshot()
+        changes = [(path, False) for path, fingerprint in snapshot.items()
+                   if self._snapshot.get(path) != fingerprint]
+        changes.extend((path, True) for path in self._snapshot if path not in snapshot)
+        self._snapshot = snapshot
+        return changes
+
+    def close(self):
+        """释放资源"""
+        pass
+
+
+class _InotifyBackend:
+    """inotify 后端（仅 Linux）：递归监视目录，文件写入完成或移入时产生事件"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+                  IN_DELETE | IN_DELETE_SELF)
+
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, roots: List[Dict]):
+        """
+        初始化 inotify 后端
+
+        Args:
+            roots: 语料库列表，每项包含 'path'、'extensions'、'ignore_patterns'
+
+        Raises:
+            OSError: 系统不支持 inotify 或监视数量超出限制
+        """
+        libc_name = ctypes.util.find_library('c')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+
+        self.roots = roots
+        # 监视描述符 -> (目录路径, 所属语料库)
+        self._watches: Dict[int, Tuple[str, Dict]] = {}
+        try:
+            for root in roots:
+                self._add_tree(root['path'], root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, dir_path: str, root: Dict):
+        """为单个目录添加监视"""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), self.WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"无法监视目录 {dir_path}: {os.strerror(errno)}")
+        self._watches[wd] = (dir_path, root)
+
+    def _add_tree(self, dir_path: str, root: Dict) -> List[str]:
+        """
+        递归为目录树添加监视（跳过被忽略的目录）
+
+        Returns:
+            目录树中已存在的文件（新建目录时这些文件不会产生事件）
+        """
+        self._add_watch(dir_path, root)
+        files = []
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return files
+
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, root['path']).replace(os.sep, '/')
+            if corpus_scanner.is_ignored(entry.name, rel_path, root['ignore_patterns']):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    files.extend(self._add_tree(entry.path, root))
+                elif entry.is_file():
+                    files.append(entry.path)
+            except OSError:
+                continue
+        return files
+
+    def wait(self, timeout: float) -> List[Tuple[str, bool]]:
+        """
+        等待文件变化
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            [(文件路径, 是否已删除), ...]
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changes = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                print("文件监视事件队列溢出，部分变化将在搜索时重新解析")
+                continue
+            if mask & (self.IN_IGNORED | self.IN_DELETE_SELF):
+                self._watches.pop(wd, None)
+                continue
+            if wd not in self._watches or not name:
+                continue
+
+            dir_path, root = self._watches[wd]
+            path = os.path.join(dir_path, name)
+
+            if mask & self.IN_ISDIR:
+                # 新建或移入的目录需要加入监视，其中已有的文件视为新增
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        changes.extend((file_path, False) for file_path in self._add_tree(path, root))
+                    except OSError as e:
+                        print(e)
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                changes.append((path, False))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                changes.append((path, True))
+        return changes
+
+    def close(self):
+        """关闭 inotify 描述符"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class CorpusWatcher:
+    """语料库监视器"""
+
+    # 文件最后一次变化后等待的秒数，避免解析仍在写入的文件
+    SETTLE_DELAY = 1.0
+
+    # 等待事件的超时时间（秒），也是检查停止和暂停状态的间隔
+    WAIT_TIMEOUT = 0.5
+
+    # 停止时等待监视线程退出的最长时间（秒），超时后不再等待，后台线程在下一次检查停止标志时退出
+    STOP_TIMEOUT = 1.0
+
+    def __init__(self):
+        """初始化监视器"""
+        self.backend_name = ''
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # 监视后端创建完成（之后发生的变化都会被记录）
+        self._ready_event = threading.Event()
+        # 暂停计数大于0时（如正在搜索）不进行预解析
+        self._pause_count = 0
+        self._pause_lock = threading.Lock()
+        # 待解析文件 -> 最后一次变化的时间
+        self._pending: Dict[str, float] = {}
+        self._roots: List[Dict] = []
+
+    def start(self, roots: Iterable[Dict], backend: str = 'auto', poll_interval: float = 5.0):
+        """
+        开始在后台监视语料库目录，已在运行时先停止
+
+        Args:
+            roots: 语料库列表，每项包含 'path'、'extensions'、'ignore_patterns'
+            backend: 'auto'（Linux 使用 inotify，否则轮询）、'inotify' 或 'polling'
+            poll_interval: 轮询间隔（秒）
+        """
+        self.stop()
+
+        self._roots = [root for root in roots if root.get('path') and os.path.isdir(root['path'])]
+        if not self._roots:
+            return
+
+        # 每次启动使用新的停止标志，上一次停止时未及时退出的线程不会被重新唤醒
+        self._stop_event = threading.Event()
+        self._ready_event = threading.Event()
+        self._pending = {}
+        self._thread = threading.Thread(target=self._run, args=(backend, poll_interval, self._stop_event),
+                                        name='CorpusWatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止监视（在界面线程中调用，最多等待 STOP_TIMEOUT 秒，正在扫描或解析大文件时不阻塞界面）"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(self.STOP_TIMEOUT)
+        self._thread = None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待监视后端创建完成（大型目录树的初始扫描在后台线程中进行）
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否已就绪
+        """
+        return self._ready_event.wait(timeout)
+
+    def is_running(self) -> bool:
+        """监视线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    @contextmanager
+    def paused(self):
+        """在 with 语句块内暂停预解析（监视仍继续记录变化）"""
+        with self._pause_lock:
+            self._pause_count += 1
+        try:
+            yield
+        finally:
+            with self._pause_lock:
+                self._pause_count -= 1
+
+    def _create_backend(self, backend: str, poll_interval: float):
+        """创建监视后端，inotify 不可用时退回轮询"""
+        if backend in ('auto', 'inotify') and sys.platform.startswith('linux'):
+            try:
+                backend_obj = _InotifyBackend(self._roots)
+                self.backend_name = 'inotify'
+                return backend_obj
+            except (OSError, AttributeError) as e:
+                print(f"inotify 不可用，改为轮询监视: {e}")
+        self.backend_name = 'polling'
+        return _PollingBackend(self._roots, poll_interval)
+
+    def _root_of(self, file_path: str) -> Optional[Dict]:
+        """返回文件所属的语料库"""
+        for root in self._roots:
+            if not os.path.relpath(file_path, root['path']).startswith(os.pardir):
+                return root
+        return None
+
+    def _run(self, backend: str, poll_interval: float, stop_event: threading.Event):
+        """监视线程主循环"""
+        pending = self._pending
+        watcher = self._create_backend(backend, poll_interval)
+        self._ready_event.set()
+        try:
+            while not stop_event.is_set():
+                for file_path, deleted in watcher.wait(self.WAIT_TIMEOUT):
+                    if stop_event.is_set():
+                        return
+                    root = self._root_of(file_path)
+                    if root is None or not corpus_scanner.is_corpus_file(
+                            root['path'], file_path, root['extensions'], root['ignore_patterns']):
+                        continue
+                    if deleted:
+                        pending.pop(file_path, None)
+                        parse_cache.invalidate(file_path)
+                    else:
+                        pending[file_path] = time.monotonic()
+                self._preparse_settled(pending, stop_event)
+        finally:
+            watcher.close()
+
+    def _preparse_settled(self, pending: Dict[str, float], stop_event: threading.Event):
+        """
+        空闲时解析已稳定（一段时间内无变化）的文件
+
+        Args:
+            pending: 待解析文件 -> 最后一次变化的时间
+            stop_event: 本次监视的停止标志
+        """
+        from function.search_engine_base import search_engine_base
+
+        now = time.monotonic()
+        for file_path, changed_at in list(pending.items()):
+            if stop_event.is_set() or self._pause_count > 0:
+                return
+            if now - changed_at < self.SETTLE_DELAY:
+                continue
+            del pending[file_path]
+            try:
+                search_engine_base.preparse(file_path)
+            except Exception as e:
+                print(f"预解析文件 {file_path} 时出错: {e}")
+
+
+# 全局语料库监视器实例
+corpus_watcher = CorpusWatcher()
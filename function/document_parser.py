@@ -3,14 +3,18 @@
 负责解析各种文档格式（Word, PDF, TXT, MD等）
 """
 
-import re
-from typing import List, Dict, Tuple
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Tuple, Iterator, Iterable, Optional
 from pathlib import Path
+from function.encoding_detector import encoding_detector
+from function.line_classifier import line_classifier
+from function.pdf_extractor import pdf_page_extractor
 
 
 class DocumentParser:
     """文档文件解析器基类"""
-    
+
     def parse(self, file_path: str) -> List[Dict]:
         """
         解析文档文件
@@ -21,510 +25,383 @@ class DocumentParser:
         Returns:
             解析结果列表，每个元素包含行号、文本等内容
         """
-        raise NotImplementedError("子类必须实现parse方法")
+        return list(self.iter_parse(file_path))
 
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
+        """
+        逐行解析文档文件（生成器）
 
-class TxtParser(DocumentParser):
-    """TXT文档解析器"""
+        Args:
+            file_path: 文档文件路径
 
-    def parse(self, file_path: str) -> List[Dict]:
+        Yields:
+            解析结果，每个元素包含行号、文本等内容
+        """
+        raise NotImplementedError("子类必须实现iter_parse方法")
+
+    def is_episode_title(self, line: str) -> bool:
         """
-        解析TXT文档
+        检查一行是否是集数标题（使用所有解析器共享的预编译分类器）
 
         Args:
-            file_path: TXT文件路径
+            line: 要检查的行
 
         Returns:
-            解析结果列表
+            是否是集数标题
         """
-        results = []
+        return line_classifier.is_episode_title(line)
 
-        # 尝试不同的编码格式
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1']
-        content = None
+    def extract_time_axis(self, line: str) -> str:
+        """
+        从行中提取时间轴信息
 
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
+        Args:
+            line: 要检查的行
 
-        if content is None:
-            raise ValueError(f"无法使用常见编码读取文件: {file_path}")
+        Returns:
+            时间轴信息，如果没有找到则返回None
+        """
+        return line_classifier.extract_time_axis(line)
 
-        # 按行分割
-        lines = content.split('\n')
+    def _iter_text_lines(self, file_path: str) -> Iterator[Dict]:
+        """
+        逐行读取纯文本类文档（TXT/MD），识别集数标题和时间轴
+
+        Args:
+            file_path: 文件路径
 
+        Yields:
+            解析结果
+        """
         current_episode = "未知集数"  # 默认集数
 
-        for i, line in enumerate(lines, 1):
-            if line.strip():  # 只处理非空行
+        # 编码由文件开头的采样检测（结果按文件缓存），整个文件只解码一次
+        with encoding_detector.open_text(file_path) as f:
+            for i, line in enumerate(f, 1):
                 stripped_line = line.strip()
+                if not stripped_line:  # 只处理非空行
+                    continue
 
                 # 检查是否是集数标题
                 if self.is_episode_title(stripped_line):
                     current_episode = stripped_line
-                else:
-                    # 检查是否包含时间轴格式，如 [00:02:36]
-                    time_axis = self.extract_time_axis(stripped_line)
+                    continue
 
-                    results.append({
-                        'line_number': i,
-                        'content': stripped_line,
-                        'episode': current_episode,
-                        'time_axis': time_axis if time_axis else 'N/A',
-                        'file_path': file_path
-                    })
+                # 检查是否包含时间轴格式，如 [00:02:36]
+                time_axis = self.extract_time_axis(stripped_line)
+                start_ms, end_ms = line_classifier.time_range(time_axis)
 
-        return results
+                yield {
+                    'line_number': i,
+                    'content': stripped_line,
+                    'episode': current_episode,
+                    'time_axis': time_axis if time_axis else 'N/A',
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'file_path': file_path
+                }
 
-    def is_episode_title(self, line: str) -> bool:
-        """
-        检查一行是否是集数标题
 
-        Args:
-            line: 要检查的行
+class TxtParser(DocumentParser):
+    """TXT文档解析器"""
 
-        Returns:
-            是否是集数标题
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        # 检查常见的集数标题格式
-        import re
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^\s*#\s+\S+',         # # title
-            r'^\s*##\s+\S+',        # ## title
-            r'^\s*###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        # 检查Markdown标题格式，如 # Death's Game S01E01
-        markdown_header_pattern = r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+.*?$'  # 匹配包含SxEx的标题
-        if re.match(markdown_header_pattern, line):
-            return True
-
-        return False
-
-    def extract_time_axis(self, line: str) -> str:
-        """
-        从行中提取时间轴信息
+        逐行解析TXT文档
 
         Args:
-            line: 要检查的行
+            file_path: TXT文件路径
 
-        Returns:
-            时间轴信息，如果没有找到则返回None
+        Yields:
+            解析结果
         """
-        import re
-        # 匹配 [00:02:36] 格式的时间轴
-        time_pattern = r'\[\d{1,2}:\d{2}:\d{2}\]'
-        match = re.search(time_pattern, line)
-        if match:
-            return match.group(0)
-        return None
+        yield from self._iter_text_lines(file_path)
 
 
 class MdParser(DocumentParser):
     """Markdown文档解析器"""
 
-    def parse(self, file_path: str) -> List[Dict]:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        解析Markdown文档
+        逐行解析Markdown文档
 
         Args:
             file_path: MD文件路径
 
-        Returns:
-            解析结果列表
+        Yields:
+            解析结果
         """
-        results = []
-
-        # 尝试不同的编码格式
-        encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1']
-        content = None
-
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
+        yield from self._iter_text_lines(file_path)
 
-        if content is None:
-            raise ValueError(f"无法使用常见编码读取文件: {file_path}")
 
-        # 按行分割
-        lines = content.split('\n')
+class WordParser(DocumentParser):
+    """Word文档解析器"""
 
-        current_episode = "未知集数"  # 默认集数
+    # WordprocessingML 命名空间
+    W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
 
-        for i, line in enumerate(lines, 1):
-            if line.strip():  # 只处理非空行
-                stripped_line = line.strip()
+    # 包关系中指向主文档部件的关系类型
+    OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+    PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
 
-                # 检查是否是集数标题
-                if self.is_episode_title(stripped_line):
-                    current_episode = stripped_line
-                else:
-                    # 检查是否包含时间轴格式，如 [00:02:36]
-                    time_axis = self.extract_time_axis(stripped_line)
+    # 主文档部件的默认位置
+    DEFAULT_DOCUMENT_PART = 'word/document.xml'
 
-                    results.append({
-                        'line_number': i,
-                        'content': stripped_line,
-                        'episode': current_episode,
-                        'time_axis': time_axis if time_axis else 'N/A',
-                        'file_path': file_path
-                    })
-
-        return results
-
-    def is_episode_title(self, line: str) -> bool:
+    def __init__(self, use_xml_stream: bool = True):
         """
-        检查一行是否是集数标题
+        初始化Word解析器
 
         Args:
-            line: 要检查的行
-
-        Returns:
-            是否是集数标题
+            use_xml_stream: 是否优先直接流式读取 document.xml，False 时始终使用 python-docx
         """
-        # 检查常见的集数标题格式
-        import re
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^\s*#\s+\S+',         # # title
-            r'^\s*##\s+\S+',        # ## title
-            r'^\s*###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        # 检查Markdown标题格式，如 # Death's Game S01E01
-        markdown_header_pattern = r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+.*?$'  # 匹配包含SxEx的标题
-        if re.match(markdown_header_pattern, line):
-            return True
-
-        return False
+        self.use_xml_stream = use_xml_stream
 
-    def extract_time_axis(self, line: str) -> str:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        从行中提取时间轴信息
+        逐段解析Word文档(.docx)
 
         Args:
-            line: 要检查的行
+            file_path: Word文件路径
 
-        Returns:
-            时间轴信息，如果没有找到则返回None
+        Yields:
+            解析结果
         """
-        import re
-        # 匹配 [00:02:36] 格式的时间轴
-        time_pattern = r'\[\d{1,2}:\d{2}:\d{2}\]'
-        match = re.search(time_pattern, line)
-        if match:
-            return match.group(0)
-        return None
+        current_episode = "未知集数"  # 默认集数
 
+        for i, text in self._iter_paragraph_texts(file_path):
+            content = text.strip()
+            if not content:  # 只处理非空段落
+                continue
 
-class WordParser(DocumentParser):
-    """Word文档解析器"""
+            # 检查是否是集数标题
+            if self.is_episode_title(content):
+                current_episode = content
+                continue
 
-    def parse(self, file_path: str) -> List[Dict]:
+            # 检查是否包含时间轴格式，如 [00:02:36]
+            time_axis = self.extract_time_axis(content)
+            start_ms, end_ms = line_classifier.time_range(time_axis)
+
+            yield {
+                'line_number': i,
+                'content': content,
+                'episode': current_episode,
+                'time_axis': time_axis if time_axis else 'N/A',
+                'start_ms': start_ms,
+                'end_ms': end_ms,
+                'file_path': file_path
+            }
+
+    def _iter_paragraph_texts(self, file_path: str) -> Iterator[Tuple[int, str]]:
         """
-        解析Word文档(.docx)
+        按文档顺序产出正文段落文本，优先使用流式XML读取，失败时从出错位置起改用 python-docx
 
         Args:
             file_path: Word文件路径
 
-        Returns:
-            解析结果列表
+        Yields:
+            (段落序号（从1开始）, 段落文本)
+        """
+        done = 0
+        if self.use_xml_stream:
+            try:
+                for i, text in self._iter_xml_paragraphs(file_path):
+                    done = i
+                    yield i, text
+                return
+            except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+                print(f"流式读取Word文档失败，改用python-docx: {file_path}: {e}")
+
+        for i, text in self._iter_docx_paragraphs(file_path):
+            if i > done:
+                yield i, text
+
+    def _iter_docx_paragraphs(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        使用 python-docx 读取段落文本（需要加载完整的文档对象模型）
+
+        Args:
+            file_path: Word文件路径
+
+        Yields:
+            (段落序号（从1开始）, 段落文本)
         """
         try:
             from docx import Document
         except ImportError:
             raise ImportError("请安装python-docx: pip install python-docx")
 
-        results = []
         doc = Document(file_path)
-
-        current_episode = "未知集数"  # 默认集数
-
         for i, paragraph in enumerate(doc.paragraphs, 1):
-            if paragraph.text.strip():  # 只处理非空段落
-                content = paragraph.text.strip()
+            yield i, paragraph.text
 
-                # 检查是否是集数标题
-                if self.is_episode_title(content):
-                    current_episode = content
-                else:
-                    # 检查是否包含时间轴格式，如 [00:02:36]
-                    time_axis = self.extract_time_axis(content)
+    def _iter_xml_paragraphs(self, file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        从压缩包中流式读取主文档XML，只保留当前正文段落的元素树
 
-                    results.append({
-                        'line_number': i,
-                        'content': content,
-                        'episode': current_episode,
-                        'time_axis': time_axis if time_axis else 'N/A',
-                        'file_path': file_path
-                    })
+        与 python-docx 的 doc.paragraphs 一致：只包含 w:body 下的直接段落（不含表格内段落），
+        段落文本由直接的 w:r 与 w:hyperlink 中的 w:r 组成
 
-        return results
+        Args:
+            file_path: Word文件路径
 
-    def is_episode_title(self, line: str) -> bool:
+        Yields:
+            (段落序号（从1开始）, 段落文本)
+        """
+        body_tag = self.W_NS + 'body'
+        p_tag = self.W_NS + 'p'
+
+        with zipfile.ZipFile(file_path) as archive:
+            part_name = self._find_document_part(archive)
+            with archive.open(part_name) as stream:
+                depth = 0
+                body = None
+                index = 0
+                for event, elem in ET.iterparse(stream, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 2 and elem.tag == body_tag:
+                            body = elem
+                        continue
+
+                    depth -= 1
+                    # w:document(1) / w:body(2) / 正文块级元素(3)
+                    if depth == 2 and body is not None:
+                        if elem.tag == p_tag:
+                            index += 1
+                            yield index, self._paragraph_text(elem)
+                        # 已处理的块级元素不再需要，释放内存
+                        body.clear()
+
+    def _find_document_part(self, archive: zipfile.ZipFile) -> str:
         """
-        检查一行是否是集数标题
+        根据包关系 _rels/.rels 查找主文档部件名
 
         Args:
-            line: 要检查的行
+            archive: docx 压缩包
 
         Returns:
-            是否是集数标题
+            主文档部件在压缩包中的路径
         """
-        # 检查常见的集数标题格式
-        import re
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^#\s+\S+',         # # title
-            r'^##\s+\S+',        # ## title
-            r'^###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        # 检查Markdown标题格式，如 # Death's Game S01E01
-        markdown_header_pattern = r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+.*?$'  # 匹配包含SxEx的标题
-        if re.match(markdown_header_pattern, line):
-            return True
-
-        return False
+        try:
+            with archive.open('_rels/.rels') as f:
+                rels = ET.parse(f).getroot()
+        except KeyError:
+            return self.DEFAULT_DOCUMENT_PART
 
-    def extract_time_axis(self, line: str) -> str:
+        for rel in rels.iter(self.PACKAGE_REL_NS + 'Relationship'):
+            if rel.get('Type') == self.OFFICE_DOCUMENT_REL and rel.get('TargetMode') != 'External':
+                return rel.get('Target', self.DEFAULT_DOCUMENT_PART).lstrip('/')
+        return self.DEFAULT_DOCUMENT_PART
+
+    def _paragraph_text(self, paragraph) -> str:
         """
-        从行中提取时间轴信息
+        获取段落元素的文本
 
         Args:
-            line: 要检查的行
+            paragraph: w:p 元素
 
         Returns:
-            时间轴信息，如果没有找到则返回None
+            段落文本
         """
-        import re
-        # 匹配 [00:02:36] 格式的时间轴
-        time_pattern = r'\[\d{1,2}:\d{2}:\d{2}\]'
-        match = re.search(time_pattern, line)
-        if match:
-            return match.group(0)
-        return None
+        r_tag = self.W_NS + 'r'
+        hyperlink_tag = self.W_NS + 'hyperlink'
+
+        parts = []
+        for child in paragraph:
+            if child.tag == r_tag:
+                self._append_run_text(child, parts)
+            elif child.tag == hyperlink_tag:
+                for run in child:
+                    if run.tag == r_tag:
+                        self._append_run_text(run, parts)
+        return ''.join(parts)
+
+    def _append_run_text(self, run, parts: List[str]):
+        """
+        将 w:r 元素的文本追加到列表，制表符、换行等按 python-docx 的规则转换
+
+        Args:
+            run: w:r 元素
+            parts: 文本片段列表
+        """
+        w = self.W_NS
+        for child in run:
+            tag = child.tag
+            if tag == w + 't':
+                if child.text:
+                    parts.append(child.text)
+            elif tag == w + 'tab' or tag == w + 'ptab':
+                parts.append('\t')
+            elif tag == w + 'br':
+                # 只有文本换行（默认类型）对应换行符，分页符和分栏符不产生文本
+                if child.get(w + 'type', 'textWrapping') == 'textWrapping':
+                    parts.append('\n')
+            elif tag == w + 'cr':
+                parts.append('\n')
+            elif tag == w + 'noBreakHyphen':
+                parts.append('-')
 
 
 class PdfParser(DocumentParser):
     """PDF文档解析器"""
 
-    def parse(self, file_path: str) -> List[Dict]:
+    def __init__(self, pages: Optional[Iterable[int]] = None):
         """
-        解析PDF文档
+        初始化PDF解析器
 
         Args:
-            file_path: PDF文件路径
-
-        Returns:
-            解析结果列表
+            pages: 只返回这些页（从1开始）中的内容，None表示全部页面
         """
-        try:
-            import fitz  # PyMuPDF
-        except ImportError:
-            raise ImportError("请安装PyMuPDF: pip install PyMuPDF")
+        self.pages = set(pages) if pages is not None else None
 
-        results = []
-        doc = fitz.open(file_path)
-
-        line_number = 1
-        current_episode = "未知集数"  # 默认集数
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
+        """
+        逐页解析PDF文档，页面文本由 pdf_page_extractor 并行提取并按文档哈希缓存
 
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            text = page.get_text()
+        指定页码过滤时，仍会读取过滤范围之前的页面，以保证行号与集数和完整解析时一致，
+        最后一个指定页之后的页面不会被提取
 
-            # 按行分割文本
-            lines = text.split('\n')
-
-            for line in lines:
-                if line.strip():  # 只处理非空行
-                    content = line.strip()
-
-                    # 检查是否是集数标题
-                    if self.is_episode_title(content):
-                        current_episode = content
-                    else:
-                        # 检查是否包含时间轴格式，如 [00:02:36]
-                        time_axis = self.extract_time_axis(content)
-
-                        results.append({
-                            'line_number': line_number,
-                            'content': content,
-                            'episode': current_episode,
-                            'time_axis': time_axis if time_axis else 'N/A',
-                            'file_path': file_path,
-                            'page': page_num + 1  # 添加页码信息
-                        })
-                    line_number += 1
-
-        doc.close()
-        return results
+        Args:
+            file_path: PDF文件路径
 
-    def is_episode_title(self, line: str) -> bool:
+        Yields:
+            解析结果
         """
-        检查一行是否是集数标题
+        last_page = max(self.pages, default=0) if self.pages is not None else None
 
-        Args:
-            line: 要检查的行
+        line_number = 1
+        current_episode = "未知集数"  # 默认集数
 
-        Returns:
-            是否是集数标题
-        """
-        # 检查常见的集数标题格式
-        import re
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^#\s+\S+',         # # title
-            r'^##\s+\S+',        # ## title
-            r'^###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        # 检查Markdown标题格式，如 # Death's Game S01E01
-        markdown_header_pattern = r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+.*?$'  # 匹配包含SxEx的标题
-        if re.match(markdown_header_pattern, line):
-            return True
-
-        return False
+        for page_index, text in pdf_page_extractor.iter_pages(file_path, last_page):
+            page = page_index + 1
+            selected = self.pages is None or page in self.pages
 
-    def extract_time_axis(self, line: str) -> str:
-        """
-        从行中提取时间轴信息
+            # 按行分割文本
+            for line in text.split('\n'):
+                content = line.strip()
+                if not content:  # 只处理非空行
+                    continue
 
-        Args:
-            line: 要检查的行
+                # 检查是否是集数标题
+                if self.is_episode_title(content):
+                    current_episode = content
+                elif selected:
+                    # 检查是否包含时间轴格式，如 [00:02:36]
+                    time_axis = self.extract_time_axis(content)
+                    start_ms, end_ms = line_classifier.time_range(time_axis)
 
-        Returns:
-            时间轴信息，如果没有找到则返回None
-        """
-        import re
-        # 匹配 [00:02:36] 格式的时间轴
-        time_pattern = r'\[\d{1,2}:\d{2}:\d{2}\]'
-        match = re.search(time_pattern, line)
-        if match:
-            return match.group(0)
-        return None
+                    yield {
+                        'line_number': line_number,
+                        'content': content,
+                        'episode': current_episode,
+                        'time_axis': time_axis if time_axis else 'N/A',
+                        'start_ms': start_ms,
+                        'end_ms': end_ms,
+                        'file_path': file_path,
+                        'page': page  # 添加页码信息
+                    }
+                line_number += 1
 
 
 def get_document_parser(file_path: str) -> DocumentParser:
@@ -562,4 +439,18 @@ def parse_document_file(file_path: str) -> List[Dict]:
         解析结果列表
     """
     parser = get_document_parser(file_path)
-    return parser.parse(file_path)
\ No newline at end of file
+    return parser.parse(file_path)
+
+
+def iter_document_file(file_path: str) -> Iterator[Dict]:
+    """
+    逐行解析文档文件的统一接口（生成器），不会一次性构建完整结果列表
+
+    Args:
+        file_path: 文档文件路径
+
+    Yields:
+        解析结果
+    """
+    parser = get_document_parser(file_path)
+    yield from parser.iter_parse(file_path)
@@ -0,0 +1,235 @@
+"""
+文件编码检测模块
+根据文件开头的采样字节判断文本编码（BOM、UTF-16、UTF-8、CP949/EUC-KR、GBK），
+并按文件指纹缓存检测结果，使每个文件只需解码一次
+"""
+
+import codecs
+import os
+import threading
+from typing import Dict, Optional, TextIO, Tuple
+
+
+class EncodingDetector:
+    """文件编码检测器"""
+
+    # 采样的字节数
+    SAMPLE_SIZE = 64 * 1024
+
+    # BOM与对应编码（UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，必须先检查）
+    BOM_ENCODINGS = [
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    ]
+
+    # 双字节编码候选：韩语字幕常用的 CP949（EUC-KR 的超集）和中文常用的 GBK
+    LEGACY_ENCODINGS = ['cp949', 'gbk']
+
+    # 兜底编码，任意字节序列都能解码
+    FALLBACK_ENCODING = 'latin-1'
+
+    # 高频韩文音节，用于在 CP949 与 GBK 两种解码结果之间打分
+    COMMON_HANGUL = set(
+        '이다는의에가고하을지기서사리로를한어도나자아요게있수해대니으시인정일들만내그제것보상전면우주라여'
+        '생부적문안장거오네데까야말세조화무저되했었금너진짜알왜뭐좋잖빠엄님씨선배'
+    )
+
+    # 高频汉字，用于同样目的
+    COMMON_HANZI = set(
+        '的一是不了人我在有他这中大来上个国到说们为子和你地出道也时年得就那要下以生会自着去之过家学对可她里'
+        '后小么心多天而能好都然没日于起还发成事只作当想看文无开手十用主行方又如前所本见经头面公同三已老从动'
+        '两长知民样现分将外但身些与高意进把法此实回二理美点月明其种声全工己话儿者向情部正名定女问力机给等几'
+        '很业最间新什打便位因重被走电四第门相次东政海口使教西再平真听世气信北少关并内加化由却代军产入先山'
+    )
+
+    def __init__(self):
+        """初始化编码检测器"""
+        # 缓存：绝对路径 -> (文件指纹, 编码)
+        self._cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, file_path: str) -> Tuple[int, int]:
+        """
+        获取文件指纹（大小和修改时间）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            (文件大小, 修改时间纳秒)
+        """
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def detect(self, file_path: str) -> str:
+        """
+        检测文件编码，文件未变化时直接返回缓存结果
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            可直接用于 open() 的编码名称
+        """
+        key = os.path.abspath(file_path)
+        fingerprint = self._fingerprint(file_path)
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        with open(file_path, 'rb') as f:
+            sample = f.read(self.SAMPLE_SIZE)
+        # 采样未覆盖整个文件时，末尾可能截断在多字节字符中间
+        truncated = len(sample) < fingerprint[0]
+
+        encoding = self.detect_bytes(sample, truncated)
+
+        with self._lock:
+            self._cache[key] = (fingerprint, encoding)
+        return encoding
+
+    def detect_bytes(self, sample: bytes, truncated: bool = False) -> str:
+        """
+        根据字节采样判断编码
+
+        Args:
+            sample: 文件开头的字节采样
+            truncated: 采样是否只是文件的一部分
+
+        Returns:
+            编码名称
+        """
+        for bom, encoding in self.BOM_ENCODINGS:
+            if sample.startswith(bom):
+                return encoding
+
+        utf16_encoding = self._detect_bomless_utf16(sample)
+        if utf16_encoding:
+            return utf16_encoding
+
+        if self._can_decode(sample, 'utf-8', truncated):
+            return 'utf-8'
+
+        best_encoding = None
+        best_score = -1.0
+        for encoding in self.LEGACY_ENCODINGS:
+            text = self._decode(sample, encoding, truncated)
+            if text is None:
+                continue
+            score = self._score_text(text, encoding)
+            if score > best_score:
+                best_encoding = encoding
+                best_score = score
+
+        return best_encoding or self.FALLBACK_ENCODING
+
+    def open_text(self, file_path: str) -> TextIO:
+        """
+        以检测到的编码打开文本文件
+
+        采样之后的内容若出现个别无法解码的字节，将以替换字符代替，而不是中断解析
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            文本文件对象
+        """
+        encoding = self.detect(file_path)
+        return open(file_path, 'r', encoding=encoding, errors='replace')
+
+    def clear_cache(self, file_path: Optional[str] = None):
+        """
+        清除缓存
+
+        Args:
+            file_path: 指定文件路径时只清除该文件，否则清除全部
+        """
+        with self._lock:
+            if file_path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(file_path), None)
+
+    def _detect_bomless_utf16(self, sample: bytes) -> Optional[str]:
+        """
+        检测没有BOM的UTF-16：空格、换行、数字等ASCII字符会在奇数（LE）或偶数（BE）位置留下零字节
+
+        Args:
+            sample: 字节采样
+
+        Returns:
+            'utf-16-le'、'utf-16-be' 或 None
+        """
+        if len(sample) < 4:
+            return None
+
+        half = len(sample) // 2
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+
+        if odd_zeros > half * 0.1 and odd_zeros > even_zeros * 4:
+            return 'utf-16-le'
+        if even_zeros > half * 0.1 and even_zeros > odd_zeros * 4:
+            return 'utf-16-be'
+        return None
+
+    def _decode(self, sample: bytes, encoding: str, truncated: bool) -> Optional[str]:
+        """
+        严格解码采样，截断的采样允许末尾存在不完整字符
+
+        Args:
+            sample: 字节采样
+            encoding: 编码名称
+            truncated: 采样是否被截断
+
+        Returns:
+            解码后的文本，失败时返回 None
+        """
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            return decoder.decode(sample, final=not truncated)
+        except UnicodeDecodeError:
+            return None
+
+    def _can_decode(self, sample: bytes, encoding: str, truncated: bool) -> bool:
+        """
+        检查采样能否用指定编码严格解码
+
+        Args:
+            sample: 字节采样
+            encoding: 编码名称
+            truncated: 采样是否被截断
+
+        Returns:
+            是否可以解码
+        """
+        return self._decode(sample, encoding, truncated) is not None
+
+    def _score_text(self, text: str, encoding: str) -> float:
+        """
+        计算解码结果像韩语或中文的程度（高频字符占非ASCII字符的比例）
+
+        Args:
+            text: 解码后的文本
+            encoding: 使用的编码
+
+        Returns:
+            得分，越高越可信
+        """
+        non_ascii = [ch for ch in text if ord(ch) > 0x7f]
+        if not non_ascii:
+            return 0.0
+
+        common = self.COMMON_HANGUL if encoding == 'cp949' else self.COMMON_HANZI
+        hits = sum(1 for ch in non_ascii if ch in common)
+        return hits / len(non_ascii)
+
+
+# 全局编码检测器实例
+encoding_detector = EncodingDetector()
@@ -0,0 +1,244 @@
+"""
+英语词形还原模块
+使用随程序附带的离线词表（不规则变形、不按规则变形的词、可比较的形容词）
+和后缀还原规则（-s/-es/-ies、-ed/-ied、-ing/-ying、辅音双写、-er/-est）把词还原为词典形；
+语料库中的词在建立索引时还原一次，词典形查询只需查找一个倒排列表即可得到所有变形
+"""
+
+import os
+import re
+import threading
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from function.index_cache import FileIndexCache
+
+
+# 随程序附带的词表
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicon', 'english_lexicon.txt')
+
+
+class EnglishLemmatizer:
+    """英语词形还原器"""
+
+    # 英语词的切分规则（按小写）
+    TOKEN_PATTERN = re.compile(r'[a-z]+')
+    WORD_PATTERN = re.compile(r'[A-Za-z]+')
+
+    # 还原后的词干最短长度
+    MIN_STEM_LENGTH = 2
+    # 可以双写的辅音（stopped -> stop、travelled -> travel）
+    DOUBLING_CONSONANTS = set('bdgklmnprtv')
+
+    def __init__(self, lexicon_path: str = LEXICON_PATH):
+        """
+        初始化词形还原器（词表在第一次使用时加载）
+
+        Args:
+            lexicon_path: 词表文件路径
+        """
+        self.lexicon_path = lexicon_path
+        self._irregular: Optional[Dict[str, Tuple[str, ...]]] = None
+        self._forms: Dict[str, List[str]] = {}
+        self._uninflected: Set[str] = set()
+        self._gradable: Set[str] = set()
+        self._cache: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """加载词表"""
+        with self._lock:
+            if self._irregular is not None:
+                return
+            irregular: Dict[str, List[str]] = {}
+            section = None
+            try:
+                with open(self.lexicon_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line or line.startswith('#'):
+                            continue
+                        if line.startswith('[') and line.endswith(']'):
+                            section = line[1:-1]
+                            continue
+                        words = line.lower().split()
+                        if section == 'irregular':
+                            lemma = words[0]
+                            self._forms.setdefault(lemma, [])
+                            for form in words[1:]:
+                                irregular.setdefault(form, []).append(lemma)
+                                if form not in self._forms[lemma]:
+                                    self._forms[lemma].append(form)
+                        elif section == 'uninflected':
+                            self._uninflected.update(words)
+                        elif section == 'gradable':
+                            self._gradable.update(words)
+            except OSError as e:
+                print(f"加载英语词表失败: {e}")
+            self._irregular = {form: tuple(lemmas) for form, lemmas in irregular.items()}
+
+    def lemmas(self, token: str) -> FrozenSet[str]:
+        """
+        取得词可能的词典形（包括词本身）
+
+        规则还原无法确定唯一结果时（如 hoping 可能是 hope 或 hop）返回所有候选，
+        不规则变形只使用词表中的词典形
+
+        Args:
+            token: 小写的词
+
+        Returns:
+            候选词典形集合
+        """
+        cached = self._cache.get(token)
+        if cached is not None:
+            return cached
+        if self._irregular is None:
+            self._load()
+
+        candidates = {token}
+        irregular = self._irregular.get(token)
+        if irregular:
+            candidates.update(irregular)
+        elif token not in self._uninflected:
+            candidates.update(stem for stem in self._rule_stems(token)
+                              if len(stem) >= self.MIN_STEM_LENGTH)
+        result = frozenset(candidates)
+        self._cache[token] = result
+        return result
+
+    def _rule_stems(self, token: str) -> Iterable[str]:
+        """按后缀规则产生候选词干"""
+        if token.endswith('ies') and len(token) > 4:
+            yield token[:-3] + 'y'
+            yield token[:-1]
+        elif token.endswith('es'):
+            yield token[:-2]
+            yield token[:-1]
+        elif token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+            yield token[:-1]
+
+        if token.endswith('ied') and len(token) > 4:
+            yield token[:-3] + 'y'
+        elif token.endswith('ed'):
+            yield from self._undouble(token[:-2])
+            yield token[:-1]
+
+        if token.endswith('ying') and len(token) > 5:
+            yield token[:-4] + 'ie'
+        if token.endswith('ing'):
+            yield from self._undouble(token[:-3])
+            yield token[:-3] + 'e'
+
+        # 比较级、最高级只还原为词表中的形容词（避免 mother -> moth 之类的误判）
+        for suffix in ('er', 'est'):
+            if token.endswith(suffix):
+                stem = token[:-len(suffix)]
+                for candidate in (stem[:-1] + 'y' if stem.endswith('i') else stem, stem + 'e',
+                                  stem[:-1] if len(stem) > 2 and stem[-1] == stem[-2] else stem):
+                    if candidate in self._gradable:
+                        yield candidate
+
+    def _undouble(self, stem: str) -> Iterable[str]:
+        """词干本身以及去掉双写辅音后的词干"""
+        yield stem
+        if len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] in self.DOUBLING_CONSONANTS:
+            yield stem[:-1]
+
+    def lemmatize(self, word: str) -> str:
+        """
+        取得查询词的词典形
+
+        查询词通常已是词典形，只有不规则变形（went、children 等）还原为词表中的词典形
+
+        Args:
+            word: 查询词
+
+        Returns:
+            小写的词典形
+        """
+        word = word.strip().lower()
+        if self._irregular is None:
+            self._load()
+        irregular = self._irregular.get(word)
+        return irregular[0] if irregular else word
+
+    def irregular_forms(self, lemma: str) -> List[str]:
+        """
+        取得词典形在词表中的不规则变形
+
+        Args:
+            lemma: 词典形
+
+        Returns:
+            不规则变形列表
+        """
+        if self._irregular is None:
+            self._load()
+        return list(self._forms.get(lemma.lower(), []))
+
+    def is_english_word(self, word: str) -> bool:
+        """
+        判断查询词是否为单个英语词（可以按词典形检索）
+
+        Args:
+            word: 查询词
+
+        Returns:
+            是否为英语词
+        """
+        return bool(self.WORD_PATTERN.fullmatch(word.strip()))
+
+
+class LemmaIndex:
+    """单个文件的词典形倒排索引：词典形 -> 包含其任一变形的记录序号"""
+
+    def __init__(self, records: Iterable[Dict], lemmatizer: Optional[EnglishLemmatizer] = None):
+        """
+        建立索引（按小写的词，每种词形只还原一次）
+
+        Args:
+            records: 文件的解析结果
+            lemmatizer: 词形还原器，None 表示使用全局实例
+        """
+        lemmatizer = lemmatizer or english_lemmatizer
+        postings: Dict[str, array] = {}
+        forms: Dict[str, Set[str]] = {}
+        token_lemmas: Dict[str, FrozenSet[str]] = {}
+        count = 0
+        for index, record in enumerate(records):
+            line_lemmas = set()
+            for token in set(EnglishLemmatizer.TOKEN_PATTERN.findall(record.get('content', '').lower())):
+                lemmas = token_lemmas.get(token)
+                if lemmas is None:
+                    lemmas = token_lemmas[token] = lemmatizer.lemmas(token)
+                    for lemma in lemmas:
+                        forms.setdefault(lemma, set()).add(token)
+                line_lemmas.update(lemmas)
+            for lemma in line_lemmas:
+                posting = postings.get(lemma)
+                if posting is None:
+                    posting = postings[lemma] = array('I')
+                posting.append(index)
+            count += len(line_lemmas)
+        self._postings = postings
+        self._forms = forms
+        self.posting_count = count
+
+    def lookup(self, lemma: str) -> Tuple[array, Set[str]]:
+        """
+        查找词典形
+
+        Args:
+            lemma: 小写的词典形
+
+        Returns:
+            (升序的记录序号, 语料库中出现的变形)
+        """
+        return self._postings.get(lemma, array('I')), self._forms.get(lemma, set())
+
+
+# 全局英语词形还原器和词典形索引缓存实例（缓存容量按倒排记录总数计算）
+english_lemmatizer = EnglishLemmatizer()
+lemma_index_cache = FileIndexCache(LemmaIndex, max_size=20000000,
+                                   size_of=lambda index: index.posting_count)
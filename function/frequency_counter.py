@@ -0,0 +1,197 @@
+"""
+频率统计模块
+只统计检索词命中的行数（总数、各文件、各集），不生成结果记录、HTML 和搜索历史，
+用于在提取台词之前先了解词或词典形的出现频率；也可以从命令行运行：
+python CorpusSearchTool.py count 关键词 [--corpus english|korean] [--mode ...]
+"""
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+# 解析器对没有集数标题的记录使用的集名称
+UNKNOWN_EPISODE = '未知集数'
+
+
+class FrequencyCount:
+    """检索词的命中行数：总数、各文件和各集"""
+
+    def __init__(self):
+        """初始化"""
+        self.total = 0
+        self.files: Dict[str, int] = {}
+        self.episodes: Dict[str, int] = {}
+
+    @staticmethod
+    def episode_key(file_path: str, record: Dict) -> str:
+        """
+        取得记录所属的集（没有集数标题时以文件名代表一集）
+
+        Args:
+            file_path: 文件路径
+            record: 解析结果
+
+        Returns:
+            集名称
+        """
+        episode = record.get('episode')
+        if not episode or episode == UNKNOWN_EPISODE:
+            return Path(file_path).stem
+        return episode
+
+    @classmethod
+    def count_records(cls, file_path: str, records: Iterable[Dict]) -> Counter:
+        """
+        按集统计记录数
+
+        Args:
+            file_path: 文件路径
+            records: 命中的记录
+
+        Returns:
+            集名称 -> 命中行数
+        """
+        return Counter(cls.episode_key(file_path, record) for record in records)
+
+    def add(self, file_path: str, episode_counts: Counter):
+        """
+        加入一个文件的统计结果
+
+        Args:
+            file_path: 文件路径
+            episode_counts: 集名称 -> 命中行数
+        """
+        file_total = sum(episode_counts.values())
+        if not file_total:
+            return
+        self.total += file_total
+        self.files[file_path] = self.files.get(file_path, 0) + file_total
+        for episode, count in episode_counts.items():
+            self.episodes[episode] = self.episodes.get(episode, 0) + count
+
+    def to_dict(self) -> Dict:
+        """
+        转换为字典
+
+        Returns:
+            {'total', 'file_count', 'episode_count', 'files', 'episodes'}
+        """
+        return {
+            'total': self.total,
+            'file_count': len(self.files),
+            'episode_count': len(self.episodes),
+            'files': dict(self.files),
+            'episodes': dict(self.episodes),
+        }
+
+    def format_report(self, top: Optional[int] = None) -> str:
+        """
+        生成文本报告
+
+        Args:
+            top: 各集只列出命中最多的前几项，None 表示全部列出
+
+        Returns:
+            报告文本
+        """
+        lines = [f"命中行数: {self.total}，文件数: {len(self.files)}，集数: {len(self.episodes)}"]
+        episodes = sorted(self.episodes.items(), key=lambda item: -item[1])
+        for episode, count in episodes[:top] if top else episodes:
+            lines.append(f"{count:>8}  {episode}")
+        return '\n'.join(lines)
+
+
+def count_files(file_paths: List[str], keywords: List[str], corpus_type: str = 'english',
+                mode: str = 'exact', case_sensitive: bool = False) -> FrequencyCount:
+    """
+    统计检索词在多个文件中的命中行数
+
+    Args:
+        file_paths: 文件路径列表
+        keywords: 关键词列表（mode 为 'query' 时只使用第一个）
+        corpus_type: 'english' 或 'korean'
+        mode: 'exact'（子串）、'lemma'（英语词典形/韩语变形）、'regex'、'fuzzy' 或 'query'（查询语言）
+        case_sensitive: 是否区分大小写
+
+    Returns:
+        统计结果
+
+    Raises:
+        ValueError: 统计方式未知或查询语法错误
+    """
+    if corpus_type == 'korean':
+        from function.search_engine_kor import search_engine_kor as engine
+    else:
+        from function.search_engine_eng import search_engine_eng as engine
+
+    if mode == 'query':
+        from function.query_language import query_parser
+        query = query_parser.parse(keywords[0])
+        count_file = lambda file_path: engine.count_query(file_path, query, case_sensitive)
+    elif mode == 'lemma':
+        if corpus_type == 'korean':
+            count_file = lambda file_path: engine.count_korean_variants(file_path, keywords, case_sensitive)
+        else:
+            count_file = lambda file_path: engine.count_english_variants(file_path, keywords, case_sensitive)
+    elif mode in ('exact', 'regex', 'fuzzy'):
+        count_file = lambda file_path: engine.count_in_file(file_path, keywords, case_sensitive,
+                                                            fuzzy_match=mode == 'fuzzy',
+                                                            regex_enabled=mode == 'regex')
+    else:
+        raise ValueError(f"未知的统计方式: {mode}")
+
+    frequency = FrequencyCount()
+    for file_path in file_paths:
+        try:
+            frequency.add(file_path, count_file(file_path))
+        except Exception as e:
+            print(f"统计文件 {file_path} 时出错: {e}")
+    return frequency
+
+
+def count_main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口：统计检索词的频率
+
+    Args:
+        argv: 命令行参数，None 表示使用 sys.argv
+
+    Returns:
+        退出状态码
+    """
+    parser = argparse.ArgumentParser(prog='CorpusSearchTool.py count', description="统计检索词的命中行数")
+    parser.add_argument('keywords', nargs='+', help="关键词（query 方式时为一条查询）")
+    parser.add_argument('--corpus', choices=['english', 'korean'], default='english', help="语料库类型")
+    parser.add_argument('--mode', choices=['exact', 'lemma', 'regex', 'fuzzy', 'query'], default='exact',
+                        help="统计方式")
+    parser.add_argument('--input', help="文件或目录，默认使用配置文件中语料库的输入目录")
+    parser.add_argument('--case-sensitive', action='store_true', help="区分大小写")
+    parser.add_argument('--top', type=int, help="只列出命中最多的前几集")
+    parser.add_argument('--json', action='store_true', help="以JSON输出")
+    args = parser.parse_args(argv)
+
+    from function.config_manager import config_manager
+    from function.corpus_scanner import corpus_scanner
+    corpus_config = config_manager.get_corpus_config(args.corpus)
+    input_path = args.input or corpus_config['input_dir']
+    file_paths = corpus_scanner.scan(input_path, extensions=corpus_config['extensions'],
+                                     ignore_patterns=corpus_config['ignore_patterns'])
+    if not file_paths:
+        print(f"没有找到可统计的文件: {input_path}")
+        return 1
+
+    keywords = [' '.join(args.keywords)] if args.mode == 'query' else args.keywords
+    try:
+        frequency = count_files(file_paths, keywords, args.corpus, args.mode, args.case_sensitive)
+    except ValueError as e:
+        print(f"统计失败: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(frequency.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(frequency.format_report(args.top))
+    return 0
@@ -0,0 +1,422 @@
+"""
+模糊匹配模块
+按编辑距离进行近似匹配：逐行扫描使用 Myers 位并行近似子串算法，
+语料库词汇使用 SymSpell 风格的删除索引，把模糊查询扩展为语料库中实际出现的词；
+韩文按字母（初声、中声、终声）计算编辑距离
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# 韩文音节分解参数
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28
+
+# 韩文音节 -> 组合用字母（初声 U+1100、中声 U+1161、终声 U+11A8），供 str.translate 使用
+_JAMO_TABLE = {}
+for _code in range(HANGUL_BASE, HANGUL_END + 1):
+    _offset = _code - HANGUL_BASE
+    _cho, _rest = divmod(_offset, JUNGSEONG_COUNT * JONGSEONG_COUNT)
+    _jung, _jong = divmod(_rest, JONGSEONG_COUNT)
+    _JAMO_TABLE[_code] = (chr(0x1100 + _cho) + chr(0x1161 + _jung) +
+                          (chr(0x11A7 + _jong) if _jong else ''))
+
+
+def to_jamo(text: str) -> str:
+    """
+    将韩文音节分解为字母，其他字符保持不变
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        分解后的文本，如 '사람' -> '사람'
+    """
+    return text.translate(_JAMO_TABLE)
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """
+    计算编辑距离（插入、删除、替换各计1）
+
+    Args:
+        a: 字符串
+        b: 字符串
+        max_distance: 距离上限，超过时提前结束
+
+    Returns:
+        编辑距离；超过上限时返回 max_distance + 1
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    limit = len(a) if max_distance is None else max_distance
+    if len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+
+class ApproximatePattern:
+    """
+    近似子串模式（Myers 位并行算法）
+
+    文本中存在与模式编辑距离不超过 max_distance 的子串即视为匹配。
+    位向量长度等于模式长度，Python 整数不限位数，长模式也可使用
+    """
+
+    def __init__(self, pattern: str, max_distance: int, hangul_jamo: bool = True):
+        """
+        编译模式
+
+        Args:
+            pattern: 模式
+            max_distance: 最大编辑距离
+            hangul_jamo: 是否按韩文字母计算编辑距离
+        """
+        self.pattern = pattern
+        self.max_distance = max_distance
+        self.hangul_jamo = hangul_jamo
+        units = to_jamo(pattern) if hangul_jamo else pattern
+        self.units = units
+
+        self._length = len(units)
+        self._mask = (1 << self._length) - 1
+        self._high = 1 << (self._length - 1) if units else 0
+        self._peq: Dict[str, int] = {}
+        for i, char in enumerate(units):
+            self._peq[char] = self._peq.get(char, 0) | (1 << i)
+
+        # 鸽巢原理过滤：把模式分成 max_distance+1 段，匹配的子串至少完整包含其中一段
+        self._pieces = self._split_pieces(units, max_distance + 1)
+
+    @staticmethod
+    def _split_pieces(units: str, count: int) -> List[str]:
+        """将模式均分为 count 段，模式过短时返回空列表（不过滤）"""
+        if len(units) < count:
+            return []
+        size, extra = divmod(len(units), count)
+        pieces, start = [], 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            pieces.append(units[start:end])
+            start = end
+        return pieces
+
+    def prepare(self, text: str) -> str:
+        """将文本转换为与模式相同的比较单位"""
+        return to_jamo(text) if self.hangul_jamo else text
+
+    def distance(self, text: str, prepared: bool = False) -> Optional[int]:
+        """
+        计算模式与文本中最接近的子串的编辑距离
+
+        Args:
+            text: 文本
+            prepared: 文本是否已经过 prepare() 转换
+
+        Returns:
+            不超过 max_distance 时返回最小编辑距离，否则返回None
+        """
+        if not prepared:
+            text = self.prepare(text)
+        if not self._length:
+            return 0
+        if self._pieces and not any(piece in text for piece in self._pieces):
+            return None
+
+        peq = self._peq
+        mask = self._mask
+        high = self._high
+        k = self.max_distance
+        pv, mv, score = mask, 0, self._length
+        best = score if score <= k else None
+        for char in text:
+            eq = peq.get(char, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            ph = (ph << 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+            if score <= k and (best is None or score < best):
+                best = score
+                if best == 0:
+                    break
+        return best
+
+    def matches(self, text: str, prepared: bool = False) -> bool:
+        """
+        检查文本中是否存在近似匹配的子串
+
+        Args:
+            text: 文本
+            prepared: 文本是否已经过 prepare() 转换
+
+        Returns:
+            是否匹配
+        """
+        return self.distance(text, prepared) is not None
+
+
+class SymSpellIndex:
+    """
+    词汇删除索引（SymSpell）
+
+    每个词只保存其前缀删除最多 max_distance 个字符后的变体，
+    查询时生成查询词的删除变体查找候选词，再用编辑距离确认
+    """
+
+    # 只对前缀生成删除变体，限制长词的变体数量
+    PREFIX_LENGTH = 7
+
+    def __init__(self, max_distance: int = 2, hangul_jamo: bool = True):
+        """
+        初始化索引
+
+        Args:
+            max_distance: 支持查询的最大编辑距离
+            hangul_jamo: 是否按韩文字母计算编辑距离
+        """
+        self.max_distance = max_distance
+        self.hangul_jamo = hangul_jamo
+        # 比较单位形式 -> 原词集合（同一形式可能对应多个原词）
+        self._words: Dict[str, Set[str]] = {}
+        # 删除变体 -> 比较单位形式列表
+        self._deletes: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return self._key(word) in self._words
+
+    def _key(self, word: str) -> str:
+        """词的比较单位形式"""
+        return to_jamo(word) if self.hangul_jamo else word
+
+    def _edits(self, key: str, distance: int) -> Set[str]:
+        """生成删除最多 distance 个字符的所有变体（包含原形式）"""
+        edits = {key}
+        frontier = {key}
+        for _ in range(distance):
+            next_frontier = set()
+            for item in frontier:
+                for i in range(len(item)):
+                    deleted = item[:i] + item[i + 1:]
+                    if deleted not in edits:
+                        edits.add(deleted)
+                        next_frontier.add(deleted)
+            frontier = next_frontier
+        return edits
+
+    def add(self, word: str):
+        """
+        添加词
+
+        Args:
+            word: 词
+        """
+        key = self._key(word)
+        originals = self._words.get(key)
+        if originals is not None:
+            originals.add(word)
+            return
+        self._words[key] = {word}
+        for deleted in self._edits(key[:self.PREFIX_LENGTH], self.max_distance):
+            self._deletes.setdefault(deleted, []).append(key)
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> Dict[str, int]:
+        """
+        查找与查询词编辑距离不超过 max_distance 的词
+
+        Args:
+            term: 查询词
+            max_distance: 最大编辑距离，None 表示使用索引的最大距离（不能超过索引的最大距离）
+
+        Returns:
+            {原词: 编辑距离}
+        """
+        k = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        term_key = self._key(term)
+        results: Dict[str, int] = {}
+        checked = set()
+        for deleted in self._edits(term_key[:self.PREFIX_LENGTH], k):
+            for key in self._deletes.get(deleted, ()):
+                if key in checked:
+                    continue
+                checked.add(key)
+                distance = levenshtein(term_key, key, k)
+                if distance <= k:
+                    for word in self._words[key]:
+                        results[word] = distance
+        return results
+
+    def clear(self):
+        """清空索引"""
+        self._words.clear()
+        self._deletes.clear()
+
+
+class FuzzyMatcher:
+    """模糊匹配器：管理编辑距离设置、已编译的模式和语料库词汇索引"""
+
+    # 词汇索引最多收录的词数
+    MAX_VOCABULARY = 500000
+
+    # 已编译模式的缓存数量
+    MAX_PATTERNS = 256
+
+    # 词汇切分规则
+    TOKEN_PATTERN = re.compile(r'\w+')
+
+    def __init__(self, max_distance: Optional[int] = None, hangul_jamo: bool = True):
+        """
+        初始化模糊匹配器
+
+        Args:
+            max_distance: 最大编辑距离，None 表示按关键词长度自动确定
+            hangul_jamo: 是否按韩文字母计算编辑距离
+        """
+        self.max_distance = max_distance
+        self.hangul_jamo = hangul_jamo
+        self._index = SymSpellIndex(2 if max_distance is None else max_distance, hangul_jamo)
+        # 已收录词汇的文件：绝对路径 -> 文件指纹
+        self._indexed_files: Dict[str, Tuple[int, int]] = {}
+        self._patterns: "OrderedDict[Tuple[str, int], ApproximatePattern]" = OrderedDict()
+        self._expansions: Dict[Tuple[str, int], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def distance_for(self, pattern: str) -> int:
+        """
+        确定关键词允许的编辑距离
+
+        自动模式下按比较单位的数量确定：不超过2个时为0（只精确匹配），
+        不超过5个时为1，更长时为2；设置了固定距离时不超过比较单位的数量减1，
+        避免整个关键词都被编辑掉而匹配所有行
+
+        Args:
+            pattern: 关键词
+
+        Returns:
+            最大编辑距离
+        """
+        length = len(to_jamo(pattern) if self.hangul_jamo else pattern)
+        if self.max_distance is not None:
+            return min(self.max_distance, max(length - 1, 0))
+        if length <= 2:
+            return 0
+        if length <= 5:
+            return 1
+        return 2
+
+    def compile(self, pattern: str, max_distance: Optional[int] = None) -> ApproximatePattern:
+        """
+        编译（并缓存）近似匹配模式
+
+        Args:
+            pattern: 关键词
+            max_distance: 最大编辑距离，None 表示使用设置
+
+        Returns:
+            近似匹配模式
+        """
+        k = self.distance_for(pattern) if max_distance is None else max_distance
+        key = (pattern, k)
+        with self._lock:
+            compiled = self._patterns.get(key)
+            if compiled is not None:
+                self._patterns.move_to_end(key)
+                return compiled
+        compiled = ApproximatePattern(pattern, k, self.hangul_jamo)
+        with self._lock:
+            self._patterns[key] = compiled
+            while len(self._patterns) > self.MAX_PATTERNS:
+                self._patterns.popitem(last=False)
+        return compiled
+
+    def index_records(self, file_path: str, fingerprint: Optional[Tuple[int, int]],
+                      records: Iterable[Dict]):
+        """
+        将文件的词汇加入词汇索引（文件未变化时跳过）
+
+        Args:
+            file_path: 文件路径
+            fingerprint: 文件指纹（大小, 修改时间）
+            records: 文件的解析结果
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            if fingerprint is not None and self._indexed_files.get(key) == fingerprint:
+                return
+            added = False
+            for record in records:
+                for token in self.TOKEN_PATTERN.findall(record.get('content', '').lower()):
+                    if len(self._index) >= self.MAX_VOCABULARY:
+                        break
+                    if token not in self._index:
+                        self._index.add(token)
+                        added = True
+            if fingerprint is not None:
+                self._indexed_files[key] = fingerprint
+            if added:
+                self._expansions.clear()
+
+    def expand(self, term: str, max_distance: Optional[int] = None) -> Dict[str, int]:
+        """
+        将关键词扩展为词汇索引中编辑距离足够近的词
+
+        Args:
+            term: 关键词
+            max_distance: 最大编辑距离，None 表示使用设置
+
+        Returns:
+            {语料库中的词: 编辑距离}
+        """
+        k = self.distance_for(term) if max_distance is None else max_distance
+        key = (term, k)
+        with self._lock:
+            expansion = self._expansions.get(key)
+            if expansion is None:
+                expansion = self._index.lookup(term, k)
+                self._expansions[key] = expansion
+        return expansion
+
+    def clear(self):
+        """清空词汇索引和模式缓存"""
+        with self._lock:
+            self._index.clear()
+            self._indexed_files.clear()
+            self._patterns.clear()
+            self._expansions.clear()
+
+
+def _create_fuzzy_matcher() -> FuzzyMatcher:
+    """根据配置文件创建全局模糊匹配器"""
+    from function.config_manager import config_manager
+    settings = config_manager.get_fuzzy_settings()
+    return FuzzyMatcher(settings['max_distance'], settings['hangul_jamo'])
+
+
+# 全局模糊匹配器实例
+fuzzy_matcher = _create_fuzzy_matcher()
@@ -0,0 +1,85 @@
+"""
+文件索引缓存模块
+按文件缓存由解析结果建立的各类索引（三元组索引、韩文字母索引、位置索引等），
+以文件大小和修改时间校验，文件变化后自动失效，超出容量时淘汰最久未使用的文件
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class FileIndexCache:
+    """文件索引缓存"""
+
+    def __init__(self, build: Callable[[List[Dict]], Any], max_size: int,
+                 size_of: Callable[[Any], int] = len):
+        """
+        初始化缓存
+
+        Args:
+            build: 用文件的完整解析结果建立索引的函数
+            max_size: 缓存容量（按 size_of 计算的总量）
+            size_of: 计算单个索引大小的函数
+        """
+        self.build = build
+        self.max_size = max_size
+        self.size_of = size_of
+        # 绝对路径 -> (文件指纹, 索引, 索引大小)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str, fingerprint: Optional[Tuple[int, int]], records: List[Dict]) -> Any:
+        """
+        获取文件的索引，没有有效缓存时用解析结果建立
+
+        Args:
+            file_path: 文件路径
+            fingerprint: 解析前获取的文件指纹
+            records: 文件的完整解析结果（记录序号与索引对应）
+
+        Returns:
+            索引
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and fingerprint is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        index = self.build(records)
+        size = self.size_of(index)
+        if fingerprint is None or size > self.max_size:
+            return index
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_size -= old[2]
+            self._entries[key] = (fingerprint, index, size)
+            self._total_size += size
+            while self._total_size > self.max_size:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._total_size -= evicted_size
+        return index
+
+    def invalidate(self, file_path: str):
+        """
+        移除文件的索引
+
+        Args:
+            file_path: 文件路径
+        """
+        with self._lock:
+            old = self._entries.pop(os.path.abspath(file_path), None)
+            if old is not None:
+                self._total_size -= old[2]
+
+    def clear(self):
+        """清除全部索引"""
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
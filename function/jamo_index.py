@@ -0,0 +1,197 @@
+"""
+韩文字母索引模块
+为每行台词建立初声（초성）投影和字母分解形式，并用 n-gram 倒排索引支持
+初声检索（如 ㅇㄹㄷ）和不完整音节检索（如 사ㄹ、달ㄱ），查询时无需逐行分解音节
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from function.fuzzy_matcher import HANGUL_BASE, HANGUL_END, JUNGSEONG_COUNT, JONGSEONG_COUNT
+from function.index_cache import FileIndexCache
+
+
+# 兼容字母（用户输入的形式）
+CHOSEONG_LETTERS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG_LETTERS = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+# 终声按组成拆分，使 살 与 사ㄹ、닭 与 달ㄱ 的字母序列一致
+JONGSEONG_LETTERS = ['', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ',
+                     'ㄹㅌ', 'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# 查询中直接输入的复合终声字母
+COMPOUND_LETTERS = {'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ',
+                    'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ'}
+
+# 兼容字母范围（ㄱ U+3131 ~ ㅣ U+3163）
+COMPAT_JAMO_START = 0x3131
+COMPAT_JAMO_END = 0x3163
+
+# str.translate 使用的转换表
+_CHOSEONG_TABLE = {}
+_LETTER_TABLE = {ord(letter): parts for letter, parts in COMPOUND_LETTERS.items()}
+for _code in range(HANGUL_BASE, HANGUL_END + 1):
+    _cho, _rest = divmod(_code - HANGUL_BASE, JUNGSEONG_COUNT * JONGSEONG_COUNT)
+    _jung, _jong = divmod(_rest, JONGSEONG_COUNT)
+    _CHOSEONG_TABLE[_code] = CHOSEONG_LETTERS[_cho]
+    _LETTER_TABLE[_code] = CHOSEONG_LETTERS[_cho] + JUNGSEONG_LETTERS[_jung] + JONGSEONG_LETTERS[_jong]
+
+
+def to_choseong(text: str) -> str:
+    """
+    将韩文音节替换为其初声字母，其他字符保持不变（长度不变）
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        初声投影，如 '어려도 돼' -> 'ㅇㄹㄷ ㄷ'
+    """
+    return text.translate(_CHOSEONG_TABLE)
+
+
+def to_letters(text: str) -> str:
+    """
+    将韩文音节分解为兼容字母（复合终声拆分），其他字符保持不变
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        字母序列，如 '닭' -> 'ㄷㅏㄹㄱ'
+    """
+    return text.translate(_LETTER_TABLE)
+
+
+def query_mode(query: str) -> Optional[str]:
+    """
+    判断查询应使用的检索方式
+
+    Args:
+        query: 查询字符串
+
+    Returns:
+        'choseong'（只含初声字母和空格）、'jamo'（含单独的字母）或None（普通查询）
+    """
+    stripped = query.strip()
+    if not stripped:
+        return None
+    if all(char in CHOSEONG_LETTERS or char.isspace() for char in stripped):
+        return 'choseong'
+    if any(COMPAT_JAMO_START <= ord(char) <= COMPAT_JAMO_END for char in stripped):
+        return 'jamo'
+    return None
+
+
+class JamoIndex:
+    """单个文件的初声和字母 n-gram 倒排索引"""
+
+    # 初声投影使用二元组，字母序列使用三元组
+    CHOSEONG_GRAM = 2
+    LETTER_GRAM = 3
+
+    def __init__(self, records: Iterable[Dict]):
+        """
+        建立索引
+
+        Args:
+            records: 文件的解析结果
+        """
+        self.choseong_lines: List[str] = []
+        self.letter_lines: List[str] = []
+        self._choseong_postings: Dict[str, List[int]] = {}
+        self._letter_postings: Dict[str, List[int]] = {}
+
+        for index, record in enumerate(records):
+            content = record.get('content', '')
+            choseong = to_choseong(content)
+            letters = to_letters(content)
+            self.choseong_lines.append(choseong)
+            self.letter_lines.append(letters)
+            self._add_grams(self._choseong_postings, choseong, self.CHOSEONG_GRAM, index)
+            self._add_grams(self._letter_postings, letters, self.LETTER_GRAM, index)
+
+    def __len__(self) -> int:
+        return len(self.choseong_lines)
+
+    @staticmethod
+    def _add_grams(postings: Dict[str, List[int]], text: str, n: int, index: int):
+        """将一行的所有 n-gram 加入倒排索引（只收录含韩文字母的 n-gram）"""
+        for gram in {text[i:i + n] for i in range(len(text) - n + 1)}:
+            if any(COMPAT_JAMO_START <= ord(char) <= COMPAT_JAMO_END for char in gram):
+                postings.setdefault(gram, []).append(index)
+
+    def search_choseong(self, query: str) -> List[int]:
+        """
+        初声检索
+
+        Args:
+            query: 初声字母组成的查询，如 'ㅇㄹㄷ'
+
+        Returns:
+            匹配的记录序号（升序）
+        """
+        return self._search(self.choseong_lines, self._choseong_postings, self.CHOSEONG_GRAM,
+                            query.strip())
+
+    def search_letters(self, query: str) -> List[int]:
+        """
+        字母检索（不完整音节）
+
+        Args:
+            query: 查询，如 '사ㄹ'
+
+        Returns:
+            匹配的记录序号（升序）
+        """
+        return self._search(self.letter_lines, self._letter_postings, self.LETTER_GRAM,
+                            to_letters(query.strip()))
+
+    def _search(self, lines: List[str], postings: Dict[str, List[int]], n: int, query: str) -> List[int]:
+        """用倒排索引筛选候选行，再确认查询是候选行投影的子串"""
+        grams = {query[i:i + n] for i in range(len(query) - n + 1)}
+        grams = [gram for gram in grams
+                 if any(COMPAT_JAMO_START <= ord(char) <= COMPAT_JAMO_END for char in gram)]
+        if grams:
+            grams.sort(key=lambda gram: len(postings.get(gram, ())))
+            candidates = set(postings.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(postings.get(gram, ()))
+            candidates = sorted(candidates)
+        else:
+            candidates = range(len(lines))
+        return [i for i in candidates if query in lines[i]]
+
+
+def matched_span(content: str, query: str, mode: str) -> Optional[Tuple[int, int]]:
+    """
+    找到查询在原文中对应的范围（扩展到完整音节），用于高亮
+
+    Args:
+        content: 原文
+        query: 查询
+        mode: 'choseong' 或 'jamo'
+
+    Returns:
+        (起始位置, 结束位置)，未匹配时返回None
+    """
+    query = query.strip()
+    if mode == 'choseong':
+        # 初声投影与原文逐字符对应
+        start = to_choseong(content).find(query)
+        return None if start < 0 else (start, start + len(query))
+
+    query = to_letters(query)
+    offsets = []
+    letters = []
+    for position, char in enumerate(content):
+        converted = to_letters(char)
+        letters.append(converted)
+        offsets.extend([position] * len(converted))
+    start = ''.join(letters).find(query)
+    if start < 0:
+        return None
+    return offsets[start], offsets[start + len(query) - 1] + 1
+
+
+# 全局韩文字母索引缓存实例（缓存容量按行数计算）
+jamo_index_cache = FileIndexCache(JamoIndex, max_size=2000000)
@@ -0,0 +1,199 @@
+"""
+行分类模块
+所有解析器共享的集数标题与时间戳识别，正则在模块加载时预编译并合并为单一模式
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+class LineClassifier:
+    """集数标题与时间戳分类器"""
+
+    # 默认的集数标题格式（均在去除首尾空白后的行上匹配，区分大小写）
+    DEFAULT_EPISODE_PATTERNS = [
+        r'^第\d+集',                      # 第1集, 第2集, ...
+        r'^Episode\s*\d+',                # Episode 1, Episode 2, ...
+        r'^EP\s*\d+',                     # EP 1, EP 2, ...
+        r'^#\d+',                         # #1, #2, ...
+        r'^[Ss]\d+[Ee]\d+',               # S1E1, S2E5, ...
+        r'^[Cc]hapter\s+\d+',             # Chapter 1, Chapter 2, ...
+        r'^-*#{1,3}\s+\d+',               # # 1, ## 3.2, ---# 1, --### 1.1, ...
+        r'^-+\s+#{1,3}\s+\S+',            # --- # title, --- ## title, ...
+        r'^\s*#{1,3}\s+\S+',              # # title, ## title, ### title
+        r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+',   # Markdown标题中包含SxEx，如 #### Death's Game S01E01
+    ]
+
+    # 行内时间轴，如 [00:02:36]
+    TIME_AXIS_PATTERN = re.compile(r'\[\d{1,2}:\d{2}:\d{2}\]')
+
+    # 以时间戳开头的行，如 [00:00:49] 内容
+    TIMESTAMP_LINE_PATTERN = re.compile(r'\[(\d{1,2}:\d{2}:\d{2})\]\s*(.*)')
+
+    # 字幕时间戳，如 00:01:02,500（SRT）、0:01:02.50（ASS）、01:02.500（VTT）
+    TIMESTAMP_PATTERN = re.compile(r'(?:(\d{1,2}):)?(\d{1,2}):(\d{2})(?:[.,](\d{1,3}))?')
+
+    def __init__(self, extra_episode_patterns: Optional[List[str]] = None):
+        """
+        初始化分类器
+
+        Args:
+            extra_episode_patterns: 额外的集数标题正则（来自配置文件）
+        """
+        self.episode_patterns = list(self.DEFAULT_EPISODE_PATTERNS)
+        for pattern in extra_episode_patterns or []:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                print(f"忽略无效的集数标题正则 {pattern!r}: {e}")
+                continue
+            self.episode_patterns.append(pattern)
+
+        # 合并为单一模式，每行只需执行一次匹配
+        self.episode_regex = re.compile('|'.join(f'(?:{p})' for p in self.episode_patterns))
+
+    def is_episode_title(self, line: str) -> bool:
+        """
+        检查一行是否是集数标题（原行和小写形式各匹配一次，如 "CHAPTER 1" 按小写匹配 Chapter 模式）
+
+        Args:
+            line: 要检查的行
+
+        Returns:
+            是否是集数标题
+        """
+        return bool(self.episode_regex.match(line) or self.episode_regex.match(line.lower()))
+
+    def extract_time_axis(self, line: str) -> Optional[str]:
+        """
+        从行中提取时间轴信息
+
+        Args:
+            line: 要检查的行
+
+        Returns:
+            时间轴信息，如 [00:02:36]，如果没有找到则返回None
+        """
+        # 绝大多数行不含方括号，先用子串检查跳过正则
+        if '[' not in line:
+            return None
+        match = self.TIME_AXIS_PATTERN.search(line)
+        return match.group(0) if match else None
+
+    def match_timestamp_line(self, line: str) -> Optional[Tuple[str, str]]:
+        """
+        解析以 [HH:MM:SS] 或 [H:MM:SS] 开头的时间戳行
+
+        Args:
+            line: 要检查的行
+
+        Returns:
+            (时间轴, 内容)，不是时间戳行时返回None
+        """
+        if not line.startswith('['):
+            return None
+        match = self.TIMESTAMP_LINE_PATTERN.match(line)
+        if not match:
+            return None
+        return f"[{match.group(1)}]", match.group(2).strip()
+
+    def contains_time_axis(self, text: str) -> bool:
+        """
+        检查文本中是否包含 [HH:MM:SS] 格式的时间轴
+
+        Args:
+            text: 要检查的文本
+
+        Returns:
+            是否包含时间轴
+        """
+        return self.extract_time_axis(text) is not None
+
+    def parse_timestamp(self, text: str) -> Optional[int]:
+        """
+        将时间戳转换为毫秒
+
+        Args:
+            text: 时间戳，如 00:01:02,500、1:02、[00:02:36]
+
+        Returns:
+            毫秒数，不是时间戳时返回None
+        """
+        match = self.TIMESTAMP_PATTERN.search(text)
+        if not match:
+            return None
+        hours, minutes, seconds, fraction = match.groups()
+        milliseconds = int(fraction.ljust(3, '0')) if fraction else 0
+        return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + milliseconds
+
+    def parse_time_range(self, time_axis: str) -> Optional[Tuple[int, int]]:
+        """
+        将时间轴转换为开始和结束的毫秒数
+
+        Args:
+            time_axis: 时间轴，如 '00:01:02,500 --> 00:01:05,000'；只有一个时间戳时开始和结束相同
+
+        Returns:
+            (开始毫秒, 结束毫秒)，没有时间轴时返回None
+        """
+        if not time_axis or time_axis == 'N/A':
+            return None
+        start_text, _, end_text = time_axis.partition('-->')
+        start = self.parse_timestamp(start_text)
+        if start is None:
+            return None
+        end = self.parse_timestamp(end_text) if end_text else None
+        return start, start if end is None else end
+
+    def time_range(self, time_axis: Optional[str]) -> Tuple[int, int]:
+        """
+        将时间轴转换为开始和结束的毫秒数，解析器用它写入每条记录的 start_ms / end_ms
+
+        Args:
+            time_axis: 时间轴，如 00:01:02,500 --> 00:01:05,000 或 [00:02:36]，可以为None
+
+        Returns:
+            (开始毫秒, 结束毫秒)，没有时间轴时为 (-1, -1)
+        """
+        return self.parse_time_range(time_axis or '') or (-1, -1)
+
+    def record_time_range(self, record: Dict) -> Tuple[int, int]:
+        """
+        取得解析记录的开始和结束毫秒数：优先使用解析器写入的 start_ms / end_ms，
+        没有这两个字段的记录（如其他来源构造的结果）再解析时间轴文本
+
+        Args:
+            record: 解析记录或搜索结果
+
+        Returns:
+            (开始毫秒, 结束毫秒)，没有时间轴时为 (-1, -1)
+        """
+        start = record.get('start_ms')
+        if start is not None:
+            end = record.get('end_ms')
+            return start, start if end is None else end
+        return self.time_range(str(record.get('time_axis', '') or ''))
+
+    @staticmethod
+    def format_timestamp(milliseconds: int) -> str:
+        """
+        将毫秒数转换为 HH:MM:SS 格式的时间戳
+
+        Args:
+            milliseconds: 毫秒数
+
+        Returns:
+            时间戳，如 00:02:36
+        """
+        seconds = milliseconds // 1000
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _create_line_classifier() -> LineClassifier:
+    """根据配置文件创建全局分类器"""
+    from function.config_manager import config_manager
+    return LineClassifier(config_manager.get_parser_settings()['episode_patterns'])
+
+
+# 全局行分类器实例
+line_classifier = _create_line_classifier()
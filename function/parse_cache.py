@@ -0,0 +1,132 @@
+"""
+解析结果缓存模块
+在内存中保存文件的完整解析结果，以文件大小和修改时间校验，文件变化后自动失效；
+由后台监视器在空闲时预先填充，搜索时直接复用
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class ParseCache:
+    """解析结果缓存"""
+
+    # 缓存的解析记录总数上限，超出后淘汰最久未使用的文件
+    MAX_RECORDS = 2000000
+
+    def __init__(self, max_records: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_records: 缓存的解析记录总数上限
+        """
+        self.max_records = max_records or self.MAX_RECORDS
+        # 绝对路径 -> (文件指纹, 解析结果列表)
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], List[Dict]]]" = OrderedDict()
+        self._record_count = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        获取文件指纹（大小和修改时间）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            (文件大小, 修改时间纳秒)，文件不存在时返回None
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, file_path: str) -> Optional[List[Dict]]:
+        """
+        获取文件的缓存解析结果，文件已变化时返回None
+
+        返回的列表与其中的记录由缓存共享，调用方不应修改
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            解析结果列表或None
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry[0] != self.fingerprint(file_path):
+            self.invalidate(file_path)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, file_path: str, fingerprint: Tuple[int, int], records: List[Dict]):
+        """
+        保存文件的解析结果
+
+        Args:
+            file_path: 文件路径
+            fingerprint: 解析前获取的文件指纹
+            records: 完整的解析结果
+        """
+        if len(records) > self.max_records:
+            return
+
+        key = os.path.abspath(file_path)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._record_count -= len(old[1])
+            self._entries[key] = (fingerprint, records)
+            self._record_count += len(records)
+
+            while self._record_count > self.max_records:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._record_count -= len(evicted)
+
+    def contains(self, file_path: str) -> bool:
+        """
+        检查文件是否有有效的缓存
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            是否已缓存且文件未变化
+        """
+        return self.get(file_path) is not None
+
+    def invalidate(self, file_path: str):
+        """
+        移除文件的缓存
+
+        Args:
+            file_path: 文件路径
+        """
+        with self._lock:
+            old = self._entries.pop(os.path.abspath(file_path), None)
+            if old is not None:
+                self._record_count -= len(old[1])
+
+    def clear(self):
+        """清除全部缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._record_count = 0
+
+
+# 全局解析结果缓存实例
+parse_cache = ParseCache()
@@ -0,0 +1,266 @@
+"""
+PDF页面文本提取模块
+按页码区间在多个进程中并行提取PDF文本，并以文档内容哈希为键缓存每一页的文本，
+同一文档再次检索时直接复用缓存，无需重新解析页面
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def _import_fitz():
+    """延迟导入PyMuPDF"""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        raise ImportError("请安装PyMuPDF: pip install PyMuPDF")
+    return fitz
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    提取指定页码区间的文本（在工作进程中执行）
+
+    Args:
+        file_path: PDF文件路径
+        start: 起始页索引（从0开始，包含）
+        end: 结束页索引（不包含）
+
+    Returns:
+        每一页的文本
+    """
+    fitz = _import_fitz()
+    doc = fitz.open(file_path)
+    try:
+        return [doc.load_page(page_index).get_text() for page_index in range(start, end)]
+    finally:
+        doc.close()
+
+
+class PdfPageExtractor:
+    """带缓存的PDF页面文本提取器"""
+
+    # 页数达到该值才启用多进程，页数较少时进程启动开销大于收益
+    PARALLEL_MIN_PAGES = 64
+
+    # 每个任务提取的页数
+    PAGES_PER_TASK = 16
+
+    # 最多缓存的文档数，超出后淘汰最久未使用的文档
+    MAX_CACHED_DOCUMENTS = 16
+
+    # 计算文档哈希时每次读取的字节数
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        初始化提取器
+
+        Args:
+            max_workers: 最大工作进程数，默认为CPU核心数
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # 页面缓存：文档哈希 -> {页索引: 页面文本}
+        self._pages: "OrderedDict[str, Dict[int, str]]" = OrderedDict()
+        # 哈希缓存：绝对路径 -> (文件指纹, 文档哈希)，文件未变化时无需重新计算哈希
+        self._hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def document_hash(self, file_path: str) -> str:
+        """
+        计算文档内容的哈希，文件大小和修改时间不变时直接返回缓存结果
+
+        Args:
+            file_path: PDF文件路径
+
+        Returns:
+            SHA-1 十六进制摘要
+        """
+        key = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        fingerprint = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        digest = hashlib.sha1()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        doc_hash = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[key] = (fingerprint, doc_hash)
+        return doc_hash
+
+    def page_count(self, file_path: str) -> int:
+        """
+        获取PDF页数
+
+        Args:
+            file_path: PDF文件路径
+
+        Returns:
+            页数
+        """
+        fitz = _import_fitz()
+        doc = fitz.open(file_path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+
+    def iter_pages(self, file_path: str, last_page: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        按页码顺序逐页产出文本，已缓存的页直接返回，其余页按区间提取（页数较多时并行）
+
+        Args:
+            file_path: PDF文件路径
+            last_page: 只提取到该页（从1开始，包含），None表示全部页面
+
+        Yields:
+            (页索引（从0开始）, 页面文本)
+        """
+        doc_hash = self.document_hash(file_path)
+        total = self.page_count(file_path)
+        if last_page is not None:
+            total = min(total, max(last_page, 0))
+
+        with self._lock:
+            cached = self._pages.get(doc_hash)
+            if cached is None:
+                cached = {}
+                self._pages[doc_hash] = cached
+                while len(self._pages) > self.MAX_CACHED_DOCUMENTS:
+                    self._pages.popitem(last=False)
+            else:
+                self._pages.move_to_end(doc_hash)
+            # 共享的缓存只在持锁时读写，产出时使用本次的副本
+            pages = {i: cached[i] for i in range(total) if i in cached}
+        missing = [i for i in range(total) if i not in pages]
+
+        if not missing:
+            for page_index in range(total):
+                yield page_index, pages[page_index]
+            return
+
+        ranges = self._split_ranges(missing)
+        if len(missing) >= self.PARALLEL_MIN_PAGES and self.max_workers > 1:
+            extracted = self._iter_parallel(file_path, ranges)
+        else:
+            extracted = self._iter_serial(file_path, ranges)
+
+        try:
+            page_index = 0
+            for (start, end), texts in extracted:
+                # 先产出该区间之前已缓存的页
+                while page_index < start:
+                    yield page_index, pages[page_index]
+                    page_index += 1
+                with self._lock:
+                    cached.update(zip(range(start, end), texts))
+                for offset, text in enumerate(texts):
+                    yield start + offset, text
+                page_index = end
+            while page_index < total:
+                yield page_index, pages[page_index]
+                page_index += 1
+        finally:
+            extracted.close()
+
+    def clear_cache(self, file_path: Optional[str] = None):
+        """
+        清除缓存
+
+        Args:
+            file_path: 指定文件路径时只清除该文档，否则清除全部
+        """
+        with self._lock:
+            if file_path is None:
+                self._pages.clear()
+                self._hashes.clear()
+                return
+            cached = self._hashes.pop(os.path.abspath(file_path), None)
+            if cached:
+                self._pages.pop(cached[1], None)
+
+    def _split_ranges(self, page_indexes: List[int]) -> List[Tuple[int, int]]:
+        """
+        将未缓存的页索引合并为连续区间，并按 PAGES_PER_TASK 切分
+
+        Args:
+            page_indexes: 升序排列的页索引
+
+        Returns:
+            [(起始页索引, 结束页索引), ...]
+        """
+        ranges = []
+        start = prev = page_indexes[0]
+        for page_index in page_indexes[1:]:
+            if page_index != prev + 1 or page_index - start >= self.PAGES_PER_TASK:
+                ranges.append((start, prev + 1))
+                start = page_index
+            prev = page_index
+        ranges.append((start, prev + 1))
+        return ranges
+
+    def _iter_serial(self, file_path: str, ranges: List[Tuple[int, int]]) -> Iterator[Tuple[Tuple[int, int], List[str]]]:
+        """
+        在当前进程中逐个区间提取
+
+        Args:
+            file_path: PDF文件路径
+            ranges: 页码区间列表
+
+        Yields:
+            ((起始页索引, 结束页索引), 页面文本列表)
+        """
+        for start, end in ranges:
+            yield (start, end), _extract_page_range(file_path, start, end)
+
+    def _iter_parallel(self, file_path: str, ranges: List[Tuple[int, int]]) -> Iterator[Tuple[Tuple[int, int], List[str]]]:
+        """
+        在进程池中并行提取各区间，按页码顺序产出结果
+
+        使用 spawn 方式创建进程，避免在GUI的多线程进程中 fork
+
+        Args:
+            file_path: PDF文件路径
+            ranges: 页码区间列表
+
+        Yields:
+            ((起始页索引, 结束页索引), 页面文本列表)
+        """
+        workers = min(self.max_workers, len(ranges))
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        except (OSError, ValueError) as e:
+            print(f"无法创建PDF提取进程池，改为单进程提取: {e}")
+            yield from self._iter_serial(file_path, ranges)
+            return
+
+        try:
+            futures = [executor.submit(_extract_page_range, file_path, start, end) for start, end in ranges]
+            for i, ((start, end), future) in enumerate(zip(ranges, futures)):
+                try:
+                    texts = future.result()
+                except Exception as e:
+                    # 进程池异常（如工作进程崩溃）时，剩余区间在当前进程中完成
+                    print(f"并行提取PDF页面失败，改为单进程提取: {e}")
+                    yield from self._iter_serial(file_path, ranges[i:])
+                    return
+                yield (start, end), texts
+        finally:
+            # 调用方提前停止迭代（如只需要第一条结果）时，取消尚未开始的任务
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 全局PDF页面提取器实例
+pdf_page_extractor = PdfPageExtractor()
@@ -0,0 +1,224 @@
+"""
+位置索引模块
+为每个文件建立词 -> (行序号, 词序号) 的倒排索引，
+惯用语等多词查询通过求各核心词倒排列表的交集并检查词序和间隔完成，耗时与命中数成正比
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from function.index_cache import FileIndexCache
+
+
+class PositionalIndex:
+    """单个文件的位置倒排索引（按小写词）"""
+
+    # 词的切分规则，与 \b 单词边界一致
+    TOKEN_PATTERN = re.compile(r'\w+')
+
+    # 位置编码：行序号 << POSITION_BITS | 行内词序号
+    POSITION_BITS = 16
+    MAX_TOKEN_POSITION = (1 << POSITION_BITS) - 1
+
+    def __init__(self, records: Iterable[Dict]):
+        """
+        建立索引
+
+        Args:
+            records: 文件的解析结果
+        """
+        postings: Dict[str, array] = {}
+        count = 0
+        for line_index, record in enumerate(records):
+            tokens = self.TOKEN_PATTERN.findall(record.get('content', '').lower())
+            for position, token in enumerate(tokens[:self.MAX_TOKEN_POSITION + 1]):
+                posting = postings.get(token)
+                if posting is None:
+                    posting = postings[token] = array('Q')
+                posting.append(line_index << self.POSITION_BITS | position)
+            count += len(tokens)
+        self._postings = postings
+        self._sorted_tokens: Optional[List[str]] = None
+        self.token_count = count
+
+    def __len__(self) -> int:
+        return self.token_count
+
+    def posting_size(self, token: str) -> int:
+        """
+        词的出现次数（用于估计查询的选择性）
+
+        Args:
+            token: 小写的词
+
+        Returns:
+            出现次数
+        """
+        return len(self._postings.get(token, ()))
+
+    def lines(self, token: str) -> Set[int]:
+        """
+        包含词的行序号（不需要词序时比合并位置快）
+
+        Args:
+            token: 小写的词
+
+        Returns:
+            行序号集合
+        """
+        bits = self.POSITION_BITS
+        return {code >> bits for code in self._postings.get(token, ())}
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        """
+        取得以前缀开头的所有词（词表排序后缓存在索引中）
+
+        Args:
+            prefix: 小写的前缀
+
+        Returns:
+            词列表
+        """
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        tokens = self._sorted_tokens
+        start = bisect_left(tokens, prefix)
+        end = start
+        while end < len(tokens) and tokens[end].startswith(prefix):
+            end += 1
+        return tokens[start:end]
+
+    def line_positions(self, variants: Sequence[str]) -> Dict[int, Tuple[List[int], List[int], List[str]]]:
+        """
+        合并一组变体的倒排列表（含多个词的变体要求各词相邻）
+
+        Args:
+            variants: 变体列表
+
+        Returns:
+            行序号 -> (升序的起始词序号列表, 结束词序号列表, 对应的变体列表)
+        """
+        mask = self.MAX_TOKEN_POSITION
+        entries = []
+        for variant in dict.fromkeys(variants):
+            tokens = self.TOKEN_PATTERN.findall(variant.lower())
+            if not tokens:
+                continue
+            first = self._postings.get(tokens[0], ())
+            if len(tokens) == 1:
+                entries.extend((code, code, variant) for code in first)
+                continue
+            following = [set(self._postings.get(token, ())) for token in tokens[1:]]
+            span = len(tokens) - 1
+            for code in first:
+                if (code & mask) + span <= mask and all(
+                        code + offset in codes for offset, codes in enumerate(following, 1)):
+                    entries.append((code, code + span, variant))
+        entries.sort()
+
+        lines: Dict[int, Tuple[List[int], List[int], List[str]]] = {}
+        for start, end, variant in entries:
+            starts, ends, matched = lines.setdefault(start >> self.POSITION_BITS, ([], [], []))
+            if starts and starts[-1] == start & mask:
+                continue
+            starts.append(start & mask)
+            ends.append(end & mask)
+            matched.append(variant)
+        return lines
+
+    def find_ordered(self, term_groups: List[Sequence[str]],
+                     max_gap: Optional[int] = None) -> List[Tuple[int, List[str]]]:
+        """
+        查找按顺序包含每组中任一变体的行
+
+        Args:
+            term_groups: 每个核心词的变体列表（按查询中的顺序）
+            max_gap: 相邻核心词之间最多间隔的词数，None 表示同一行内不限
+
+        Returns:
+            [(行序号, 各核心词匹配到的变体), ...]，按行序号升序
+        """
+        if not term_groups:
+            return []
+        per_word = [self.line_positions(group) for group in term_groups]
+
+        # 从命中行最少的核心词开始求交集
+        ordered = sorted(per_word, key=len)
+        lines = set(ordered[0])
+        for word_lines in ordered[1:]:
+            lines.intersection_update(word_lines)
+            if not lines:
+                return []
+
+        results = []
+        for line_index in sorted(lines):
+            matched = self._chain([word_lines[line_index] for word_lines in per_word], max_gap)
+            if matched is not None:
+                results.append((line_index, matched))
+        return results
+
+    @classmethod
+    def match_tokens(cls, tokens: List[str], term_groups: List[Sequence[str]],
+                     max_gap: Optional[int] = None) -> Optional[List[str]]:
+        """
+        在单行的词序列中按顺序匹配每组变体（精确比较，用于区分大小写的确认）
+
+        Args:
+            tokens: 行内的词
+            term_groups: 每个核心词的变体列表
+            max_gap: 相邻核心词之间最多间隔的词数
+
+        Returns:
+            各核心词匹配到的变体，未匹配时返回None
+        """
+        position_lists = []
+        for group in term_groups:
+            entries = []
+            for variant in dict.fromkeys(group):
+                variant_tokens = cls.TOKEN_PATTERN.findall(variant)
+                size = len(variant_tokens)
+                if not size:
+                    continue
+                entries.extend((i, i + size - 1, variant) for i in range(len(tokens) - size + 1)
+                               if tokens[i:i + size] == variant_tokens)
+            if not entries:
+                return None
+            entries.sort()
+            starts, ends, matched = [], [], []
+            for start, end, variant in entries:
+                if starts and starts[-1] == start:
+                    continue
+                starts.append(start)
+                ends.append(end)
+                matched.append(variant)
+            position_lists.append((starts, ends, matched))
+        return cls._chain(position_lists, max_gap)
+
+    @staticmethod
+    def _chain(position_lists: List[Tuple[List[int], List[int], List[str]]],
+               max_gap: Optional[int]) -> Optional[List[str]]:
+        """
+        选择按顺序排列且互不重叠的匹配：每个核心词取前一个匹配结束之后最近的位置
+
+        不限间隔时只需从第一个核心词最早的位置开始；限制间隔时依次尝试第一个核心词的每个位置
+        """
+        first_starts, first_ends, first_variants = position_lists[0]
+        starts = range(len(first_starts)) if max_gap is not None else range(1)
+        for start in starts:
+            previous_end = first_ends[start]
+            matched = [first_variants[start]]
+            for positions, ends, variants in position_lists[1:]:
+                i = bisect_right(positions, previous_end)
+                if i == len(positions) or (max_gap is not None and positions[i] - previous_end - 1 > max_gap):
+                    break
+                previous_end = ends[i]
+                matched.append(variants[i])
+            else:
+                return matched
+        return None
+
+
+# 全局位置索引缓存实例（缓存容量按词数计算）
+positional_index_cache = FileIndexCache(PositionalIndex, max_size=20000000)
@@ -0,0 +1,737 @@
+"""
+查询语言模块
+支持 AND / OR / NOT、括号、引号短语、NEAR/n 邻近查询、前缀通配（word*）
+以及 file: / episode: / time: / eptime: 筛选条件，例如：
+
+    "I love you" AND NOT sorry
+    (love OR like) NEAR/3 you episode:3-5 time:00:10:00-00:20:00
+    love eptime:-00:10:00          （每集的前 10 分钟）
+
+相邻的查询项之间默认为 OR（与普通关键词搜索一致），筛选条件与相邻的查询项之间为 AND。查询在每个文件的位置索引上执行：
+AND 的各子查询按估计的命中数从少到多求交集，结果为空时提前结束，NOT 最后求差集；
+只含 file: 条件即可确定不匹配的文件无需解析
+"""
+
+import fnmatch
+import os
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from function.index_cache import FileIndexCache
+from function.line_classifier import line_classifier
+from function.positional_index import PositionalIndex, positional_index_cache
+
+
+# NEAR 未指定距离时允许间隔的词数
+DEFAULT_NEAR_DISTANCE = 5
+
+# 查询的词法规则
+_LEXER = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() |
+        (?P<rparen>\)) |
+        (?P<field>file|episode|time|eptime):(?:"(?P<field_quoted>[^"]*)"|(?P<field_value>[^\s()"]+)) |
+        "(?P<phrase>[^"]*)" |
+        (?P<word>[^\s()"]+)
+    )''', re.VERBOSE)
+
+_NEAR_PATTERN = re.compile(r'NEAR(?:/(\d+))?')
+_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+class QueryContext:
+    """单个文件的查询执行环境"""
+
+    def __init__(self, file_path: str, records: List[Dict], index: PositionalIndex,
+                 metadata: "RecordMetadata", case_sensitive: bool):
+        self.file_path = file_path
+        self.records = records
+        self.index = index
+        self.metadata = metadata
+        # 区分大小写时先在（小写的）索引上求候选行，NOT 不排除任何行，再逐行确认
+        self.case_sensitive = case_sensitive
+        self.all_lines = range(len(records))
+        self._positions: Dict[Tuple, Dict[int, Tuple[List[int], List[int], List[str]]]] = {}
+        self._lines: Dict[str, Set[int]] = {}
+
+    def positions(self, key: Tuple, variants: Iterable[str]) -> Dict[int, Tuple[List[int], List[int], List[str]]]:
+        """取得一组变体的位置（同一查询中重复出现的词只计算一次）"""
+        cached = self._positions.get(key)
+        if cached is None:
+            cached = self._positions[key] = self.index.line_positions(list(variants))
+        return cached
+
+    def lines(self, token: str) -> Set[int]:
+        """取得包含单个词的行（不需要词序时使用）"""
+        cached = self._lines.get(token)
+        if cached is None:
+            cached = self._lines[token] = self.index.lines(token)
+        return cached
+
+
+class LineView:
+    """逐行确认时使用的单行数据（保留原始大小写的词）"""
+
+    def __init__(self, record: Dict, file_path: str, metadata: "RecordMetadata", line_index: int):
+        self.tokens = PositionalIndex.TOKEN_PATTERN.findall(record.get('content', ''))
+        self.file_path = file_path
+        self.metadata = metadata
+        self.line_index = line_index
+
+
+class QueryNode:
+    """查询语法树节点"""
+
+    def estimate(self, ctx: QueryContext) -> int:
+        """估计命中的行数，用于安排求交集的顺序"""
+        raise NotImplementedError
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        """在索引上求命中的行序号"""
+        raise NotImplementedError
+
+    def restrict(self, ctx: QueryContext, lines: Set[int]) -> Set[int]:
+        """在已有的候选行中求命中的行（AND 中排在后面的子查询使用）"""
+        return lines & self.evaluate(ctx)
+
+    def test(self, line: LineView) -> bool:
+        """逐行确认（区分大小写）"""
+        raise NotImplementedError
+
+    def prefilter(self, file_path: str) -> Optional[bool]:
+        """只根据文件路径判断是否可能匹配：False 表示一定不匹配，None 表示需要查看内容"""
+        return None
+
+    def leaves(self) -> Iterable["TermNode"]:
+        """不在 NOT 之下的词和短语，用于记录结果中的匹配词"""
+        return ()
+
+
+class TermNode(QueryNode):
+    """词或短语（短语要求各词相邻）"""
+
+    def __init__(self, tokens: List[str], prefix: bool = False):
+        self.tokens = tokens
+        self.prefix = prefix
+        self.text = ' '.join(tokens)
+
+    def __repr__(self) -> str:
+        return f'Term({self.text!r}{", prefix" if self.prefix else ""})'
+
+    def _variants(self, ctx: QueryContext) -> List[str]:
+        text = self.text.lower()
+        return ctx.index.expand_prefix(text) if self.prefix else [text]
+
+    def positions(self, ctx: QueryContext) -> Dict[int, Tuple[List[int], List[int], List[str]]]:
+        """行序号 -> (起始词序号, 结束词序号, 匹配的词)"""
+        return ctx.positions(('prefix' if self.prefix else 'term', self.text.lower()), self._variants(ctx))
+
+    def estimate(self, ctx: QueryContext) -> int:
+        if self.prefix:
+            return sum(ctx.index.posting_size(token) for token in self._variants(ctx))
+        return min(ctx.index.posting_size(token.lower()) for token in self.tokens)
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        if not self.prefix and len(self.tokens) == 1:
+            return set(ctx.lines(self.text.lower()))
+        return set(self.positions(ctx))
+
+    def line_spans(self, tokens: List[str]) -> List[Tuple[int, int]]:
+        """在单行的词序列中查找（区分大小写），返回 (起始词序号, 结束词序号)"""
+        size = len(self.tokens)
+        if self.prefix:
+            return [(i, i) for i, token in enumerate(tokens) if token.startswith(self.tokens[0])]
+        return [(i, i + size - 1) for i in range(len(tokens) - size + 1) if tokens[i:i + size] == self.tokens]
+
+    def test(self, line: LineView) -> bool:
+        return bool(self.line_spans(line.tokens))
+
+    def leaves(self) -> Iterable["TermNode"]:
+        yield self
+
+    def matched_text(self, ctx: QueryContext, line_index: int) -> List[str]:
+        """结果行中匹配的文字（小写；前缀查询为匹配的词），该行不含此查询项时返回空列表"""
+        if not self.prefix and len(self.tokens) == 1:
+            text = self.text.lower()
+            return [text] if line_index in ctx.lines(text) else []
+        positions = self.positions(ctx).get(line_index)
+        if positions is None:
+            return []
+        return list(dict.fromkeys(positions[2]))
+
+
+class NearNode(QueryNode):
+    """两侧的词或短语（或它们的 OR 组合）在同一行中相距不超过 distance 个词（顺序不限）"""
+
+    def __init__(self, left: List[TermNode], right: List[TermNode], distance: int):
+        self.left = left
+        self.right = right
+        self.distance = distance
+
+    def __repr__(self) -> str:
+        return f'Near({self.left!r}, {self.right!r}, {self.distance})'
+
+    @staticmethod
+    def operand_terms(node: QueryNode) -> Optional[List[TermNode]]:
+        """NEAR 一侧的查询项：词、短语或只由它们组成的 OR，否则返回None"""
+        if isinstance(node, TermNode):
+            return [node]
+        if isinstance(node, OrNode) and all(isinstance(child, TermNode) for child in node.children):
+            return list(node.children)
+        return None
+
+    @staticmethod
+    def _side_positions(terms: List[TermNode], ctx: QueryContext) -> Dict[int, List[Tuple[int, int]]]:
+        """合并一侧各查询项的位置：行序号 -> 按起始位置排序的 (起始词序号, 结束词序号)"""
+        if len(terms) == 1:
+            return {line_index: list(zip(starts, ends))
+                    for line_index, (starts, ends, _) in terms[0].positions(ctx).items()}
+        merged: Dict[int, List[Tuple[int, int]]] = {}
+        for term in terms:
+            for line_index, (starts, ends, _) in term.positions(ctx).items():
+                merged.setdefault(line_index, []).extend(zip(starts, ends))
+        for spans in merged.values():
+            spans.sort()
+        return merged
+
+    def estimate(self, ctx: QueryContext) -> int:
+        return min(sum(term.estimate(ctx) for term in self.left),
+                   sum(term.estimate(ctx) for term in self.right))
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        left = self._side_positions(self.left, ctx)
+        right = self._side_positions(self.right, ctx)
+        if len(right) < len(left):
+            left, right = right, left
+        return {line_index for line_index, spans in left.items()
+                if line_index in right and self._close(spans, right[line_index])}
+
+    def _close(self, spans: List[Tuple[int, int]], other_spans: List[Tuple[int, int]]) -> bool:
+        """两组位置中是否有一对互不重叠且间隔不超过 distance 个词"""
+        other_starts = [start for start, _ in other_spans]
+        for start, end in spans:
+            # 在右侧：起始位置位于 (end, end + distance + 1]
+            i = bisect_left(other_starts, end + 1)
+            if i < len(other_starts) and other_starts[i] - end - 1 <= self.distance:
+                return True
+            # 在左侧：结束位置位于 [start - distance - 1, start)
+            for other_start, other_end in other_spans:
+                if other_start >= start:
+                    break
+                if other_end < start and start - other_end - 1 <= self.distance:
+                    return True
+        return False
+
+    def test(self, line: LineView) -> bool:
+        left = sorted(span for term in self.left for span in term.line_spans(line.tokens))
+        right = sorted(span for term in self.right for span in term.line_spans(line.tokens))
+        return bool(left) and bool(right) and self._close(left, right)
+
+    def leaves(self) -> Iterable[TermNode]:
+        yield from self.left
+        yield from self.right
+
+
+class AndNode(QueryNode):
+    """所有子查询都命中"""
+
+    def __init__(self, children: List[QueryNode]):
+        self.children = children
+
+    def __repr__(self) -> str:
+        return f'And({", ".join(map(repr, self.children))})'
+
+    def estimate(self, ctx: QueryContext) -> int:
+        positive = [child.estimate(ctx) for child in self.children if not isinstance(child, NotNode)]
+        return min(positive) if positive else len(ctx.records)
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        positive = [child for child in self.children if not isinstance(child, NotNode)]
+        negative = [child for child in self.children if isinstance(child, NotNode)]
+
+        # 按估计的命中数从少到多求交集，结果为空时提前结束
+        result: Optional[Set[int]] = None
+        for child in sorted(positive, key=lambda node: node.estimate(ctx)):
+            result = child.evaluate(ctx) if result is None else child.restrict(ctx, result)
+            if not result:
+                return set()
+        if result is None:
+            result = set(ctx.all_lines)
+        if not ctx.case_sensitive:
+            for child in negative:
+                result -= child.child.evaluate(ctx)
+                if not result:
+                    break
+        return result
+
+    def test(self, line: LineView) -> bool:
+        return all(child.test(line) for child in self.children)
+
+    def prefilter(self, file_path: str) -> Optional[bool]:
+        results = [child.prefilter(file_path) for child in self.children]
+        if False in results:
+            return False
+        return True if all(result is True for result in results) else None
+
+    def leaves(self) -> Iterable[TermNode]:
+        for child in self.children:
+            yield from child.leaves()
+
+
+class OrNode(QueryNode):
+    """任一子查询命中"""
+
+    def __init__(self, children: List[QueryNode]):
+        self.children = children
+
+    def __repr__(self) -> str:
+        return f'Or({", ".join(map(repr, self.children))})'
+
+    def estimate(self, ctx: QueryContext) -> int:
+        return min(sum(child.estimate(ctx) for child in self.children), len(ctx.records))
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        result: Set[int] = set()
+        for child in self.children:
+            result |= child.evaluate(ctx)
+        return result
+
+    def test(self, line: LineView) -> bool:
+        return any(child.test(line) for child in self.children)
+
+    def prefilter(self, file_path: str) -> Optional[bool]:
+        results = [child.prefilter(file_path) for child in self.children]
+        if True in results:
+            return True
+        return False if all(result is False for result in results) else None
+
+    def leaves(self) -> Iterable[TermNode]:
+        for child in self.children:
+            yield from child.leaves()
+
+
+class NotNode(QueryNode):
+    """子查询不命中"""
+
+    def __init__(self, child: QueryNode):
+        self.child = child
+
+    def __repr__(self) -> str:
+        return f'Not({self.child!r})'
+
+    def estimate(self, ctx: QueryContext) -> int:
+        return len(ctx.records)
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        if ctx.case_sensitive:
+            return set(ctx.all_lines)
+        return set(ctx.all_lines) - self.child.evaluate(ctx)
+
+    def test(self, line: LineView) -> bool:
+        return not self.child.test(line)
+
+    def prefilter(self, file_path: str) -> Optional[bool]:
+        result = self.child.prefilter(file_path)
+        return None if result is None else not result
+
+
+class FilterNode(QueryNode):
+    """file: / episode: / time: / eptime: 筛选条件（eptime 的时间从每集第一句台词开始计算）"""
+
+    def __init__(self, field: str, value: str):
+        self.field = field
+        self.value = value
+        if field in ('time', 'eptime'):
+            self.time_range = self._parse_time_range(value)
+        elif field == 'episode':
+            self.episode_range = self._parse_number_range(value)
+
+    def __repr__(self) -> str:
+        return f'Filter({self.field}:{self.value!r})'
+
+    @staticmethod
+    def _parse_time_range(value: str) -> Tuple[int, Optional[int]]:
+        """解析 开始-结束（任一侧可省略）为毫秒"""
+        start_text, separator, end_text = value.partition('-')
+        start = line_classifier.parse_timestamp(start_text) if start_text else 0
+        end = line_classifier.parse_timestamp(end_text) if end_text else None
+        if (start_text and start is None) or (end_text and end is None) or (not separator and start is None):
+            raise ValueError(f"无效的时间范围: {value}")
+        if not separator:
+            end = start
+        return start, end
+
+    @staticmethod
+    def _parse_number_range(value: str) -> Optional[Tuple[int, int]]:
+        """解析 3 或 3-5 形式的集数范围，不是数字时返回None（按文字匹配集数标题）"""
+        match = re.fullmatch(r'(\d+)(?:-(\d+))?', value)
+        if not match:
+            return None
+        start = int(match.group(1))
+        return start, int(match.group(2) or start)
+
+    def _file_matches(self, file_path: str) -> bool:
+        name = os.path.basename(file_path).lower()
+        pattern = self.value.lower()
+        if any(char in pattern for char in '*?['):
+            return fnmatch.fnmatchcase(name, pattern)
+        return pattern in name
+
+    def estimate(self, ctx: QueryContext) -> int:
+        if self.field == 'file':
+            return len(ctx.records) if self._file_matches(ctx.file_path) else 0
+        return len(ctx.records)
+
+    def evaluate(self, ctx: QueryContext) -> Set[int]:
+        if self.field == 'file':
+            return set(ctx.all_lines) if self._file_matches(ctx.file_path) else set()
+        if self.field == 'episode':
+            return ctx.metadata.episode_lines(self.value, self.episode_range)
+        return ctx.metadata.time_lines(*self.time_range, relative=self.field == 'eptime')
+
+    def restrict(self, ctx: QueryContext, lines: Set[int]) -> Set[int]:
+        # 候选行较少时逐行检查，不扫描整个文件的元数据
+        if self.field == 'file':
+            return lines if self._file_matches(ctx.file_path) else set()
+        if self.field == 'episode':
+            return {i for i in lines if ctx.metadata.episode_matches(i, self.value, self.episode_range)}
+        relative = self.field == 'eptime'
+        return {i for i in lines if ctx.metadata.time_matches(i, *self.time_range, relative=relative)}
+
+    def test(self, line: LineView) -> bool:
+        if self.field == 'file':
+            return self._file_matches(line.file_path)
+        if self.field == 'episode':
+            return line.metadata.episode_matches(line.line_index, self.value, self.episode_range)
+        return line.metadata.time_matches(line.line_index, *self.time_range, relative=self.field == 'eptime')
+
+    def prefilter(self, file_path: str) -> Optional[bool]:
+        if self.field == 'file':
+            return self._file_matches(file_path)
+        return None
+
+
+class RecordMetadata:
+    """单个文件各行的集数和时间范围（供筛选条件使用）"""
+
+    def __init__(self, records: Iterable[Dict]):
+        """
+        提取集数和时间轴
+
+        Args:
+            records: 文件的解析结果
+        """
+        self.episodes: List[str] = []
+        # 没有时间轴的行开始和结束均为 -1
+        self.starts = array('q')
+        self.ends = array('q')
+        episode_numbers: Dict[str, Optional[int]] = {}
+        # 每集第一句有时间轴的台词的开始毫秒数
+        episode_starts: Dict[str, int] = {}
+        for record in records:
+            episode = str(record.get('episode', '') or '')
+            self.episodes.append(episode)
+            if episode not in episode_numbers:
+                numbers = re.findall(r'\d+', episode)
+                episode_numbers[episode] = int(numbers[-1]) if numbers else None
+            start, end = line_classifier.record_time_range(record)
+            self.starts.append(start)
+            self.ends.append(end)
+            if start >= 0 and episode not in episode_starts:
+                episode_starts[episode] = start
+        self._episode_numbers = episode_numbers
+        # 各行所在集的开始毫秒数（eptime: 筛选时从行的时间中减去）
+        self.episode_starts = array('q', [episode_starts.get(episode, 0) for episode in self.episodes])
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def episode_matches(self, line_index: int, value: str, number_range: Optional[Tuple[int, int]]) -> bool:
+        """行的集数是否满足条件：数字范围比较集数标题中的最后一个数字，否则按子串匹配"""
+        episode = self.episodes[line_index]
+        if number_range is None:
+            return value.lower() in episode.lower()
+        number = self._episode_numbers.get(episode)
+        return number is not None and number_range[0] <= number <= number_range[1]
+
+    def episode_lines(self, value: str, number_range: Optional[Tuple[int, int]]) -> Set[int]:
+        """满足集数条件的行（每个不同的集数标题只判断一次）"""
+        matched = {episode for episode in self._episode_numbers
+                   if self._episode_match(episode, value, number_range)}
+        return {i for i, episode in enumerate(self.episodes) if episode in matched}
+
+    def _episode_match(self, episode: str, value: str, number_range: Optional[Tuple[int, int]]) -> bool:
+        if number_range is None:
+            return value.lower() in episode.lower()
+        number = self._episode_numbers[episode]
+        return number is not None and number_range[0] <= number <= number_range[1]
+
+    def time_matches(self, line_index: int, start: int, end: Optional[int], relative: bool = False) -> bool:
+        """行的时间范围是否与查询范围重叠（relative 为 True 时从所在集的开始计算）"""
+        line_start = self.starts[line_index]
+        if line_start < 0:
+            return False
+        offset = self.episode_starts[line_index] if relative else 0
+        return self.ends[line_index] - offset >= start and (end is None or line_start - offset <= end)
+
+    def time_lines(self, start: int, end: Optional[int], relative: bool = False) -> Set[int]:
+        """时间范围与查询范围重叠的行（relative 为 True 时从所在集的开始计算）"""
+        limit = end if end is not None else float('inf')
+        if not relative:
+            return {i for i, (line_start, line_end) in enumerate(zip(self.starts, self.ends))
+                    if line_start >= 0 and line_end >= start and line_start <= limit}
+        return {i for i, (line_start, line_end, offset) in enumerate(zip(self.starts, self.ends, self.episode_starts))
+                if line_start >= 0 and line_end - offset >= start and line_start - offset <= limit}
+
+
+class QueryParser:
+    """查询语言解析器（递归下降，优先级 NOT > NEAR > AND > OR）"""
+
+    def tokenize(self, query: str) -> List[Tuple[str, str]]:
+        """
+        词法分析
+
+        Args:
+            query: 查询字符串
+
+        Returns:
+            [(类型, 值), ...]，类型为 lparen、rparen、field、phrase、word、op、near
+        """
+        tokens = []
+        position = 0
+        query = query.rstrip()
+        while position < len(query):
+            match = _LEXER.match(query, position)
+            if not match or match.end() == position:
+                raise ValueError(f"查询语法错误：第 {position + 1} 个字符附近有未闭合的引号")
+            position = match.end()
+            if match.group('lparen'):
+                tokens.append(('lparen', '('))
+            elif match.group('rparen'):
+                tokens.append(('rparen', ')'))
+            elif match.group('field'):
+                value = match.group('field_quoted')
+                if value is None:
+                    value = match.group('field_value')
+                tokens.append(('field', f"{match.group('field')}:{value}"))
+            elif match.group('phrase') is not None:
+                tokens.append(('phrase', match.group('phrase')))
+            else:
+                word = match.group('word')
+                near = _NEAR_PATTERN.fullmatch(word)
+                if word in _OPERATORS:
+                    tokens.append(('op', word))
+                elif near:
+                    tokens.append(('near', near.group(1) or str(DEFAULT_NEAR_DISTANCE)))
+                else:
+                    tokens.append(('word', word))
+        return tokens
+
+    def parse(self, query: str) -> QueryNode:
+        """
+        解析查询
+
+        Args:
+            query: 查询字符串
+
+        Returns:
+            查询语法树
+
+        Raises:
+            ValueError: 查询语法错误
+        """
+        self._tokens = self.tokenize(query)
+        self._position = 0
+        if not self._tokens:
+            raise ValueError("查询为空")
+        node = self._parse_or()
+        if self._position < len(self._tokens):
+            raise ValueError(f"查询语法错误：多余的 {self._tokens[self._position][1]!r}")
+        return node
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise ValueError("查询语法错误：查询不完整")
+        self._position += 1
+        return token
+
+    def _starts_operand(self, token: Optional[Tuple[str, str]]) -> bool:
+        return token is not None and (token[0] in ('lparen', 'field', 'phrase', 'word') or token == ('op', 'NOT'))
+
+    def _parse_or(self) -> QueryNode:
+        children = [self._parse_and()]
+        # 每两个相邻查询项之间是否为显式的 OR
+        explicit = []
+        while True:
+            token = self._peek()
+            if token == ('op', 'OR'):
+                self._next()
+                explicit.append(True)
+            elif self._starts_operand(token):
+                # 相邻的查询项之间默认为 OR
+                explicit.append(False)
+            else:
+                break
+            children.append(self._parse_and())
+
+        # 不与 OR 相连的筛选条件作用于同一层的其余查询项（AND）
+        filters = [child for i, child in enumerate(children)
+                   if isinstance(child, FilterNode)
+                   and not (i > 0 and explicit[i - 1]) and not (i < len(explicit) and explicit[i])]
+        terms = [child for child in children if not any(child is node for node in filters)]
+        node = None
+        if terms:
+            node = terms[0] if len(terms) == 1 else OrNode(terms)
+        if not filters:
+            return node
+        parts = ([node] if node is not None else []) + filters
+        return parts[0] if len(parts) == 1 else AndNode(parts)
+
+    def _parse_and(self) -> QueryNode:
+        children = [self._parse_near()]
+        while self._peek() == ('op', 'AND'):
+            self._next()
+            children.append(self._parse_near())
+        return children[0] if len(children) == 1 else AndNode(children)
+
+    def _parse_near(self) -> QueryNode:
+        node = self._parse_unary()
+        while self._peek() is not None and self._peek()[0] == 'near':
+            distance = int(self._next()[1])
+            right = self._parse_unary()
+            left_terms = NearNode.operand_terms(node)
+            right_terms = NearNode.operand_terms(right)
+            if left_terms is None or right_terms is None:
+                raise ValueError("查询语法错误：NEAR 的两侧必须是词、短语或它们的 OR 组合")
+            node = NearNode(left_terms, right_terms, distance)
+        return node
+
+    def _parse_unary(self) -> QueryNode:
+        kind, value = self._next()
+        if kind == 'op' and value == 'NOT':
+            return NotNode(self._parse_unary())
+        if kind == 'lparen':
+            node = self._parse_or()
+            if self._next()[0] != 'rparen':
+                raise ValueError("查询语法错误：缺少右括号")
+            return node
+        if kind == 'field':
+            field, _, field_value = value.partition(':')
+            if not field_value:
+                raise ValueError(f"查询语法错误：{field}: 缺少条件")
+            return FilterNode(field, field_value)
+        if kind in ('phrase', 'word'):
+            prefix = kind == 'word' and value.endswith('*')
+            tokens = PositionalIndex.TOKEN_PATTERN.findall(value)
+            if not tokens:
+                raise ValueError(f"查询语法错误：{value!r} 不包含文字")
+            if prefix and len(tokens) > 1:
+                raise ValueError(f"查询语法错误：前缀通配只能用于单个词：{value!r}")
+            return TermNode(tokens, prefix)
+        raise ValueError(f"查询语法错误：意外的 {value!r}")
+
+    def is_structured(self, query: str) -> bool:
+        """
+        判断查询是否使用了查询语言（运算符、括号、NEAR、筛选条件、前缀通配，
+        或短语与其他查询项组合）；普通关键词和单个引号短语仍使用原有的搜索方式
+
+        Args:
+            query: 查询字符串
+
+        Returns:
+            是否为查询语言
+        """
+        try:
+            tokens = self.tokenize(query)
+        except ValueError:
+            return False
+        if any(kind in ('op', 'near', 'lparen', 'rparen', 'field') for kind, _ in tokens):
+            return True
+        if any(kind == 'word' and value.endswith('*') for kind, value in tokens):
+            return True
+        return any(kind == 'phrase' for kind, _ in tokens) and len(tokens) > 1
+
+
+class QueryExecutor:
+    """在单个文件上执行查询"""
+
+    def execute(self, query: QueryNode, file_path: str, fingerprint: Optional[Tuple[int, int]],
+                records: List[Dict], case_sensitive: bool = False) -> List[Dict]:
+        """
+        执行查询
+
+        Args:
+            query: 查询语法树
+            file_path: 文件路径
+            fingerprint: 文件指纹
+            records: 文件的完整解析结果
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            搜索结果列表（按行顺序），matched_keywords 为行中匹配的词和短语
+        """
+        ctx = self._context(file_path, fingerprint, records, case_sensitive)
+        lines = sorted(query.evaluate(ctx))
+
+        leaves = list(query.leaves())
+        results = []
+        for line_index in lines:
+            record = records[line_index]
+            matched_keywords = []
+            if case_sensitive:
+                # 在原始大小写的词上确认，匹配词取行中实际出现的文字
+                view = LineView(record, file_path, ctx.metadata, line_index)
+                if not query.test(view):
+                    continue
+                for leaf in leaves:
+                    matched_keywords.extend(' '.join(view.tokens[start:end + 1])
+                                            for start, end in leaf.line_spans(view.tokens))
+            else:
+                for leaf in leaves:
+                    matched_keywords.extend(leaf.matched_text(ctx, line_index))
+            result_item = record.copy()
+            result_item['matched_keywords'] = list(dict.fromkeys(matched_keywords))
+            results.append(result_item)
+        return results
+
+    def matching_lines(self, query: QueryNode, file_path: str, fingerprint: Optional[Tuple[int, int]],
+                       records: List[Dict], case_sensitive: bool = False) -> List[int]:
+        """
+        只求匹配的行序号（用于统计，不生成结果记录）
+
+        Args:
+            query: 查询语法树
+            file_path: 文件路径
+            fingerprint: 文件指纹
+            records: 文件的完整解析结果
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            升序的行序号列表
+        """
+        ctx = self._context(file_path, fingerprint, records, case_sensitive)
+        lines = sorted(query.evaluate(ctx))
+        if case_sensitive:
+            lines = [line_index for line_index in lines
+                     if query.test(LineView(records[line_index], file_path, ctx.metadata, line_index))]
+        return lines
+
+    @staticmethod
+    def _context(file_path: str, fingerprint: Optional[Tuple[int, int]], records: List[Dict],
+                 case_sensitive: bool) -> QueryContext:
+        """取得文件的索引并创建查询上下文"""
+        index = positional_index_cache.get(file_path, fingerprint, records)
+        metadata = record_metadata_cache.get(file_path, fingerprint, records)
+        return QueryContext(file_path, records, index, metadata, case_sensitive)
+
+
+# 全局查询解析器、执行器和行元数据缓存实例（缓存容量按行数计算）
+query_parser = QueryParser()
+query_executor = QueryExecutor()
+record_metadata_cache = FileIndexCache(RecordMetadata, max_size=2000000)
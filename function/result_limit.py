@@ -0,0 +1,154 @@
+"""
+结果数量限制模块
+常用词可能命中数万行，限制模式在扫描过程中只保留需要的结果：
+前 N 条（达到数量后立即停止扫描）、每集前 N 条、均匀随机抽取 N 条（蓄水池抽样），
+提前停止时剩余文件改用只计数的统计，仍能报告准确的命中总数
+"""
+
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from function.frequency_counter import FrequencyCount
+
+
+# 可用的限制模式：all（不限制）、first（前 N 条）、per_episode（每集前 N 条）、sample（随机抽取 N 条）
+LIMIT_MODES = ('all', 'first', 'per_episode', 'sample')
+
+
+class ResultLimiter:
+    """在扫描过程中按限制模式保留搜索结果"""
+
+    def __init__(self, mode: str = 'all', limit: int = 0, seed: Optional[int] = None):
+        """
+        初始化
+
+        Args:
+            mode: 限制模式（all/first/per_episode/sample）
+            limit: 保留的结果数（per_episode 为每集的结果数），0 表示不限制
+            seed: 随机抽样的种子，None 表示每次不同
+
+        Raises:
+            ValueError: 限制模式未知或数量为负数
+        """
+        if mode not in LIMIT_MODES:
+            raise ValueError(f"未知的结果限制模式: {mode}")
+        if limit < 0:
+            raise ValueError(f"结果数量不能为负数: {limit}")
+        self.mode = mode
+        self.limit = limit
+        self.seen = 0
+        # 提前停止时正在扫描的文件及其中已计入的结果数
+        self.partial: Optional[Tuple[str, int]] = None
+        self._kept: List[Tuple[int, Dict]] = []
+        self._episodes: Dict[str, int] = {}
+        self._random = random.Random(seed)
+
+    @property
+    def enabled(self) -> bool:
+        """是否限制结果数量"""
+        return self.mode != 'all' and self.limit > 0
+
+    @property
+    def satisfied(self) -> bool:
+        """是否已取得足够的结果（只有前 N 条模式可以提前停止扫描）"""
+        return self.enabled and self.mode == 'first' and len(self._kept) >= self.limit
+
+    def offer(self, file_path: str, result: Dict):
+        """
+        计入一条搜索结果，按限制模式决定是否保留
+
+        Args:
+            file_path: 结果所在的文件路径
+            result: 搜索结果
+        """
+        sequence = self.seen
+        self.seen += 1
+        if not self.enabled:
+            self._kept.append((sequence, result))
+        elif self.mode == 'first':
+            if len(self._kept) < self.limit:
+                self._kept.append((sequence, result))
+        elif self.mode == 'per_episode':
+            episode = FrequencyCount.episode_key(result.get('file_path') or file_path, result)
+            count = self._episodes.get(episode, 0)
+            if count < self.limit:
+                self._episodes[episode] = count + 1
+                self._kept.append((sequence, result))
+        elif len(self._kept) < self.limit:
+            self._kept.append((sequence, result))
+        else:
+            # 蓄水池抽样：第 k 条结果以 limit/k 的概率替换已保留的一条
+            j = self._random.randrange(self.seen)
+            if j < self.limit:
+                self._kept[j] = (sequence, result)
+
+    def consume(self, file_path: str, results: Iterable[Dict]) -> bool:
+        """
+        逐条计入一个文件的搜索结果，取得足够的结果时立即停止（不再消耗迭代器）
+
+        Args:
+            file_path: 文件路径
+            results: 文件的搜索结果（列表或生成器，生成器提前停止时该文件由 total 重新计数）
+
+        Returns:
+            是否已取得足够的结果
+        """
+        count = 0
+        for result in results:
+            self.offer(file_path, result)
+            count += 1
+            if self.satisfied:
+                if isinstance(results, list):
+                    # 已经取得完整的结果列表时直接计入剩余的结果数，无需重新统计
+                    self.seen += len(results) - count
+                else:
+                    self.partial = (file_path, count)
+                return True
+        return False
+
+    def results(self) -> List[Dict]:
+        """
+        取得保留的结果（按语料库中的顺序）
+
+        Returns:
+            搜索结果列表
+        """
+        return [result for _, result in sorted(self._kept, key=lambda item: item[0])]
+
+    def total(self, remaining_files: Iterable[str], count_file: Callable[[str], int]) -> int:
+        """
+        计算准确的命中总数：已扫描完的文件使用计入的结果数，
+        提前停止时正在扫描的文件和剩余文件使用只计数的统计
+
+        Args:
+            remaining_files: 尚未扫描的文件路径
+            count_file: 统计单个文件命中数的函数
+
+        Returns:
+            命中总数
+        """
+        total = self.seen
+        files = list(remaining_files)
+        if self.partial is not None:
+            partial_file, partial_count = self.partial
+            total -= partial_count
+            files.insert(0, partial_file)
+        for file_path in files:
+            total += count_file(file_path)
+        return total
+
+
+def create_result_limiter() -> ResultLimiter:
+    """
+    按配置文件 [SEARCH] 的 result_limit_mode、result_limit 和 sample_seed 创建结果限制器
+
+    Returns:
+        结果限制器，配置无效时不限制
+    """
+    from function.config_manager import config_manager
+    settings = config_manager.get_search_settings()
+    try:
+        return ResultLimiter(settings['result_limit_mode'], settings['result_limit'], settings['sample_seed'])
+    except ValueError as e:
+        print(f"结果限制配置无效，不限制结果数量: {e}")
+        return ResultLimiter()
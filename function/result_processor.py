@@ -7,6 +7,32 @@ import re
 from typing import List, Dict, Any
 from pathlib import Path
 
+from function.line_classifier import line_classifier
+from function.result_set import argsort, natural_key, rank_values
+
+
+def _line_number(result: Dict) -> int:
+    """结果的行号（兼容 lineno 字段）"""
+    try:
+        return int(result.get('line_number') or result.get('lineno') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _start_ms(result: Dict) -> int:
+    """结果时间轴的开始毫秒数，没有时间轴时为 -1"""
+    return line_classifier.record_time_range(result)[0]
+
+
+# 各排序字段的排序值
+SORT_KEYS = {
+    'file': lambda result: result.get('file_path', ''),
+    'line': _line_number,
+    'content': lambda result: result.get('content', ''),
+    'episode': lambda result: result.get('episode', '未知集数'),
+    'time': _start_ms,
+}
+
 
 class ResultProcessor:
     """结果处理器"""
@@ -42,12 +68,11 @@ class ResultProcessor:
             if file_type == 'subtitle':
                 # 字幕文件有时间轴信息
                 time_axis = result.get('time_axis', 'N/A')
-                # 如果时间轴是N/A但内容中有类似时间轴的格式，尝试从内容中提取
+                # 时间轴是N/A但解析器已写入开始毫秒数时直接格式化，不再扫描内容
                 if time_axis == 'N/A':
-                    # 尝试从内容中提取时间轴信息，例如 [00:00:49] 格式
-                    time_match = re.search(r'\[(\d{1,2}:\d{2}:\d{2})\]', content)
-                    if time_match:
-                        time_axis = f"[{time_match.group(1)}]"
+                    start_ms = result.get('start_ms')
+                    if start_ms is not None and start_ms >= 0:
+                        time_axis = f"[{line_classifier.format_timestamp(start_ms)}]"
 
                 # 获取集数信息，并移除可能的"# "符号
                 episode = result.get('episode', '未知集数')
@@ -105,71 +130,83 @@ class ResultProcessor:
     
     def sort_results(self, results: List[Dict], sort_by: str = 'file', reverse: bool = False) -> List[Dict]:
         """
-        排序搜索结果
+        排序搜索结果（稳定排序，排序键相同的结果保持原来的先后顺序）
+
+        先为每个排序字段计算整数排序键：行号按数值，时间轴按开始毫秒数，
+        文件和集数按自然顺序（"第9集" 排在 "第10集" 之前），再按行序号多列排序
 
         Args:
             results: 搜索结果列表
-            sort_by: 排序字段 ('file', 'line', 'content', 'episode')
+            sort_by: 排序字段 ('file', 'line', 'content', 'episode', 'time')，
+                     多列排序时用逗号分隔，如 'episode,time'
             reverse: 是否逆序
 
         Returns:
             排序后的结果列表
         """
-        if sort_by == 'file':
-            return sorted(results, key=lambda x: x.get('file_path', ''), reverse=reverse)
-        elif sort_by == 'line':
-            return sorted(results, key=lambda x: x.get('line_number', 0), reverse=reverse)
-        elif sort_by == 'content':
-            return sorted(results, key=lambda x: x.get('content', ''), reverse=reverse)
-        elif sort_by == 'episode':
-            return sorted(results, key=lambda x: x.get('episode', '未知集数'), reverse=reverse)
-        else:
+        fields = [field.strip() for field in sort_by.split(',') if field.strip() in SORT_KEYS]
+        if not fields:
             # 默认按文件名和行号排序
-            return sorted(results, key=lambda x: (x.get('file_path', ''), x.get('line_number', 0)), reverse=reverse)
-    
+            fields = ['file', 'line']
+        columns = []
+        for field in fields:
+            values = [SORT_KEYS[field](result) for result in results]
+            key = natural_key if field in ('file', 'episode') else None
+            columns.append((rank_values(values, key=key), reverse))
+        return [results[i] for i in argsort(range(len(results)), columns)]
+
     def filter_results(self, results: List[Dict], filters: Dict[str, Any]) -> List[Dict]:
         """
-        过滤搜索结果
+        过滤搜索结果（先根据过滤条件生成判断函数，再对结果列表只遍历一次）
+
+        表格中已显示的结果在结果集（function.result_set.ResultSet）上按列筛选，不经过这里
 
         Args:
             results: 搜索结果列表
-            filters: 过滤条件字典
+            filters: 过滤条件字典，可包含 filename_contains、content_contains、content_regex、
+                     episode_contains、line_min、line_max
 
         Returns:
             过滤后的结果列表
+
+        Raises:
+            ValueError: 正则表达式无效
         """
-        filtered_results = results[:]
+        predicates = []
 
         # 按文件名过滤
         if 'filename_contains' in filters:
             filename_filter = filters['filename_contains'].lower()
-            filtered_results = [r for r in filtered_results
-                               if filename_filter in Path(r.get('file_path', '')).name.lower()]
+            predicates.append(lambda r: filename_filter in Path(r.get('file_path', '')).name.lower())
 
         # 按内容过滤
         if 'content_contains' in filters:
             content_filter = filters['content_contains'].lower()
-            filtered_results = [r for r in filtered_results
-                               if content_filter in r.get('content', '').lower()]
+            predicates.append(lambda r: content_filter in r.get('content', '').lower())
+
+        # 按正则表达式过滤内容
+        if 'content_regex' in filters:
+            try:
+                pattern = re.compile(filters['content_regex'], re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"正则表达式无效: {filters['content_regex']} ({e})")
+            predicates.append(lambda r: pattern.search(r.get('content', '')) is not None)
 
         # 按集数过滤
         if 'episode_contains' in filters:
             episode_filter = filters['episode_contains'].lower()
-            filtered_results = [r for r in filtered_results
-                               if episode_filter in r.get('episode', '未知集数').lower()]
+            predicates.append(lambda r: episode_filter in r.get('episode', '未知集数').lower())
 
         # 按行号范围过滤
         if 'line_min' in filters:
             min_line = filters['line_min']
-            filtered_results = [r for r in filtered_results
-                               if r.get('line_number', 0) >= min_line]
+            predicates.append(lambda r: r.get('line_number', 0) >= min_line)
 
         if 'line_max' in filters:
             max_line = filters['line_max']
-            filtered_results = [r for r in filtered_results
-                               if r.get('line_number', 0) <= max_line]
+            predicates.append(lambda r: r.get('line_number', 0) <= max_line)
 
-        return filtered_results
+        return [r for r in results if all(predicate(r) for predicate in predicates)]
     
     def extract_full_dialogue(self, results: List[Dict], context_lines: int = 1) -> List[Dict]:
         """
@@ -180,24 +217,12 @@ class ResultProcessor:
             context_lines: 上下文行数
 
         Returns:
-            包含上下文的结果列表
+            包含上下文的结果列表，每条结果增加 context_before 和 context_after 字段，
+            元素为 {'line_number', 'time_axis', 'content'}
         """
-        # 这个功能需要访问原始文件来获取上下文
-        # 由于当前实现中我们没有保存原始文件内容的完整结构，
-        # 这里提供一个概念性的实现
-        enhanced_results = []
-
-        for result in results:
-            enhanced_result = result.copy()
-
-            # 添加上下文信息（如果可用）
-            # 这里只是占位符，实际实现需要访问原始文件
-            enhanced_result['context_before'] = []
-            enhanced_result['context_after'] = []
-
-            enhanced_results.append(enhanced_result)
-
-        return enhanced_results
+        # 上下文来自按文件缓存的台词偏移表，不需要重新解析文件
+        from function.context_index import context_provider
+        return context_provider.attach(results, context_lines)
 
     def highlight_matched_keywords(self, content: str, matched_keywords: List[str]) -> str:
         """
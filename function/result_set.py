@@ -0,0 +1,374 @@
+"""
+结果集模块
+把当前的搜索结果按列保存（行号、集数编号等为整数数组，集数和文件路径只保存一份），
+在结果中继续筛选时只对当前选中的行序号数组应用关键词、正则表达式或集数条件，
+不重新扫描语料库；每次筛选前的选中行压入栈中，可以逐步撤销。
+排序使用建立结果集时计算的整数排序键（行号、时间轴毫秒数、集数和文件的自然顺序编号），
+多列排序用 NumPy 的 lexsort 一次完成，未安装 NumPy 时按列逐次稳定排序
+"""
+
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from function.line_classifier import line_classifier
+
+
+# 去除结果文本中高亮用的HTML标签
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 自然排序时拆分数字
+DIGITS_PATTERN = re.compile(r'(\d+)')
+
+# 可排序的列，顺序与结果表格的列一致：集数、时间轴、台词、行号、文件
+SORT_COLUMNS = ('episode', 'time', 'text', 'line', 'file')
+
+
+def natural_key(text: str) -> tuple:
+    """
+    自然排序键：数字部分按数值比较，"第9集" 排在 "第10集" 之前
+
+    Args:
+        text: 文本
+
+    Returns:
+        排序键（文本部分和数值部分交替出现）
+    """
+    parts = DIGITS_PATTERN.split(str(text).lower())
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+def rank_values(values: Sequence, key=None) -> array:
+    """
+    将一列值转换为整数排序键：相同的值编号相同，编号顺序即值的排序顺序
+
+    Args:
+        values: 一列值
+        key: 比较值时使用的排序键函数
+
+    Returns:
+        与 values 等长的整数数组
+    """
+    distinct = sorted(set(values), key=key)
+    ranks = {value: i for i, value in enumerate(distinct)}
+    return array('q', [ranks[value] for value in values])
+
+
+def _import_numpy():
+    """导入 NumPy（可选依赖），未安装时返回 None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def argsort(indices: Sequence[int], columns: Sequence[Tuple[Sequence[int], bool]]) -> List[int]:
+    """
+    按多列整数排序键对行序号稳定排序（排序键相同的行保持原来的先后顺序）
+
+    Args:
+        indices: 要排序的行序号
+        columns: [(排序键数组, 是否降序), ...]，排在前面的列优先
+
+    Returns:
+        排序后的行序号
+    """
+    if not columns or len(indices) < 2:
+        return list(indices)
+    np = _import_numpy()
+    if np is None:
+        # Python 的排序是稳定的（降序也是），从最次要的列开始逐列排序即得到多列排序
+        order = list(indices)
+        for keys, descending in reversed(columns):
+            order.sort(key=keys.__getitem__, reverse=descending)
+        return order
+    rows = np.asarray(indices, dtype=np.int64)
+    # lexsort 以最后一个键为主键，且是稳定排序；降序的列取相反数
+    sort_keys = []
+    for keys, descending in reversed(columns):
+        column = np.asarray(keys, dtype=np.int64)[rows]
+        sort_keys.append(-column if descending else column)
+    return rows[np.lexsort(sort_keys)].tolist()
+
+
+def parse_refine_query(text: str) -> Dict[str, List[str]]:
+    """
+    解析结果内筛选的输入：空格分隔的多个条件同时满足，
+    "re:" 开头为正则表达式，"ep:" 或 "集:" 开头为集数，"-" 开头为排除的关键词，其余为关键词
+
+    Args:
+        text: 筛选输入，如 "school ep:第3集 -bus"
+
+    Returns:
+        {'keywords': [...], 'excluded': [...], 'regex': [...], 'episodes': [...]}
+
+    Raises:
+        ValueError: 没有任何条件
+    """
+    query = {'keywords': [], 'excluded': [], 'regex': [], 'episodes': []}
+    for term in text.split():
+        lowered = term.lower()
+        if lowered.startswith('re:') and len(term) > 3:
+            query['regex'].append(term[3:])
+        elif lowered.startswith('ep:') and len(term) > 3:
+            query['episodes'].append(term[3:])
+        elif term.startswith('集:') and len(term) > 2:
+            query['episodes'].append(term[2:])
+        elif term.startswith('-') and len(term) > 1:
+            query['excluded'].append(term[1:])
+        else:
+            query['keywords'].append(term)
+    if not any(query.values()):
+        raise ValueError("请输入筛选条件")
+    return query
+
+
+class ResultSet:
+    """按列保存的搜索结果，支持在结果中筛选和撤销"""
+
+    def __init__(self, rows: Iterable[Sequence], start_ms: Optional[Sequence[Optional[int]]] = None):
+        """
+        建立结果集
+
+        Args:
+            rows: 格式化后的结果行 [文件名, 行号, 集数, 时间轴, 内容, 完整文件路径]（或同名字段的字典，可以带 start_ms）
+            start_ms: 各行时间轴的开始毫秒数（解析器写入的 start_ms），None 表示使用字典中的 start_ms 字段
+        """
+        self.filenames: List[str] = []
+        self.line_numbers = array('q')
+        self.time_axes: List[str] = []
+        # 解析器写入的开始毫秒数，没有时为 None（按时间轴排序时再解析时间轴文本）
+        self.start_ms: List[Optional[int]] = []
+        self.texts: List[str] = []
+        # 去除HTML标签后的内容，以及其小写形式（不区分大小写的筛选使用）
+        self.plain_texts: List[str] = []
+        self.lower_texts: List[str] = []
+        # 集数和文件路径按出现顺序编号
+        self.episode_names: List[str] = []
+        self.episode_codes = array('I')
+        self.file_path_names: List[str] = []
+        self.file_path_codes = array('I')
+        episode_ids: Dict[str, int] = {}
+        file_path_ids: Dict[str, int] = {}
+        for row in rows:
+            if isinstance(row, dict):
+                self.start_ms.append(row.get('start_ms'))
+                row = [row.get(key, '') for key in ('filename', 'lineno', 'episode', 'time_axis', 'text', 'filepath')]
+            else:
+                self.start_ms.append(None)
+                row = list(row) + [''] * (6 - len(row))
+            filename, lineno, episode, time_axis, text, file_path = row[:6]
+            self.filenames.append(filename)
+            try:
+                self.line_numbers.append(int(lineno))
+            except (TypeError, ValueError):
+                self.line_numbers.append(0)
+            self.time_axes.append(time_axis)
+            text = str(text)
+            plain = HTML_TAG_PATTERN.sub('', text)
+            self.texts.append(text)
+            self.plain_texts.append(plain)
+            self.lower_texts.append(plain.lower())
+            episode = str(episode)
+            code = episode_ids.get(episode)
+            if code is None:
+                code = episode_ids[episode] = len(self.episode_names)
+                self.episode_names.append(episode)
+            self.episode_codes.append(code)
+            code = file_path_ids.get(file_path)
+            if code is None:
+                code = file_path_ids[file_path] = len(self.file_path_names)
+                self.file_path_names.append(file_path)
+            self.file_path_codes.append(code)
+        if start_ms is not None and len(start_ms) == len(self.texts):
+            self.start_ms = list(start_ms)
+        self.selection = array('I', range(len(self.texts)))
+        self._history: List[array] = []
+        # 当前的排序：[(列名, 是否降序), ...]，空列表表示语料库中的顺序
+        self.sort_columns: List[Tuple[str, bool]] = []
+        # 集数和文件按自然顺序编号后的排序键，时间轴和台词的排序键在第一次按该列排序时计算
+        episode_ranks = rank_values(self.episode_names, key=natural_key)
+        file_path_ranks = rank_values(self.file_path_names, key=natural_key)
+        self._sort_keys: Dict[str, array] = {
+            'episode': array('q', [episode_ranks[code] for code in self.episode_codes]),
+            'line': self.line_numbers,
+            'file': array('q', [file_path_ranks[code] for code in self.file_path_codes]),
+        }
+
+    def __len__(self) -> int:
+        """当前选中的行数"""
+        return len(self.selection)
+
+    @property
+    def total(self) -> int:
+        """筛选前的结果总数"""
+        return len(self.texts)
+
+    @property
+    def depth(self) -> int:
+        """可以撤销的筛选次数"""
+        return len(self._history)
+
+    def row(self, i: int) -> list:
+        """
+        取得第 i 行（结果集中的原始序号）
+
+        Args:
+            i: 行序号
+
+        Returns:
+            [文件名, 行号, 集数, 时间轴, 内容, 完整文件路径]
+        """
+        return [self.filenames[i], str(self.line_numbers[i]), self.episode_names[self.episode_codes[i]],
+                self.time_axes[i], self.texts[i], self.file_path_names[self.file_path_codes[i]]]
+
+    def rows(self) -> List[list]:
+        """
+        取得当前选中的行（保持原顺序）
+
+        Returns:
+            结果行列表
+        """
+        return [self.row(i) for i in self.selection]
+
+    def refine(self, keywords: Optional[List[str]] = None, regex: Optional[List[str]] = None,
+               episodes: Optional[List[str]] = None, excluded: Optional[List[str]] = None,
+               case_sensitive: bool = False) -> int:
+        """
+        在当前选中的行中继续筛选（所有条件同时满足），筛选前的选中行压入撤销栈
+
+        Args:
+            keywords: 必须包含的关键词
+            regex: 必须匹配的正则表达式
+            episodes: 集数（包含任一文本的集）
+            excluded: 不能包含的关键词
+            case_sensitive: 关键词和正则表达式是否区分大小写
+
+        Returns:
+            筛选后的行数
+
+        Raises:
+            ValueError: 正则表达式无效
+        """
+        selection = self.selection
+        texts = self.plain_texts if case_sensitive else self.lower_texts
+
+        if episodes:
+            # 集数条件先在不同的集名上判断，再按编号筛选
+            targets = [episode if case_sensitive else episode.lower() for episode in episodes]
+            matched = {code for code, name in enumerate(self.episode_names)
+                       if any(target in (name if case_sensitive else name.lower()) for target in targets)}
+            codes = self.episode_codes
+            selection = [i for i in selection if codes[i] in matched]
+
+        for keyword in keywords or ():
+            keyword = keyword if case_sensitive else keyword.lower()
+            selection = [i for i in selection if keyword in texts[i]]
+
+        for keyword in excluded or ():
+            keyword = keyword if case_sensitive else keyword.lower()
+            selection = [i for i in selection if keyword not in texts[i]]
+
+        for expression in regex or ():
+            try:
+                pattern = re.compile(expression, 0 if case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"正则表达式无效: {expression} ({e})")
+            search = pattern.search
+            plain_texts = self.plain_texts
+            selection = [i for i in selection if search(plain_texts[i])]
+
+        self._history.append(self.selection)
+        self.selection = array('I', selection)
+        return len(self.selection)
+
+    def sort_keys(self, column: str) -> array:
+        """
+        取得一列的整数排序键
+
+        Args:
+            column: 列名（见 SORT_COLUMNS）
+
+        Returns:
+            按原始行序号排列的排序键数组
+
+        Raises:
+            ValueError: 列名未知
+        """
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"未知的排序列: {column}")
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            if column == 'time':
+                keys = array('q', [self._start_ms(time_axis) if start is None else start
+                                   for start, time_axis in zip(self.start_ms, self.time_axes)])
+            else:
+                keys = rank_values(self.lower_texts)
+            self._sort_keys[column] = keys
+        return keys
+
+    @staticmethod
+    def _start_ms(time_axis) -> int:
+        """解析时间轴文本取得开始毫秒数（只用于没有 start_ms 的行），没有时间轴时为 -1"""
+        time_range = line_classifier.parse_time_range(str(time_axis))
+        return time_range[0] if time_range else -1
+
+    def sort(self, columns: Sequence[Tuple[str, bool]]):
+        """
+        对当前选中的行排序，之后的筛选和撤销保持这一排序
+
+        Args:
+            columns: [(列名, 是否降序), ...]，排在前面的列优先；空列表恢复语料库中的顺序
+
+        Raises:
+            ValueError: 列名未知
+        """
+        for column, _ in columns:
+            if column not in SORT_COLUMNS:
+                raise ValueError(f"未知的排序列: {column}")
+        self.sort_columns = list(columns)
+        self.selection = self._sorted(self.selection)
+
+    def _sorted(self, selection: array) -> array:
+        """按当前的排序重新排列行序号"""
+        if not self.sort_columns:
+            return array('I', sorted(selection))
+        columns = [(self.sort_keys(column), descending) for column, descending in self.sort_columns]
+        return array('I', argsort(selection, columns))
+
+    def refine_query(self, text: str, case_sensitive: bool = False) -> int:
+        """
+        按输入文本筛选（语法见 parse_refine_query）
+
+        Args:
+            text: 筛选输入
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            筛选后的行数
+
+        Raises:
+            ValueError: 没有任何条件或正则表达式无效
+        """
+        query = parse_refine_query(text)
+        return self.refine(query['keywords'], query['regex'], query['episodes'], query['excluded'],
+                           case_sensitive)
+
+    def undo(self) -> bool:
+        """
+        撤销最近一次筛选
+
+        Returns:
+            是否撤销成功（没有可撤销的筛选时返回 False）
+        """
+        if not self._history:
+            return False
+        self.selection = self._sorted(self._history.pop())
+        return True
+
+    def reset(self):
+        """撤销所有筛选"""
+        if self._history:
+            self.selection = self._sorted(self._history[0])
+            self._history = []
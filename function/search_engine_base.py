@@ -4,18 +4,112 @@
 """
 
 import re
-from typing import List, Dict, Union
-from function.subtitle_parser import parse_subtitle_file
-from function.document_parser import parse_document_file
+from collections import Counter
+from typing import Callable, List, Dict, Union, Iterable, Iterator, Optional, Tuple
+from function.subtitle_parser import iter_subtitle_file
+from function.document_parser import iter_document_file
+from function.parse_cache import parse_cache
+from function.search_profiler import search_profiler
+from function.search_progress import search_progress
+from function.fuzzy_matcher import fuzzy_matcher
+from function.trigram_index import regex_trigram_analyzer, trigram_index_cache
+from function.query_language import QueryNode, query_executor, query_parser
+from function.suffix_array import suffix_array_searcher
+from function.frequency_counter import FrequencyCount
+from function.result_limit import ResultLimiter
 from pathlib import Path
 
 
 class SearchEngineBase:
     """搜索引擎基础类"""
+
+    # 使用字幕解析器的文件扩展名，其余文件使用文档解析器
+    SUBTITLE_EXTS = ['.srt', '.ass', '.ssa', '.vtt']
     
     def __init__(self):
         """初始化搜索引擎"""
         pass
+
+    def _is_subtitle_file(self, file_path: str) -> bool:
+        """
+        判断文件是否按字幕文件解析
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            是否为字幕文件
+        """
+        return Path(file_path).suffix.lower() in self.SUBTITLE_EXTS
+
+    def _iter_parsed_data(self, file_path: str) -> Iterator[Dict]:
+        """
+        根据文件类型选择解析器，逐条产出解析结果（不预先构建完整列表）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            解析结果迭代器
+        """
+        # 后台监视器已预解析且文件未变化时，直接使用缓存；
+        # 搜索线程绑定了进度对象时，每产出一条记录都检查取消标志并更新进度
+        cached = parse_cache.get(file_path)
+        if cached is not None:
+            return search_progress.track(search_profiler.timed_iter(iter(cached), file_path, 'cache'),
+                                         file_path, len(cached))
+        return search_progress.track(search_profiler.timed_iter(self._parse_file(file_path), file_path), file_path)
+
+    def _parse_file(self, file_path: str) -> Iterator[Dict]:
+        """
+        根据文件类型选择解析器解析文件（不使用缓存）
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            解析结果迭代器
+        """
+        if self._is_subtitle_file(file_path):
+            return iter_subtitle_file(file_path)
+        return iter_document_file(file_path)
+
+    def _load_records(self, file_path: str,
+                      parsed_data: Optional[Iterable[Dict]] = None) -> Tuple[Optional[Tuple[int, int]], List[Dict]]:
+        """
+        取得文件的完整解析结果（供需要建立索引的搜索使用），新解析的结果存入解析结果缓存
+
+        Args:
+            file_path: 文件路径
+            parsed_data: 已创建的解析结果迭代器，None 表示新建
+
+        Returns:
+            (文件指纹, 解析结果列表)
+        """
+        fingerprint = parse_cache.fingerprint(file_path)
+        if parsed_data is None:
+            parsed_data = self._iter_parsed_data(file_path)
+        records = list(parsed_data)
+        if fingerprint is not None and not parse_cache.contains(file_path):
+            parse_cache.put(file_path, fingerprint, records)
+        return fingerprint, records
+
+    def preparse(self, file_path: str) -> int:
+        """
+        完整解析文件并存入解析结果缓存，供之后的搜索直接使用
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            解析记录数，文件不存在时返回0
+        """
+        fingerprint = parse_cache.fingerprint(file_path)
+        if fingerprint is None:
+            return 0
+        records = list(self._parse_file(file_path))
+        parse_cache.put(file_path, fingerprint, records)
+        return len(records)
     
     def search_in_file(self, file_path: str, keywords: Union[str, List[str]], 
                       case_sensitive: bool = False, fuzzy_match: bool = False, 
@@ -33,33 +127,105 @@ class SearchEngineBase:
         Returns:
             搜索结果列表
         """
+        return list(self.iter_search_in_file(file_path, keywords, case_sensitive,
+                                             fuzzy_match, regex_enabled))
+
+    def iter_search_in_file(self, file_path: str, keywords: Union[str, List[str]],
+                            case_sensitive: bool = False, fuzzy_match: bool = False,
+                            regex_enabled: bool = False) -> Iterator[Dict]:
+        """
+        在单个文件中逐条搜索关键词（生成器），边解析边匹配，
+        找到第一条结果时无需解析文件的剩余部分
+
+        Args:
+            file_path: 文件路径
+            keywords: 关键词，可以是字符串或字符串列表
+            case_sensitive: 是否区分大小写
+            fuzzy_match: 是否启用模糊匹配
+            regex_enabled: 是否启用正则表达式
+
+        Yields:
+            搜索结果
+        """
         # 确保keywords是列表
         if isinstance(keywords, str):
             keywords = [keywords]
-        
-        # 根据文件类型选择解析器
-        file_ext = Path(file_path).suffix.lower()
-        subtitle_exts = ['.srt', '.ass', '.ssa', '.vtt']
-        
-        if file_ext in subtitle_exts:
-            # 字幕文件
-            parsed_data = parse_subtitle_file(file_path)
-            return self._search_in_parsed_data(parsed_data, keywords, case_sensitive, 
-                                             fuzzy_match, regex_enabled, is_subtitle=True)
-        else:
-            # 文档文件
-            parsed_data = parse_document_file(file_path)
-            return self._search_in_parsed_data(parsed_data, keywords, case_sensitive, 
-                                             fuzzy_match, regex_enabled, is_subtitle=False)
+
+        if not regex_enabled and not fuzzy_match and suffix_array_searcher.enabled:
+            results = self._suffix_array_search(file_path, keywords, case_sensitive)
+            if results is not None:
+                yield from results
+                return
+
+        parsed_data = self._iter_parsed_data(file_path)
+        if regex_enabled:
+            # 正则表达式先用三元组索引筛选候选行
+            parsed_data = self._regex_candidates(file_path, parsed_data, keywords)
+        elif fuzzy_match:
+            # 模糊匹配先将文件的词汇加入词汇索引，以便把关键词扩展为语料库中的近似词
+            parsed_data = list(parsed_data)
+            fuzzy_matcher.index_records(file_path, parse_cache.fingerprint(file_path), parsed_data)
+
+        yield from self._iter_search_in_parsed_data(
+            parsed_data, keywords, case_sensitive,
+            fuzzy_match, regex_enabled, is_subtitle=self._is_subtitle_file(file_path))
     
-    def _search_in_parsed_data(self, parsed_data: List[Dict], keywords: List[str], 
+    def _suffix_array_search(self, file_path: str, keywords: List[str],
+                             case_sensitive: bool) -> Optional[List[Dict]]:
+        """
+        用后缀数组索引进行精确子串搜索
+
+        Args:
+            file_path: 文件路径
+            keywords: 关键词列表
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            搜索结果列表，未安装 numpy 时返回None（由调用方逐行扫描）
+        """
+        fingerprint, records = self._load_records(file_path)
+        try:
+            index = suffix_array_searcher.get_index(file_path, fingerprint, records)
+        except ImportError as e:
+            print(f"后缀数组不可用，使用逐行扫描: {e}")
+            return None
+        return suffix_array_searcher.search(index, records, keywords, case_sensitive)
+
+    def _regex_candidates(self, file_path: str, parsed_data: Iterator[Dict],
+                          keywords: List[str]) -> Iterable[Dict]:
+        """
+        用三元组索引筛选可能匹配任一正则表达式的行
+
+        每个正则表达式都能提取出必须包含的字面三元组时，完整解析文件（并存入解析结果缓存）、
+        取得文件的三元组索引，只返回候选行；否则原样返回解析结果，由调用方逐行扫描
+
+        Args:
+            file_path: 文件路径
+            parsed_data: 文件的解析结果迭代器
+            keywords: 正则表达式列表
+
+        Returns:
+            候选行（保持原顺序）或原解析结果
+        """
+        queries = [regex_trigram_analyzer.analyze(keyword) for keyword in keywords]
+        if not queries or any(query is None for query in queries):
+            return parsed_data
+
+        fingerprint, records = self._load_records(file_path, parsed_data)
+        index = trigram_index_cache.get(file_path, fingerprint, records)
+        candidates = set()
+        for query in queries:
+            candidates |= index.candidates(query)
+        return [records[i] for i in sorted(candidates)]
+
+    def _search_in_parsed_data(self, parsed_data: Iterable[Dict], keywords: List[str], 
                               case_sensitive: bool, fuzzy_match: bool, 
                               regex_enabled: bool, is_subtitle: bool) -> List[Dict]:
         """
         在解析后的数据中搜索关键词
         
         Args:
-            parsed_data: 解析后的数据
+            parsed_data: 解析后的数据（列表或解析器产出的迭代器）
             keywords: 关键词列表
             case_sensitive: 是否区分大小写
             fuzzy_match: 是否启用模糊匹配
@@ -69,28 +235,65 @@ class SearchEngineBase:
         Returns:
             搜索结果列表
         """
-        results = []
-        
+        return list(self._iter_search_in_parsed_data(parsed_data, keywords, case_sensitive,
+                                                     fuzzy_match, regex_enabled, is_subtitle))
+
+    def _iter_search_in_parsed_data(self, parsed_data: Iterable[Dict], keywords: List[str],
+                                    case_sensitive: bool, fuzzy_match: bool,
+                                    regex_enabled: bool, is_subtitle: bool) -> Iterator[Dict]:
+        """
+        在解析后的数据中逐条搜索关键词（生成器）
+
+        Args:
+            parsed_data: 解析后的数据（列表或解析器产出的迭代器）
+            keywords: 关键词列表
+            case_sensitive: 是否区分大小写
+            fuzzy_match: 是否启用模糊匹配
+            regex_enabled: 是否启用正则表达式
+            is_subtitle: 是否为字幕文件
+
+        Yields:
+            搜索结果
+        """
+        search_keywords = keywords if case_sensitive else [kw.lower() for kw in keywords]
+
+        # 正则表达式：每个关键词只编译一次（使用原始关键词，转换小写会改变 \D、\W 等的含义）
+        regex_patterns = []
+        if regex_enabled:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            regex_patterns = [re.compile(keyword, flags) for keyword in keywords]
+
+        # 模糊匹配：每个关键词编译一次近似匹配模式，并扩展为词汇索引中的近似词
+        fuzzy_patterns = {}
+        fuzzy_terms = {}
+        if fuzzy_match and not regex_enabled:
+            for keyword in search_keywords:
+                fuzzy_patterns[keyword] = fuzzy_matcher.compile(keyword)
+                fuzzy_terms[keyword] = sorted(fuzzy_matcher.expand(keyword), key=len, reverse=True)
+
         for item in parsed_data:
             content = item.get('content', '')
             
             # 根据是否区分大小写来处理内容和关键词
             search_content = content if case_sensitive else content.lower()
-            search_keywords = keywords if case_sensitive else [kw.lower() for kw in keywords]
             
             matched = False
             matched_keywords = []
             
-            for keyword in search_keywords:
+            for i, keyword in enumerate(search_keywords):
                 if regex_enabled:
                     # 正则表达式匹配
-                    flags = 0 if case_sensitive else re.IGNORECASE
-                    if re.search(keyword, content, flags):
+                    if regex_patterns[i].search(content):
                         matched = True
                         matched_keywords.append(keyword)
                 elif fuzzy_match:
-                    # 模糊匹配 - 简单实现：检查关键词是否在内容中（允许一定编辑距离）
-                    if self._fuzzy_match(keyword, search_content):
+                    # 模糊匹配：先查找语料库中的近似词（结果中记录实际出现的词以便高亮），
+                    # 再用近似子串匹配覆盖词的一部分或跨词的情况
+                    hit_terms = [term for term in fuzzy_terms[keyword] if term in search_content]
+                    if hit_terms:
+                        matched = True
+                        matched_keywords.extend(hit_terms)
+                    elif fuzzy_patterns[keyword].matches(search_content):
                         matched = True
                         matched_keywords.append(keyword)
                 else:
@@ -102,30 +305,33 @@ class SearchEngineBase:
             if matched:
                 result_item = item.copy()
                 result_item['matched_keywords'] = matched_keywords
-                results.append(result_item)
-        
-        return results
+                yield result_item
     
-    def _fuzzy_match(self, pattern: str, text: str, threshold: float = 0.6) -> bool:
+    def _fuzzy_match(self, pattern: str, text: str, threshold: Optional[float] = 0.6) -> bool:
         """
-        简单的模糊匹配实现
+        模糊匹配：文本中存在与模式编辑距离足够近的子串
         
         Args:
             pattern: 搜索模式
             text: 要搜索的文本
-            threshold: 匹配阈值
+            threshold: 相似度阈值（0~1），允许的编辑距离为模式长度的 (1 - threshold) 倍，默认 0.6；
+                       None 表示使用 [FUZZY] 模糊匹配设置
             
         Returns:
             是否匹配
         """
-        # 简单的子串匹配，未来可以扩展为更复杂的模糊算法
-        return pattern in text
+        max_distance = None
+        if threshold is not None:
+            max_distance = int(len(pattern) * (1 - threshold))
+        return fuzzy_matcher.compile(pattern, max_distance).matches(text)
     
     def search_in_files(self, file_paths: List[str], keywords: Union[str, List[str]], 
                        case_sensitive: bool = False, fuzzy_match: bool = False, 
-                       regex_enabled: bool = False) -> List[Dict]:
+                       regex_enabled: bool = False, limiter: Optional[ResultLimiter] = None) -> List[Dict]:
         """
         在多个文件中搜索关键词
+
+        精确搜索（非模糊、非正则）在 [SEARCH] substring_backend = suffix_array 时使用后缀数组索引
         
         Args:
             file_paths: 文件路径列表
@@ -133,10 +339,18 @@ class SearchEngineBase:
             case_sensitive: 是否区分大小写
             fuzzy_match: 是否启用模糊匹配
             regex_enabled: 是否启用正则表达式
+            limiter: 结果限制器，取得足够的结果后立即停止扫描（不再解析文件的剩余部分和其余文件）
             
         Returns:
             搜索结果列表
         """
+        if limiter is not None:
+            for file_path in file_paths:
+                if limiter.consume(file_path, self.iter_search_in_file(file_path, keywords, case_sensitive,
+                                                                       fuzzy_match, regex_enabled)):
+                    break
+            return limiter.results()
+
         all_results = []
         for file_path in file_paths:
             results = self.search_in_file(file_path, keywords, case_sensitive, 
@@ -144,6 +358,196 @@ class SearchEngineBase:
             all_results.extend(results)
         return all_results
     
+    def count_in_file(self, file_path: str, keywords: Union[str, List[str]],
+                      case_sensitive: bool = False, fuzzy_match: bool = False,
+                      regex_enabled: bool = False) -> Counter:
+        """
+        统计单个文件中命中关键词的行数（按集），不生成结果记录
+
+        精确搜索在启用后缀数组后端时使用索引，正则表达式先用三元组索引筛选候选行，
+        其余情况逐行流式匹配
+
+        Args:
+            file_path: 文件路径
+            keywords: 关键词，可以是字符串或字符串列表
+            case_sensitive: 是否区分大小写
+            fuzzy_match: 是否启用模糊匹配
+            regex_enabled: 是否启用正则表达式
+
+        Returns:
+            集名称 -> 命中行数
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+
+        if not regex_enabled and not fuzzy_match and suffix_array_searcher.enabled:
+            fingerprint, records = self._load_records(file_path)
+            try:
+                index = suffix_array_searcher.get_index(file_path, fingerprint, records)
+            except ImportError as e:
+                print(f"后缀数组不可用，使用逐行扫描: {e}")
+            else:
+                lines = suffix_array_searcher.matching_lines(index, records, keywords, case_sensitive)
+                return FrequencyCount.count_records(file_path, (records[i] for i in sorted(lines)))
+
+        parsed_data = self._iter_parsed_data(file_path)
+        if regex_enabled:
+            parsed_data = self._regex_candidates(file_path, parsed_data, keywords)
+        elif fuzzy_match:
+            parsed_data = list(parsed_data)
+            fuzzy_matcher.index_records(file_path, parse_cache.fingerprint(file_path), parsed_data)
+
+        matches = self._line_matcher(keywords, case_sensitive, fuzzy_match, regex_enabled)
+        return FrequencyCount.count_records(
+            file_path, (record for record in parsed_data if matches(record.get('content', ''))))
+
+    def _line_matcher(self, keywords: List[str], case_sensitive: bool, fuzzy_match: bool,
+                      regex_enabled: bool) -> Callable[[str], bool]:
+        """
+        创建判断一行是否命中任一关键词的函数（与 _iter_search_in_parsed_data 的匹配规则一致）
+
+        Args:
+            keywords: 关键词列表
+            case_sensitive: 是否区分大小写
+            fuzzy_match: 是否启用模糊匹配
+            regex_enabled: 是否启用正则表达式
+
+        Returns:
+            以行内容为参数的判断函数
+        """
+        if regex_enabled:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            patterns = [re.compile(keyword, flags) for keyword in keywords]
+            return lambda content: any(pattern.search(content) for pattern in patterns)
+
+        search_keywords = keywords if case_sensitive else [kw.lower() for kw in keywords]
+        if fuzzy_match:
+            terms = [term for keyword in search_keywords for term in fuzzy_matcher.expand(keyword)]
+            patterns = [fuzzy_matcher.compile(keyword) for keyword in search_keywords]
+
+            def matches(content: str) -> bool:
+                content = content if case_sensitive else content.lower()
+                return any(term in content for term in terms) or \
+                    any(pattern.matches(content) for pattern in patterns)
+            return matches
+
+        if case_sensitive:
+            return lambda content: any(keyword in content for keyword in search_keywords)
+        return lambda content: any(keyword in content.lower() for keyword in search_keywords)
+
+    def count_in_files(self, file_paths: List[str], keywords: Union[str, List[str]],
+                       case_sensitive: bool = False, fuzzy_match: bool = False,
+                       regex_enabled: bool = False) -> FrequencyCount:
+        """
+        统计多个文件中命中关键词的行数（总数、各文件、各集）
+
+        Args:
+            file_paths: 文件路径列表
+            keywords: 关键词，可以是字符串或字符串列表
+            case_sensitive: 是否区分大小写
+            fuzzy_match: 是否启用模糊匹配
+            regex_enabled: 是否启用正则表达式
+
+        Returns:
+            统计结果
+        """
+        frequency = FrequencyCount()
+        for file_path in file_paths:
+            frequency.add(file_path, self.count_in_file(file_path, keywords, case_sensitive,
+                                                        fuzzy_match, regex_enabled))
+        return frequency
+
+    def count_query(self, file_path: str, query: Union[str, QueryNode],
+                    case_sensitive: bool = False) -> Counter:
+        """
+        统计单个文件中匹配查询语言的行数（按集），只求倒排列表的结果行
+
+        Args:
+            file_path: 文件路径
+            query: 查询字符串或已解析的查询语法树
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            集名称 -> 命中行数
+
+        Raises:
+            ValueError: 查询语法错误
+        """
+        if isinstance(query, str):
+            query = query_parser.parse(query)
+        if query.prefilter(file_path) is False:
+            return Counter()
+        fingerprint, records = self._load_records(file_path)
+        lines = query_executor.matching_lines(query, file_path, fingerprint, records, case_sensitive)
+        return FrequencyCount.count_records(file_path, (records[i] for i in lines))
+
+    def count_occurrences(self, file_paths: List[str], text: str) -> int:
+        """
+        统计子串在多个文件中的出现次数（不区分大小写，使用后缀数组索引）
+
+        Args:
+            file_paths: 文件路径列表
+            text: 子串
+
+        Returns:
+            出现次数
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        total = 0
+        for file_path in file_paths:
+            fingerprint, records = self._load_records(file_path)
+            total += suffix_array_searcher.get_index(file_path, fingerprint, records).count(text)
+        return total
+
+    def kwic(self, file_paths: List[str], text: str, width: int = 30, sort: str = 'right') -> List[Dict]:
+        """
+        子串的 KWIC（上下文中的关键词）列表（不区分大小写，使用后缀数组索引）
+
+        Args:
+            file_paths: 文件路径列表
+            text: 子串
+            width: 左右上下文的字符数
+            sort: 'right' 按右侧上下文排序，'left' 按左侧上下文排序
+
+        Returns:
+            KWIC 结果列表，每项包含 'left'、'keyword'、'right' 和所在行的解析结果字段
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        streams = []
+        for file_path in file_paths:
+            fingerprint, records = self._load_records(file_path)
+            index = suffix_array_searcher.get_index(file_path, fingerprint, records)
+            streams.append(suffix_array_searcher.iter_kwic(index, records, text, width))
+        return suffix_array_searcher.merge_kwic(streams, sort)
+
+    def search_query(self, file_path: str, query: Union[str, QueryNode],
+                     case_sensitive: bool = False) -> List[Dict]:
+        """
+        用查询语言搜索单个文件（AND/OR/NOT、短语、NEAR/n、file:/episode:/time: 筛选）
+
+        Args:
+            file_path: 文件路径
+            query: 查询字符串或已解析的查询语法树（多个文件共用同一查询时只解析一次）
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            搜索结果列表
+
+        Raises:
+            ValueError: 查询语法错误
+        """
+        if isinstance(query, str):
+            query = query_parser.parse(query)
+        # 只凭文件名即可排除的文件无需解析
+        if query.prefilter(file_path) is False:
+            return []
+        fingerprint, records = self._load_records(file_path)
+        return query_executor.execute(query, file_path, fingerprint, records, case_sensitive)
+
     def search_exact_match(self, file_path: str, exact_text: str, 
                          case_sensitive: bool = False) -> List[Dict]:
         """
@@ -157,18 +561,9 @@ class SearchEngineBase:
         Returns:
             搜索结果列表
         """
-        # 根据文件类型选择解析器
-        file_ext = Path(file_path).suffix.lower()
-        subtitle_exts = ['.srt', '.ass', '.ssa', '.vtt']
-        
-        if file_ext in subtitle_exts:
-            parsed_data = parse_subtitle_file(file_path)
-        else:
-            parsed_data = parse_document_file(file_path)
-        
         results = []
         
-        for item in parsed_data:
+        for item in self._iter_parsed_data(file_path):
             content = item.get('content', '')
             
             # 完全匹配检查
@@ -187,6 +582,8 @@ class SearchEngineBase:
                     'line_number': line_number,  # 同时保留两种字段名，方便后续处理
                     'episode': item.get('episode', ''),
                     'time_axis': item.get('time_axis', ''),
+                    'start_ms': item.get('start_ms'),
+                    'end_ms': item.get('end_ms'),
                     'content': content,
                     'matched_keywords': [exact_text]
                 }
@@ -3,8 +3,11 @@
 实现英语特定的搜索功能，包括变形匹配等
 """
 
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Set, Tuple
 from function.search_engine_base import SearchEngineBase
+from function.frequency_counter import FrequencyCount
+from function.english_lemmatizer import EnglishLemmatizer, english_lemmatizer, lemma_index_cache
 
 
 class EnglishSearchEngine(SearchEngineBase):
@@ -18,59 +21,118 @@ class EnglishSearchEngine(SearchEngineBase):
                                case_sensitive: bool = False) -> List[Dict]:
         """
         搜索英语变形匹配
-        
+
+        英语词还原为词典形后在文件的词典形索引中查找（went 命中 go，stopped 命中 stop），
+        非英语词按子串匹配
+
+        Args:
+            file_path: 文件路径
+            base_words: 基础词列表（原型词）
+            case_sensitive: 是否区分大小写（变形词的大小写形式需与查询词一致）
+
+        Returns:
+            搜索结果列表（按行顺序），matched_keywords 为行中实际出现的变形
+        """
+        english_words = [word for word in base_words if english_lemmatizer.is_english_word(word)]
+        other_words = [word for word in base_words if word not in english_words]
+        if not english_words:
+            return self.search_in_file(file_path, other_words, case_sensitive,
+                                       fuzzy_match=False, regex_enabled=False)
+
+        fingerprint, records = self._load_records(file_path)
+        index = lemma_index_cache.get(file_path, fingerprint, records)
+
+        # 行序号 -> 各查询词在语料库中出现的变形
+        line_forms: Dict[int, List[Tuple[str, Set[str]]]] = {}
+        for word in english_words:
+            lines, forms = index.lookup(english_lemmatizer.lemmatize(word))
+            for line_index in lines:
+                line_forms.setdefault(line_index, []).append((word, forms))
+
+        # 非英语词逐行按子串匹配
+        search_words = other_words if case_sensitive else [word.lower() for word in other_words]
+        other_lines: Dict[int, List[str]] = {}
+        if search_words:
+            for line_index, record in enumerate(records):
+                content = record.get('content', '')
+                content = content if case_sensitive else content.lower()
+                hits = [word for word in search_words if word in content]
+                if hits:
+                    other_lines[line_index] = hits
+
+        results = []
+        for line_index in sorted(line_forms.keys() | other_lines.keys()):
+            record = records[line_index]
+            matched_keywords = []
+            for word, forms in line_forms.get(line_index, ()):
+                matched_keywords.extend(self._matched_forms(record.get('content', ''), word, forms,
+                                                            case_sensitive))
+            matched_keywords.extend(other_lines.get(line_index, ()))
+            if matched_keywords:
+                result_item = record.copy()
+                result_item['matched_keywords'] = list(dict.fromkeys(matched_keywords))
+                results.append(result_item)
+        return results
+
+    def count_english_variants(self, file_path: str, base_words: List[str],
+                               case_sensitive: bool = False) -> Counter:
+        """
+        统计英语变形匹配的命中行数（按集），直接使用词典形索引的倒排列表
+
         Args:
             file_path: 文件路径
             base_words: 基础词列表（原型词）
             case_sensitive: 是否区分大小写
-            
+
         Returns:
-            搜索结果列表
+            集名称 -> 命中行数
         """
-        # 生成可能的变形词
-        all_keywords = []
-        
-        for word in base_words:
-            # 生成可能的变形词
-            variants = self._generate_english_variants(word)
-            all_keywords.extend(variants)
-        
-        # 去重
-        all_keywords = list(set(all_keywords))
-        
-        return self.search_in_file(file_path, all_keywords, case_sensitive, 
-                                 fuzzy_match=False, regex_enabled=False)
-
-    def _generate_english_variants(self, word: str) -> List[str]:
+        english_words = [word for word in base_words if english_lemmatizer.is_english_word(word)]
+        other_words = [word for word in base_words if word not in english_words]
+        if not english_words:
+            return self.count_in_file(file_path, other_words, case_sensitive)
+
+        fingerprint, records = self._load_records(file_path)
+        index = lemma_index_cache.get(file_path, fingerprint, records)
+        lines = set()
+        for word in english_words:
+            word_lines, forms = index.lookup(english_lemmatizer.lemmatize(word))
+            if case_sensitive:
+                word_lines = [i for i in word_lines
+                              if self._matched_forms(records[i].get('content', ''), word, forms, True)]
+            lines.update(word_lines)
+
+        if other_words:
+            matches = self._line_matcher(other_words, case_sensitive, False, False)
+            lines.update(i for i, record in enumerate(records) if matches(record.get('content', '')))
+        return FrequencyCount.count_records(file_path, (records[i] for i in sorted(lines)))
+
+    @staticmethod
+    def _matched_forms(content: str, word: str, forms: Set[str], case_sensitive: bool) -> List[str]:
         """
-        生成英语单词的可能变形（简化版本）
+        找出行中属于查询词变形的词
 
         Args:
-            word: 英语基础词
+            content: 行内容
+            word: 查询词
+            forms: 查询词的词典形在语料库中出现的变形（小写）
+            case_sensitive: 是否区分大小写
 
         Returns:
-            英语变形词列表
+            行中出现的变形（不区分大小写时为小写）
         """
-        variants = [word]  # 至少包含原词
-        
-        # 简化的英语变形规则
-        # 复数形式
-        if not word.endswith('s'):
-            variants.append(word + 's')
-        
-        # 过去式（以e结尾的加d，否则加ed）
-        if word.endswith('e'):
-            variants.append(word + 'd')
-        else:
-            variants.append(word + 'ed')
-        
-        # 进行时
-        if word.endswith('e'):
-            variants.append(word[:-1] + 'ing')
+        tokens = EnglishLemmatizer.WORD_PATTERN.findall(content)
+        if not case_sensitive:
+            return [token for token in dict.fromkeys(token.lower() for token in tokens) if token in forms]
+
+        # 区分大小写：全大写的查询词只匹配全大写的变形，首字母大写的只匹配首字母大写的变形
+        if len(word) > 1 and word.isupper():
+            same_case = str.isupper
+        elif word[:1].isupper():
+            same_case = lambda token: token[:1].isupper() and token[1:].islower()
         else:
-            variants.append(word + 'ing')
-        
-        return variants
+            same_case = str.islower
+        return [token for token in dict.fromkeys(tokens) if token.lower() in forms and same_case(token)]
 
 
 # 全局英语搜索引擎实例
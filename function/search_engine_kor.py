@@ -4,8 +4,14 @@
 """
 
 import re
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Optional
 from function.search_engine_base import SearchEngineBase
+from function.search_profiler import search_profiler
+from function.jamo_index import jamo_index_cache, matched_span, query_mode
+from function.positional_index import PositionalIndex, positional_index_cache
+from function.collocation import collocation_finder
+from function.corpus_statistics import korean_line_analyzer
 from kiwipiepy import Kiwi
 
 
@@ -16,6 +22,8 @@ class KoreanSearchEngine(SearchEngineBase):
         """初始化韩语搜索引擎"""
         super().__init__()
         self.kiwi = Kiwi()
+        # 惯用语核心词 -> 变体列表（同一查询逐个文件搜索时只生成一次）
+        self._idiom_variant_cache: Dict[str, List[str]] = {}
     
     def search_korean_variants(self, file_path: str, base_words: List[str],
                               case_sensitive: bool = False) -> List[Dict]:
@@ -44,6 +52,51 @@ class KoreanSearchEngine(SearchEngineBase):
         return self.search_in_file(file_path, all_keywords, case_sensitive, 
                                  fuzzy_match=False, regex_enabled=False)
     
+    def count_korean_variants(self, file_path: str, base_words: List[str],
+                              case_sensitive: bool = False) -> Counter:
+        """
+        统计韩语变形匹配的命中行数（按集），不生成结果记录
+
+        Args:
+            file_path: 文件路径
+            base_words: 基础词列表（原型词）
+            case_sensitive: 是否区分大小写
+
+        Returns:
+            集名称 -> 命中行数
+        """
+        all_keywords = []
+        for word in base_words:
+            all_keywords.extend(self._generate_korean_variants(word))
+        return self.count_in_file(file_path, list(set(all_keywords)), case_sensitive)
+
+    def find_collocations(self, file_paths: List[str], lemma: str, left: int = 3, right: int = 3,
+                          measure: str = 'log_dice', min_frequency: int = 2, top: int = 20) -> Dict:
+        """
+        统计词典形的左右搭配（基于词典形位置索引，不重新扫描文本）
+
+        输入的词不是语料库中的词典形时（如 먹었어요），先用形态分析还原为词典形
+
+        Args:
+            file_paths: 文件路径列表
+            lemma: 词典形（如 '먹다'）或统计键（如 '먹다/VV'）
+            left: 左侧窗口的词数
+            right: 右侧窗口的词数
+            measure: 搭配强度指标（log_dice/pmi/t_score）
+            min_frequency: 最少共现次数
+            top: 每侧返回的搭配词数
+
+        Returns:
+            搭配统计结果，格式见 CollocationFinder.find
+        """
+        result = collocation_finder.find(self, file_paths, lemma, left, right, measure, min_frequency, top)
+        if not result['frequency'] and '/' not in lemma:
+            keys = korean_line_analyzer.analyze(lemma)
+            if keys and keys[0].rpartition('/')[0] != lemma:
+                result = collocation_finder.find(self, file_paths, keys[0].rpartition('/')[0],
+                                                 left, right, measure, min_frequency, top)
+        return result
+
     def search_korean_advanced(self, file_path: str, raw_keyword: str, 
                               case_sensitive: bool = False) -> Dict:
         """
@@ -57,18 +110,8 @@ class KoreanSearchEngine(SearchEngineBase):
         Returns:
             包含搜索记录和结果的字典
         """
-        # 根据文件类型选择解析器
-        from pathlib import Path
-        from function.subtitle_parser import parse_subtitle_file
-        from function.document_parser import parse_document_file
-        
-        file_ext = Path(file_path).suffix.lower()
-        subtitle_exts = ['.srt', '.ass', '.ssa', '.vtt']
-        
-        if file_ext in subtitle_exts:
-            parsed_data = parse_subtitle_file(file_path)
-        else:
-            parsed_data = parse_document_file(file_path)
+        # 根据文件类型选择解析器，按需逐条解析
+        parsed_data = self._iter_parsed_data(file_path)
         
         # 1. 使用kiwipiepy分析原始关键词
         analyzed_words = self.kiwi.analyze(raw_keyword)
@@ -216,7 +259,8 @@ class KoreanSearchEngine(SearchEngineBase):
 
                     if not found:
                         # 策略2：形态分析（备用，确保覆盖所有可能的变形）
-                        sentence_analyzed = self.kiwi.analyze(content)
+                        with search_profiler.stage('analyze', lines=1):
+                            sentence_analyzed = self.kiwi.analyze(content)
 
                         # 检查是否包含目标词典形的任意变形
                         for analysis_result in sentence_analyzed:
@@ -257,6 +301,8 @@ class KoreanSearchEngine(SearchEngineBase):
                     'line_number': line_number,  # 同时保留两种字段名，方便后续处理
                     'episode': item.get('episode', ''),
                     'time_axis': item.get('time_axis', ''),
+                    'start_ms': item.get('start_ms'),
+                    'end_ms': item.get('end_ms'),
                     'content': content,
                     'matched_keyword': matched_variant
                 }
@@ -307,8 +353,70 @@ class KoreanSearchEngine(SearchEngineBase):
 
         return search_record
     
+    def search_korean_jamo(self, file_path: str, query: str) -> Dict:
+        """
+        韩文字母检索：初声检索（如 ㅇㄹㄷ）或不完整音节检索（如 사ㄹ），
+        使用文件的初声/字母索引，无需逐行分解音节
+
+        Args:
+            file_path: 文件路径
+            query: 查询字符串
+
+        Returns:
+            包含搜索记录和结果的字典（结构与 search_korean_advanced 相同）
+        """
+        mode = query_mode(query) or 'jamo'
+        fingerprint, records = self._load_records(file_path)
+        index = jamo_index_cache.get(file_path, fingerprint, records)
+        if mode == 'choseong':
+            line_indices = index.search_choseong(query)
+        else:
+            line_indices = index.search_letters(query)
+
+        results = []
+        matched_terms_set = set()
+        for i in line_indices:
+            item = records[i]
+            content = item.get('content', '')
+
+            # 记录原文中对应的音节，用于高亮
+            span = matched_span(content, query, mode)
+            matched_term = content[span[0]:span[1]] if span else query.strip()
+            matched_terms_set.add(matched_term)
+
+            # 兼容不同的行号字段名
+            line_number = item.get('lineno', '')
+            if line_number == '':
+                line_number = item.get('line_number', '')
+
+            results.append({
+                'file_path': file_path,
+                'lineno': line_number,
+                'line_number': line_number,
+                'episode': item.get('episode', ''),
+                'time_axis': item.get('time_axis', ''),
+                'start_ms': item.get('start_ms'),
+                'end_ms': item.get('end_ms'),
+                'content': content,
+                'matched_keyword': matched_term
+            })
+
+        return {
+            'raw_keyword': query,
+            'lemma': query.strip(),
+            'pos': '初声检索 (Choseong)' if mode == 'choseong' else '字母检索 (Jamo)',
+            'original_pos': mode,
+            'is_verb_adj': False,
+            'is_noun_adv': False,
+            'target_variant_set': [],
+            'actual_variant_set': sorted(matched_terms_set),
+            'matched_terms_set': sorted(matched_terms_set),
+            'search_results': results,
+            'result_count': len(results)
+        }
+
     def search_korean_idiom(self, file_path: str, idiom: str, 
-                          case_sensitive: bool = False) -> List[Dict]:
+                          case_sensitive: bool = False, max_gap: Optional[int] = None) -> List[Dict]:
         """
         搜索韩语惯用语
         
@@ -318,35 +426,79 @@ class KoreanSearchEngine(SearchEngineBase):
         - 必须同时包含所有核心词
         - 动词/形容词可以匹配其变体
         
+        使用文件的位置索引：求各核心词（含变体）倒排列表的交集，再检查词序和间隔，
+        耗时与命中数成正比而不是与语料库大小成正比
+        
         Args:
             file_path: 文件路径
             idiom: 惯用语字符串（如 "인심을 쓰다"）
             case_sensitive: 是否区分大小写
+            max_gap: 相邻核心词之间最多间隔的词数，None 表示同一行内不限
             
         Returns:
             搜索结果列表
         """
-        # 根据文件类型选择解析器
-        from pathlib import Path
-        from function.subtitle_parser import parse_subtitle_file
-        from function.document_parser import parse_document_file
-        
-        file_ext = Path(file_path).suffix.lower()
-        subtitle_exts = ['.srt', '.ass', '.ssa', '.vtt']
-        
-        if file_ext in subtitle_exts:
-            parsed_data = parse_subtitle_file(file_path)
-        else:
-            parsed_data = parse_document_file(file_path)
-        
         # 提取核心词（去掉助词）
         core_words = self._extract_core_words(idiom)
         
         # 为每个核心词生成变体（动词/形容词）
         all_word_variants = {}
         for word in core_words:
-            variants = self._generate_korean_variants(word)
-            all_word_variants[word] = variants
+            if word not in self._idiom_variant_cache:
+                self._idiom_variant_cache[word] = self._generate_korean_variants(word)
+            all_word_variants[word] = self._idiom_variant_cache[word]
+        term_groups = [all_word_variants[word] for word in core_words]
+
+        # 没有核心词或变体中不含词（如只有标点）时无法使用索引，逐行扫描
+        token_pattern = PositionalIndex.TOKEN_PATTERN
+        if not core_words or any(not token_pattern.search(variant)
+                                 for group in term_groups for variant in group):
+            return self._search_korean_idiom_scan(file_path, core_words, all_word_variants, case_sensitive)
+
+        fingerprint, records = self._load_records(file_path)
+        index = positional_index_cache.get(file_path, fingerprint, records)
+
+        results = []
+        for line_index, matched_variants in index.find_ordered(term_groups, max_gap):
+            item = records[line_index]
+            content = item.get('content', '')
+            if case_sensitive:
+                # 索引按小写建立，区分大小写时在候选行上精确确认
+                matched_variants = PositionalIndex.match_tokens(
+                    token_pattern.findall(content), term_groups, max_gap)
+                if matched_variants is None:
+                    continue
+
+            results.append({
+                'file_path': file_path,
+                'lineno': item.get('lineno', ''),
+                'episode': item.get('episode', ''),
+                'time_axis': item.get('time_axis', ''),
+                'start_ms': item.get('start_ms'),
+                'end_ms': item.get('end_ms'),
+                'content': content,
+                'matched_keywords': matched_variants
+            })
+        
+        return results
+
+    def _search_korean_idiom_scan(self, file_path: str, core_words: List[str],
+                                  all_word_variants: Dict[str, List[str]],
+                                  case_sensitive: bool) -> List[Dict]:
+        """
+        逐行扫描搜索惯用语（变体无法按词索引时使用）
+        
+        Args:
+            file_path: 文件路径
+            core_words: 核心词列表
+            all_word_variants: 核心词 -> 变体列表
+            case_sensitive: 是否区分大小写
+            
+        Returns:
+            搜索结果列表
+        """
+        # 根据文件类型选择解析器，按需逐条解析
+        parsed_data = self._iter_parsed_data(file_path)
         
         results = []
         
@@ -414,6 +566,8 @@ class KoreanSearchEngine(SearchEngineBase):
                     'lineno': item.get('lineno', ''),
                     'episode': item.get('episode', ''),
                     'time_axis': item.get('time_axis', ''),
+                    'start_ms': item.get('start_ms'),
+                    'end_ms': item.get('end_ms'),
                     'content': content,
                     'matched_keywords': matched_variants
                 }
@@ -4,12 +4,19 @@
 """
 
 import os
+import re
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from function.search_profiler import SearchProfile
 
 
 class SearchHistoryManager:
     """搜索历史记录管理器"""
+
+    # 阶段耗时行，如 "- 解析(parse): 0.812 秒, 20 文件, 30000 行, 10485760 字节"
+    TIMING_LINE_PATTERN = re.compile(
+        r'^- .*?\((\w+)\): ([\d.]+) 秒, (\d+) 文件, (\d+) 行, (\d+) 字节$')
     
     def __init__(self, corpus_type: str = "eng"):
         """
@@ -273,6 +280,20 @@ class SearchHistoryManager:
                             record_dict['result_count'] = int(line.split('**结果数量**:', 1)[1].strip())
                         elif line.startswith('**关键词类型**:'):
                             record_dict['keyword_type'] = line.split('**关键词类型**:', 1)[1].strip()
+                        elif line.startswith('**总耗时**:'):
+                            total = line.split('**总耗时**:', 1)[1].replace('秒', '').strip()
+                            record_dict['timings'] = {'total': float(total), 'stages': {}}
+                        elif line.startswith('- ') and 'timings' in record_dict:
+                            # 阶段耗时在总耗时之后，每个阶段一行
+                            timing_match = self.TIMING_LINE_PATTERN.match(line)
+                            if timing_match:
+                                name, seconds, files, line_count, size = timing_match.groups()
+                                record_dict['timings']['stages'][name] = {
+                                    'seconds': float(seconds),
+                                    'files': int(files),
+                                    'lines': int(line_count),
+                                    'bytes': int(size)
+                                }
                         elif line.startswith('**设置**:'):
                             # 解析设置部分
                             settings = {
@@ -358,12 +379,21 @@ class SearchHistoryManager:
                     f.write(f"**HTML路径**: {html_path}\n")
                 
                 f.write(f"**结果数量**: {record.get('result_count', 0)}\n")
+
+                # 各阶段耗时（旧记录没有此项）
+                timings = record.get('timings')
+                if timings:
+                    f.write(f"**总耗时**: {timings.get('total', 0.0):.3f} 秒\n")
+                    for name, stage in timings.get('stages', {}).items():
+                        label = SearchProfile.STAGE_LABELS.get(name, name)
+                        f.write(f"- {label}({name}): {stage['seconds']:.3f} 秒, {stage['files']} 文件, "
+                                f"{stage['lines']} 行, {stage['bytes']} 字节\n")
     
     def add_record(self, keywords: str, input_path: str, output_path: str = "", 
                    case_sensitive: bool = False, fuzzy_match: bool = False, 
                    regex_enabled: bool = False, result_count: int = 0, keyword_type: str = "",
                    lemma: str = "", actual_variant_set: list = [], target_variant_set: list = [],
-                   html_path: str = "", search_time=None):
+                   html_path: str = "", search_time=None, timings: Optional[Dict] = None):
         """
         添加搜索记录
         
@@ -380,6 +410,7 @@ class SearchHistoryManager:
             actual_variant_set: 基于词典形实际命中的所有变体形式列表
             target_variant_set: 基于词典形生成的所有可能变体形式列表
             html_path: HTML文件路径
+            timings: 各阶段耗时统计（SearchProfile.to_dict() 的返回值）
         """
         # 使用提供的搜索时间或当前时间
         if search_time:
@@ -398,6 +429,7 @@ class SearchHistoryManager:
             "lemma": lemma,
             "target_variant_set": target_variant_set,
             "actual_variant_set": actual_variant_set,
+            "timings": timings,
             "settings": {
                 "case_sensitive": case_sensitive,
                 "fuzzy_match": fuzzy_match,
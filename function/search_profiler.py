@@ -0,0 +1,286 @@
+"""
+搜索性能统计模块
+记录一次搜索中各阶段（扫描、解析、形态分析、匹配、格式化、表格显示等）的耗时、
+文件数、行数和字节数；设置环境变量 CORPUS_SEARCH_PROFILE 时额外保存 cProfile 数据
+"""
+
+import cProfile
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+
+class SearchProfile:
+    """单次搜索的分阶段统计"""
+
+    # 阶段名称 -> 显示名称（按搜索流程排列）
+    STAGE_LABELS = OrderedDict([
+        ('scan', '扫描'),
+        ('cache', '缓存'),
+        ('parse', '解析'),
+        ('analyze', '形态分析'),
+        ('match', '匹配'),
+        ('count', '计数'),
+        ('format', '格式化'),
+        ('display', '表格显示'),
+        ('export', '导出'),
+    ])
+
+    def __init__(self):
+        """初始化统计"""
+        # 阶段名称 -> {'seconds', 'files', 'lines', 'bytes'}
+        self.stages: Dict[str, Dict] = {}
+        # 正在进行的嵌套阶段中子阶段已用的时间，用于计算各阶段自身的耗时
+        self._child_seconds = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float = 0.0, files: int = 0, lines: int = 0, size: int = 0):
+        """
+        累加阶段统计
+
+        Args:
+            name: 阶段名称
+            seconds: 耗时（秒）
+            files: 文件数
+            lines: 行数
+            size: 字节数
+        """
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {'seconds': 0.0, 'files': 0, 'lines': 0, 'bytes': 0}
+            stage['seconds'] += seconds
+            stage['files'] += files
+            stage['lines'] += lines
+            stage['bytes'] += size
+
+    @contextmanager
+    def stage(self, name: str, files: int = 0, lines: int = 0, size: int = 0):
+        """
+        计时 with 语句块，嵌套阶段的耗时只计入内层阶段
+
+        Args:
+            name: 阶段名称
+            files: 文件数
+            lines: 行数
+            size: 字节数
+        """
+        self._child_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(name, elapsed - self._child_seconds.pop(), files, lines, size)
+            self.exclude(elapsed)
+
+    def exclude(self, seconds: float):
+        """
+        从当前所在阶段的耗时中扣除已计入其他阶段的时间
+
+        Args:
+            seconds: 已计入其他阶段的耗时（秒）
+        """
+        if self._child_seconds:
+            self._child_seconds[-1] += seconds
+
+    @property
+    def total_seconds(self) -> float:
+        """各阶段耗时之和"""
+        return sum(stage['seconds'] for stage in self.stages.values())
+
+    def to_dict(self) -> Dict:
+        """
+        转换为可保存的字典
+
+        Returns:
+            {'total': 总耗时, 'stages': {阶段名称: {'seconds', 'files', 'lines', 'bytes'}}}
+        """
+        with self._lock:
+            stages = OrderedDict((name, dict(self.stages[name])) for name in self._ordered_names(self.stages))
+        return {'total': sum(stage['seconds'] for stage in stages.values()), 'stages': stages}
+
+    def summary(self) -> str:
+        """状态栏显示的简要统计"""
+        return self.format_summary(self.to_dict())
+
+    @classmethod
+    def format_summary(cls, timings: Dict) -> str:
+        """
+        生成简要统计文本，如 "耗时 1.23s（扫描 0.01s · 解析 0.80s, 20 文件, 3.1 MB · 匹配 0.40s）"
+
+        Args:
+            timings: to_dict() 返回的字典
+
+        Returns:
+            统计文本
+        """
+        parts = []
+        for name in cls._ordered_names(timings.get('stages', {})):
+            stage = timings['stages'][name]
+            text = f"{cls.STAGE_LABELS.get(name, name)} {stage['seconds']:.2f}s"
+            if name in ('parse', 'cache') and stage['files']:
+                text += f", {stage['files']} 文件, {cls.format_bytes(stage['bytes'])}"
+            parts.append(text)
+        return f"耗时 {timings.get('total', 0.0):.2f}s（{' · '.join(parts)}）"
+
+    @staticmethod
+    def format_bytes(size: int) -> str:
+        """字节数转为易读的文本"""
+        if size >= 1024 * 1024:
+            return f"{size / 1024 / 1024:.1f} MB"
+        if size >= 1024:
+            return f"{size / 1024:.1f} KB"
+        return f"{size} B"
+
+    @classmethod
+    def _ordered_names(cls, stages: Dict) -> list:
+        """按搜索流程排列阶段名称，未知阶段排在最后"""
+        known = [name for name in cls.STAGE_LABELS if name in stages]
+        return known + [name for name in stages if name not in cls.STAGE_LABELS]
+
+
+class SearchProfiler:
+    """
+    搜索性能统计入口
+
+    统计对象通过 activate() 绑定到当前线程，解析器和搜索引擎通过 stage() 和 timed_iter()
+    记录数据；当前线程没有绑定统计对象时（如后台预解析）这些调用不做任何统计
+    """
+
+    # 启用 cProfile 的环境变量：值为输出文件或目录路径，为 1 时输出到当前目录
+    CPROFILE_ENV = 'CORPUS_SEARCH_PROFILE'
+
+    def __init__(self):
+        """初始化统计入口"""
+        self._local = threading.local()
+
+    def current(self) -> Optional[SearchProfile]:
+        """返回当前线程正在使用的统计对象"""
+        return getattr(self._local, 'profile', None)
+
+    @contextmanager
+    def activate(self, profile: SearchProfile):
+        """
+        在 with 语句块内将统计对象绑定到当前线程
+
+        Args:
+            profile: 统计对象
+        """
+        previous = self.current()
+        self._local.profile = profile
+        try:
+            yield profile
+        finally:
+            self._local.profile = previous
+
+    @contextmanager
+    def stage(self, name: str, files: int = 0, lines: int = 0, size: int = 0):
+        """
+        计时 with 语句块，记入当前线程的统计对象
+
+        Args:
+            name: 阶段名称
+            files: 文件数
+            lines: 行数
+            size: 字节数
+        """
+        profile = self.current()
+        if profile is None:
+            yield
+            return
+        with profile.stage(name, files, lines, size):
+            yield
+
+    def timed_iter(self, iterator: Iterator[Dict], file_path: str, name: str = 'parse') -> Iterator[Dict]:
+        """
+        包装解析结果迭代器，统计产出记录所用的时间、记录数和文件大小
+
+        解析器是边解析边产出的生成器，解析时间分散在搜索循环中，
+        这里只累计迭代器内部的时间并从外层阶段（匹配）中扣除
+
+        Args:
+            iterator: 解析结果迭代器
+            file_path: 文件路径
+            name: 阶段名称（'parse' 或 'cache'）
+
+        Returns:
+            解析结果迭代器，当前线程未启用统计时原样返回
+        """
+        profile = self.current()
+        if profile is None:
+            return iterator
+        return self._timed_iter(profile, iterator, file_path, name)
+
+    @staticmethod
+    def _timed_iter(profile: SearchProfile, iterator: Iterator[Dict], file_path: str,
+                    name: str) -> Iterator[Dict]:
+        """timed_iter 的生成器实现"""
+        perf_counter = time.perf_counter
+        seconds = 0.0
+        lines = 0
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += perf_counter() - start
+                    break
+                seconds += perf_counter() - start
+                lines += 1
+                yield item
+        finally:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            profile.add(name, seconds, files=1, lines=lines, size=size)
+            profile.exclude(seconds)
+
+    def cprofile_path(self) -> Optional[str]:
+        """
+        根据环境变量确定 cProfile 数据的保存路径
+
+        Returns:
+            输出文件路径，未启用时返回None
+        """
+        value = os.environ.get(self.CPROFILE_ENV, '').strip()
+        if not value or value.lower() in ('0', 'false', 'no', 'off'):
+            return None
+
+        file_name = f"search_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof"
+        if value.lower() in ('1', 'true', 'yes', 'on'):
+            return os.path.abspath(file_name)
+        if os.path.isdir(value) or value.endswith(('/', os.sep)):
+            os.makedirs(value, exist_ok=True)
+            return os.path.join(value, file_name)
+        return value
+
+    @contextmanager
+    def cprofile(self):
+        """环境变量启用时，使用 cProfile 分析 with 语句块（仅分析当前线程）并保存结果"""
+        path = self.cprofile_path()
+        if path is None:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            try:
+                profiler.dump_stats(path)
+                print(f"已保存性能分析数据: {path}")
+            except OSError as e:
+                print(f"保存性能分析数据失败: {e}")
+
+
+# 全局搜索性能统计实例
+search_profiler = SearchProfiler()
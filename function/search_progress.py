@@ -0,0 +1,281 @@
+"""
+搜索进度模块
+按文件字节数加权计算搜索进度并估计剩余时间，文件内部的进度按已产出的解析记录估计
+（缓存的解析结果按记录数，PDF 按页码，其余文件按之前文件的平均每条记录字节数）；
+解析结果迭代器每产出一条记录都检查取消标志，停止搜索时在当前行处理完后立即退出
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class SearchCancelled(BaseException):
+    """
+    搜索已取消
+
+    继承 BaseException 而不是 Exception：搜索流程中按文件捕获 Exception 以跳过出错的文件，
+    取消信号不能被这些处理代码吞掉
+    """
+
+
+class SearchProgress:
+    """单次搜索的进度与取消状态"""
+
+    # 还没有扫描完的文件可供参考时，估计每条解析记录对应的字节数
+    DEFAULT_BYTES_PER_RECORD = 48.0
+
+    def __init__(self, callback: Optional[Callable[[int, float], None]] = None, interval: float = 0.1):
+        """
+        初始化
+
+        Args:
+            callback: 进度回调，参数为 (百分比, 预计剩余秒数，未知时为 -1)
+            interval: 两次回调的最短间隔（秒）
+        """
+        self.callback = callback
+        self.interval = interval
+        self.cancelled = False
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._done_bytes = 0
+        self._done_files = set()
+        # 正在处理的文件 -> 已处理的字节数估计
+        self._current: Dict[str, float] = {}
+        self._parsed_bytes = 0
+        self._parsed_records = 0
+        self._start_time = time.perf_counter()
+        self._last_report = 0.0
+
+    def start(self, file_paths: List[str]):
+        """
+        开始计时并记录各文件的大小
+
+        Args:
+            file_paths: 要搜索的文件路径
+        """
+        self._sizes = {}
+        for file_path in file_paths:
+            try:
+                self._sizes[os.path.abspath(file_path)] = max(os.path.getsize(file_path), 1)
+            except OSError:
+                self._sizes[os.path.abspath(file_path)] = 1
+        self._total_bytes = sum(self._sizes.values())
+        self._done_bytes = 0
+        self._done_files = set()
+        self._current = {}
+        self._start_time = time.perf_counter()
+        self._last_report = 0.0
+
+    def cancel(self):
+        """请求取消搜索（由其他线程调用）"""
+        self.cancelled = True
+
+    def check(self):
+        """
+        检查是否已请求取消
+
+        Raises:
+            SearchCancelled: 已请求取消
+        """
+        if self.cancelled:
+            raise SearchCancelled()
+
+    def size_of(self, file_path: str) -> int:
+        """文件大小（不在本次搜索的文件列表中时返回0）"""
+        return self._sizes.get(os.path.abspath(file_path), 0)
+
+    def advance(self, file_path: str, fraction: float):
+        """
+        更新文件内部的进度
+
+        Args:
+            file_path: 文件路径
+            fraction: 已处理的比例（0-1）
+        """
+        key = os.path.abspath(file_path)
+        if key in self._done_files or key not in self._sizes:
+            return
+        processed = self._sizes[key] * min(max(fraction, 0.0), 0.99)
+        if processed > self._current.get(key, 0.0):
+            self._current[key] = processed
+            self.report()
+
+    def learn(self, file_path: str, records: int):
+        """
+        文件完整解析后记录每条解析记录的平均字节数，用于估计之后文件的内部进度
+
+        Args:
+            file_path: 文件路径
+            records: 解析记录数
+        """
+        size = self.size_of(file_path)
+        if size and records:
+            self._parsed_bytes += size
+            self._parsed_records += records
+
+    @property
+    def bytes_per_record(self) -> float:
+        """每条解析记录的平均字节数"""
+        if self._parsed_records:
+            return self._parsed_bytes / self._parsed_records
+        return self.DEFAULT_BYTES_PER_RECORD
+
+    def file_done(self, file_path: str):
+        """
+        标记文件已处理完
+
+        Args:
+            file_path: 文件路径
+        """
+        key = os.path.abspath(file_path)
+        if key in self._done_files:
+            return
+        self._done_files.add(key)
+        self._current.pop(key, None)
+        self._done_bytes += self._sizes.get(key, 0)
+        self.report()
+
+    @property
+    def percent(self) -> int:
+        """按字节数加权的进度百分比"""
+        if not self._total_bytes:
+            return 0
+        processed = self._done_bytes + sum(self._current.values())
+        return min(100, int(processed * 100 / self._total_bytes))
+
+    @property
+    def eta(self) -> float:
+        """预计剩余秒数，进度不足 1% 无法估计时返回 -1"""
+        processed = self._done_bytes + sum(self._current.values())
+        if not self._total_bytes or processed < self._total_bytes * 0.01:
+            return -1.0
+        elapsed = time.perf_counter() - self._start_time
+        return max(0.0, elapsed * (self._total_bytes - processed) / processed)
+
+    def report(self, force: bool = False):
+        """
+        调用进度回调（两次回调之间至少间隔 interval 秒）
+
+        Args:
+            force: 是否忽略间隔立即回调
+        """
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        self.callback(self.percent, self.eta)
+
+    @staticmethod
+    def format_eta(seconds: float) -> str:
+        """
+        剩余时间转为易读的文本
+
+        Args:
+            seconds: 剩余秒数，负数表示未知
+
+        Returns:
+            如 "剩余约 1分05秒"，未知时返回空字符串
+        """
+        if seconds < 0:
+            return ""
+        seconds = int(round(seconds))
+        if seconds >= 60:
+            return f"剩余约 {seconds // 60}分{seconds % 60:02d}秒"
+        return f"剩余约 {seconds}秒"
+
+
+class SearchProgressTracker:
+    """
+    搜索进度入口
+
+    进度对象通过 activate() 绑定到当前线程，搜索引擎用 track() 包装解析结果迭代器；
+    当前线程没有绑定进度对象时（如后台预解析、命令行统计）这些调用不做任何事
+    """
+
+    def __init__(self):
+        """初始化进度入口"""
+        self._local = threading.local()
+
+    def current(self) -> Optional[SearchProgress]:
+        """返回当前线程正在使用的进度对象"""
+        return getattr(self._local, 'progress', None)
+
+    @contextmanager
+    def activate(self, progress: SearchProgress):
+        """
+        在 with 语句块内将进度对象绑定到当前线程
+
+        Args:
+            progress: 进度对象
+        """
+        previous = self.current()
+        self._local.progress = progress
+        try:
+            yield progress
+        finally:
+            self._local.progress = previous
+
+    def check(self):
+        """
+        检查当前线程的搜索是否已取消
+
+        Raises:
+            SearchCancelled: 已请求取消
+        """
+        progress = self.current()
+        if progress is not None:
+            progress.check()
+
+    def track(self, iterator: Iterable[Dict], file_path: str, expected: Optional[int] = None) -> Iterator[Dict]:
+        """
+        包装解析结果迭代器，每产出一条记录检查取消标志并更新文件内部的进度
+
+        Args:
+            iterator: 解析结果迭代器
+            file_path: 文件路径
+            expected: 已知的记录总数（如缓存的解析结果），None 表示按平均字节数估计
+
+        Returns:
+            解析结果迭代器，当前线程未绑定进度对象时原样返回
+        """
+        progress = self.current()
+        if progress is None:
+            return iterator
+        return self._track(progress, iter(iterator), file_path, expected)
+
+    @staticmethod
+    def _track(progress: SearchProgress, iterator: Iterator[Dict], file_path: str,
+               expected: Optional[int]) -> Iterator[Dict]:
+        """track 的生成器实现"""
+        size = progress.size_of(file_path)
+        is_pdf = file_path.lower().endswith('.pdf')
+        pages = None
+        records = 0
+        for item in iterator:
+            if progress.cancelled:
+                raise SearchCancelled()
+            records += 1
+            if size and records % 64 == 0:
+                if expected:
+                    fraction = records / expected
+                elif is_pdf and item.get('page'):
+                    if pages is None:
+                        from function.pdf_extractor import pdf_page_extractor
+                        pages = max(pdf_page_extractor.page_count(file_path), 1)
+                    fraction = (item['page'] - 1) / pages
+                else:
+                    fraction = records * progress.bytes_per_record / size
+                progress.advance(file_path, fraction)
+            yield item
+        progress.check()
+        if expected is None and not is_pdf:
+            progress.learn(file_path, records)
+
+
+# 全局搜索进度入口
+search_progress = SearchProgressTracker()
@@ -4,12 +4,12 @@
 """
 
 import re
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator
 from pathlib import Path
+from function.encoding_detector import encoding_detector
+from function.line_classifier import line_classifier
 
 
-import re
-
 class SubtitleParser:
     """字幕文件解析器基类"""
 
@@ -23,319 +23,254 @@ class SubtitleParser:
         Returns:
             解析结果列表，每个元素包含时间轴、文本、集数等内容
         """
-        raise NotImplementedError("子类必须实现parse方法")
+        return list(self.iter_parse(file_path))
 
-
-class SrtParser(SubtitleParser):
-    """SRT字幕文件解析器"""
-
-    def parse(self, file_path: str) -> List[Dict]:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        解析SRT字幕文件
+        逐条解析字幕文件（生成器），按文件顺序产出每条字幕
 
         Args:
-            file_path: SRT文件路径
+            file_path: 字幕文件路径
 
-        Returns:
-            解析结果列表
+        Yields:
+            解析结果，包含时间轴、文本、集数等内容
         """
-        results = []
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        # 遍历所有行，寻找字幕块
-        i = 0
-        current_episode = "未知集数"  # 默认集数
-
-        while i < len(lines):
-            line = lines[i].strip()
+        raise NotImplementedError("子类必须实现iter_parse方法")
 
-            if line.isdigit():  # 这是一个字幕块的开始
-                line_number = int(line)
-
-                # 检查下一行是否是时间轴
-                if i + 1 < len(lines):
-                    time_line = lines[i + 1].strip()
-                    if '-->' in time_line:
-                        time_axis = time_line
-
-                        # 提取内容行
-                        content_lines = []
-                        j = i + 2
-                        while j < len(lines) and lines[j].strip() != '':
-                            content_line = lines[j].strip()
-
-                            # 检查是否是集数标题（通常格式为 "Episode X", "第X集", "#X" 等）
-                            if self.is_episode_title(content_line):
-                                current_episode = content_line
-                            else:
-                                content_lines.append(content_line)
-
-                            j += 1
-
-                        content = '\n'.join(content_lines)
+    def is_episode_title(self, line: str) -> bool:
+        """
+        检查一行是否是集数标题（使用所有解析器共享的预编译分类器）
 
-                        results.append({
-                            'line_number': line_number,
-                            'time_axis': time_axis,
-                            'content': content,
-                            'episode': current_episode,
-                            'file_path': file_path
-                        })
+        Args:
+            line: 要检查的行
 
-                        # 跳过已处理的行
-                        i = j
-                        continue
+        Returns:
+            是否是集数标题
+        """
+        return line_classifier.is_episode_title(line)
 
-            i += 1
 
-        return results
+class SrtParser(SubtitleParser):
+    """SRT字幕文件解析器"""
 
-    def is_episode_title(self, line: str) -> bool:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        检查一行是否是集数标题
+        逐块解析SRT字幕文件
 
         Args:
-            line: 要检查的行
+            file_path: SRT文件路径
 
-        Returns:
-            是否是集数标题
+        Yields:
+            解析结果
         """
-        # 检查常见的集数标题格式
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^\s*#\s+\S+',         # # title
-            r'^\s*##\s+\S+',        # ## title
-            r'^\s*###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        return False
+        current_episode = "未知集数"  # 默认集数
+
+        with encoding_detector.open_text(file_path) as f:
+            lines = iter(f)
+            # 上一行是纯数字时记录其序号，等待下一行的时间轴确认字幕块开始
+            pending_number = None
+
+            for raw_line in lines:
+                line = raw_line.strip()
+
+                if pending_number is not None and '-->' in line:
+                    time_axis = line
+
+                    # 提取内容行，直到空行结束当前字幕块
+                    content_lines = []
+                    for raw_content_line in lines:
+                        content_line = raw_content_line.strip()
+                        if content_line == '':
+                            break
+
+                        # 检查是否是集数标题（通常格式为 "Episode X", "第X集", "#X" 等）
+                        if self.is_episode_title(content_line):
+                            current_episode = content_line
+                        else:
+                            content_lines.append(content_line)
+
+                    start_ms, end_ms = line_classifier.time_range(time_axis)
+                    yield {
+                        'line_number': pending_number,
+                        'time_axis': time_axis,
+                        'start_ms': start_ms,
+                        'end_ms': end_ms,
+                        'content': '\n'.join(content_lines),
+                        'episode': current_episode,
+                        'file_path': file_path
+                    }
+
+                    pending_number = None
+                    continue
+
+                # 纯数字行可能是一个字幕块的开始
+                pending_number = int(line) if line.isdigit() else None
 
 
 class AssParser(SubtitleParser):
     """ASS/SSA字幕文件解析器"""
     
-    def parse(self, file_path: str) -> List[Dict]:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        解析ASS/SSA字幕文件
+        逐行解析ASS/SSA字幕文件
         
         Args:
             file_path: ASS/SSA文件路径
             
-        Returns:
-            解析结果列表
+        Yields:
+            解析结果
         """
-        results = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # 查找Dialogue行
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith('Dialogue:'):
+        with encoding_detector.open_text(file_path) as f:
+            # 查找Dialogue行
+            for i, line in enumerate(f):
+                line = line.strip()
+                if not line.startswith('Dialogue:'):
+                    continue
+
                 # Dialogue格式: Dialogue: Mark,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text
                 parts = line.split(',', 9)  # 分割为10个部分
                 if len(parts) >= 10:
                     start_time = parts[1]  # 开始时间
                     end_time = parts[2]    # 结束时间
                     text = parts[9]        # 字幕文本
-                    
+
                     time_axis = f"{start_time} --> {end_time}"
-                    
-                    results.append({
+                    start_ms, end_ms = line_classifier.time_range(time_axis)
+                    yield {
                         'line_number': i + 1,
                         'time_axis': time_axis,
+                        'start_ms': start_ms,
+                        'end_ms': end_ms,
                         'content': text,
                         'file_path': file_path
-                    })
-        
-        return results
+                    }
 
 
 class VttParser(SubtitleParser):
     """WebVTT字幕文件解析器"""
     
-    def parse(self, file_path: str) -> List[Dict]:
+    # 时间轴行 (HH:MM:SS.mmm --> HH:MM:SS.mmm)
+    TIME_PATTERN = re.compile(r'\d{2}:\d{2}:\d{2}\.\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}\.\d{3}')
+
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        解析VTT字幕文件
+        逐块解析VTT字幕文件
         
         Args:
             file_path: VTT文件路径
             
-        Returns:
-            解析结果列表
+        Yields:
+            解析结果
         """
-        results = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # 移除可能的WEBVTT头部
-        content = re.sub(r'^WEBVTT\s*\n(?:\s*NOTE.*?\n)?\s*\n?', '', content, flags=re.DOTALL | re.IGNORECASE)
-        
-        # 按空白行分割块
-        blocks = re.split(r'\n\s*\n', content.strip())
-        
         line_number = 1
-        for block in blocks:
-            block = block.strip()
-            if not block:
-                continue
-            
-            lines = block.split('\n')
-            if len(lines) < 2:
+
+        for block_index, block in enumerate(self._iter_blocks(file_path)):
+            if block_index == 0:
+                block = self._strip_header(block)
+
+            if len(block) < 2:
                 continue
-            
-            # 检查是否为时间轴行 (HH:MM:SS.mmm --> HH:MM:SS.mmm)
-            time_pattern = r'\d{2}:\d{2}:\d{2}\.\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}\.\d{3}'
-            if re.match(time_pattern, lines[0].strip()):
-                time_axis = lines[0].strip()
-                
-                # 提取文本内容
-                text_lines = lines[1:]
-                text_content = '\n'.join(text_lines).strip()
-                
-                results.append({
+
+            # 检查是否为时间轴行
+            if self.TIME_PATTERN.match(block[0].strip()):
+                time_axis = block[0].strip()
+                start_ms, end_ms = line_classifier.time_range(time_axis)
+                yield {
                     'line_number': line_number,
                     'time_axis': time_axis,
-                    'content': text_content,
+                    'start_ms': start_ms,
+                    'end_ms': end_ms,
+                    'content': '\n'.join(block[1:]).strip(),
                     'file_path': file_path
-                })
-                
+                }
+
                 line_number += 1
-        
-        return results
+
+    def _strip_header(self, block: List[str]) -> List[str]:
+        """
+        移除首个块中可能的WEBVTT头部（以及紧随其后的NOTE行）
+
+        Args:
+            block: 文件的第一个块
+
+        Returns:
+            去除头部后的行列表
+        """
+        if block and block[0].strip().upper() == 'WEBVTT':
+            block = block[1:]
+            if block and block[0].strip().upper().startswith('NOTE'):
+                block = block[1:]
+        return block
+
+    def _iter_blocks(self, file_path: str) -> Iterator[List[str]]:
+        """
+        按空白行切分VTT文件，逐块产出（不读入整个文件）
+
+        Args:
+            file_path: VTT文件路径
+
+        Yields:
+            每个块的行列表（已去除行尾换行符）
+        """
+        block = []
+
+        with encoding_detector.open_text(file_path) as f:
+            for raw_line in f:
+                line = raw_line.rstrip('\n')
+                if line.strip():
+                    block.append(line)
+                elif block:
+                    yield block
+                    block = []
+
+        if block:
+            yield block
 
 
 class TimestampParser(SubtitleParser):
     """时间戳文本文件解析器 - 处理 [00:00:49] 格式"""
     
-    def parse(self, file_path: str) -> List[Dict]:
+    def iter_parse(self, file_path: str) -> Iterator[Dict]:
         """
-        解析带时间戳的文本文件，格式如 [00:00:49] 内容
+        逐行解析带时间戳的文本文件，格式如 [00:00:49] 内容
         
         Args:
             file_path: 文本文件路径
             
-        Returns:
-            解析结果列表
+        Yields:
+            解析结果
         """
-        results = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
         line_number = 1
         current_episode = "未知集数"  # 默认集数
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # 检查是否是集数标题（Markdown格式或其他格式）
-            if self.is_episode_title(line):
-                current_episode = line
-                line_number += 1
-                continue
-            
-            # 匹配 [HH:MM:SS] 或 [H:MM:SS] 格式的时间戳
-            timestamp_pattern = r'\[(\d{1,2}:\d{2}:\d{2})\]\s*(.*)'
-            match = re.match(timestamp_pattern, line)
-            
-            if match:
-                time_axis = f"[{match.group(1)}]"  # 保留原始格式
-                content = match.group(2).strip()
-                
-                results.append({
-                    'line_number': line_number,
-                    'time_axis': time_axis,
-                    'content': content,
-                    'episode': current_episode,
-                    'file_path': file_path
-                })
-            
-            line_number += 1
-        
-        return results
-    
-    def is_episode_title(self, line: str) -> bool:
-        """
-        检查一行是否是集数标题
 
-        Args:
-            line: 要检查的行
+        with encoding_detector.open_text(file_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+
+                # 检查是否是集数标题（Markdown格式或其他格式）
+                if self.is_episode_title(line):
+                    current_episode = line
+                    line_number += 1
+                    continue
+
+                # 匹配 [HH:MM:SS] 或 [H:MM:SS] 格式的时间戳
+                timestamp = line_classifier.match_timestamp_line(line)
+                if timestamp:
+                    time_axis, content = timestamp
+                    start_ms, end_ms = line_classifier.time_range(time_axis)
+                    yield {
+                        'line_number': line_number,
+                        'time_axis': time_axis,  # 保留原始格式
+                        'start_ms': start_ms,
+                        'end_ms': end_ms,
+                        'content': content,
+                        'episode': current_episode,
+                        'file_path': file_path
+                    }
 
-        Returns:
-            是否是集数标题
-        """
-        # 检查常见的集数标题格式
-        episode_patterns = [
-            r'^第\d+集',           # 第1集, 第2集, ...
-            r'^Episode\s*\d+',     # Episode 1, Episode 2, ...
-            r'^EP\s*\d+',         # EP 1, EP 2, ...
-            r'^#\d+',             # #1, #2, ...
-            r'^[Ss]\d+[Ee]\d+',   # S1E1, S2E5, ...
-            r'^[Cc]hapter\s+\d+',   # Chapter 1, Chapter 2, ...
-            r'^#\s+\d+',           # # 1, # 2, ...
-            r'^#\s+\d+\.\d+',      # # 3.2, # 1.1, ...
-            r'^##\s+\d+',         # ## 1, ## 2, ...
-            r'^##\s+\d+\.\d+',    # ## 3.2, ## 1.1, ...
-            r'^###\s+\d+',        # ### 1, ### 2, ...
-            r'^###\s+\d+\.\d+',   # ### 3.2, ### 1.1, ...
-            # 包含特殊字符的集数标题
-            r'^[-]*#\s+\d+',      # ---# 1, --# 2, ...
-            r'^[-]*#\s+\d+\.\d+', # ---# 3.2, --# 1.1, ...
-            r'^[-]*##\s+\d+',     # ---## 1, --## 2, ...
-            r'^[-]*##\s+\d+\.\d+', # ---## 3.2, --## 1.1, ...
-            r'^[-]*###\s+\d+',    # ---### 1, --### 2, ...
-            r'^[-]*###\s+\d+\.\d+', # ---### 3.2, --### 1.1, ...
-            # 任意标题（以 # 开头，后面跟任意非空字符）
-            r'^[-]+\s+#\s+\S+',  # ---# title
-            r'^[-]+\s+##\s+\S+', # ---## title
-            r'^[-]+\s+###\s+\S+', # ---### title
-            # 任何以 # 开头的行（独立行）
-            r'^\s*#\s+\S+',         # # title
-            r'^\s*##\s+\S+',        # ## title
-            r'^\s*###\s+\S+',       # ### title
-        ]
-
-        line_lower = line.lower()
-        for pattern in episode_patterns:
-            if re.match(pattern, line_lower) or re.match(pattern, line):
-                return True
-
-        return False
+                line_number += 1
 
 
 def get_parser(file_path: str) -> SubtitleParser:
@@ -358,9 +293,9 @@ def get_parser(file_path: str) -> SubtitleParser:
         return VttParser()
     elif ext in ['.txt', '.md']:  # 对于文本文件，检查是否包含时间戳
         # 先尝试时间戳解析
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        with encoding_detector.open_text(file_path) as f:
             sample = f.read(1024)  # 读取前1024字符
-            if re.search(r'\[\d{1,2}:\d{2}:\d{2}\]', sample):
+            if line_classifier.contains_time_axis(sample):
                 return TimestampParser()
         # 如果没有时间戳，则使用普通文本解析
         from function.document_parser import get_document_parser
@@ -380,4 +315,18 @@ def parse_subtitle_file(file_path: str) -> List[Dict]:
         解析结果列表
     """
     parser = get_parser(file_path)
-    return parser.parse(file_path)
\ No newline at end of file
+    return parser.parse(file_path)
+
+
+def iter_subtitle_file(file_path: str) -> Iterator[Dict]:
+    """
+    逐条解析字幕文件的统一接口（生成器），不会一次性构建完整结果列表
+
+    Args:
+        file_path: 字幕文件路径
+
+    Yields:
+        解析结果
+    """
+    parser = get_parser(file_path)
+    yield from parser.iter_parse(file_path)
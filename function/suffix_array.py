@@ -0,0 +1,380 @@
+"""
+后缀数组模块
+把文件各行（转换为小写，可选去除空白）用分隔符连接成一个文本并建立后缀数组和行偏移表，
+任意子串（可以跨越韩语语节和助词）的查找、出现次数统计和 KWIC 上下文都只需 O(m log n) 的二分查找；
+后缀数组用 NumPy 按前缀倍增法构建，NumPy 为可选依赖
+"""
+
+import heapq
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from function.index_cache import FileIndexCache
+
+
+# 行之间的分隔符（查询中不会出现，保证匹配不跨行）
+LINE_SEPARATOR = '\x00'
+
+
+def _import_numpy():
+    """导入 NumPy（可选依赖）"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("请安装numpy: pip install numpy")
+    return numpy
+
+
+def build_suffix_array(text: str):
+    """
+    构建后缀数组（前缀倍增法，每轮对 (rank[i], rank[i + k]) 排序）
+
+    Args:
+        text: 文本
+
+    Returns:
+        后缀起始位置按后缀字典序排列的 NumPy 数组
+    """
+    np = _import_numpy()
+    n = len(text)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    _, rank = np.unique(codes, return_inverse=True)
+    rank = rank.astype(np.int64)
+    k = 1
+    while True:
+        # 排序键 rank[i] * (n + 1) + rank[i + k] + 1，超出文本末尾的部分为 0
+        key = rank * (n + 1)
+        key[:n - k] += rank[k:] + 1
+        sa = np.argsort(key)
+        sorted_key = key[sa]
+        new_rank = np.empty(n, dtype=np.int64)
+        new_rank[0] = 0
+        np.cumsum(sorted_key[1:] != sorted_key[:-1], out=new_rank[1:])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = new_rank
+        if new_rank[-1] == n - 1 or k >= n:
+            return sa
+        k *= 2
+
+
+class SuffixArrayIndex:
+    """单个文件的后缀数组索引"""
+
+    def __init__(self, records: Iterable[Dict], ignore_whitespace: bool = False):
+        """
+        建立索引
+
+        Args:
+            records: 文件的解析结果
+            ignore_whitespace: 是否去除空白（查询时同样去除，使 사랑해요 与 사랑 해요 都能匹配）
+        """
+        np = _import_numpy()
+        self.ignore_whitespace = ignore_whitespace
+        contents = [record.get('content', '') for record in records]
+        parts = [content.lower() for content in contents]
+        # 去除空白或小写后长度变化时（如 'İ'.lower() 为两个字符）记录规范化文本中每个字符在原行中的位置
+        use_offsets = ignore_whitespace or any(len(part) != len(content) for part, content in zip(parts, contents))
+        char_offsets = [] if use_offsets else None
+        starts = []
+        position = 0
+        for i, content in enumerate(contents):
+            if use_offsets:
+                parts[i], offsets = self._map_line(content, parts[i], ignore_whitespace)
+                char_offsets.extend(offsets)
+                char_offsets.append(len(content))
+            starts.append(position)
+            position += len(parts[i]) + 1
+        self.text = LINE_SEPARATOR.join(parts) + LINE_SEPARATOR
+        self.line_starts = np.array(starts, dtype=np.int64)
+        self.char_offsets = np.array(char_offsets, dtype=np.int64) if use_offsets else None
+        self.suffix_array = build_suffix_array(self.text)
+
+    @staticmethod
+    def _map_line(content: str, lowered: str, ignore_whitespace: bool) -> Tuple[str, List[int]]:
+        """
+        取得规范化后的行及其中每个字符在原行中的位置
+
+        Args:
+            content: 原行
+            lowered: 原行的小写形式
+            ignore_whitespace: 是否去除空白
+
+        Returns:
+            (规范化后的行, 每个字符在原行中的位置)
+        """
+        if len(lowered) == len(content):
+            sources = range(len(content))
+        else:
+            sources = [i for i, char in enumerate(content) for _ in range(len(char.lower()))]
+        if not ignore_whitespace:
+            return lowered, list(sources)
+        kept = [i for i, char in enumerate(lowered) if not char.isspace()]
+        return ''.join(lowered[i] for i in kept), [sources[i] for i in kept]
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def normalize(self, pattern: str) -> str:
+        """按索引的规则规范化查询（小写，可选去除空白）"""
+        pattern = pattern.lower()
+        if self.ignore_whitespace:
+            pattern = ''.join(pattern.split())
+        return pattern
+
+    def _range(self, pattern: str) -> Tuple[int, int]:
+        """二分查找以 pattern 开头的后缀在后缀数组中的范围"""
+        text = self.text
+        sa = self.suffix_array
+        m = len(pattern)
+        lo, hi = 0, len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(sa[mid])
+            if text[start:start + m] < pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = lo
+        hi = len(sa)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(sa[mid])
+            if text[start:start + m] <= pattern:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    def count(self, pattern: str) -> int:
+        """
+        子串出现次数
+
+        Args:
+            pattern: 查询子串
+
+        Returns:
+            出现次数
+        """
+        pattern = self.normalize(pattern)
+        if not pattern or LINE_SEPARATOR in pattern:
+            return 0
+        first, last = self._range(pattern)
+        return last - first
+
+    def occurrences(self, pattern: str):
+        """
+        子串出现的位置（按后缀字典序，即按右侧上下文排序）
+
+        Args:
+            pattern: 查询子串
+
+        Returns:
+            规范化文本中的位置数组
+        """
+        np = _import_numpy()
+        pattern = self.normalize(pattern)
+        if not pattern or LINE_SEPARATOR in pattern:
+            return np.zeros(0, dtype=np.int64)
+        first, last = self._range(pattern)
+        return self.suffix_array[first:last]
+
+    def line_indexes(self, positions) -> List[int]:
+        """
+        位置所在的行序号（去重、升序）
+
+        Args:
+            positions: 规范化文本中的位置数组
+
+        Returns:
+            行序号列表
+        """
+        np = _import_numpy()
+        lines = np.searchsorted(self.line_starts, positions, side='right') - 1
+        return np.unique(lines).tolist()
+
+    def lines(self, pattern: str) -> List[int]:
+        """
+        包含子串的行序号（升序）
+
+        Args:
+            pattern: 查询子串
+
+        Returns:
+            行序号列表
+        """
+        return self.line_indexes(self.occurrences(pattern))
+
+    def locate(self, position: int, length: int) -> Tuple[int, int, int]:
+        """
+        把规范化文本中的匹配转换为原行中的范围
+
+        Args:
+            position: 规范化文本中的位置
+            length: 规范化后的匹配长度
+
+        Returns:
+            (行序号, 原行中的起始位置, 原行中的结束位置)
+        """
+        line_index = int(self.line_starts.searchsorted(position, side='right')) - 1
+        offset = position - int(self.line_starts[line_index])
+        if self.char_offsets is None:
+            return line_index, offset, offset + length
+        return line_index, int(self.char_offsets[position]), int(self.char_offsets[position + length - 1]) + 1
+
+
+class SuffixArraySearcher:
+    """使用后缀数组索引搜索文件（供搜索引擎作为精确子串搜索的后端）"""
+
+    # 可选的子串搜索后端
+    BACKENDS = ('scan', 'suffix_array')
+
+    def __init__(self, backend: str = 'scan', ignore_whitespace: bool = False,
+                 max_size: int = 50000000):
+        """
+        初始化
+
+        Args:
+            backend: 'scan' 逐行扫描（默认），'suffix_array' 使用后缀数组索引
+            ignore_whitespace: 是否忽略空白匹配（사랑해요 与 사랑 해요 互相匹配）
+            max_size: 索引缓存容量（按字符数计算）
+        """
+        if backend not in self.BACKENDS:
+            print(f"未知的子串搜索后端: {backend}，使用逐行扫描")
+            backend = 'scan'
+        self.backend = backend
+        self.ignore_whitespace = ignore_whitespace
+        self._cache = FileIndexCache(self._build, max_size=max_size)
+
+    @property
+    def enabled(self) -> bool:
+        """是否使用后缀数组后端"""
+        return self.backend == 'suffix_array'
+
+    def _build(self, records: List[Dict]) -> SuffixArrayIndex:
+        """建立索引（供缓存调用）"""
+        return SuffixArrayIndex(records, self.ignore_whitespace)
+
+    def get_index(self, file_path: str, fingerprint: Optional[Tuple[int, int]],
+                  records: List[Dict]) -> SuffixArrayIndex:
+        """
+        获取文件的后缀数组索引
+
+        Args:
+            file_path: 文件路径
+            fingerprint: 文件指纹
+            records: 文件的完整解析结果
+
+        Returns:
+            后缀数组索引
+        """
+        index = self._cache.get(file_path, fingerprint, records)
+        if index.ignore_whitespace != self.ignore_whitespace:
+            # 设置改变后重新建立
+            self._cache.invalidate(file_path)
+            index = self._cache.get(file_path, fingerprint, records)
+        return index
+
+    def matching_lines(self, index: SuffixArrayIndex, records: List[Dict], keywords: List[str],
+                       case_sensitive: bool = False) -> Dict[int, List[str]]:
+        """
+        找出包含任一关键词的行（搜索和只计数的统计共用，两者的命中行一致）
+
+        Args:
+            index: 后缀数组索引
+            records: 文件的完整解析结果
+            keywords: 关键词列表
+            case_sensitive: 是否区分大小写（在小写索引的候选行上确认，忽略空白时比较去除空白后的内容）
+
+        Returns:
+            行序号 -> 该行命中的关键词（不区分大小写时为小写形式）
+        """
+        search_keywords = keywords if case_sensitive else [keyword.lower() for keyword in keywords]
+        line_keywords: Dict[int, List[str]] = {}
+        for keyword, search_keyword in zip(keywords, search_keywords):
+            confirm_keyword = ''.join(keyword.split()) if index.ignore_whitespace else keyword
+            for line_index in index.lines(keyword):
+                if case_sensitive:
+                    content = records[line_index].get('content', '')
+                    if index.ignore_whitespace:
+                        content = ''.join(content.split())
+                    if confirm_keyword not in content:
+                        continue
+                line_keywords.setdefault(line_index, []).append(search_keyword)
+        return line_keywords
+
+    def search(self, index: SuffixArrayIndex, records: List[Dict], keywords: List[str],
+               case_sensitive: bool = False) -> List[Dict]:
+        """
+        搜索包含任一关键词的行（不忽略空白时结果与逐行子串匹配一致）
+
+        Args:
+            index: 后缀数组索引
+            records: 文件的完整解析结果
+            keywords: 关键词列表
+            case_sensitive: 是否区分大小写（在小写索引的候选行上确认）
+
+        Returns:
+            搜索结果列表（按行顺序）
+        """
+        line_keywords = self.matching_lines(index, records, keywords, case_sensitive)
+        results = []
+        for line_index in sorted(line_keywords):
+            result_item = records[line_index].copy()
+            result_item['matched_keywords'] = line_keywords[line_index]
+            results.append(result_item)
+        return results
+
+    def iter_kwic(self, index: SuffixArrayIndex, records: List[Dict], pattern: str,
+                  width: int = 30) -> Iterator[Dict]:
+        """
+        按右侧上下文排序产出关键词的每次出现（KWIC）
+
+        Args:
+            index: 后缀数组索引
+            records: 文件的完整解析结果
+            pattern: 查询子串
+            width: 左右上下文的字符数
+
+        Yields:
+            {'left', 'keyword', 'right', 'sort_key', 以及所在行的解析结果字段}
+        """
+        length = len(index.normalize(pattern))
+        for position in index.occurrences(pattern).tolist():
+            line_index, start, end = index.locate(position, length)
+            record = records[line_index]
+            content = record.get('content', '')
+            item = record.copy()
+            item['left'] = content[max(0, start - width):start]
+            item['keyword'] = content[start:end]
+            item['right'] = content[end:end + width]
+            item['sort_key'] = index.text[position:position + length + width]
+            yield item
+
+    def merge_kwic(self, streams: List[Iterator[Dict]], sort: str = 'right') -> List[Dict]:
+        """
+        合并多个文件的 KWIC 结果
+
+        Args:
+            streams: 各文件按右侧上下文排序的 KWIC 结果
+            sort: 'right' 按关键词及右侧上下文排序，'left' 按左侧上下文（从关键词向左）排序
+
+        Returns:
+            排序后的 KWIC 结果
+        """
+        if sort == 'left':
+            items = [item for stream in streams for item in stream]
+            items.sort(key=lambda item: (item['left'][::-1].lower(), item['sort_key']))
+            return items
+        return list(heapq.merge(*streams, key=lambda item: item['sort_key']))
+
+
+def _create_suffix_array_searcher() -> SuffixArraySearcher:
+    """根据配置文件创建全局后缀数组搜索实例"""
+    from function.config_manager import config_manager
+    settings = config_manager.get_search_settings()
+    return SuffixArraySearcher(settings['substring_backend'], settings['ignore_whitespace'])
+
+
+# 全局后缀数组搜索实例
+suffix_array_searcher = _create_suffix_array_searcher()
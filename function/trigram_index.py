@@ -0,0 +1,186 @@
+"""
+三元组索引模块
+将正则表达式分析为必须出现的字面三元组组合（参照 Google Code Search 的做法），
+用每个文件的三元组倒排索引筛选候选行，只在候选行上运行正则表达式；
+无法提取字面量的正则表达式返回 None，由调用方退回全量扫描
+"""
+
+import re
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python 3.10 及更早版本
+    import sre_parse
+    import sre_constants
+
+from function.index_cache import FileIndexCache
+
+
+# 三元组查询：None 表示不限制（所有行都是候选），字符串为单个三元组，
+# ('and', [...]) / ('or', [...]) 为子查询的交集/并集
+TrigramQuery = Union[None, str, Tuple[str, list]]
+
+
+class RegexTrigramAnalyzer:
+    """正则表达式三元组分析器"""
+
+    # 重复次数固定时展开为字面量的最大次数
+    MAX_LITERAL_REPEAT = 8
+
+    def analyze(self, pattern: str) -> TrigramQuery:
+        """
+        分析正则表达式匹配的行必须包含的三元组（按小写比较）
+
+        Args:
+            pattern: 正则表达式
+
+        Returns:
+            三元组查询，无法提取时返回None
+        """
+        try:
+            parsed = sre_parse.parse(pattern)
+        except (re.error, RecursionError, OverflowError):
+            return None
+        return self._analyze_sequence(parsed)
+
+    def _analyze_sequence(self, items: Iterable) -> TrigramQuery:
+        """分析顺序排列的正则节点，连续的字面字符组成字面串"""
+        clauses: List[TrigramQuery] = []
+        run: List[str] = []
+
+        def flush():
+            if len(run) >= 3:
+                text = ''.join(run)
+                clauses.extend(text[i:i + 3] for i in range(len(text) - 2))
+            run.clear()
+
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                char = chr(av).lower()
+                if len(char) == 1:
+                    run.append(char)
+                else:
+                    flush()
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                        getattr(sre_constants, 'POSSESSIVE_REPEAT', None)):
+                low, high, body = av
+                body = list(body)
+                # 固定次数重复单个字面字符（如 a{3}）时展开后继续拼接字面串
+                if (low == high and low <= self.MAX_LITERAL_REPEAT and len(body) == 1
+                        and body[0][0] is sre_constants.LITERAL and len(chr(body[0][1]).lower()) == 1):
+                    run.extend(chr(body[0][1]).lower() * low)
+                    continue
+                flush()
+                if low >= 1:
+                    clauses.append(self._analyze_sequence(body))
+            elif op is sre_constants.SUBPATTERN:
+                flush()
+                clauses.append(self._analyze_sequence(av[-1]))
+            elif op is getattr(sre_constants, 'ATOMIC_GROUP', None):
+                flush()
+                clauses.append(self._analyze_sequence(av))
+            elif op is sre_constants.BRANCH:
+                flush()
+                clauses.append(self._or([self._analyze_sequence(branch) for branch in av[1]]))
+            else:
+                # 字符类、任意字符、断言、反向引用等无法确定字面量
+                flush()
+        flush()
+        return self._and(clauses)
+
+    @staticmethod
+    def _and(clauses: List[TrigramQuery]) -> TrigramQuery:
+        """合并为交集查询，忽略不限制的子查询"""
+        clauses = [clause for clause in clauses if clause is not None]
+        unique = list(OrderedDict.fromkeys(clause for clause in clauses if isinstance(clause, str)))
+        unique.extend(clause for clause in clauses if not isinstance(clause, str))
+        if not unique:
+            return None
+        if len(unique) == 1:
+            return unique[0]
+        return ('and', unique)
+
+    @staticmethod
+    def _or(clauses: List[TrigramQuery]) -> TrigramQuery:
+        """合并为并集查询，任一子查询不限制时整体不限制"""
+        if not clauses or any(clause is None for clause in clauses):
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return ('or', clauses)
+
+
+class TrigramIndex:
+    """单个文件的三元组倒排索引：三元组 -> 包含它的记录序号"""
+
+    def __init__(self, records: Iterable[Dict]):
+        """
+        建立索引（按小写内容）
+
+        Args:
+            records: 文件的解析结果
+        """
+        postings: Dict[str, array] = {}
+        count = 0
+        for index, record in enumerate(records):
+            content = record.get('content', '').lower()
+            for trigram in {content[i:i + 3] for i in range(len(content) - 2)}:
+                posting = postings.get(trigram)
+                if posting is None:
+                    posting = postings[trigram] = array('I')
+                posting.append(index)
+                count += 1
+        self._postings = postings
+        self.posting_count = count
+
+    def candidates(self, query: TrigramQuery) -> Optional[Set[int]]:
+        """
+        计算满足查询的记录序号
+
+        Args:
+            query: 三元组查询
+
+        Returns:
+            记录序号集合，查询不限制时返回None
+        """
+        if query is None:
+            return None
+        if isinstance(query, str):
+            return set(self._postings.get(query, ()))
+
+        op, clauses = query
+        if op == 'or':
+            result: Set[int] = set()
+            for clause in clauses:
+                matched = self.candidates(clause)
+                if matched is None:
+                    return None
+                result |= matched
+            return result
+
+        # 交集：先处理最短的倒排列表，结果为空时提前结束
+        result = None
+        for clause in sorted(clauses, key=self._estimate):
+            matched = self.candidates(clause)
+            if matched is None:
+                continue
+            result = matched if result is None else result & matched
+            if not result:
+                break
+        return result
+
+    def _estimate(self, query: TrigramQuery) -> int:
+        """估计子查询的结果数量，用于安排交集顺序"""
+        if isinstance(query, str):
+            return len(self._postings.get(query, ()))
+        return len(self._postings)
+
+
+# 全局正则表达式分析器和三元组索引缓存实例（缓存容量按倒排记录总数计算）
+regex_trigram_analyzer = RegexTrigramAnalyzer()
+trigram_index_cache = FileIndexCache(TrigramIndex, max_size=20000000,
+                                     size_of=lambda index: index.posting_count)
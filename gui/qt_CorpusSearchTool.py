@@ -17,7 +17,7 @@ from PySide6.QtWidgets import (
     QLabel, QLineEdit, QPushButton, QCheckBox, QGroupBox, QTableWidget,
     QTableWidgetItem, QHeaderView, QMenu, QMessageBox, QFileDialog,
     QProgressBar, QStatusBar, QSplitter, QFrame, QStyledItemDelegate,
-    QStyleOptionViewItem, QTabWidget, QComboBox, QSizePolicy
+    QStyleOptionViewItem, QTabWidget, QComboBox, QSizePolicy, QInputDialog
 )
 from PySide6.QtCore import Qt, QThread, Signal, QPoint, QSettings, QSize, QTimer
 from PySide6.QtGui import QColor, QFont, QAction, QIcon, QCursor, QDragEnterEvent, QDropEvent, QTextDocument
@@ -35,17 +35,31 @@ from .search_result_table_gui import SearchResultTableManager, HTMLDelegate
 from function.config_manager import config_manager
 from function.search_engine_kor import search_engine_kor
 from function.search_engine_eng import search_engine_eng
+from function.english_lemmatizer import english_lemmatizer
+from function.query_language import query_parser
 from function.result_processor import result_processor
 from function.result_exporter import result_exporter
+from function.context_index import context_provider
+from function.result_limit import create_result_limiter
+from function.result_set import SORT_COLUMNS, ResultSet
 from function.search_history_manager import search_history_manager
+from function.corpus_scanner import corpus_scanner
+from function.corpus_watcher import corpus_watcher
+from function.search_profiler import SearchProfile, search_profiler
+from function.search_progress import SearchCancelled, SearchProgress, search_progress
+from function.jamo_index import query_mode as jamo_query_mode
 from gui.search_history_gui import SearchHistoryWindow
 
+# 结果表格第0列记录上下文状态的数据角色：上下文行为 'before'/'after'，已展开的命中行为 (上文行数, 下文行数)
+CONTEXT_ROLE = Qt.ItemDataRole.UserRole + 1
+
 
 class SearchThread(QThread):
     """搜索线程"""
-    progress_updated = Signal(int)
+    progress_updated = Signal(int, float)  # 按字节数加权的进度百分比, 预计剩余秒数（未知时为 -1）
     search_completed = Signal(list, str, list, str, list, list)  # results, lemma, actual_variant_set, pos_full, target_variant_set, matched_terms_set
     search_failed = Signal(str)
+    search_stopped = Signal()
     
     def __init__(self, input_path, keywords, case_sensitive, fuzzy_match, regex_enabled, 
                  corpus_type="english", keyword_type="", exact_match=False):
@@ -62,37 +76,86 @@ class SearchThread(QThread):
         self.actual_variant_set = []  # 基于词典形实际命中的所有变体形式列表
         self.matched_terms_set = []  # 所有实际匹配到的词（包括词干和变体）
         self._stop_flag = False  # 停止标志
+        self.profile = SearchProfile()  # 各阶段耗时统计
+        self.progress = SearchProgress(self.progress_updated.emit)  # 进度与取消状态
+        self.total_count = 0  # 命中总数（限制结果数量时大于显示的结果数）
+        self.total_is_lower_bound = False  # 剩余文件未计数时命中总数只是下限
+        self.start_ms = []  # 各结果行的开始毫秒数（解析器写入的 start_ms），供结果集按时间轴排序
     
     def stop(self):
-        """停止搜索"""
+        """停止搜索（解析结果每产出一条记录都会检查取消标志，搜索在当前行处理完后退出）"""
         self._stop_flag = True
+        self.progress.cancel()
     
     def run(self):
+        """
+        执行搜索（搜索期间暂停后台预解析，避免与搜索争用CPU）
+
+        各阶段耗时记入 self.profile；设置环境变量 CORPUS_SEARCH_PROFILE 时同时保存 cProfile 数据
+        """
+        with corpus_watcher.paused(), search_profiler.activate(self.profile), search_profiler.cprofile(), \
+                search_progress.activate(self.progress):
+            try:
+                self._run_search()
+            except SearchCancelled:
+                self.search_stopped.emit()
+    
+    def _run_search(self):
         """执行搜索"""
         try:
-            # 获取所有支持的文件
-            supported_extensions = ['.md']
-            files_to_search = []
-            
-            if os.path.isfile(self.input_path):
-                files_to_search.append(self.input_path)
-            elif os.path.isdir(self.input_path):
-                for root, dirs, files in os.walk(self.input_path):
-                    for file in files:
-                        if any(file.lower().endswith(ext) for ext in supported_extensions):
-                            files_to_search.append(os.path.join(root, file))
+            # 获取所有支持的文件（扩展名和忽略规则来自当前语料库的配置，目录列表在多次搜索间缓存）
+            corpus_config = config_manager.get_corpus_config(self.corpus_type)
+            with self.profile.stage('scan'):
+                files_to_search = corpus_scanner.scan(
+                    self.input_path,
+                    extensions=corpus_config['extensions'],
+                    ignore_patterns=corpus_config['ignore_patterns']
+                )
+            self.profile.add('scan', files=len(files_to_search))
             
             total_files = len(files_to_search)
+            self.progress.start(files_to_search)
             if total_files == 0:
                 self.search_completed.emit([], "", [], "", [], [])
                 return
             
+            # 按配置限制保留的结果数量；前 N 条模式取得足够结果后停止扫描，剩余文件只计数
+            limiter = create_result_limiter()
+            remaining_files = []
+            
+            # 使用查询语言（运算符、短语组合、NEAR、筛选条件）时在每个文件的位置索引上执行查询
+            if not self.regex_enabled and query_parser.is_structured(self.keywords):
+                # 查询语法错误时抛出 ValueError，作为搜索失败报告
+                query = query_parser.parse(self.keywords)
+                engine = search_engine_kor if self.corpus_type == "korean" else search_engine_eng
+                pos_full = ""
+                
+                def count_file(file_path):
+                    return sum(engine.count_query(file_path, query, case_sensitive=self.case_sensitive).values())
+                
+                for i, file_path in enumerate(files_to_search):
+                    # 检查是否需要停止
+                    self.progress.check()
+                    
+                    try:
+                        with self.profile.stage('match', files=1):
+                            file_results = engine.search_query(file_path, query, case_sensitive=self.case_sensitive)
+                        if limiter.consume(file_path, file_results):
+                            remaining_files = files_to_search[i + 1:]
+                            break
+                    except Exception as e:
+                        print(f"处理文件 {file_path} 时出错: {str(e)}")
+                    
+                    # 更新进度
+                    self.progress.file_done(file_path)
+                
+                results = limiter.results()
+                self.matched_terms_set = sorted({keyword for result in results for keyword in result.get('matched_keywords', [])})
             # 韩语模式特殊处理
-            if self.corpus_type == "korean":
+            elif self.corpus_type == "korean":
                 # 韩语模式：韩语没有大小写之分，使用 case_sensitive=True
                 # 但为了兼容性，我们保留用户的选择，只是不使用模糊匹配
                 self.fuzzy_match = False
-                all_results = []  # 初始化 results 变量
                 all_search_records = []  # 保存所有搜索记录
                 
                 # 检查是否包含韩语
@@ -100,28 +163,28 @@ class SearchThread(QThread):
                 korean_pattern = re.compile(r'[\uac00-\ud7af]')
                 contains_korean = bool(korean_pattern.search(self.keywords))
                 
-                # 使用新的高级韩语搜索方法
+                # 使用新的高级韩语搜索方法；查询含单独的韩文字母时（如 ㅇㄹㄷ、사ㄹ）使用字母检索
+                use_jamo_search = jamo_query_mode(self.keywords) is not None
                 
                 # 保存生成的变体列表
                 self.target_variant_set = []
                 
+                def korean_search(file_path):
+                    if use_jamo_search:
+                        return search_engine_kor.search_korean_jamo(file_path, self.keywords)
+                    return search_engine_kor.search_korean_advanced(file_path, self.keywords, case_sensitive=True)
+                
+                # 韩语检索依赖形态分析，没有省时的计数方法：提前停止时剩余文件不再检索，命中总数只报告下限
+                count_file = None
+                
                 for i, file_path in enumerate(files_to_search):
                     # 检查是否需要停止
-                    if self._stop_flag:
-                        return
+                    self.progress.check()
                     
                     try:
-                        # 使用新的 search_korean_advanced 方法
-                        search_record = search_engine_kor.search_korean_advanced(
-                            file_path,
-                            self.keywords,
-                            case_sensitive=True
-                        )
-                        
-                        # 提取搜索结果
-                        file_results = search_record['search_results']
-                        if file_results:
-                            all_results.extend(file_results)
+                        # 使用新的 search_korean_advanced 方法（解析和形态分析的耗时单独统计）
+                        with self.profile.stage('match', files=1):
+                            search_record = korean_search(file_path)
                         
                         # 保存搜索记录
                         all_search_records.append(search_record)
@@ -136,9 +199,13 @@ class SearchThread(QThread):
                                 self.matched_terms_set_all = set()
                             self.matched_terms_set_all.update(search_record['matched_terms_set'])
 
+                        # 提取搜索结果
+                        if limiter.consume(file_path, search_record['search_results']):
+                            remaining_files = files_to_search[i + 1:]
+                            break
+
                         # 更新进度
-                        progress = int((i + 1) / total_files * 100)
-                        self.progress_updated.emit(progress)
+                        self.progress.file_done(file_path)
                     except Exception as e:
                         print(f"[ERROR] 处理文件 {file_path} 时出错: {str(e)}")
                         import traceback
@@ -179,64 +246,102 @@ class SearchThread(QThread):
                     # 这里可以扩展，将搜索记录保存到历史文件
                     pass
                 
-                # 使用 all_results 作为最终结果
-                results = all_results
+                # 使用限制器保留的结果作为最终结果
+                results = limiter.results()
             else:
                 # 英语模式：使用用户设置
                 # 检查是否需要韩语/英语变形匹配
                 import re
                 korean_pattern = re.compile(r'[\uac00-\ud7af]')
                 contains_korean = bool(korean_pattern.search(self.keywords))
+                pos_full = ""
                 
-                results = []
+                # 英语单词（非词组、非引号内的完全匹配）按词典形检索所有变形
+                keyword_list = self.keywords.split()
+                use_lemma_search = (not self.exact_match and self.keyword_type != "词组" and bool(keyword_list)
+                                    and all(english_lemmatizer.is_english_word(word) for word in keyword_list))
                 
-                if contains_korean and not self.regex_enabled:
-                    # 使用韩语变形匹配功能
+                if (contains_korean or use_lemma_search) and not self.regex_enabled and not self.fuzzy_match:
+                    # 使用韩语/英语变形匹配功能（模糊匹配时改用按韩文字母计算编辑距离的通用搜索）
+                    def count_file(file_path):
+                        return sum(search_engine_eng.count_english_variants(
+                            file_path, self.keywords.split(), case_sensitive=self.case_sensitive).values())
+                    
                     for i, file_path in enumerate(files_to_search):
                         # 检查是否需要停止
-                        if self._stop_flag:
-                            return
+                        self.progress.check()
                         
-                        file_results = search_engine_eng.search_english_variants(
-                            file_path,
-                            self.keywords.split(),
-                            case_sensitive=self.case_sensitive
-                        )
-                        results.extend(file_results)
+                        with self.profile.stage('match', files=1):
+                            file_results = search_engine_eng.search_english_variants(
+                                file_path,
+                                self.keywords.split(),
+                                case_sensitive=self.case_sensitive
+                            )
+                        if limiter.consume(file_path, file_results):
+                            remaining_files = files_to_search[i + 1:]
+                            break
                         
                         # 更新进度
-                        progress = int((i + 1) / total_files * 100)
-                        self.progress_updated.emit(progress)
+                        self.progress.file_done(file_path)
+                    
+                    results = limiter.results()
+                    if use_lemma_search:
+                        # 词典形和语料库中实际命中的变形
+                        self.lemma = ", ".join(dict.fromkeys(english_lemmatizer.lemmatize(word) for word in keyword_list))
+                        matched_forms = sorted({keyword for result in results for keyword in result.get('matched_keywords', [])})
+                        self.actual_variant_set = matched_forms
+                        self.target_variant_set = matched_forms
+                        self.matched_terms_set = matched_forms
                 else:
                     # 常规搜索
-                    keyword_list = self.keywords.split()
+                    def count_file(file_path):
+                        return sum(search_engine_eng.count_in_file(
+                            file_path, keyword_list, case_sensitive=self.case_sensitive,
+                            fuzzy_match=self.fuzzy_match, regex_enabled=self.regex_enabled).values())
                     
                     for i, file_path in enumerate(files_to_search):
                         # 检查是否需要停止
-                        if self._stop_flag:
-                            return
+                        self.progress.check()
                         
                         try:
-                            file_results = search_engine_eng.search_in_file(
-                                file_path,
-                                keyword_list,
-                                case_sensitive=self.case_sensitive,
-                                fuzzy_match=self.fuzzy_match,
-                                regex_enabled=self.regex_enabled
-                            )
-                            results.extend(file_results)
+                            # 逐条匹配，取得足够的结果时不再解析文件的剩余部分
+                            with self.profile.stage('match', files=1):
+                                satisfied = limiter.consume(file_path, search_engine_eng.iter_search_in_file(
+                                    file_path,
+                                    keyword_list,
+                                    case_sensitive=self.case_sensitive,
+                                    fuzzy_match=self.fuzzy_match,
+                                    regex_enabled=self.regex_enabled
+                                ))
+                            if satisfied:
+                                remaining_files = files_to_search[i + 1:]
+                                break
                         except Exception as e:
                             print(f"处理文件 {file_path} 时出错: {str(e)}")
                         
                         # 更新进度
-                        progress = int((i + 1) / total_files * 100)
-                        self.progress_updated.emit(progress)
+                        self.progress.file_done(file_path)
+                    
+                    results = limiter.results()
+            
+            # 命中总数：提前停止时正在扫描的文件和剩余文件只计数
+            if limiter.satisfied and count_file is None:
+                self.total_count = limiter.seen
+                self.total_is_lower_bound = True
+            elif limiter.satisfied:
+                with self.profile.stage('count', files=len(remaining_files) + (limiter.partial is not None)):
+                    self.total_count = limiter.total(remaining_files, count_file)
+                self.progress_updated.emit(100, 0.0)
+            else:
+                self.total_count = limiter.seen
             
             # 处理结果以供显示
             if results:
-                has_time_axis = any('time_axis' in result and result.get('time_axis', 'N/A') != 'N/A' for result in results)
-                file_type = 'subtitle' if has_time_axis else 'document'
-                formatted_results = result_processor.format_results_for_display(results, file_type)
+                with self.profile.stage('format', lines=len(results)):
+                    has_time_axis = any('time_axis' in result and result.get('time_axis', 'N/A') != 'N/A' for result in results)
+                    file_type = 'subtitle' if has_time_axis else 'document'
+                    formatted_results = result_processor.format_results_for_display(results, file_type)
+                self.start_ms = [result.get('start_ms') for result in results]
             else:
                 formatted_results = []
             
@@ -346,6 +451,7 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 初始化变量
         self.history_window = None
         self.result_file_paths = []
+        self.result_set = None  # 在结果中筛选使用的按列结果集
         self.search_thread = None
         
         # 加载配置
@@ -419,6 +525,9 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 恢复列宽和顺序设置
         self.restore_column_settings()
         
+        # 启动语料库目录监视（配置启用时）
+        self.start_corpus_watcher()
+        
         # 设置样式主题
         self.setup_styles()
 
@@ -593,6 +702,8 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 清除搜索结果表格
         self.result_table.setRowCount(0)
         self.result_file_paths = []
+        self.result_set = None  # 在结果中筛选使用的按列结果集
+        self.result_table.horizontalHeader().setSortIndicatorShown(False)
         
         # 清除英语相关控件
         if hasattr(self, 'english_keyword_edit'):
@@ -1105,6 +1216,10 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         header.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         header.customContextMenuRequested.connect(self.show_header_context_menu)
 
+        # 点击表头排序（按住 Shift 点击追加次要排序列）
+        header.setSectionsClickable(True)
+        header.sectionClicked.connect(self.sort_result_table)
+
         # 恢复列宽和顺序
         self.restore_column_settings()
         
@@ -1214,6 +1329,9 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
             # 更新配置管理器中的输入路径
             config_manager.set_input_dir(input_path)
             
+            # 监视新的输入目录
+            self.start_corpus_watcher()
+            
             # 成功：绿色边框闪烁1次
             self.flash_border(success=True, flash_count=1)
         else:
@@ -1369,9 +1487,12 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         else:  # 韩语语料库
             corpus_type = "korean"
         
+        # 使用查询语言时保留引号等语法，由搜索线程解析
+        structured_query = not regex_enabled and query_parser.is_structured(keywords)
+        
         # 检查是否是引号内的完全匹配
         exact_match = False
-        if keywords.startswith('"') and keywords.endswith('"'):
+        if not structured_query and keywords.startswith('"') and keywords.endswith('"'):
             exact_match = True
             keywords = keywords[1:-1]  # 去掉引号
 
@@ -1406,9 +1527,18 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         
         # 分析关键词词典型并显示
         # 对于韩语，先调用 generate_lemmalist 生成变体列表
-        if self.current_corpus_tab == 0:  # 英语语料库
-            # 英语词典型显示（简化版）
-            lemma_text = "N/A"  # 英语暂不实现词典型分析
+        if structured_query:
+            # 查询语言不分析词典型
+            lemma_display = self.english_lemma_display if self.current_corpus_tab == 0 else self.korean_lemma_display
+            lemma_display.setText("N/A")
+            self.korean_variant_set = []
+        elif self.current_corpus_tab == 0:  # 英语语料库
+            # 英语词典型显示（单词按词表还原，词组和完全匹配不分析）
+            keyword_list = keywords.split()
+            if not exact_match and keyword_type != "词组" and keyword_list and all(english_lemmatizer.is_english_word(word) for word in keyword_list):
+                lemma_text = ", ".join(dict.fromkeys(english_lemmatizer.lemmatize(word) for word in keyword_list))
+            else:
+                lemma_text = "N/A"
             self.english_lemma_display.setText(lemma_text)
         else:  # 韩语语料库
             # 调用 generate_lemmalist 方法生成词典形和变体列表
@@ -1524,12 +1654,20 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         self.search_thread.progress_updated.connect(self.update_progress)
         self.search_thread.search_completed.connect(self.search_completed)
         self.search_thread.search_failed.connect(self.search_failed)
+        self.search_thread.search_stopped.connect(self.search_stopped)
         self.search_thread.start()
     
-    def update_progress(self, value):
-        """更新进度条"""
+    def update_progress(self, value, eta=-1.0):
+        """更新进度条和预计剩余时间"""
         self.ProgressBar.setValue(value)
-        self.status_bar.showMessage(f"⏳ 正在搜索... {value}%")
+        eta_text = SearchProgress.format_eta(eta)
+        self.status_bar.showMessage(f"⏳ 正在搜索... {value}%" + (f"，{eta_text}" if eta_text else ""))
+    
+    def search_stopped(self):
+        """搜索已停止"""
+        self.ProgressBar.setVisible(False)
+        self.search_btn.setEnabled(True)
+        self.status_bar.showMessage("⏹ 搜索已停止")
     
     def search_completed(self, results, lemma="", actual_variant_set=[], pos_full="", target_variant_set=[], matched_terms_set=[]):
         """搜索完成"""
@@ -1542,9 +1680,17 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 清空表格
         self.result_table.setRowCount(0)
         self.result_file_paths = []
+        self.result_set = None
+        self.result_table.horizontalHeader().setSortIndicatorShown(False)
         
+        # 搜索线程记录的各阶段耗时，表格显示和导出的耗时继续记入其中
+        profile = getattr(self.search_thread, 'profile', None) or SearchProfile()
+        # 限制结果数量时命中总数大于显示的结果数
+        total_count = max(getattr(self.search_thread, 'total_count', 0), len(results))
+        total_is_lower_bound = getattr(self.search_thread, 'total_is_lower_bound', False)
+
         if not results:
-            self.status_bar.showMessage("✓ 搜索完成，未找到结果")
+            self.status_bar.showMessage(f"✓ 搜索完成，未找到结果 | {profile.summary()}")
             QMessageBox.information(self, "✓ 搜索完成", "未找到匹配结果")
             return
         
@@ -1558,76 +1704,11 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
             self.html_delegate.set_search_params(self.current_search_params, list(highlight_set))
         
         # 填充表格
-        self.result_table.setRowCount(len(results))
-        for row, result in enumerate(results):
-            # 处理不同类型的结果
-            if isinstance(result, dict):
-                # 字典类型
-                filename = result.get('filename', '')
-                lineno = result.get('lineno', '')
-                episode = result.get('episode', '')
-                time_axis = result.get('time_axis', '')
-                text = result.get('text', '')
-                filepath = result.get('filepath', '')
-            elif isinstance(result, list) and len(result) >= 5:
-                # 列表类型 [filename, lineno, episode, time_axis, text, filepath]
-                filename = result[0] if len(result) > 0 else ''
-                lineno = result[1] if len(result) > 1 else ''
-                episode = result[2] if len(result) > 2 else ''
-                time_axis = result[3] if len(result) > 3 else ''
-                text = result[4] if len(result) > 4 else ''
-                filepath = result[5] if len(result) > 5 else ''
-            else:
-                # 未知类型，跳过
-                continue
-            
-            # 集数
-            episode_item = QTableWidgetItem(str(episode))
-            episode_item.setForeground(QColor('#FFC209'))
-            # 设置为不可编辑
-            episode_item.setFlags(episode_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.result_table.setItem(row, 0, episode_item)
-            
-            # 时间轴
-            time_item = QTableWidgetItem(str(time_axis))
-            time_item.setForeground(QColor('#4ec9b0'))
-            time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中对齐
-            # 设置为不可编辑
-            time_item.setFlags(time_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.result_table.setItem(row, 1, time_item)
-            
-            # 对应台词：完全处理HTML标签，只保留纯文本
-            import re
-            
-            # 提取原始文本，移除所有HTML标签
-            text_str = str(text)
-            # 移除所有HTML标签
-            plain_text = re.sub(r'<[^>]+>', '', text_str)
-            
-            # 创建纯文本项，不包含任何HTML标签
-            text_item = QTableWidgetItem(plain_text)
-            text_item.setForeground(QColor('#ffffff'))
-            # 设置为不可编辑
-            text_item.setFlags(text_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.result_table.setItem(row, 2, text_item)
-            
-            # 行号
-            lineno_item = QTableWidgetItem(str(lineno))
-            lineno_item.setForeground(QColor('#979a98'))
-            lineno_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中对齐
-            # 设置为不可编辑
-            lineno_item.setFlags(lineno_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.result_table.setItem(row, 3, lineno_item)
-            
-            # 文件名
-            filename_item = QTableWidgetItem(str(filename))
-            filename_item.setForeground(QColor('#149acd'))
-            # 设置为不可编辑
-            filename_item.setFlags(filename_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.result_table.setItem(row, 4, filename_item)
-            
-            # 保存文件路径
-            self.result_file_paths.append(filepath)
+        import time
+        display_start = time.perf_counter()
+        self._fill_result_table(results)
+        # 在结果中筛选使用的按列结果集
+        self.result_set = ResultSet(results, getattr(self.search_thread, 'start_ms', None))
         
         # 保存变体集和匹配词集到实例变量，以便在导出时使用
         self.target_variant_set = target_variant_set
@@ -1669,6 +1750,7 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
 
         # 自动调整行高以适应内容
         self.result_table.resizeRowsToContents()
+        profile.add('display', time.perf_counter() - display_start, lines=len(results))
 
         # 保存搜索历史到对应的文件
         if hasattr(self, 'current_search_params'):
@@ -1679,7 +1761,8 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
             keyword_type_to_save = pos_full if pos_full else self.current_search_params.get('keyword_type', '')
             
             # 自动导出搜索结果，获取HTML文件路径
-            html_path = self.auto_export_results(results, keyword_type_to_save)
+            with profile.stage('export', lines=len(results)):
+                html_path = self.auto_export_results(results, keyword_type_to_save)
             
             # 将HTML绝对路径转换为相对于主程序目录的相对路径
             import os
@@ -1696,15 +1779,101 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
                 case_sensitive=self.current_search_params['case_sensitive'],
                 fuzzy_match=self.current_search_params['fuzzy_match'],
                 regex_enabled=self.current_search_params['regex_enabled'],
-                result_count=len(results),
+                result_count=total_count,
                 keyword_type=keyword_type_to_save,
                 lemma=lemma,
                 actual_variant_set=actual_variant_set,
-                target_variant_set=target_variant_set
+                target_variant_set=target_variant_set,
+                timings=profile.to_dict()
             )
 
-        self.status_bar.showMessage(f"✓ 搜索完成，找到 {len(results)} 条结果")
+        if total_is_lower_bound:
+            self.status_bar.showMessage(f"✓ 搜索完成，共 ≥{total_count} 条结果，显示 {len(results)} 条 | {profile.summary()}")
+        elif total_count > len(results):
+            self.status_bar.showMessage(f"✓ 搜索完成，共 {total_count} 条结果，显示 {len(results)} 条 | {profile.summary()}")
+        else:
+            self.status_bar.showMessage(f"✓ 搜索完成，找到 {len(results)} 条结果 | {profile.summary()}")
 
+    def _fill_result_table(self, results):
+        """
+        用格式化后的结果行填充结果表格
+        
+        Args:
+            results: 结果行列表 [文件名, 行号, 集数, 时间轴, 内容, 完整文件路径]（或同名字段的字典）
+        """
+        self.result_table.setRowCount(0)
+        self.result_file_paths = []
+        self.result_table.setRowCount(len(results))
+        for row, result in enumerate(results):
+            # 处理不同类型的结果
+            if isinstance(result, dict):
+                # 字典类型
+                filename = result.get('filename', '')
+                lineno = result.get('lineno', '')
+                episode = result.get('episode', '')
+                time_axis = result.get('time_axis', '')
+                text = result.get('text', '')
+                filepath = result.get('filepath', '')
+            elif isinstance(result, list) and len(result) >= 5:
+                # 列表类型 [filename, lineno, episode, time_axis, text, filepath]
+                filename = result[0] if len(result) > 0 else ''
+                lineno = result[1] if len(result) > 1 else ''
+                episode = result[2] if len(result) > 2 else ''
+                time_axis = result[3] if len(result) > 3 else ''
+                text = result[4] if len(result) > 4 else ''
+                filepath = result[5] if len(result) > 5 else ''
+            else:
+                # 未知类型，跳过
+                continue
+            
+            # 集数
+            episode_item = QTableWidgetItem(str(episode))
+            episode_item.setForeground(QColor('#FFC209'))
+            # 设置为不可编辑
+            episode_item.setFlags(episode_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, 0, episode_item)
+            
+            # 时间轴
+            time_item = QTableWidgetItem(str(time_axis))
+            time_item.setForeground(QColor('#4ec9b0'))
+            time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中对齐
+            # 设置为不可编辑
+            time_item.setFlags(time_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, 1, time_item)
+            
+            # 对应台词：完全处理HTML标签，只保留纯文本
+            import re
+            
+            # 提取原始文本，移除所有HTML标签
+            text_str = str(text)
+            # 移除所有HTML标签
+            plain_text = re.sub(r'<[^>]+>', '', text_str)
+            
+            # 创建纯文本项，不包含任何HTML标签
+            text_item = QTableWidgetItem(plain_text)
+            text_item.setForeground(QColor('#ffffff'))
+            # 设置为不可编辑
+            text_item.setFlags(text_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, 2, text_item)
+            
+            # 行号
+            lineno_item = QTableWidgetItem(str(lineno))
+            lineno_item.setForeground(QColor('#979a98'))
+            lineno_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)  # 居中对齐
+            # 设置为不可编辑
+            lineno_item.setFlags(lineno_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, 3, lineno_item)
+            
+            # 文件名
+            filename_item = QTableWidgetItem(str(filename))
+            filename_item.setForeground(QColor('#149acd'))
+            # 设置为不可编辑
+            filename_item.setFlags(filename_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, 4, filename_item)
+            
+            # 保存文件路径
+            self.result_file_paths.append(filepath)
+    
     def auto_export_results(self, results, keyword_type=""):
         """自动导出搜索结果到HTML文件，保留高亮加粗特效"""
         try:
@@ -2025,6 +2194,8 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
             # 清空当前表格
             self.result_table.setRowCount(0)
             self.result_file_paths = []
+            self.result_set = None  # 在结果中筛选使用的按列结果集
+            self.result_table.horizontalHeader().setSortIndicatorShown(False)
             
             # 提取数据行（跳过表头）
             data_rows = rows[1:]
@@ -2394,6 +2565,10 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         
         # 按照用户要求的顺序排列菜单项
         open_action = menu.addAction("📂 打开文件")
+        context_action = menu.addAction("📖 展开/收起上下文")
+        menu.addSeparator()
+        refine_action = menu.addAction("🔍 在结果中筛选")
+        undo_refine_action = menu.addAction("↩️ 撤销筛选")
         menu.addSeparator()
         copy_cell_action = menu.addAction("📋 复制单元格")
         copy_action = menu.addAction("📋 复制选中行")
@@ -2431,6 +2606,14 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 打开文件：必须有选中的行
         open_action.setEnabled(has_selection)
         
+        # 展开上下文：选中的必须是命中行而不是上下文行
+        context_action.setEnabled(has_selection and not self._is_context_row(selected_row))
+        
+        # 在结果中筛选：必须有本次搜索的结果集；撤销筛选：必须有已应用的筛选
+        result_set = getattr(self, 'result_set', None)
+        refine_action.setEnabled(result_set is not None and len(result_set) > 0)
+        undo_refine_action.setEnabled(result_set is not None and result_set.depth > 0)
+        
         # 导出选中行：必须有选中的行
         export_action.setEnabled(has_selection)
         
@@ -2447,6 +2630,12 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
             self.copy_selected_row(selected_row)
         elif has_selection and action == open_action:
             self.open_file(selected_row)
+        elif has_selection and action == context_action:
+            self.toggle_context_rows(selected_row)
+        elif action == refine_action:
+            self.refine_results()
+        elif action == undo_refine_action:
+            self.undo_refine_results()
         elif has_selection and action == export_action:
             self.export_selected_row(selected_row)
         elif action == export_all_action:
@@ -2759,6 +2948,178 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         QApplication.clipboard().setText(text.strip())
         self.status_bar.showMessage("📋 已复制到剪贴板")
     
+    def refine_results(self):
+        """
+        在当前结果中继续筛选（不重新搜索语料库）
+        
+        输入空格分隔的条件：关键词、"-关键词"（排除）、"re:正则表达式"、"ep:集数"，所有条件同时满足
+        """
+        result_set = getattr(self, 'result_set', None)
+        if result_set is None:
+            return
+        text, ok = QInputDialog.getText(
+            self, "🔍 在结果中筛选",
+            "筛选条件（空格分隔，同时满足）：关键词、-排除词、re:正则表达式、ep:集数"
+        )
+        if not ok or not text.strip():
+            return
+        case_sensitive = self.current_search_params.get('case_sensitive', False) \
+            if hasattr(self, 'current_search_params') else False
+        try:
+            result_set.refine_query(text, case_sensitive)
+        except ValueError as e:
+            QMessageBox.warning(self, "❌ 筛选失败", str(e))
+            return
+        self._show_refined_results(f"🔍 筛选 “{text.strip()}”")
+    
+    def undo_refine_results(self):
+        """撤销最近一次结果内筛选"""
+        result_set = getattr(self, 'result_set', None)
+        if result_set is None or not result_set.undo():
+            return
+        self._show_refined_results("↩️ 已撤销筛选")
+    
+    def sort_result_table(self, logical_index):
+        """
+        点击表头按该列排序：再次点击同一列切换升序/降序，按住 Shift 点击其他列追加为次要排序列
+        
+        Args:
+            logical_index: 被点击列的逻辑序号
+        """
+        result_set = getattr(self, 'result_set', None)
+        if result_set is None or not 0 <= logical_index < len(SORT_COLUMNS):
+            return
+        column = SORT_COLUMNS[logical_index]
+        columns = list(result_set.sort_columns)
+        names = [name for name, _ in columns]
+        if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier and columns:
+            if column in names:
+                i = names.index(column)
+                columns[i] = (column, not columns[i][1])
+            else:
+                columns.append((column, False))
+        elif names == [column]:
+            columns = [(column, not columns[0][1])]
+        else:
+            columns = [(column, False)]
+        result_set.sort(columns)
+        
+        # 表头显示主排序列的方向
+        header = self.result_table.horizontalHeader()
+        primary, descending = columns[0]
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(SORT_COLUMNS.index(primary),
+                                Qt.SortOrder.DescendingOrder if descending else Qt.SortOrder.AscendingOrder)
+        
+        column_names = ['出处', '时间轴', '对应台词', '行号', '文件名']
+        order = "、".join(f"{column_names[SORT_COLUMNS.index(name)]}{'↓' if desc else '↑'}"
+                         for name, desc in columns)
+        self._show_refined_results(f"⇅ 已按 {order} 排序")
+    
+    def _show_refined_results(self, message):
+        """
+        用结果集当前选中的行重新填充表格
+        
+        Args:
+            message: 状态栏显示的操作说明
+        """
+        result_set = self.result_set
+        self._fill_result_table(result_set.rows())
+        self.result_table.resizeRowsToContents()
+        self.status_bar.showMessage(
+            f"{message}: {len(result_set)} / {result_set.total} 条结果（可撤销 {result_set.depth} 步）")
+    
+    def _is_context_row(self, row):
+        """判断表格行是否为展开的上下文行"""
+        item = self.result_table.item(row, 0) if row >= 0 else None
+        return item is not None and item.data(CONTEXT_ROLE) in ('before', 'after')
+    
+    def _context_row_span(self, row):
+        """
+        取得命中行连同其展开的上下文行所占的行范围
+        
+        Args:
+            row: 命中行的行号
+            
+        Returns:
+            (起始行, 结束行)，包含两端
+        """
+        item = self.result_table.item(row, 0)
+        expanded = item.data(CONTEXT_ROLE) if item is not None else None
+        if not expanded:
+            return row, row
+        before, after = expanded
+        return row - before, row + after
+    
+    def toggle_context_rows(self, row):
+        """
+        在命中行上下插入或移除上下文行（可展开的行）
+        
+        上下文来自按文件缓存的台词偏移表，行数由配置 [SEARCH] context_lines 决定
+        
+        Args:
+            row: 命中行的行号
+        """
+        if row < 0 or row >= len(self.result_file_paths) or self._is_context_row(row):
+            return
+        hit_item = self.result_table.item(row, 0)
+        first, last = self._context_row_span(row)
+        if first != last:
+            # 已展开：先删除下文再删除上文，行号才不会错位
+            for r in range(last, row, -1):
+                self.result_table.removeRow(r)
+                del self.result_file_paths[r]
+            for r in range(row - 1, first - 1, -1):
+                self.result_table.removeRow(r)
+                del self.result_file_paths[r]
+            hit_item.setData(CONTEXT_ROLE, None)
+            self.status_bar.showMessage("📖 已收起上下文")
+            return
+        
+        filepath = self.result_file_paths[row]
+        lineno_item = self.result_table.item(row, 3)
+        try:
+            line_number = int(lineno_item.text()) if lineno_item else 0
+        except ValueError:
+            line_number = 0
+        context_lines = config_manager.get_search_settings()['context_lines']
+        before, after = context_provider.get_context(filepath, line_number, context_lines)
+        if not before and not after:
+            self.status_bar.showMessage("📖 没有可显示的上下文")
+            return
+        
+        # 先插入下文再插入上文，命中行的行号在插入上文前保持不变
+        for offset, line in enumerate(after, 1):
+            self._insert_context_row(row + offset, 'after', line, filepath)
+        for line in reversed(before):
+            self._insert_context_row(row, 'before', line, filepath)
+        hit_item.setData(CONTEXT_ROLE, (len(before), len(after)))
+        self.result_table.selectRow(row + len(before))
+        self.status_bar.showMessage(f"📖 已展开上下文: 前 {len(before)} 行，后 {len(after)} 行")
+    
+    def _insert_context_row(self, row, kind, line, filepath):
+        """
+        插入一行灰色、不可编辑的上下文行
+        
+        Args:
+            row: 插入位置
+            kind: 'before'（上文）或 'after'（下文）
+            line: 上下文台词 {'line_number', 'time_axis', 'content'}
+            filepath: 文件路径
+        """
+        self.result_table.insertRow(row)
+        self.result_file_paths.insert(row, filepath)
+        values = ["上文" if kind == 'before' else "下文", line.get('time_axis', ''), line.get('content', ''),
+                  str(line.get('line_number', '')), os.path.basename(filepath)]
+        for col, value in enumerate(values):
+            item = QTableWidgetItem(str(value))
+            item.setForeground(QColor('#808080'))
+            if col in (1, 3):
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.result_table.setItem(row, col, item)
+        self.result_table.item(row, 0).setData(CONTEXT_ROLE, kind)
+    
     def _remove_html_tags(self, text: str) -> str:
         """
         去除HTML标签，只保留纯文本
@@ -2826,18 +3187,20 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
                 headers.append(self.result_table.horizontalHeaderItem(col).text())
             writer.writerow(headers)
 
-            # 写入数据行
-            row_data = []
-            for col in range(self.result_table.columnCount()):
-                item = self.result_table.item(row, col)
-                if item:
-                    # 去除HTML标签
-                    raw_text = item.text()
-                    clean_text = self._remove_html_tags(raw_text)
-                    row_data.append(clean_text)
-                else:
-                    row_data.append("")
-            writer.writerow(row_data)
+            # 写入数据行（已展开上下文时连同上下文行一起导出）
+            first, last = self._context_row_span(row)
+            for export_row in range(first, last + 1):
+                row_data = []
+                for col in range(self.result_table.columnCount()):
+                    item = self.result_table.item(export_row, col)
+                    if item:
+                        # 去除HTML标签
+                        raw_text = item.text()
+                        clean_text = self._remove_html_tags(raw_text)
+                        row_data.append(clean_text)
+                    else:
+                        row_data.append("")
+                writer.writerow(row_data)
 
         QMessageBox.information(self, "✅ 成功", f"结果已导出到 {output_file}")
     
@@ -3095,8 +3458,28 @@ class CorpusSearchToolGUI(QMainWindow, Ui_CorpusSearchTool):
         # 保存所有列的宽度和顺序
         config_manager.set_column_settings('result', all_widths, column_order) 
     
+    def start_corpus_watcher(self):
+        """根据配置（重新）启动英语和韩语语料库输入目录的后台监视"""
+        watcher_settings = config_manager.get_watcher_settings()
+        if not watcher_settings['enabled']:
+            corpus_watcher.stop()
+            return
+        
+        roots = []
+        for corpus_type in ("english", "korean"):
+            corpus_config = config_manager.get_corpus_config(corpus_type)
+            roots.append({
+                'path': corpus_config['input_dir'],
+                'extensions': corpus_config['extensions'],
+                'ignore_patterns': corpus_config['ignore_patterns']
+            })
+        corpus_watcher.start(roots, watcher_settings['backend'], watcher_settings['poll_interval'])
+    
     def closeEvent(self, event):
         """窗口关闭事件"""
+        # 停止语料库目录监视
+        corpus_watcher.stop()
+        
         # 保存列宽和顺序
         self.save_column_settings()
 
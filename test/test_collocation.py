@@ -0,0 +1,108 @@
+"""
+搭配统计测试模块
+验证词典形位置索引的窗口统计、n-gram、搭配强度指标以及基于形态分析的搭配检索
+"""
+
+import math
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.collocation import CollocationFinder, LemmaSequenceIndex, association_score
+from function.corpus_statistics import KoreanLineAnalyzer
+from function.search_engine_kor import search_engine_kor
+
+
+class SplitAnalyzer(KoreanLineAnalyzer):
+    """按空格切分的分析器"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def analyze(self, text):
+        self.calls += 1
+        return tuple(f"{word}/NNG" for word in text.split())
+
+
+class TestCollocation(unittest.TestCase):
+    """搭配统计测试类"""
+
+    def setUp(self):
+        """建立测试索引"""
+        records = [{'content': line} for line in ['a b c', 'c b a b', 'b']]
+        self.index = LemmaSequenceIndex(records, SplitAnalyzer())
+
+    def test_neighbours_within_line(self):
+        """窗口内左右两侧的词，窗口不跨行"""
+        left, right, count = self.index.neighbours(['b/NNG'], 1, 1)
+        self.assertEqual(count, 4)
+        self.assertEqual(left, {'a/NNG': 2, 'c/NNG': 1})
+        self.assertEqual(right, {'c/NNG': 1, 'a/NNG': 1})
+        left, right, _ = self.index.neighbours(['b/NNG'], 5, 0)
+        self.assertEqual(left, {'a/NNG': 2, 'b/NNG': 1, 'c/NNG': 2})
+        self.assertEqual(right, {})
+
+    def test_matching_keys_and_ngrams(self):
+        """词典形匹配所有词性，n-gram 不跨行"""
+        self.assertEqual(self.index.matching_keys('a'), ['a/NNG'])
+        self.assertEqual(self.index.matching_keys('a/VV'), [])
+        self.assertEqual(self.index.frequency('b/NNG'), 4)
+        bigrams = self.index.ngrams(2)
+        self.assertEqual(bigrams[('b/NNG', 'c/NNG')], 1)
+        self.assertEqual(bigrams[('a/NNG', 'b/NNG')], 2)
+        self.assertNotIn(('b/NNG', 'b/NNG'), bigrams)
+
+    def test_association_scores(self):
+        """PMI、log-Dice 和 t-score"""
+        self.assertAlmostEqual(association_score('pmi', 10, 100, 100, 10000), math.log2(10))
+        self.assertAlmostEqual(association_score('log_dice', 10, 10, 10, 1000), 14.0)
+        self.assertAlmostEqual(association_score('t_score', 4, 100, 100, 10000), 1.5)
+        with self.assertRaises(ValueError):
+            association_score('chi2', 1, 1, 1, 1)
+
+    def test_engine_collocations(self):
+        """用形态分析结果检索搭配，活用形还原为词典形"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('밥을 먹었어요\n밥을 먹어요\n물을 마셔요\n')
+            result = search_engine_kor.find_collocations([file_path], '먹었어요', min_frequency=1)
+        self.assertEqual(result['node'], ['먹다/VV'])
+        self.assertEqual(result['frequency'], 2)
+        self.assertEqual(result['left'][0]['lemma'], '밥')
+        self.assertEqual(result['left'][0]['frequency'], 2)
+
+    def test_sequences_saved_by_fingerprint(self):
+        """词典形序列按文件指纹保存，未变化的文件不重新分析"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            store_path = os.path.join(temp_dir, 'lemma_sequences_kor.json')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('a b c\nc b a b\nb\n')
+            analyzer = SplitAnalyzer()
+            expected = CollocationFinder(store_path, analyzer).find(search_engine_kor, [file_path], 'b',
+                                                                    1, 1, min_frequency=1)
+            calls = analyzer.calls
+            self.assertGreater(calls, 0)
+
+            result = CollocationFinder(store_path, analyzer).find(search_engine_kor, [file_path], 'b',
+                                                                  1, 1, min_frequency=1)
+            self.assertEqual(analyzer.calls, calls)
+            self.assertEqual(result, expected)
+            self.assertEqual(result['frequency'], 4)
+
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write('b d\n')
+            result = CollocationFinder(store_path, analyzer).find(search_engine_kor, [file_path], 'b',
+                                                                  1, 1, min_frequency=1)
+            self.assertGreater(analyzer.calls, calls)
+            self.assertEqual(result['frequency'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+上下文索引测试模块
+验证台词偏移表按行号取前后台词、文件开头和结尾的边界，以及为搜索结果补充上下文
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.context_index import ContextIndex, ContextProvider
+from function.result_processor import result_processor
+from function.search_engine_eng import search_engine_eng
+
+
+SUBTITLE = """1
+00:00:01,000 --> 00:00:02,000
+First line.
+
+2
+00:00:03,000 --> 00:00:04,000
+Second line.
+
+3
+00:00:05,000 --> 00:00:06,000
+Third line.
+
+4
+00:00:07,000 --> 00:00:08,000
+Fourth line.
+"""
+
+
+class TestContextIndex(unittest.TestCase):
+    """上下文索引测试类"""
+
+    def test_context_by_line_number(self):
+        """按行号取前后台词，文件边界处截断"""
+        records = [{'line_number': n, 'content': f'line {n}', 'time_axis': str(n)} for n in (3, 5, 8, 9)]
+        index = ContextIndex(records)
+        before, after = index.context(5, 1)
+        self.assertEqual([line['content'] for line in before], ['line 3'])
+        self.assertEqual([line['content'] for line in after], ['line 8'])
+        before, after = index.context(3, 2, 3)
+        self.assertEqual(before, [])
+        self.assertEqual([line['line_number'] for line in after], [5, 8, 9])
+        self.assertEqual(index.context(4, 1), ([], []))
+        # 台词直接引用解析结果中的记录，不另存一份文本
+        self.assertIs(index.line(1)['content'], records[1]['content'])
+
+    def test_unsorted_line_numbers(self):
+        """行号不递增时仍能定位"""
+        index = ContextIndex([{'line_number': n, 'content': str(n)} for n in (2, 1, 3)])
+        before, after = index.context(1, 1)
+        self.assertEqual((before[0]['content'], after[0]['content']), ('2', '3'))
+
+    def test_search_results_with_context(self):
+        """为搜索结果补充上下文，时间轴随台词一起返回"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.srt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(SUBTITLE)
+            results = search_engine_eng.search_in_file(file_path, ['Third'])
+            enhanced = result_processor.extract_full_dialogue(results, 2)
+            self.assertEqual(len(enhanced), 1)
+            self.assertEqual([line['content'] for line in enhanced[0]['context_before']],
+                             ['First line.', 'Second line.'])
+            self.assertEqual(enhanced[0]['context_after'][0]['content'], 'Fourth line.')
+            self.assertEqual(enhanced[0]['context_after'][0]['time_axis'], '00:00:07,000 --> 00:00:08,000')
+            self.assertNotIn('context_before', results[0])
+
+            # 文件不存在时返回空上下文
+            provider = ContextProvider()
+            self.assertEqual(provider.get_context(os.path.join(temp_dir, 'missing.srt'), 1), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
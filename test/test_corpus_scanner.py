@@ -0,0 +1,95 @@
+"""
+语料库扫描测试模块
+验证扩展名集合、忽略规则、目录列表缓存以及不进入目录符号链接
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.corpus_scanner import CorpusScanner
+
+
+class TestCorpusScanner(unittest.TestCase):
+    """语料库扫描测试类"""
+
+    def setUp(self):
+        """创建测试目录树"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = self.temp_dir.name
+        for rel_path in ['a.srt', 'b.MD', 'c.pdf', 'notes.log', '~$draft.docx',
+                         'season1/ep1.ass', 'season1/ep2.vtt', 'season1/extra/x.txt',
+                         '.git/config.md', 'drafts/old.srt']:
+            path = os.path.join(self.root, *rel_path.split('/'))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('test')
+        self.scanner = CorpusScanner(max_workers=4)
+
+    def _relative(self, files):
+        """转换为相对路径便于比较"""
+        return [os.path.relpath(f, self.root).replace(os.sep, '/') for f in files]
+
+    def test_default_extensions_and_ignore(self):
+        """测试默认扩展名集合和默认忽略规则"""
+        files = self._relative(self.scanner.scan(self.root))
+        self.assertEqual(files, ['a.srt', 'b.MD', 'c.pdf', 'drafts/old.srt',
+                                 'season1/ep1.ass', 'season1/ep2.vtt', 'season1/extra/x.txt'])
+
+    def test_custom_rules(self):
+        """测试自定义扩展名和按相对路径的忽略规则"""
+        files = self._relative(self.scanner.scan(self.root, extensions=['srt', '.TXT'],
+                                                 ignore_patterns=['drafts', 'season1/extra/*']))
+        self.assertEqual(files, ['a.srt'])
+
+        single = os.path.join(self.root, 'notes.log')
+        self.assertEqual(self.scanner.scan(single), [single])
+
+    def test_listing_cache(self):
+        """测试目录未变化时复用缓存，新增文件后重新读取目录"""
+        self.scanner.scan(self.root)
+        calls = []
+        original = os.scandir
+
+        def counting_scandir(path):
+            calls.append(path)
+            return original(path)
+
+        os.scandir = counting_scandir
+        try:
+            self.scanner.scan(self.root)
+            self.assertEqual(calls, [])
+
+            new_file = os.path.join(self.root, 'season1', 'ep3.srt')
+            with open(new_file, 'w', encoding='utf-8') as f:
+                f.write('test')
+            stat = os.stat(os.path.dirname(new_file))
+            os.utime(os.path.dirname(new_file), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+            files = self._relative(self.scanner.scan(self.root))
+        finally:
+            os.scandir = original
+        self.assertEqual(len(calls), 1)
+        self.assertIn('season1/ep3.srt', files)
+
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "不支持符号链接")
+    def test_symlink_loop(self):
+        """测试指向上级目录的符号链接不会被进入（与 os.walk 一致）"""
+        loop = os.path.join(self.root, 'season1', 'loop')
+        try:
+            os.symlink('..', loop, target_is_directory=True)
+        except OSError:
+            self.skipTest("无法创建符号链接")
+        files = self._relative(self.scanner.scan(self.root))
+        self.assertEqual(files, ['a.srt', 'b.MD', 'c.pdf', 'drafts/old.srt',
+                                 'season1/ep1.ass', 'season1/ep2.vtt', 'season1/extra/x.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,118 @@
+"""
+语料库统计测试模块
+验证词典形统计键、按集和文件汇总、Juilland's D、排序筛选、保存后的增量重建和CSV导出
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.corpus_statistics import (CorpusStatistics, CorpusStatisticsBuilder, FileStatistics,
+                                        KoreanLineAnalyzer)
+
+
+class CountingAnalyzer(KoreanLineAnalyzer):
+    """按空格切分并记录分析次数的分析器"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def analyze(self, text):
+        self.calls += 1
+        return tuple(f"{word}/NNG" for word in text.split())
+
+
+class TestCorpusStatistics(unittest.TestCase):
+    """语料库统计测试类"""
+
+    def test_lemma_key(self):
+        """用言加 다，去掉不规则标记，不统计助词和词尾"""
+        self.assertEqual(KoreanLineAnalyzer.lemma_key('춥', 'VA-I', '춥다'), '춥다/VA')
+        self.assertEqual(KoreanLineAnalyzer.lemma_key('먹', 'VV'), '먹다/VV')
+        self.assertEqual(KoreanLineAnalyzer.lemma_key('Hello', 'SL'), 'hello/SL')
+        self.assertIsNone(KoreanLineAnalyzer.lemma_key('을', 'JKO'))
+        self.assertIsNone(KoreanLineAnalyzer.lemma_key('어요', 'EF'))
+
+    def test_analyze_with_kiwi(self):
+        """形态分析的结果按行缓存"""
+        analyzer = KoreanLineAnalyzer()
+        keys = analyzer.analyze('동생이 음악을 봤어요')
+        self.assertIn('동생/NNG', keys)
+        self.assertIn('보다/VV', keys)
+        self.assertIs(analyzer.analyze('동생이 음악을 봤어요'), keys)
+
+    def test_juilland_d(self):
+        """均匀分布为1，集中在一个分区为0"""
+        sizes = [10, 10, 10, 10]
+        self.assertAlmostEqual(CorpusStatistics.juilland_d({0: 2, 1: 2, 2: 2, 3: 2}, sizes), 1.0)
+        self.assertAlmostEqual(CorpusStatistics.juilland_d({0: 8}, sizes), 0.0)
+        # 分区大小不同时按相对频率计算
+        self.assertAlmostEqual(CorpusStatistics.juilland_d({0: 1, 1: 2}, [10, 20]), 1.0)
+
+    def test_aggregate_and_sort(self):
+        """按文件和集汇总，排序与筛选"""
+        analyzer = CountingAnalyzer()
+        stats = {
+            'a.txt': FileStatistics.build('a.txt', (1, 1), [
+                {'content': '친구 학교', 'episode': '第1集'},
+                {'content': '친구', 'episode': '第2集'}], analyzer),
+            'b.txt': FileStatistics.build('b.txt', (1, 1), [
+                {'content': '친구 친구 시장', 'episode': '第3集'}], analyzer),
+        }
+        statistics = CorpusStatistics(stats)
+        self.assertEqual(statistics.part_count, 3)
+        self.assertEqual(statistics.token_count, 6)
+        row = statistics.lookup('친구')[0]
+        self.assertEqual((row['frequency'], row['range'], row['episodes']), (4, 2, 3))
+        self.assertEqual([row['lemma'] for row in statistics.rows()], ['친구', '시장', '학교'])
+        self.assertEqual([row['lemma'] for row in statistics.rows('lemma', descending=False)],
+                         ['시장', '친구', '학교'])
+        self.assertEqual(len(statistics.rows(min_frequency=2)), 1)
+        with self.assertRaises(ValueError):
+            statistics.rows('unknown')
+
+    def test_incremental_build_and_export(self):
+        """保存后只重新分析变化的文件，并导出CSV"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for name, text in [('ep1.txt', '친구 학교\n'), ('ep2.txt', '친구 시장\n')]:
+                path = os.path.join(temp_dir, name)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                paths.append(path)
+
+            analyzer = CountingAnalyzer()
+            builder = CorpusStatisticsBuilder(os.path.join(temp_dir, 'stats.json'), analyzer)
+            statistics = builder.build(paths)
+            self.assertEqual(statistics.lookup('친구')[0]['range'], 2)
+            first_calls = analyzer.calls
+
+            # 未变化的文件直接使用保存的结果
+            statistics = builder.build(paths)
+            self.assertEqual(analyzer.calls, first_calls)
+            self.assertEqual(statistics.lookup('친구')[0]['frequency'], 2)
+
+            with open(paths[1], 'w', encoding='utf-8') as f:
+                f.write('시장 시장 가게\n')
+            os.utime(paths[1], ns=(1, 1))
+            statistics = builder.build(paths)
+            self.assertGreater(analyzer.calls, first_calls)
+            self.assertEqual(statistics.lookup('시장')[0]['frequency'], 2)
+            self.assertEqual(statistics.lookup('친구')[0]['range'], 1)
+
+            output_path = os.path.join(temp_dir, 'stats.csv')
+            statistics.export_csv(output_path)
+            with open(output_path, 'r', encoding='utf-8-sig') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows[0][0], '词典形')
+            self.assertEqual(len(rows), len(statistics) + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+语料库监视测试模块
+验证解析结果缓存的校验与淘汰，以及监视器在文件新增后预解析
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.parse_cache import ParseCache, parse_cache
+from function.corpus_watcher import CorpusWatcher
+from function.search_engine_base import search_engine_base
+
+
+SRT_CONTENT = "1\n00:00:01,000 --> 00:00:02,000\n新的一集台词\n\n"
+
+
+class TestCorpusWatcher(unittest.TestCase):
+    """语料库监视测试类"""
+
+    def setUp(self):
+        """创建临时语料库目录"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(parse_cache.clear)
+        self.root = {'path': self.temp_dir.name, 'extensions': None, 'ignore_patterns': None}
+
+    def _write(self, name, content):
+        """写入语料库文件"""
+        path = os.path.join(self.temp_dir.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def _wait_cached(self, path, timeout=10.0):
+        """等待文件被预解析"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if parse_cache.contains(path):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_parse_cache(self):
+        """测试缓存按文件指纹失效以及按记录数淘汰"""
+        cache = ParseCache(max_records=3)
+        path = self._write('a.srt', SRT_CONTENT)
+        cache.put(path, cache.fingerprint(path), [{'content': 'a'}, {'content': 'b'}])
+        self.assertEqual(len(cache.get(path)), 2)
+
+        other = self._write('b.srt', SRT_CONTENT)
+        cache.put(other, cache.fingerprint(other), [{'content': 'c'}, {'content': 'd'}])
+        self.assertIsNone(cache.get(path))
+
+        with open(other, 'a', encoding='utf-8') as f:
+            f.write('追加\n')
+        self.assertIsNone(cache.get(other))
+
+    def test_search_uses_preparsed_records(self):
+        """测试搜索使用预解析的结果"""
+        path = self._write('a.srt', SRT_CONTENT)
+        self.assertEqual(search_engine_base.preparse(path), 1)
+        cached = parse_cache.get(path)
+        cached.append(dict(cached[0], content='只在缓存中的台词'))
+
+        results = search_engine_base.search_in_file(path, '缓存')
+        self.assertEqual(len(results), 1)
+
+    def _check_backend(self, backend):
+        """新增和修改文件后由指定后端触发预解析"""
+        watcher = CorpusWatcher()
+        watcher.SETTLE_DELAY = 0.1
+        watcher.WAIT_TIMEOUT = 0.05
+        watcher.start([self.root], backend=backend, poll_interval=0.1)
+        self.addCleanup(watcher.stop)
+        self.assertTrue(watcher.wait_ready(10))
+        self.assertTrue(watcher.is_running())
+
+        path = self._write(os.path.join('season1', 'ep1.srt'), SRT_CONTENT)
+        self.assertTrue(self._wait_cached(path))
+        self.assertEqual(parse_cache.get(path)[0]['content'], '新的一集台词')
+
+        ignored = self._write('.hidden.srt', SRT_CONTENT)
+        with watcher.paused():
+            time.sleep(0.3)
+            self._write(os.path.join('season1', 'ep1.srt'), SRT_CONTENT.replace('新的', '修改后'))
+            time.sleep(0.5)
+            self.assertFalse(parse_cache.contains(path))
+        self.assertTrue(self._wait_cached(path))
+        self.assertEqual(parse_cache.get(path)[0]['content'], '修改后一集台词')
+        self.assertFalse(parse_cache.contains(ignored))
+
+        watcher.stop()
+        self.assertFalse(watcher.is_running())
+        return watcher
+
+    def test_polling_backend(self):
+        """测试轮询后端"""
+        self.assertEqual(self._check_backend('polling').backend_name, 'polling')
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify 仅在 Linux 上可用")
+    def test_inotify_backend(self):
+        """测试 inotify 后端"""
+        self.assertEqual(self._check_backend('inotify').backend_name, 'inotify')
+
+    def test_stop_does_not_block(self):
+        """测试后台线程正在建立监视时停止不会长时间阻塞"""
+        class SlowWatcher(CorpusWatcher):
+            STOP_TIMEOUT = 0.2
+
+            def _create_backend(self, backend, poll_interval):
+                time.sleep(2)
+                return super()._create_backend(backend, poll_interval)
+
+        watcher = SlowWatcher()
+        watcher.start([self.root], backend='polling')
+        thread = watcher._thread
+        start = time.monotonic()
+        watcher.stop()
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(watcher.is_running())
+        # 超时后线程在下一次检查停止标志时退出
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
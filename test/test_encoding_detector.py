@@ -0,0 +1,111 @@
+"""
+编码检测测试模块
+验证编码采样检测、按文件指纹缓存以及解析器对非UTF-8字幕的支持
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.encoding_detector import EncodingDetector, encoding_detector
+from function.subtitle_parser import SrtParser
+from function.document_parser import TxtParser
+
+
+KOREAN_SRT = """1
+00:00:01,000 --> 00:00:03,000
+안녕하세요, 오늘 날씨가 정말 좋네요.
+
+2
+00:00:04,000 --> 00:00:06,000
+우리 같이 나가요!
+"""
+
+CHINESE_TXT = "这是一个测试文件\n我们在这里说中文\n他说的话很有意思\n"
+
+
+class TestEncodingDetector(unittest.TestCase):
+    """编码检测测试类"""
+
+    def setUp(self):
+        """测试前准备"""
+        self.detector = EncodingDetector()
+
+    def _write_bytes(self, data, suffix):
+        """写入临时文件并返回路径"""
+        with tempfile.NamedTemporaryFile(mode='wb', suffix=suffix, delete=False) as f:
+            f.write(data)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_detect_bom(self):
+        """测试BOM识别"""
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-8-sig')), 'utf-8-sig')
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-16')), 'utf-16')
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-32')), 'utf-32')
+
+    def test_detect_bomless_utf16(self):
+        """测试无BOM的UTF-16识别"""
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-16-le')), 'utf-16-le')
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-16-be')), 'utf-16-be')
+
+    def test_detect_legacy_encodings(self):
+        """测试CP949/EUC-KR与GBK的区分"""
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('utf-8')), 'utf-8')
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('cp949')), 'cp949')
+        self.assertEqual(self.detector.detect_bytes(KOREAN_SRT.encode('euc-kr')), 'cp949')
+        self.assertEqual(self.detector.detect_bytes(CHINESE_TXT.encode('gbk')), 'gbk')
+
+    def test_truncated_sample(self):
+        """测试采样截断在多字节字符中间时仍识别为UTF-8"""
+        data = KOREAN_SRT.encode('utf-8')
+        self.assertEqual(self.detector.detect_bytes(data[:len(data) - 1], truncated=True), 'utf-8')
+
+    def test_cache_by_fingerprint(self):
+        """测试检测结果按文件指纹缓存，文件变化后重新检测"""
+        temp_file = self._write_bytes(KOREAN_SRT.encode('cp949'), '.srt')
+
+        calls = []
+        original = self.detector.detect_bytes
+
+        def counting_detect(sample, truncated=False):
+            calls.append(sample)
+            return original(sample, truncated)
+
+        self.detector.detect_bytes = counting_detect
+
+        self.assertEqual(self.detector.detect(temp_file), 'cp949')
+        self.assertEqual(self.detector.detect(temp_file), 'cp949')
+        self.assertEqual(len(calls), 1)
+
+        with open(temp_file, 'wb') as f:
+            f.write(KOREAN_SRT.encode('utf-16'))
+        stat = os.stat(temp_file)
+        os.utime(temp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+        self.assertEqual(self.detector.detect(temp_file), 'utf-16')
+        self.assertEqual(len(calls), 2)
+
+    def test_parsers_decode_non_utf8(self):
+        """测试解析器读取非UTF-8文件"""
+        srt_file = self._write_bytes(KOREAN_SRT.encode('cp949'), '.srt')
+        results = SrtParser().parse(srt_file)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[1]['content'], '우리 같이 나가요!')
+
+        bom_file = self._write_bytes(KOREAN_SRT.encode('utf-8-sig'), '.srt')
+        results = SrtParser().parse(bom_file)
+        self.assertEqual(results[0]['line_number'], 1)
+
+        txt_file = self._write_bytes(CHINESE_TXT.encode('gbk'), '.txt')
+        results = TxtParser().parse(txt_file)
+        self.assertEqual(results[2]['content'], '他说的话很有意思')
+        self.assertEqual(encoding_detector.detect(txt_file), 'gbk')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
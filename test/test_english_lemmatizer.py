@@ -0,0 +1,84 @@
+"""
+英语词形还原测试模块
+验证不规则变形、后缀还原规则、词典形索引以及英语变形搜索
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.english_lemmatizer import LemmaIndex, english_lemmatizer
+from function.search_engine_eng import search_engine_eng
+
+
+LINES = [
+    "He went home and stopped crying.",
+    "The children are going to school.",
+    "She goes there every day.",
+    "Nothing happened, it was a good thing.",
+    "This is the best and biggest news.",
+    "Go! Going? GONE.",
+]
+
+
+class TestEnglishLemmatizer(unittest.TestCase):
+    """英语词形还原测试类"""
+
+    def test_irregular_forms(self):
+        """不规则变形还原为词表中的词典形"""
+        self.assertIn('go', english_lemmatizer.lemmas('went'))
+        self.assertIn('child', english_lemmatizer.lemmas('children'))
+        self.assertIn('good', english_lemmatizer.lemmas('best'))
+        self.assertEqual(english_lemmatizer.lemmatize('Went'), 'go')
+        self.assertEqual(english_lemmatizer.lemmatize('walk'), 'walk')
+
+    def test_suffix_rules(self):
+        """后缀规则处理辅音双写、y 变 i 和词尾 e"""
+        self.assertIn('stop', english_lemmatizer.lemmas('stopped'))
+        self.assertIn('cry', english_lemmatizer.lemmas('cries'))
+        self.assertIn('hope', english_lemmatizer.lemmas('hoping'))
+        self.assertIn('lie', english_lemmatizer.lemmas('lying'))
+        self.assertIn('big', english_lemmatizer.lemmas('biggest'))
+        self.assertIn('happy', english_lemmatizer.lemmas('happier'))
+
+    def test_no_false_reduction(self):
+        """词表中的不变形词和非比较级不按规则还原"""
+        self.assertEqual(english_lemmatizer.lemmas('news'), {'news'})
+        self.assertEqual(english_lemmatizer.lemmas('thing'), {'thing'})
+        self.assertEqual(english_lemmatizer.lemmas('mother'), {'mother'})
+
+    def test_lemma_index(self):
+        """词典形查询返回包含任一变形的行"""
+        index = LemmaIndex([{'content': line} for line in LINES])
+        lines, forms = index.lookup('go')
+        self.assertEqual(list(lines), [0, 1, 2, 5])
+        self.assertEqual(forms, {'went', 'going', 'goes', 'go', 'gone'})
+        self.assertEqual(list(index.lookup('new')[0]), [])
+
+    def test_engine_variants_search(self):
+        """英语变形搜索记录每行实际出现的变形"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+
+            results = search_engine_eng.search_english_variants(file_path, ['go'])
+            self.assertEqual([result['content'] for result in results],
+                             [LINES[0], LINES[1], LINES[2], LINES[5]])
+            self.assertEqual(results[0]['matched_keywords'], ['went'])
+            self.assertEqual(results[3]['matched_keywords'], ['go', 'going', 'gone'])
+
+            # 区分大小写时变形的大小写形式需与查询词一致
+            results = search_engine_eng.search_english_variants(file_path, ['Go'], case_sensitive=True)
+            self.assertEqual(results[0]['matched_keywords'], ['Go', 'Going'])
+
+            results = search_engine_eng.search_english_variants(file_path, ['child'])
+            self.assertEqual(results[0]['matched_keywords'], ['children'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+频率统计测试模块
+验证统计结果与完整搜索的结果数一致、按文件和集汇总，以及命令行统计模式
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.frequency_counter import FrequencyCount, count_main
+from function.search_engine_eng import search_engine_eng
+
+
+EPISODE_1 = """第1集
+I went home.
+She goes to school.
+We love it.
+"""
+
+EPISODE_2 = """Going out? No.
+They GO there.
+"""
+
+
+class TestFrequencyCounter(unittest.TestCase):
+    """频率统计测试类"""
+
+    def setUp(self):
+        """创建测试文件"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.files = []
+        for name, text in [('ep1.txt', EPISODE_1), ('ep2.txt', EPISODE_2)]:
+            file_path = os.path.join(self.temp_dir.name, name)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.files.append(file_path)
+
+    def tearDown(self):
+        """删除测试文件"""
+        self.temp_dir.cleanup()
+
+    def test_count_matches_search(self):
+        """统计的行数与搜索结果数一致"""
+        for keywords, case_sensitive, regex_enabled in [(['go'], False, False), (['GO'], True, False),
+                                                        (['o\\b'], False, True)]:
+            for file_path in self.files:
+                expected = len(search_engine_eng.search_in_file(file_path, keywords, case_sensitive,
+                                                                regex_enabled=regex_enabled))
+                counts = search_engine_eng.count_in_file(file_path, keywords, case_sensitive,
+                                                         regex_enabled=regex_enabled)
+                self.assertEqual(sum(counts.values()), expected, (keywords, file_path))
+
+    def test_lemma_count(self):
+        """词典形统计使用倒排列表，与变形搜索的结果数一致"""
+        for file_path in self.files:
+            expected = len(search_engine_eng.search_english_variants(file_path, ['go']))
+            self.assertEqual(sum(search_engine_eng.count_english_variants(file_path, ['go']).values()),
+                             expected)
+
+    def test_totals_by_file_and_episode(self):
+        """按文件和集汇总（没有集数标题时以文件名代表一集）"""
+        frequency = search_engine_eng.count_in_files(self.files, 'go')
+        self.assertEqual(frequency.total, 3)
+        self.assertEqual(frequency.files, {self.files[0]: 1, self.files[1]: 2})
+        self.assertEqual(frequency.episodes, {'第1集': 1, 'ep2': 2})
+        self.assertEqual(frequency.to_dict()['episode_count'], 2)
+
+    def test_empty_file_not_listed(self):
+        """没有命中的文件不计入"""
+        frequency = FrequencyCount()
+        frequency.add('a.txt', FrequencyCount.count_records('a.txt', []))
+        self.assertEqual(frequency.to_dict()['file_count'], 0)
+
+    def test_command_line(self):
+        """命令行统计模式输出JSON"""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = count_main(['go', '--mode', 'lemma', '--input', self.temp_dir.name, '--json'])
+        self.assertEqual(status, 0)
+        result = json.loads(output.getvalue())
+        self.assertEqual(result['total'], 4)
+        self.assertEqual(result['episode_count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
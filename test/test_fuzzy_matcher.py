@@ -0,0 +1,106 @@
+"""
+模糊匹配测试模块
+用暴力算法验证 Myers 近似子串匹配和 SymSpell 词汇索引，并测试韩文字母级编辑距离和搜索引擎的模糊匹配
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.fuzzy_matcher import ApproximatePattern, FuzzyMatcher, SymSpellIndex, levenshtein, to_jamo
+from function.search_engine_base import SearchEngineBase
+
+
+def brute_force_distance(pattern, text, max_distance):
+    """枚举所有子串计算最小编辑距离"""
+    best = None
+    for i in range(len(text) + 1):
+        for j in range(i, len(text) + 1):
+            distance = levenshtein(pattern, text[i:j])
+            if distance <= max_distance and (best is None or distance < best):
+                best = distance
+    return best
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+    """模糊匹配测试类"""
+
+    def test_approximate_pattern_matches_brute_force(self):
+        """Myers 算法与暴力枚举结果一致"""
+        rng = random.Random(7)
+        for _ in range(1000):
+            pattern = ''.join(rng.choice('abc') for _ in range(rng.randint(1, 6)))
+            text = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 12)))
+            max_distance = rng.randint(0, 2)
+            compiled = ApproximatePattern(pattern, max_distance, hangul_jamo=False)
+            self.assertEqual(compiled.distance(text), brute_force_distance(pattern, text, max_distance),
+                             (pattern, text, max_distance))
+
+    def test_symspell_lookup_matches_brute_force(self):
+        """SymSpell 查找结果与逐词计算编辑距离一致"""
+        rng = random.Random(11)
+        words = [''.join(rng.choice('abcde') for _ in range(rng.randint(1, 12))) for _ in range(500)]
+        index = SymSpellIndex(2, hangul_jamo=False)
+        for word in words:
+            index.add(word)
+        for _ in range(300):
+            term = ''.join(rng.choice('abcde') for _ in range(rng.randint(1, 12)))
+            max_distance = rng.randint(0, 2)
+            expected = {word: levenshtein(term, word) for word in words
+                        if levenshtein(term, word) <= max_distance}
+            self.assertEqual(index.lookup(term, max_distance), expected, (term, max_distance))
+
+    def test_hangul_jamo_distance(self):
+        """韩文按字母计算编辑距离：사랑 与 사람 只差一个终声，与 사과 相差多个字母"""
+        self.assertEqual(len(to_jamo('사람')), 5)
+        self.assertEqual(ApproximatePattern('사랑', 1).distance('그 사람은'), 1)
+        self.assertIsNone(ApproximatePattern('사랑', 1).distance('사과 주세요'))
+        self.assertEqual(ApproximatePattern('사랑', 1, hangul_jamo=False).distance('사과 주세요'), 1)
+
+    def test_automatic_distance(self):
+        """自动编辑距离随关键词长度增加"""
+        matcher = FuzzyMatcher()
+        self.assertEqual(matcher.distance_for('go'), 0)
+        self.assertEqual(matcher.distance_for('hello'), 1)
+        self.assertEqual(matcher.distance_for('decision'), 2)
+        self.assertEqual(FuzzyMatcher(max_distance=3).distance_for('decision'), 3)
+
+    def test_fixed_distance_capped(self):
+        """固定编辑距离不超过关键词长度减1，短关键词不会匹配所有行"""
+        matcher = FuzzyMatcher(max_distance=2)
+        self.assertEqual(matcher.distance_for('go'), 1)
+        self.assertEqual(matcher.distance_for('a'), 0)
+        self.assertEqual(matcher.distance_for('hello'), 2)
+        self.assertIsNone(matcher.compile('go').distance('xyz abc'))
+
+    def test_default_threshold(self):
+        """_fuzzy_match 默认相似度阈值 0.6，允许的编辑距离为模式长度的 0.4 倍"""
+        engine = SearchEngineBase()
+        self.assertTrue(engine._fuzzy_match('decision', 'a hard desicion'))
+        self.assertFalse(engine._fuzzy_match('decision', 'a hard choice'))
+        self.assertFalse(engine._fuzzy_match('go', 'to'))
+        self.assertTrue(engine._fuzzy_match('go', 'to', threshold=0.5))
+
+    def test_engine_fuzzy_search(self):
+        """搜索引擎的模糊匹配命中拼写错误的关键词，并记录语料库中实际出现的词"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("We made a decision.\nNothing here.\n그 사람은 친구예요.\n")
+
+            engine = SearchEngineBase()
+            results = engine.search_in_file(file_path, ['decison'], fuzzy_match=True)
+            self.assertEqual([r['content'] for r in results], ['We made a decision.'])
+            self.assertEqual(results[0]['matched_keywords'], ['decision'])
+
+            self.assertEqual(engine.search_in_file(file_path, ['decison']), [])
+            self.assertEqual(len(engine.search_in_file(file_path, ['사랑'], fuzzy_match=True)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+韩文字母索引测试模块
+验证初声投影、字母分解、查询方式判断以及初声/不完整音节检索
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.jamo_index import JamoIndex, matched_span, query_mode, to_choseong, to_letters
+from function.search_engine_kor import search_engine_kor
+
+
+LINES = [
+    "어려도 괜찮아요",
+    "그 사람은 학교에 가요",
+    "닭을 먹었어요",
+    "hello world",
+    "살 빼야 돼",
+]
+
+
+class TestJamoIndex(unittest.TestCase):
+    """韩文字母索引测试类"""
+
+    def setUp(self):
+        """建立测试索引"""
+        self.index = JamoIndex([{'content': line} for line in LINES])
+
+    def test_projections(self):
+        """初声投影逐字符对应，复合终声拆分"""
+        self.assertEqual(to_choseong('어려도 돼!'), 'ㅇㄹㄷ ㄷ!')
+        self.assertEqual(to_letters('닭'), 'ㄷㅏㄹㄱ')
+        self.assertEqual(to_letters('ㄺ'), 'ㄹㄱ')
+
+    def test_query_mode(self):
+        """只含初声时为初声检索，含单独字母时为字母检索"""
+        self.assertEqual(query_mode('ㅇㄹㄷ'), 'choseong')
+        self.assertEqual(query_mode('ㄱ ㅅ'), 'choseong')
+        self.assertEqual(query_mode('사ㄹ'), 'jamo')
+        self.assertEqual(query_mode('ㅏ'), 'jamo')
+        self.assertIsNone(query_mode('사람'))
+        self.assertIsNone(query_mode('hello'))
+
+    def test_search_matches_linear_scan(self):
+        """索引检索结果与逐行比较一致"""
+        for query in ['ㅇㄹㄷ', 'ㅅㄹ', 'ㄱ', 'ㄱ ㅅ', 'ㅎㄱㅇ']:
+            expected = [i for i, line in enumerate(LINES) if query in to_choseong(line)]
+            self.assertEqual(self.index.search_choseong(query), expected, query)
+        for query in ['사ㄹ', '달ㄱ', '살', 'ㅏ', '먹었ㅇ', '학ㄱ']:
+            expected = [i for i, line in enumerate(LINES) if to_letters(query) in to_letters(line)]
+            self.assertEqual(self.index.search_letters(query), expected, query)
+        self.assertEqual(self.index.search_letters('사ㄹ'), [1, 4])
+
+    def test_matched_span(self):
+        """匹配范围扩展到完整音节"""
+        self.assertEqual(matched_span('그 사람은', '사ㄹ', 'jamo'), (2, 4))
+        self.assertEqual(matched_span('어려도 괜찮아요', 'ㅇㄹㄷ', 'choseong'), (0, 3))
+
+    def test_engine_jamo_search(self):
+        """韩语搜索引擎的字母检索返回与高级检索相同结构的搜索记录"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+
+            record = search_engine_kor.search_korean_jamo(file_path, 'ㅇㄹㄷ')
+            self.assertEqual(record['result_count'], 1)
+            self.assertEqual(record['search_results'][0]['content'], LINES[0])
+            self.assertEqual(record['matched_terms_set'], ['어려도'])
+
+            record = search_engine_kor.search_korean_jamo(file_path, '사ㄹ')
+            self.assertEqual(record['matched_terms_set'], ['사람', '살'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+行分类测试模块
+验证合并后的集数标题正则与原有逐条匹配结果一致，并支持配置文件中的额外格式
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.config_manager import ConfigManager
+from function.line_classifier import LineClassifier, line_classifier
+
+
+# 原 SubtitleParser.is_episode_title 中的格式列表
+LEGACY_PATTERNS = [
+    r'^第\d+集',
+    r'^Episode\s*\d+',
+    r'^EP\s*\d+',
+    r'^#\d+',
+    r'^[Ss]\d+[Ee]\d+',
+    r'^[Cc]hapter\s+\d+',
+    r'^-*#{1,3}\s+\d+',
+    r'^-+\s+#{1,3}\s+\S+',
+    r'^\s*#{1,3}\s+\S+',
+    r'^#{1,6}\s+.*?[Ss]\d+[Ee]\d+',
+]
+
+SAMPLE_LINES = [
+    '第1集', '第12集 开始', 'Episode 3', 'episode 3', 'EP 10', 'ep 10', '#5', 'S01E02', 's1e2',
+    'Chapter 4', 'chapter 4', 'CHAPTER 1', 'CHAPTER 2', '## 1.2', '---# 1', '--- ## 标题', '# 标题', '#### Death\'s Game S01E01',
+    '普通台词', '안녕하세요', 'This is a line', '[00:00:49] 내용', '#hashtag', '1', '',
+]
+
+
+def legacy_is_episode_title(line):
+    """原实现：每行逐条匹配，并对小写后的行再匹配一次"""
+    line_lower = line.lower()
+    for pattern in LEGACY_PATTERNS:
+        if re.match(pattern, line_lower) or re.match(pattern, line):
+            return True
+    return False
+
+
+class TestLineClassifier(unittest.TestCase):
+    """行分类测试类"""
+
+    def test_parity_with_legacy_patterns(self):
+        """测试合并正则与原逐条匹配结果一致"""
+        classifier = LineClassifier()
+        for line in SAMPLE_LINES:
+            self.assertEqual(classifier.is_episode_title(line), legacy_is_episode_title(line), line)
+
+    def test_uppercase_heading(self):
+        """测试全大写的标题按小写形式匹配（如 CHAPTER 1）"""
+        self.assertTrue(line_classifier.is_episode_title('CHAPTER 1'))
+        self.assertTrue(line_classifier.is_episode_title('CHAPTER 2'))
+
+    def test_extra_patterns(self):
+        """测试配置的额外格式生效，无效正则被忽略"""
+        classifier = LineClassifier([r'^제\d+화', r'^(broken'])
+        self.assertTrue(classifier.is_episode_title('제3화'))
+        self.assertTrue(classifier.is_episode_title('第3集'))
+        self.assertNotIn(r'^(broken', classifier.episode_patterns)
+        self.assertFalse(line_classifier.is_episode_title('제3화'))
+
+    def test_patterns_from_config(self):
+        """测试配置文件中含 % 的额外格式按原样读取"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = os.path.join(temp_dir, 'test.ini')
+            with open(config_file, 'w', encoding='utf-8') as f:
+                f.write('[PARSER]\nepisode_patterns =\n    ^\\d+% 완료\n    ^제\\d+화\n')
+            settings = ConfigManager(config_file).get_parser_settings()
+        self.assertEqual(settings['episode_patterns'], [r'^\d+% 완료', r'^제\d+화'])
+
+    def test_time_axis(self):
+        """测试时间轴提取与时间戳行解析"""
+        self.assertEqual(line_classifier.extract_time_axis('台词 [00:02:36] 结尾'), '[00:02:36]')
+        self.assertIsNone(line_classifier.extract_time_axis('没有时间轴'))
+        self.assertEqual(line_classifier.match_timestamp_line('[0:00:49]  内容 '), ('[0:00:49]', '内容'))
+        self.assertIsNone(line_classifier.match_timestamp_line('内容 [00:00:49]'))
+        self.assertTrue(line_classifier.contains_time_axis('a\n[01:02:03] b'))
+
+
+def benchmark(repeat=2000):
+    """对比原逐条匹配与合并正则的耗时"""
+    lines = SAMPLE_LINES * repeat
+
+    start = time.perf_counter()
+    for line in lines:
+        legacy_is_episode_title(line)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for line in lines:
+        line_classifier.is_episode_title(line)
+    combined_time = time.perf_counter() - start
+
+    print(f"{len(lines)} 行: 原实现 {legacy_time:.3f}s, 合并正则 {combined_time:.3f}s, "
+          f"加速 {legacy_time / combined_time:.1f}x")
+
+
+if __name__ == '__main__':
+    if '--benchmark' in sys.argv:
+        benchmark()
+    else:
+        unittest.main(verbosity=2)
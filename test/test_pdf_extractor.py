@@ -0,0 +1,100 @@
+"""
+PDF页面提取测试模块
+验证并行提取与逐页提取结果一致、页面缓存复用以及页码过滤
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from function.pdf_extractor import PdfPageExtractor
+from function.document_parser import PdfParser
+import function.document_parser as document_parser
+
+
+class TestPdfExtractor(unittest.TestCase):
+    """PDF页面提取测试类"""
+
+    PAGE_COUNT = 40
+
+    @classmethod
+    def setUpClass(cls):
+        """生成测试用PDF"""
+        fd, cls.pdf_file = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+        doc = fitz.open()
+        for i in range(cls.PAGE_COUNT):
+            page = doc.new_page()
+            lines = [f'line {i}-{j} [00:0{j}:00]' for j in range(3)]
+            if i % 10 == 0:
+                lines.insert(0, f'Episode {i // 10 + 1}')
+            page.insert_text((72, 72), '\n'.join(lines))
+        doc.save(cls.pdf_file)
+        doc.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """删除测试用PDF"""
+        os.unlink(cls.pdf_file)
+
+    def setUp(self):
+        """每个测试使用独立的提取器"""
+        self.extractor = PdfPageExtractor(max_workers=2)
+        self.extractor.PARALLEL_MIN_PAGES = 8
+        self.extractor.PAGES_PER_TASK = 7
+        self.original_extractor = document_parser.pdf_page_extractor
+        document_parser.pdf_page_extractor = self.extractor
+
+    def tearDown(self):
+        """恢复全局提取器"""
+        document_parser.pdf_page_extractor = self.original_extractor
+
+    def _expected_pages(self):
+        """逐页直接提取的文本"""
+        doc = fitz.open(self.pdf_file)
+        try:
+            return [page.get_text() for page in doc]
+        finally:
+            doc.close()
+
+    def test_parallel_matches_serial(self):
+        """测试并行提取与逐页提取结果一致"""
+        pages = list(self.extractor.iter_pages(self.pdf_file))
+        self.assertEqual([text for _, text in pages], self._expected_pages())
+        self.assertEqual([i for i, _ in pages], list(range(self.PAGE_COUNT)))
+
+    def test_cache_reused(self):
+        """测试第二次读取直接使用页面缓存"""
+        list(self.extractor.iter_pages(self.pdf_file, last_page=5))
+
+        def fail(*args):
+            raise AssertionError("不应重新提取已缓存的页面")
+
+        self.extractor._iter_serial = fail
+        self.extractor._iter_parallel = fail
+        pages = list(self.extractor.iter_pages(self.pdf_file, last_page=5))
+        self.assertEqual(len(pages), 5)
+
+        # 已缓存部分页面时只提取缺失的页面
+        del self.extractor._iter_serial
+        del self.extractor._iter_parallel
+        pages = list(self.extractor.iter_pages(self.pdf_file))
+        self.assertEqual([text for _, text in pages], self._expected_pages())
+
+    def test_page_filter(self):
+        """测试页码过滤时行号和集数与完整解析一致"""
+        full = PdfParser().parse(self.pdf_file)
+        filtered = PdfParser(pages=[12, 13]).parse(self.pdf_file)
+        self.assertEqual(filtered, [r for r in full if r['page'] in (12, 13)])
+        self.assertEqual(filtered[0]['episode'], 'Episode 2')
+        self.assertEqual(len(full), self.PAGE_COUNT * 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+"""
+位置索引测试模块
+验证有序邻近匹配、间隔限制、多词变体以及索引缓存的复用
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.index_cache import FileIndexCache
+from function.positional_index import PositionalIndex
+from function.search_engine_kor import search_engine_kor
+
+
+LINES = [
+    "그 사람은 너무 높아요",
+    "높아요 너무 그 사람",
+    "너무 많이 높아요",
+    "너무, 너무 높지 않아요",
+    "Hello World hello",
+]
+
+
+class TestPositionalIndex(unittest.TestCase):
+    """位置索引测试类"""
+
+    def setUp(self):
+        """建立测试索引"""
+        self.index = PositionalIndex([{'content': line} for line in LINES])
+
+    def test_find_ordered(self):
+        """按顺序匹配各核心词的任一变体"""
+        results = self.index.find_ordered([['너무'], ['높아요', '높지']])
+        self.assertEqual([line for line, _ in results], [0, 2, 3])
+        self.assertEqual(results[0][1], ['너무', '높아요'])
+        # 顺序颠倒的行不匹配
+        self.assertEqual([line for line, _ in self.index.find_ordered([['사람은'], ['그']])], [])
+
+    def test_max_gap(self):
+        """限制相邻核心词之间的词数"""
+        results = self.index.find_ordered([['너무'], ['높아요']], max_gap=0)
+        self.assertEqual([line for line, _ in results], [0])
+        results = self.index.find_ordered([['너무'], ['높아요']], max_gap=1)
+        self.assertEqual([line for line, _ in results], [0, 2])
+
+    def test_multi_token_variant(self):
+        """含多个词的变体要求各词相邻"""
+        results = self.index.find_ordered([['너무'], ['높지 않아요']])
+        self.assertEqual(results, [(3, ['너무', '높지 않아요'])])
+        self.assertEqual(self.index.find_ordered([['많이 너무']]), [])
+
+    def test_match_tokens_case_sensitive(self):
+        """单行词序列的精确匹配"""
+        tokens = PositionalIndex.TOKEN_PATTERN.findall(LINES[4])
+        self.assertEqual(PositionalIndex.match_tokens(tokens, [['World'], ['hello']]), ['World', 'hello'])
+        self.assertIsNone(PositionalIndex.match_tokens(tokens, [['world'], ['Hello']]))
+        # 索引按小写匹配
+        self.assertEqual(len(self.index.find_ordered([['world'], ['HELLO']])), 1)
+
+    def test_cache_reuse(self):
+        """指纹一致时复用索引，变化后重建"""
+        cache = FileIndexCache(PositionalIndex, max_size=1000)
+        records = [{'content': line} for line in LINES]
+        first = cache.get('ep1.txt', (1, 1), records)
+        self.assertIs(cache.get('ep1.txt', (1, 1), records), first)
+        self.assertIsNot(cache.get('ep1.txt', (1, 2), records), first)
+
+    def test_engine_matches_scan(self):
+        """惯用语检索结果与逐行扫描一致"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+
+            for idiom in ['너무 높다', '그 사람']:
+                core_words = search_engine_kor._extract_core_words(idiom)
+                variants = {word: search_engine_kor._generate_korean_variants(word) for word in core_words}
+                expected = [result['content'] for result in
+                            search_engine_kor._search_korean_idiom_scan(file_path, core_words, variants, False)]
+                actual = [result['content'] for result in search_engine_kor.search_korean_idiom(file_path, idiom)]
+                self.assertEqual(actual, expected, idiom)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+查询语言测试模块
+验证查询解析、布尔运算、短语、NEAR、前缀通配以及 file:/episode:/time:/eptime: 筛选条件
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.query_language import AndNode, FilterNode, NearNode, OrNode, TermNode, query_parser
+from function.search_engine_base import search_engine_base
+
+
+SRT_CONTENT = """1
+00:00:01,000 --> 00:00:03,000
+Episode 1
+
+2
+00:00:04,000 --> 00:00:06,000
+I love you so much
+
+3
+00:00:07,000 --> 00:00:09,000
+You love me, I am sorry
+
+4
+00:01:10,000 --> 00:01:12,000
+Love is all you need
+
+5
+00:02:00,000 --> 00:02:02,000
+Episode 2
+
+6
+00:02:04,000 --> 00:02:06,000
+I really really love you
+
+7
+00:02:07,000 --> 00:02:09,000
+Lovely weather today
+"""
+
+
+class TestQueryLanguage(unittest.TestCase):
+    """查询语言测试类"""
+
+    def setUp(self):
+        """创建测试字幕文件"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, 'drama_ep1.srt')
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write(SRT_CONTENT)
+
+    def tearDown(self):
+        """删除测试文件"""
+        self.temp_dir.cleanup()
+
+    def search(self, query, case_sensitive=False):
+        """返回命中行的内容"""
+        return [result['content'] for result in
+                search_engine_base.search_query(self.file_path, query, case_sensitive)]
+
+    def test_parse(self):
+        """运算符优先级：NOT > NEAR > AND > OR，筛选条件与相邻查询项为 AND"""
+        node = query_parser.parse('a OR b AND NOT c')
+        self.assertIsInstance(node, OrNode)
+        self.assertIsInstance(node.children[1], AndNode)
+
+        node = query_parser.parse('(love OR like) NEAR/3 you episode:2')
+        self.assertIsInstance(node, AndNode)
+        self.assertIsInstance(node.children[0], NearNode)
+        self.assertIsInstance(node.children[1], FilterNode)
+
+        node = query_parser.parse('"I love you"')
+        self.assertIsInstance(node, TermNode)
+        self.assertEqual(node.tokens, ['I', 'love', 'you'])
+
+        for query in ['a AND', '(a OR b', '"a', 'a NEAR (b AND c)']:
+            with self.assertRaises(ValueError, msg=query):
+                query_parser.parse(query)
+
+    def test_is_structured(self):
+        """普通关键词和单个引号短语不使用查询语言"""
+        self.assertFalse(query_parser.is_structured('love you'))
+        self.assertFalse(query_parser.is_structured('"love you"'))
+        self.assertTrue(query_parser.is_structured('"love you" sorry'))
+        self.assertTrue(query_parser.is_structured('love AND you'))
+        self.assertTrue(query_parser.is_structured('lov*'))
+        self.assertTrue(query_parser.is_structured('love time:00:01:00-'))
+
+    def test_boolean_and_phrase(self):
+        """布尔运算和短语按词匹配"""
+        self.assertEqual(self.search('"love you" AND NOT sorry'),
+                         ['I love you so much', 'I really really love you'])
+        self.assertEqual(self.search('love AND sorry'), ['You love me, I am sorry'])
+        # 按词匹配：Lovely 不是 love
+        self.assertNotIn('Lovely weather today', self.search('love OR weather AND NOT today'))
+        self.assertEqual(self.search('lov*'), ['I love you so much', 'You love me, I am sorry',
+                                               'Love is all you need', 'I really really love you',
+                                               'Lovely weather today'])
+
+    def test_near(self):
+        """NEAR/n 不限顺序，间隔按词数计算"""
+        self.assertEqual(self.search('love NEAR/0 you'), ['I love you so much', 'You love me, I am sorry',
+                                                          'I really really love you'])
+        self.assertEqual(self.search('I NEAR/0 love'), ['I love you so much'])
+        self.assertEqual(self.search('I NEAR/1 love'), ['I love you so much', 'You love me, I am sorry'])
+        self.assertEqual(len(self.search('I NEAR/2 love')), 3)
+        self.assertEqual(self.search('"really love" NEAR/1 I'), ['I really really love you'])
+
+    def test_filters(self):
+        """文件名、集数和时间范围筛选"""
+        self.assertEqual(self.search('love episode:2'), ['I really really love you'])
+        self.assertEqual(self.search('love time:00:01:00-00:01:30'), ['Love is all you need'])
+        self.assertEqual(self.search('love time:-00:00:08'), ['I love you so much', 'You love me, I am sorry'])
+        self.assertEqual(self.search('love AND file:ep2*'), [])
+        self.assertEqual(len(self.search('love AND file:drama*')), 4)
+        with self.assertRaises(ValueError):
+            query_parser.parse('time:abc')
+
+    def test_episode_relative_time(self):
+        """eptime: 的时间从每集第一句台词开始计算"""
+        self.assertEqual(self.search('love eptime:-00:00:05'), ['I love you so much', 'I really really love you'])
+        self.assertEqual(self.search('love eptime:00:01:00-'), ['Love is all you need'])
+        self.assertEqual(self.search('love time:-00:00:05'), ['I love you so much'])
+
+    def test_case_sensitive(self):
+        """区分大小写时逐行确认，匹配词为行中的原文"""
+        self.assertEqual(self.search('Love AND you', case_sensitive=True), ['Love is all you need'])
+        self.assertEqual(self.search('love AND NOT Love', case_sensitive=True),
+                         ['I love you so much', 'You love me, I am sorry', 'I really really love you'])
+        results = search_engine_base.search_query(self.file_path, 'Lov*', case_sensitive=True)
+        self.assertEqual([result['matched_keywords'] for result in results], [['Love'], ['Lovely']])
+
+    def test_matched_keywords(self):
+        """结果记录 NOT 之外实际匹配的词和短语"""
+        results = search_engine_base.search_query(self.file_path, '"love you" OR sorry AND NOT need')
+        self.assertEqual([result['matched_keywords'] for result in results],
+                         [['love you'], ['sorry'], ['love you']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+结果数量限制测试模块
+验证前 N 条模式提前停止扫描、每集前 N 条、蓄水池抽样，以及提前停止后命中总数仍然准确
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.result_limit import ResultLimiter
+from function.search_engine_eng import search_engine_eng
+
+
+def make_results(count, episode='第1集'):
+    """生成测试用的搜索结果"""
+    return [{'file_path': 'a.txt', 'line_number': i, 'episode': episode} for i in range(count)]
+
+
+class TestResultLimit(unittest.TestCase):
+    """结果数量限制测试类"""
+
+    def test_first_stops_consuming(self):
+        """前 N 条模式取得足够结果后不再消耗生成器"""
+        consumed = []
+
+        def results():
+            for result in make_results(10):
+                consumed.append(result)
+                yield result
+
+        limiter = ResultLimiter('first', 3)
+        self.assertTrue(limiter.consume('a.txt', results()))
+        self.assertEqual(len(consumed), 3)
+        self.assertEqual([r['line_number'] for r in limiter.results()], [0, 1, 2])
+        self.assertEqual(limiter.total(['b.txt'], lambda path: 10 if path == 'a.txt' else 4), 14)
+
+    def test_first_with_complete_list(self):
+        """结果为完整列表时直接计入剩余结果数，不重新统计"""
+        limiter = ResultLimiter('first', 3)
+        self.assertTrue(limiter.consume('a.txt', make_results(10)))
+        self.assertIsNone(limiter.partial)
+        self.assertEqual(limiter.total([], lambda path: self.fail(path)), 10)
+
+    def test_per_episode(self):
+        """每集最多保留 N 条，没有集数标题时按文件区分"""
+        limiter = ResultLimiter('per_episode', 2)
+        limiter.consume('a.txt', make_results(5, '第1集') + make_results(1, '第2集'))
+        limiter.consume('b.txt', [{'file_path': 'b.txt', 'episode': '未知集数'}] * 3)
+        self.assertEqual(len(limiter.results()), 5)
+        self.assertFalse(limiter.satisfied)
+        self.assertEqual(limiter.seen, 9)
+
+    def test_reservoir_sample(self):
+        """抽样保留 N 条，按原顺序返回，同一种子结果相同"""
+        samples = []
+        for _ in range(2):
+            limiter = ResultLimiter('sample', 5, seed=7)
+            limiter.consume('a.txt', make_results(100))
+            samples.append([r['line_number'] for r in limiter.results()])
+        self.assertEqual(len(samples[0]), 5)
+        self.assertEqual(samples[0], sorted(samples[0]))
+        self.assertEqual(samples[0], samples[1])
+        self.assertNotEqual(samples[0], [0, 1, 2, 3, 4])
+
+    def test_invalid_mode(self):
+        """未知模式报错，数量为0时不限制"""
+        with self.assertRaises(ValueError):
+            ResultLimiter('top')
+        limiter = ResultLimiter('first', 0)
+        limiter.consume('a.txt', make_results(4))
+        self.assertEqual(len(limiter.results()), 4)
+
+    def test_engine_search_with_limit(self):
+        """引擎在多个文件中搜索时提前停止，命中总数与完整搜索一致"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files = []
+            for name in ('ep1.txt', 'ep2.txt', 'ep3.txt'):
+                file_path = os.path.join(temp_dir, name)
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write('go home\nstay\ngo out\n')
+                files.append(file_path)
+            limiter = ResultLimiter('first', 3)
+            results = search_engine_eng.search_in_files(files, ['go'], limiter=limiter)
+            self.assertEqual(len(results), 3)
+            self.assertEqual(limiter.partial, (files[1], 1))
+            total = limiter.total(files[2:], lambda path: sum(search_engine_eng.count_in_file(path, ['go']).values()))
+            self.assertEqual(total, len(search_engine_eng.search_in_files(files, ['go'])))
+
+
+if __name__ == '__main__':
+    unittest.main()
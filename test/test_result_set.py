@@ -0,0 +1,137 @@
+"""
+结果集测试模块
+验证按列保存的结果集在结果中筛选（关键词、排除词、正则表达式、集数）、撤销、按整数排序键排序，
+以及结果过滤只遍历一次的实现
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.result_processor import result_processor
+from function import result_set as result_set_module
+from function.result_set import ResultSet, natural_key, parse_refine_query
+
+
+ROWS = [
+    ['ep1.srt', '3', '第1集', '00:00:01', 'I take <b>the bus</b> today.', '/c/ep1.srt'],
+    ['ep1.srt', '10', '第1集', '00:00:05', 'We walked home.', '/c/ep1.srt'],
+    ['ep2.srt', '4', '第2集', '00:00:02', 'The bus was late.', '/c/ep2.srt'],
+    ['ep2.srt', '9', '第2集', '00:00:09', 'She walks to school.', '/c/ep2.srt'],
+]
+
+
+class TestResultSet(unittest.TestCase):
+    """结果集测试类"""
+
+    def setUp(self):
+        """建立结果集"""
+        self.result_set = ResultSet(ROWS)
+
+    def test_refine_and_undo(self):
+        """逐步筛选后逐步撤销"""
+        self.assertEqual(self.result_set.refine_query('bus'), 2)
+        self.assertEqual(self.result_set.refine_query('ep:第2集'), 1)
+        self.assertEqual(self.result_set.rows()[0][1], '4')
+        self.assertEqual(self.result_set.depth, 2)
+        self.assertTrue(self.result_set.undo())
+        self.assertEqual(len(self.result_set), 2)
+        self.result_set.reset()
+        self.assertEqual(len(self.result_set), 4)
+        self.assertFalse(self.result_set.undo())
+
+    def test_html_tags_ignored(self):
+        """高亮标签不参与匹配，筛选后的行保留原内容"""
+        self.assertEqual(self.result_set.refine_query('bus'), 2)
+        self.result_set.reset()
+        self.assertEqual(self.result_set.refine(['the bus']), 2)
+        self.assertIn('<b>', self.result_set.rows()[0][4])
+
+    def test_regex_exclude_and_case(self):
+        """正则表达式、排除词与大小写"""
+        self.assertEqual(self.result_set.refine_query('re:walk(ed|s) -school'), 1)
+        self.result_set.reset()
+        self.assertEqual(self.result_set.refine(['The'], case_sensitive=True), 1)
+        with self.assertRaises(ValueError):
+            self.result_set.refine(regex=['('])
+        self.assertEqual(self.result_set.depth, 1)
+
+    def test_parse_refine_query(self):
+        """解析筛选输入"""
+        query = parse_refine_query('bus -late re:^I 集:第1集')
+        self.assertEqual(query, {'keywords': ['bus'], 'excluded': ['late'], 'regex': ['^I'], 'episodes': ['第1集']})
+        with self.assertRaises(ValueError):
+            parse_refine_query('   ')
+
+    def test_sort_typed_keys(self):
+        """行号按数值、集数按自然顺序排序，多列排序稳定"""
+        self.result_set.sort([('line', False)])
+        self.assertEqual([row[1] for row in self.result_set.rows()], ['3', '4', '9', '10'])
+        self.result_set.sort([('episode', True), ('time', False)])
+        self.assertEqual([row[1] for row in self.result_set.rows()], ['4', '9', '3', '10'])
+        self.assertLess(natural_key('第9集'), natural_key('第10集'))
+
+    def test_sort_time_uses_start_ms(self):
+        """按时间轴排序使用解析器写入的开始毫秒数，没有时才解析时间轴文本"""
+        result_set = ResultSet(ROWS, [9000, None, 1000, None])
+        result_set.sort([('time', False)])
+        self.assertEqual([row[1] for row in result_set.rows()], ['4', '10', '3', '9'])
+        rows = [{'lineno': '1', 'time_axis': '0:00:02.00 --> 0:00:03.00', 'start_ms': 2000},
+                {'lineno': '2', 'time_axis': '00:00:01.500 --> 00:00:02.000'},
+                {'lineno': '3', 'time_axis': 'N/A', 'start_ms': -1}]
+        result_set = ResultSet(rows)
+        result_set.sort([('time', False)])
+        self.assertEqual([row[1] for row in result_set.rows()], ['3', '2', '1'])
+
+    def test_sort_kept_after_refine_and_undo(self):
+        """筛选和撤销后保持当前排序，清空排序恢复语料库中的顺序"""
+        self.result_set.sort([('line', True)])
+        self.result_set.refine_query('-late')
+        self.assertEqual([row[1] for row in self.result_set.rows()], ['10', '9', '3'])
+        self.result_set.undo()
+        self.assertEqual([row[1] for row in self.result_set.rows()], ['10', '9', '4', '3'])
+        self.result_set.sort([])
+        self.assertEqual([row[1] for row in self.result_set.rows()], ['3', '10', '4', '9'])
+        with self.assertRaises(ValueError):
+            self.result_set.sort([('speaker', False)])
+
+    def test_sort_without_numpy(self):
+        """未安装 NumPy 时逐列稳定排序，结果相同"""
+        columns = [('episode', False), ('text', True)]
+        self.result_set.sort(columns)
+        expected = self.result_set.rows()
+        with mock.patch.object(result_set_module, '_import_numpy', return_value=None):
+            self.result_set.sort([])
+            self.result_set.sort(columns)
+        self.assertEqual(self.result_set.rows(), expected)
+
+    def test_sort_results(self):
+        """结果排序使用整数行号与自然顺序的集数"""
+        results = [{'file_path': '/c/ep10.srt', 'line_number': 2, 'episode': '第10集'},
+                   {'file_path': '/c/ep9.srt', 'line_number': 10, 'episode': '第9集'},
+                   {'file_path': '/c/ep9.srt', 'line_number': 9, 'episode': '第9集'}]
+        self.assertEqual([r['line_number'] for r in result_processor.sort_results(results, 'line')], [2, 9, 10])
+        self.assertEqual([r['line_number'] for r in result_processor.sort_results(results, 'episode')], [10, 9, 2])
+        self.assertEqual([r['line_number'] for r in result_processor.sort_results(results, 'file,line')], [9, 10, 2])
+
+    def test_format_uses_start_ms(self):
+        """时间轴缺失时使用解析器写入的开始毫秒数，不再扫描内容"""
+        results = [{'file_path': '/c/ep1.txt', 'line_number': 2, 'content': 'hello', 'time_axis': 'N/A',
+                    'start_ms': 3723000, 'end_ms': 3723000}]
+        self.assertEqual(result_processor.format_results_for_display(results)[0][3], '[01:02:03]')
+
+    def test_filter_results(self):
+        """结果过滤按多个条件组合"""
+        results = [{'file_path': '/c/ep1.srt', 'content': 'Go home', 'episode': '第1集', 'line_number': 3},
+                   {'file_path': '/c/ep2.srt', 'content': 'go out', 'episode': '第2集', 'line_number': 9}]
+        filtered = result_processor.filter_results(results, {'content_regex': '^go', 'line_max': 5})
+        self.assertEqual([r['line_number'] for r in filtered], [3])
+        self.assertEqual(len(result_processor.filter_results(results, {'filename_contains': 'EP2'})), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+搜索性能统计测试模块
+验证分阶段计时、解析统计、搜索历史中的耗时记录以及 cProfile 环境变量
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.parse_cache import parse_cache
+from function.search_engine_base import SearchEngineBase
+from function.search_history_manager import SearchHistoryManager
+from function.search_profiler import SearchProfile, SearchProfiler, search_profiler
+
+
+SRT_CONTENT = """1
+00:00:01,000 --> 00:00:02,000
+hello world
+
+2
+00:00:03,000 --> 00:00:04,000
+goodbye world
+
+3
+00:00:05,000 --> 00:00:06,000
+hello again
+"""
+
+
+class TestSearchProfiler(unittest.TestCase):
+    """搜索性能统计测试类"""
+
+    def setUp(self):
+        """创建测试字幕文件"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.srt_path = os.path.join(self.temp_dir.name, 'ep1.srt')
+        with open(self.srt_path, 'w', encoding='utf-8') as f:
+            f.write(SRT_CONTENT)
+        parse_cache.invalidate(self.srt_path)
+
+    def test_nested_stage_time_is_exclusive(self):
+        """嵌套阶段的耗时不重复计入外层阶段"""
+        profile = SearchProfile()
+        with profile.stage('match', files=1):
+            with profile.stage('analyze', lines=1):
+                time.sleep(0.05)
+
+        self.assertGreaterEqual(profile.stages['analyze']['seconds'], 0.05)
+        self.assertLess(profile.stages['match']['seconds'], 0.04)
+        self.assertEqual(profile.stages['match']['files'], 1)
+        self.assertAlmostEqual(profile.total_seconds, profile.to_dict()['total'])
+
+    def test_parse_statistics_recorded_while_active(self):
+        """搜索线程启用统计时记录解析的文件数、行数和字节数"""
+        engine = SearchEngineBase()
+        profile = SearchProfile()
+        with search_profiler.activate(profile):
+            with profile.stage('match', files=1):
+                results = engine.search_in_file(self.srt_path, 'hello')
+
+        self.assertEqual(len(results), 2)
+        parse = profile.stages['parse']
+        self.assertEqual(parse['files'], 1)
+        self.assertEqual(parse['lines'], 3)
+        self.assertEqual(parse['bytes'], os.path.getsize(self.srt_path))
+        self.assertIn('解析', profile.summary())
+
+    def test_inactive_profiler_returns_iterator_unchanged(self):
+        """未启用统计时（如后台预解析）不包装解析结果"""
+        iterator = iter([{'content': 'a'}])
+        self.assertIs(search_profiler.timed_iter(iterator, self.srt_path), iterator)
+        with search_profiler.stage('analyze'):
+            pass
+        self.assertIsNone(search_profiler.current())
+
+    def test_history_round_trip(self):
+        """阶段耗时保存到搜索历史后可以重新读取"""
+        profile = SearchProfile()
+        profile.add('scan', 0.01, files=2)
+        profile.add('parse', 0.25, files=2, lines=300, size=4096)
+        timings = profile.to_dict()
+
+        history_file = os.path.join(self.temp_dir.name, 'history.txt')
+        with mock.patch.object(SearchHistoryManager, '_get_history_file', return_value=history_file):
+            manager = SearchHistoryManager('eng')
+            manager.add_record(keywords='hello', input_path=self.temp_dir.name,
+                               result_count=2, timings=timings)
+            loaded = SearchHistoryManager('eng').history[0]['timings']
+
+        self.assertAlmostEqual(loaded['total'], timings['total'], places=3)
+        self.assertEqual(loaded['stages']['parse'], {'seconds': 0.25, 'files': 2, 'lines': 300, 'bytes': 4096})
+        self.assertEqual(list(loaded['stages']), ['scan', 'parse'])
+
+    def test_cprofile_env(self):
+        """设置环境变量时保存 cProfile 数据"""
+        profiler = SearchProfiler()
+        with mock.patch.dict(os.environ, {SearchProfiler.CPROFILE_ENV: ''}):
+            self.assertIsNone(profiler.cprofile_path())
+
+        output_dir = os.path.join(self.temp_dir.name, 'profiles')
+        with mock.patch.dict(os.environ, {SearchProfiler.CPROFILE_ENV: output_dir + os.sep}):
+            with profiler.cprofile():
+                sum(range(1000))
+        files = os.listdir(output_dir)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith('.prof'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+搜索进度测试模块
+验证按字节数加权的进度、剩余时间文本、解析过程中的取消，以及未绑定进度对象时不影响搜索
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.search_engine_eng import search_engine_eng
+from function.search_progress import SearchCancelled, SearchProgress, search_progress
+
+
+class TestSearchProgress(unittest.TestCase):
+    """搜索进度测试类"""
+
+    def setUp(self):
+        """创建大小不同的测试文件"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.small = os.path.join(self.temp_dir.name, 'small.txt')
+        self.large = os.path.join(self.temp_dir.name, 'large.txt')
+        line = 'We go home together after the long day at work.\n'
+        with open(self.small, 'w', encoding='utf-8') as f:
+            f.write(line * 10)
+        with open(self.large, 'w', encoding='utf-8') as f:
+            f.write(line * 990)
+
+    def tearDown(self):
+        """删除测试文件"""
+        self.temp_dir.cleanup()
+
+    def test_weighted_by_bytes(self):
+        """进度按文件大小加权，不按文件数"""
+        reports = []
+        progress = SearchProgress(lambda percent, eta: reports.append(percent), interval=0)
+        progress.start([self.small, self.large])
+        progress.file_done(self.small)
+        self.assertEqual(progress.percent, 1)
+        progress.advance(self.large, 0.5)
+        self.assertEqual(progress.percent, 50)
+        progress.file_done(self.large)
+        self.assertEqual(reports[-1], 100)
+        self.assertEqual(reports, sorted(reports))
+        self.assertGreaterEqual(progress.eta, 0)
+
+    def test_progress_inside_file(self):
+        """搜索单个大文件时进度在文件内部也会前进"""
+        reports = []
+        progress = SearchProgress(lambda percent, eta: reports.append(percent), interval=0)
+        progress.start([self.large])
+        with search_progress.activate(progress):
+            results = search_engine_eng.search_in_file(self.large, ['home'])
+        self.assertEqual(len(results), 990)
+        self.assertGreater(len(reports), 5)
+        self.assertLess(max(reports), 100)
+
+    def test_cancel_during_parse(self):
+        """取消后在下一条记录处停止，不等文件处理完"""
+        progress = SearchProgress()
+        progress.start([self.large])
+        consumed = 0
+        with search_progress.activate(progress):
+            with self.assertRaises(SearchCancelled):
+                for _ in search_engine_eng.iter_search_in_file(self.large, ['home']):
+                    consumed += 1
+                    if consumed == 5:
+                        progress.cancel()
+        self.assertEqual(consumed, 5)
+
+    def test_cancel_not_swallowed_by_exception_handlers(self):
+        """按文件捕获 Exception 的代码不会吞掉取消信号"""
+        self.assertFalse(issubclass(SearchCancelled, Exception))
+
+    def test_format_eta(self):
+        """剩余时间文本"""
+        self.assertEqual(SearchProgress.format_eta(-1), "")
+        self.assertEqual(SearchProgress.format_eta(12.4), "剩余约 12秒")
+        self.assertEqual(SearchProgress.format_eta(65), "剩余约 1分05秒")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+流式解析测试模块
+验证各解析器的生成器接口与原有 parse 接口结果一致、时间轴解析为毫秒数，且搜索可以边解析边产出结果
+"""
+
+import os
+import sys
+import types
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.subtitle_parser import SrtParser, VttParser, TimestampParser, iter_subtitle_file
+from function.document_parser import TxtParser, MdParser, iter_document_file
+from function.search_engine_base import SearchEngineBase
+
+
+class TestStreamingParsers(unittest.TestCase):
+    """流式解析测试类"""
+
+    def _write_temp(self, content, suffix, mode='w'):
+        """写入临时文件并返回路径"""
+        kwargs = {} if 'b' in mode else {'encoding': 'utf-8'}
+        with tempfile.NamedTemporaryFile(mode=mode, suffix=suffix, delete=False, **kwargs) as f:
+            f.write(content)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_srt_iter_parse(self):
+        """测试SRT生成器解析"""
+        temp_file = self._write_temp("""1
+00:00:01,000 --> 00:00:03,000
+Episode 1
+第一行字幕
+
+2
+00:00:04,000 --> 00:00:06,000
+第二行字幕
+续行
+""", '.srt')
+
+        parser = SrtParser()
+        items = parser.iter_parse(temp_file)
+        self.assertIsInstance(items, types.GeneratorType)
+
+        results = list(items)
+        self.assertEqual(results, parser.parse(temp_file))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['episode'], 'Episode 1')
+        self.assertEqual(results[1]['content'], '第二行字幕\n续行')
+        self.assertEqual(results[1]['line_number'], 2)
+        self.assertEqual((results[1]['start_ms'], results[1]['end_ms']), (4000, 6000))
+
+    def test_vtt_iter_parse(self):
+        """测试VTT生成器解析（含紧跟头部的字幕块）"""
+        temp_file = self._write_temp("""WEBVTT
+00:00:01.000 --> 00:00:02.000
+hello
+
+00:00:03.000 --> 00:00:04.000
+world
+""", '.vtt')
+
+        results = list(VttParser().iter_parse(temp_file))
+        self.assertEqual([r['content'] for r in results], ['hello', 'world'])
+        self.assertEqual(results[1]['line_number'], 2)
+        self.assertEqual((results[1]['start_ms'], results[1]['end_ms']), (3000, 4000))
+
+    def test_timestamp_iter_parse(self):
+        """测试时间戳文本生成器解析"""
+        temp_file = self._write_temp("# Show S01E01\n[00:00:49] 안녕하세요\n\n[00:01:02] 반가워요\n", '.md')
+
+        results = list(TimestampParser().iter_parse(temp_file))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['episode'], '# Show S01E01')
+        self.assertEqual(results[1]['time_axis'], '[00:01:02]')
+        self.assertEqual(results[1]['line_number'], 3)
+        self.assertEqual((results[1]['start_ms'], results[1]['end_ms']), (62000, 62000))
+
+    def test_text_iter_parse(self):
+        """测试TXT/MD生成器解析与统一接口"""
+        temp_file = self._write_temp("第1集\n第一行\n\n第二行 [00:02:36]\n", '.txt')
+
+        results = list(iter_document_file(temp_file))
+        self.assertEqual(results, TxtParser().parse(temp_file))
+        self.assertEqual([r['line_number'] for r in results], [2, 4])
+        self.assertEqual(results[1]['time_axis'], '[00:02:36]')
+        self.assertEqual(results[0]['episode'], '第1集')
+
+        md_file = self._write_temp("## 1\n内容\n", '.md')
+        self.assertEqual(list(MdParser().iter_parse(md_file))[0]['episode'], '## 1')
+
+    def test_first_match_without_parsing_rest(self):
+        """测试找到第一条结果时不需要解析文件剩余部分"""
+        # 文件开头是正常字幕，尾部（远超读取缓冲区）是无法解码的字节
+        head = "1\n00:00:01,000 --> 00:00:02,000\n目标台词\n\n".encode('utf-8')
+        filler = ("2\n00:00:03,000 --> 00:00:04,000\n填充内容\n\n" * 20000).encode('utf-8')
+        temp_file = self._write_temp(head + filler + b'\xff\xfe\xfa', '.srt', mode='wb')
+
+        results = SearchEngineBase().iter_search_in_file(temp_file, '目标')
+        first = next(results)
+        results.close()
+        self.assertEqual(first['content'], '目标台词')
+
+        items = iter_subtitle_file(temp_file)
+        self.assertEqual(next(items)['line_number'], 1)
+        items.close()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
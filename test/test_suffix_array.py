@@ -0,0 +1,142 @@
+"""
+后缀数组测试模块
+验证后缀数组的构建、子串计数、与逐行扫描一致的搜索结果、忽略空白匹配、计数与搜索一致以及 KWIC 排序
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from function.search_engine_base import SearchEngineBase
+from function.suffix_array import SuffixArrayIndex, SuffixArraySearcher, build_suffix_array
+import function.search_engine_base as search_engine_base_module
+
+
+LINES = [
+    "너무 사랑해요",
+    "사랑 해요, 정말 사랑해",
+    "I love you, LOVE",
+    "Lovely day",
+    "가고 싶어요",
+]
+
+
+@unittest.skipIf(numpy is None, "未安装numpy")
+class TestSuffixArray(unittest.TestCase):
+    """后缀数组测试类"""
+
+    def setUp(self):
+        """建立测试索引"""
+        self.records = [{'content': line} for line in LINES]
+        self.index = SuffixArrayIndex(self.records)
+
+    def test_build_suffix_array(self):
+        """后缀数组与直接排序所有后缀的结果一致"""
+        rng = random.Random(0)
+        for _ in range(100):
+            text = ''.join(rng.choice('ab\x00가') for _ in range(rng.randint(1, 50)))
+            self.assertEqual(build_suffix_array(text).tolist(),
+                             sorted(range(len(text)), key=lambda i: text[i:]))
+
+    def test_count_and_lines(self):
+        """出现次数和所在行（不区分大小写，不跨行）"""
+        self.assertEqual(self.index.count('사랑해'), 2)
+        self.assertEqual(self.index.count('love'), 3)
+        self.assertEqual(self.index.lines('love'), [2, 3])
+        self.assertEqual(self.index.count('해요가'), 0)
+
+    def test_search_matches_scan(self):
+        """精确搜索结果与逐行扫描一致"""
+        engine = SearchEngineBase()
+        searcher = SuffixArraySearcher('suffix_array')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+
+            for keywords in [['사랑'], ['love', '해요'], ['LOVE'], ['없는말']]:
+                for case_sensitive in (False, True):
+                    expected = engine.search_in_file(file_path, keywords, case_sensitive)
+                    _, records = engine._load_records(file_path)
+                    index = searcher.get_index(file_path, None, records)
+                    actual = searcher.search(index, records, keywords, case_sensitive)
+                    self.assertEqual(actual, expected, (keywords, case_sensitive))
+
+    def test_ignore_whitespace(self):
+        """忽略空白时 사랑해 与 사랑 해 互相匹配，KWIC 使用原文"""
+        index = SuffixArrayIndex(self.records, ignore_whitespace=True)
+        self.assertEqual(index.lines('사랑해'), [0, 1])
+        self.assertEqual(index.lines('가고싶'), [4])
+        searcher = SuffixArraySearcher('suffix_array', ignore_whitespace=True)
+        items = list(searcher.iter_kwic(index, self.records, '사랑 해요', width=3))
+        self.assertEqual(sorted(item['keyword'] for item in items), ['사랑 해요', '사랑해요'])
+
+    def test_lowercase_changes_length(self):
+        """小写后长度变化的字符（İ）不使后面的匹配位置错开"""
+        records = [{'content': 'İstanbul love'}, {'content': 'I love you'}]
+        for ignore_whitespace in (False, True):
+            index = SuffixArrayIndex(records, ignore_whitespace=ignore_whitespace)
+            searcher = SuffixArraySearcher('suffix_array', ignore_whitespace=ignore_whitespace)
+            items = list(searcher.iter_kwic(index, records, 'love', width=3))
+            self.assertEqual([item['keyword'] for item in items], ['love', 'love'], ignore_whitespace)
+            self.assertEqual(index.locate(int(index.occurrences('i̇stanbul')[0]), 9)[1:], (0, 8))
+
+    def test_count_matches_search_case_sensitive(self):
+        """忽略空白且区分大小写时，只计数的统计与搜索结果的行数一致"""
+        engine = SearchEngineBase()
+        original = search_engine_base_module.suffix_array_searcher
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('Hello World\nhello world\nHELLO\n')
+            try:
+                search_engine_base_module.suffix_array_searcher = SuffixArraySearcher(
+                    'suffix_array', ignore_whitespace=True)
+                results = engine.search_in_file(file_path, ['Hello'], case_sensitive=True)
+                counts = engine.count_in_file(file_path, ['Hello'], case_sensitive=True)
+            finally:
+                search_engine_base_module.suffix_array_searcher = original
+        self.assertEqual([result['content'] for result in results], ['Hello World'])
+        self.assertEqual(sum(counts.values()), 1)
+
+    def test_kwic_order(self):
+        """KWIC 按右侧上下文排序，也可按左侧上下文排序"""
+        searcher = SuffixArraySearcher('suffix_array')
+        items = list(searcher.iter_kwic(self.index, self.records, 'love', width=5))
+        self.assertEqual([item['right'] for item in items], ['', ' you,', 'ly da'])
+        self.assertEqual([item['keyword'] for item in items], ['LOVE', 'love', 'Love'])
+        items = searcher.merge_kwic([iter(items)], sort='left')
+        self.assertEqual([item['left'] for item in items], ['', 'you, ', 'I '])
+
+    def test_engine_backend(self):
+        """搜索引擎按设置使用后缀数组后端"""
+        engine = SearchEngineBase()
+        original = search_engine_base_module.suffix_array_searcher
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+            expected = engine.search_in_files([file_path], ['사랑 해'])
+            try:
+                search_engine_base_module.suffix_array_searcher = SuffixArraySearcher(
+                    'suffix_array', ignore_whitespace=True)
+                actual = engine.search_in_files([file_path], ['사랑 해'])
+                self.assertEqual(engine.count_occurrences([file_path], '사랑 해'), 3)
+            finally:
+                search_engine_base_module.suffix_array_searcher = original
+        self.assertEqual([result['content'] for result in expected], LINES[1:2])
+        self.assertEqual([result['content'] for result in actual], LINES[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
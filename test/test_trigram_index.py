@@ -0,0 +1,96 @@
+"""
+三元组索引测试模块
+验证正则表达式的三元组分析、索引筛选结果与全量扫描一致，以及无法提取字面量时退回全量扫描
+"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from function.parse_cache import parse_cache
+from function.search_engine_base import SearchEngineBase
+from function.index_cache import FileIndexCache
+from function.trigram_index import RegexTrigramAnalyzer, TrigramIndex
+
+
+LINES = [
+    "We made a decision today.",
+    "She went home again.",
+    "They took the bus home.",
+    "Dinner is ready!",
+    "눈이 너무 높아요",
+    "Room 101, floor 2",
+    "nothing to see",
+    "He is walking and talking.",
+]
+
+PATTERNS = [
+    r"decision", r"(went|took)\s+\w+", r"DINNER", r"눈이 너무", r"\d+", r"[a-z]+ing",
+    r"walk(ing)?", r"x{0}home", r"ho+me", r"(?i)ROOM \d", r"^They", r"a(?=g)gain",
+]
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """三元组索引测试类"""
+
+    def setUp(self):
+        """准备测试数据"""
+        self.analyzer = RegexTrigramAnalyzer()
+        self.records = [{'content': line} for line in LINES]
+
+    def test_analyze_literals_and_branches(self):
+        """字面串拆分为三元组，分支生成并集，无字面量时返回None"""
+        self.assertEqual(self.analyzer.analyze('Hello'), ('and', ['hel', 'ell', 'llo']))
+        self.assertEqual(self.analyzer.analyze('(went|took)'),
+                         ('or', [('and', ['wen', 'ent']), ('and', ['too', 'ook'])]))
+        self.assertEqual(self.analyzer.analyze('a{3}'), 'aaa')
+        self.assertIsNone(self.analyzer.analyze(r'\d+'))
+        self.assertIsNone(self.analyzer.analyze('(abc)?x'))
+        self.assertIsNone(self.analyzer.analyze('abc|x'))
+        self.assertIsNone(self.analyzer.analyze('(unclosed'))
+
+    def test_candidates_cover_all_matches(self):
+        """候选行包含所有实际匹配的行"""
+        index = TrigramIndex(self.records)
+        for pattern in PATTERNS:
+            regex = re.compile(pattern, re.IGNORECASE)
+            expected = {i for i, line in enumerate(LINES) if regex.search(line)}
+            candidates = index.candidates(self.analyzer.analyze(pattern))
+            if candidates is not None:
+                self.assertTrue(expected <= candidates, pattern)
+
+    def test_cache_reuses_index_until_file_changes(self):
+        """文件指纹不变时复用索引"""
+        cache = FileIndexCache(TrigramIndex, max_size=1000, size_of=lambda index: index.posting_count)
+        first = cache.get('a.txt', (10, 1), self.records)
+        self.assertIs(cache.get('a.txt', (10, 1), self.records), first)
+        self.assertIsNot(cache.get('a.txt', (10, 2), self.records), first)
+
+    def test_engine_regex_search_matches_full_scan(self):
+        """搜索引擎使用索引的结果与逐行扫描一致"""
+        engine = SearchEngineBase()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'ep1.txt')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(LINES) + '\n')
+            self.addCleanup(parse_cache.invalidate, file_path)
+
+            for case_sensitive in (False, True):
+                for pattern in PATTERNS + [r'\D{20}']:
+                    full_scan = engine._search_in_parsed_data(
+                        engine._parse_file(file_path), [pattern], case_sensitive, False, True, False)
+                    indexed = engine.search_in_file(file_path, pattern, case_sensitive=case_sensitive,
+                                                    regex_enabled=True)
+                    self.assertEqual(indexed, full_scan, (pattern, case_sensitive))
+
+            # \D 不能因忽略大小写被转换为 \d
+            self.assertEqual(len(engine.search_in_file(file_path, r'^\D+$', regex_enabled=True)), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Word解析测试模块
+验证流式XML读取与 python-docx 读取的段落文本和解析结果一致
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.enum.text import WD_BREAK
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from function.document_parser import WordParser
+
+
+class TestWordParser(unittest.TestCase):
+    """Word解析测试类"""
+
+    def _save(self, doc):
+        """保存文档到临时文件并返回路径"""
+        fd, path = tempfile.mkstemp(suffix='.docx')
+        os.close(fd)
+        doc.save(path)
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def _build_document(self):
+        """构造包含各种段落内容的文档"""
+        doc = Document()
+        doc.add_paragraph('第1集')
+        doc.add_paragraph('普通台词 [00:02:36]')
+        doc.add_paragraph('')
+
+        paragraph = doc.add_paragraph('前\t后')
+        run = paragraph.add_run('换行')
+        run.add_break()
+        run.add_text('之后')
+        paragraph.add_run('分页').add_break(WD_BREAK.PAGE)
+        for tag in ('w:cr', 'w:noBreakHyphen', 'w:ptab'):
+            run = paragraph.add_run('x')
+            run._r.append(OxmlElement(tag))
+
+        # 超链接中的文字
+        paragraph = doc.add_paragraph('访问 ')
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('r:id'), 'rId99')
+        link_run = OxmlElement('w:r')
+        link_text = OxmlElement('w:t')
+        link_text.text = '链接文字'
+        link_run.append(link_text)
+        hyperlink.append(link_run)
+        paragraph._p.append(hyperlink)
+        paragraph.add_run(' 结尾')
+
+        # 表格中的段落不属于正文段落
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = '表格内容'
+        doc.add_paragraph('Episode 2')
+        doc.add_paragraph('最后一行')
+        return doc
+
+    def test_paragraph_text_parity(self):
+        """测试流式读取的段落文本与 python-docx 一致"""
+        path = self._save(self._build_document())
+        parser = WordParser()
+        fast = list(parser._iter_xml_paragraphs(path))
+        slow = list(parser._iter_docx_paragraphs(path))
+        self.assertEqual(fast, slow)
+        self.assertIn('访问 链接文字 结尾', [text for _, text in fast])
+
+    def test_parse_parity(self):
+        """测试两种读取方式的解析结果一致"""
+        path = self._save(self._build_document())
+        fast = WordParser().parse(path)
+        slow = WordParser(use_xml_stream=False).parse(path)
+        self.assertEqual(fast, slow)
+        self.assertEqual(fast[0]['time_axis'], '[00:02:36]')
+        self.assertEqual(fast[-1]['episode'], 'Episode 2')
+
+    def test_fallback_on_invalid_xml(self):
+        """测试主文档XML损坏时改用 python-docx"""
+        path = self._save(self._build_document())
+        parser = WordParser()
+
+        def broken(file_path):
+            yield 1, '第1集'
+            raise zipfile.BadZipFile('损坏')
+
+        parser._iter_xml_paragraphs = broken
+        self.assertEqual(parser.parse(path), WordParser(use_xml_stream=False).parse(path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)